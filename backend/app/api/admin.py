@@ -1,8 +1,9 @@
 from __future__ import annotations
 
+import json
 import logging
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 
@@ -16,7 +17,7 @@ from app.api.auth import get_current_user, require_admin
 from app.config import settings
 from app.db.models import (
     User, FreeTrialApplication, Payment, Subscription,
-    LottoDraw, LottoRecommendLog, LottoStatsCache,
+    BacktestResultCache, LottoDraw, LottoRecommendLine, LottoRecommendLog,
     PlanPerformanceStats, MLTrainingLog, SocialAccount
 )
 from app.db.session import get_db
@@ -707,6 +708,10 @@ def create_lotto_draw(
     )
     db.add(draw)
     db.commit()
+
+    from app.services.lotto.feature_store import refresh_feature_store
+    refresh_feature_store(db, [payload.draw_no])
+
     return {"ok": True, "message": f"{payload.draw_no}회차가 추가되었습니다."}
 
 
@@ -721,6 +726,7 @@ def update_lotto_draw(
     if not draw:
         raise HTTPException(status_code=404, detail="회차를 찾을 수 없습니다.")
 
+    old_numbers = (draw.n1, draw.n2, draw.n3, draw.n4, draw.n5, draw.n6, draw.bonus)
     draw.draw_date = payload.draw_date
     draw.n1 = payload.n1
     draw.n2 = payload.n2
@@ -729,8 +735,32 @@ def update_lotto_draw(
     draw.n5 = payload.n5
     draw.n6 = payload.n6
     draw.bonus = payload.bonus
+    numbers_changed = old_numbers != (draw.n1, draw.n2, draw.n3, draw.n4, draw.n5, draw.n6, draw.bonus)
+
+    reset_logs = 0
+    if numbers_changed:
+        # 수정된 회차와 이후 회차의 백테스팅 캐시는 수정 전 번호로 계산된 결과
+        db.query(BacktestResultCache).filter(
+            BacktestResultCache.draw_no >= draw_no
+        ).delete(synchronize_session=False)
+        # 수정 전 번호로 매칭된 결과/플랜별 성과 초기화 (구간 집계도 재계산)
+        from app.services.lotto.result_matcher import reset_draw_matches
+        reset_logs = reset_draw_matches(db, draw_no)
     db.commit()
-    return {"ok": True, "message": f"{draw_no}회차가 수정되었습니다."}
+
+    from app.services.lotto.feature_store import refresh_feature_store
+    refresh_feature_store(db, [draw_no])
+
+    if reset_logs:
+        # 새 번호로 다시 매칭하고 유저 누적 통계 재계산
+        from app.services.jobs import submit_job, JobQueueFull
+        try:
+            submit_job(db, "match", {"draw_no": draw_no, "rebuild_user_stats": True}, created_by=admin.id)
+        except JobQueueFull:
+            logger.warning(f"회차 수정 후 재매칭 작업 등록 실패: draw_no={draw_no}")
+
+    logger.info(f"회차 수정: draw_no={draw_no}, 재매칭 대상 추천로그={reset_logs}건")
+    return {"ok": True, "message": f"{draw_no}회차가 수정되었습니다. (재매칭 대상 로그 {reset_logs}건)"}
 
 
 @router.delete("/lotto/draws/{draw_no}")
@@ -744,6 +774,9 @@ def delete_lotto_draw(
         raise HTTPException(status_code=404, detail="회차를 찾을 수 없습니다.")
 
     # 관련 데이터 삭제 (데이터 무결성)
+    db.query(LottoRecommendLine).filter(
+        LottoRecommendLine.target_draw_no == draw_no
+    ).delete(synchronize_session=False)
     deleted_logs = db.query(LottoRecommendLog).filter(
         LottoRecommendLog.target_draw_no == draw_no
     ).delete(synchronize_session=False)
@@ -752,62 +785,37 @@ def delete_lotto_draw(
     ).delete(synchronize_session=False)
 
     db.delete(draw)
+    if deleted_stats:
+        from app.services.lotto.result_matcher import refresh_plan_performance_rollups
+        refresh_plan_performance_rollups(db)
     db.commit()
 
+    from app.services.lotto.feature_store import refresh_feature_store
+    refresh_feature_store(db, [draw_no])
+
+    if deleted_stats:
+        # 삭제된 회차의 매칭분이 유저 누적 통계에 남지 않도록 재계산
+        from app.services.jobs import submit_job, JobQueueFull
+        try:
+            submit_job(db, "user_hit_stats_backfill", {}, created_by=admin.id)
+        except JobQueueFull:
+            logger.warning(f"회차 삭제 후 유저 적중 통계 재계산 등록 실패: draw_no={draw_no}")
+
     logger.info(f"회차 삭제: draw_no={draw_no}, 삭제된 추천로그={deleted_logs}건, 삭제된 성과통계={deleted_stats}건")
     return {"ok": True, "message": f"{draw_no}회차가 삭제되었습니다. (관련 로그 {deleted_logs}건, 통계 {deleted_stats}건 삭제)"}
 
 
-@router.post("/lotto/rebuild-cache")
+@router.post("/lotto/rebuild-cache", status_code=202)
 def rebuild_lotto_cache(
     db: Session = Depends(get_db),
     admin: User = Depends(require_admin)
 ):
-    """통계 캐시 재생성"""
-    from app.services.lotto.stats_calculator import LottoStatsCalculator
-    import json
-
-    draws = db.query(LottoDraw).order_by(LottoDraw.draw_no).all()
-    if not draws:
+    """통계 캐시 재생성 (백그라운드 작업)"""
+    if not db.query(LottoDraw.draw_no).first():
         raise HTTPException(status_code=400, detail="로또 데이터가 없습니다.")
 
-    draws_dict = [
-        {
-            "draw_no": d.draw_no,
-            "n1": d.n1, "n2": d.n2, "n3": d.n3,
-            "n4": d.n4, "n5": d.n5, "n6": d.n6,
-            "bonus": d.bonus,
-        }
-        for d in draws
-    ]
-
-    most_common, least_common = LottoStatsCalculator.calculate_most_least(draws_dict)
-    ai_scores = {
-        "logic1": LottoStatsCalculator.calculate_ai_scores_logic1(draws_dict),
-        "logic2": LottoStatsCalculator.calculate_ai_scores_logic2(draws_dict),
-        "logic3": LottoStatsCalculator.calculate_ai_scores_logic3(draws_dict),
-    }
-
-    cache = db.query(LottoStatsCache).filter(LottoStatsCache.id == 1).first()
-    if cache:
-        cache.updated_at = datetime.utcnow()
-        cache.total_draws = len(draws)
-        cache.most_common = json.dumps(most_common)
-        cache.least_common = json.dumps(least_common)
-        cache.ai_scores = json.dumps(ai_scores)
-    else:
-        cache = LottoStatsCache(
-            id=1,
-            updated_at=datetime.utcnow(),
-            total_draws=len(draws),
-            most_common=json.dumps(most_common),
-            least_common=json.dumps(least_common),
-            ai_scores=json.dumps(ai_scores),
-        )
-        db.add(cache)
-
-    db.commit()
-    return {"ok": True, "message": f"캐시가 재생성되었습니다. ({len(draws)}개 회차)"}
+    job = _submit_admin_job(db, "rebuild_cache", {}, admin)
+    return {"ok": True, "job_id": job.id, "status": job.status, "message": "캐시 재생성 작업이 등록되었습니다."}
 
 
 # ============================================
@@ -850,8 +858,25 @@ def get_recommend_logs(
     total = query.count()
     logs = query.order_by(desc(LottoRecommendLog.recommend_time)).offset((page - 1) * page_size).limit(page_size).all()
 
+    # 매칭 결과는 발급 줄 테이블에서 (매칭 시 로그에 JSON을 쓰지 않음 - 직접 수정한 값이 있으면 그대로 표시)
+    from app.services.lotto.recommend_lines import get_log_lines, line_match_results
+    matched = [l for l in logs if l.is_matched and not l.match_results]
+    draws = {
+        d.draw_no: d for d in db.query(LottoDraw).filter(
+            LottoDraw.draw_no.in_({l.target_draw_no for l in matched})
+        )
+    } if matched else {}
+    log_lines = get_log_lines(db, [l.id for l in matched if l.target_draw_no in draws])
+    items = []
+    for l in logs:
+        item = RecommendLogItem.model_validate(l)
+        if l.id in log_lines:
+            results = line_match_results(draws[l.target_draw_no], log_lines[l.id], l.matched_at)
+            item.match_results = json.dumps(results, ensure_ascii=False) if results else None
+        items.append(item)
+
     return RecommendLogListResponse(
-        logs=[RecommendLogItem.model_validate(l) for l in logs],
+        logs=items,
         total=total,
         page=page,
         page_size=page_size
@@ -942,51 +967,29 @@ class PlanPerformanceSummary(BaseModel):
 
 @router.get("/performance/summary")
 def get_performance_summary(
-    recent_draws: int = Query(10, ge=1, le=100),
+    recent_draws: int = Query(10, description="10, 50 또는 0(전체)"),
     db: Session = Depends(get_db),
     admin: User = Depends(require_admin)
 ):
-    """플랜별 성과 요약 (최근 N회차)"""
-    results = {}
-
-    for plan_type in ["free", "basic", "premium", "vip"]:
-        stats = db.query(
-            func.sum(PlanPerformanceStats.total_lines).label("total_lines"),
-            func.sum(PlanPerformanceStats.total_users).label("total_users"),
-            func.sum(PlanPerformanceStats.match_3).label("rank5"),
-            func.sum(PlanPerformanceStats.match_4).label("rank4"),
-            func.sum(PlanPerformanceStats.match_5).label("rank3"),
-            func.sum(PlanPerformanceStats.match_5_bonus).label("rank2"),
-            func.sum(PlanPerformanceStats.match_6).label("rank1"),
-            func.avg(PlanPerformanceStats.avg_match_count).label("avg_match")
-        ).filter(
-            PlanPerformanceStats.plan_type == plan_type
-        ).first()
-
-        if stats and stats.total_lines:
-            results[plan_type] = {
-                "total_lines": stats.total_lines or 0,
-                "total_users": stats.total_users or 0,
-                "rank5_count": stats.rank5 or 0,
-                "rank4_count": stats.rank4 or 0,
-                "rank3_count": stats.rank3 or 0,
-                "rank2_count": stats.rank2 or 0,
-                "rank1_count": stats.rank1 or 0,
-                "avg_match": round(stats.avg_match or 0, 2)
-            }
-        else:
-            results[plan_type] = {
-                "total_lines": 0,
-                "total_users": 0,
-                "rank5_count": 0,
-                "rank4_count": 0,
-                "rank3_count": 0,
-                "rank2_count": 0,
-                "rank1_count": 0,
-                "avg_match": 0
-            }
+    """플랜별 성과 요약 (최근 N회차 - 미리 계산된 구간 집계 조회)"""
+    from app.services.lotto.result_matcher import PLAN_TYPES, get_plan_performance_summary
 
-    return results
+    try:
+        summary = get_plan_performance_summary(db, recent_draws=recent_draws)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="recent_draws는 10, 50, 0(전체) 중 하나여야 합니다.")
+
+    empty = {
+        "total_lines": 0,
+        "total_users": 0,
+        "rank5_count": 0,
+        "rank4_count": 0,
+        "rank3_count": 0,
+        "rank2_count": 0,
+        "rank1_count": 0,
+        "avg_match": 0
+    }
+    return {plan_type: summary.get(plan_type, dict(empty)) for plan_type in PLAN_TYPES}
 
 
 @router.get("/performance/by-draw")
@@ -1086,82 +1089,161 @@ def get_latest_ml_status(
     return MLTrainingLogItem.model_validate(latest)
 
 
+# ============================================
+# 백그라운드 작업 (재학습/백테스팅/매칭/캐시 재생성)
+# ============================================
+
+def _submit_admin_job(db: Session, job_type: str, params: dict, admin: User):
+    from app.services.jobs import submit_job, JobQueueFull
+
+    try:
+        return submit_job(db, job_type, params, created_by=admin.id)
+    except JobQueueFull:
+        raise HTTPException(status_code=429, detail="대기 중인 작업이 너무 많습니다. 잠시 후 다시 시도해주세요.")
+
+
+@router.get("/jobs")
+def list_admin_jobs(
+    job_type: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin)
+):
+    """작업 목록 (최신순)"""
+    from app.db.models import AdminJob
+    from app.services.jobs import job_to_dict
+
+    query = db.query(AdminJob)
+    if job_type:
+        query = query.filter(AdminJob.job_type == job_type)
+    if status:
+        query = query.filter(AdminJob.status == status)
+
+    jobs = query.order_by(desc(AdminJob.created_at)).limit(limit).all()
+    return {"items": [job_to_dict(j) for j in jobs]}
+
+
+@router.get("/jobs/{job_id}")
+def get_admin_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin)
+):
+    """작업 상태/진행률/결과 조회"""
+    from app.services.jobs import get_job, job_to_dict
+
+    job = get_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return job_to_dict(job)
+
+
+@router.post("/jobs/{job_id}/cancel")
+def cancel_admin_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin)
+):
+    """작업 취소 요청"""
+    from app.services.jobs import cancel_job, job_to_dict
+
+    job = cancel_job(db, job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="작업을 찾을 수 없습니다.")
+    return {"ok": True, "message": "취소 요청되었습니다.", "job": job_to_dict(job)}
+
+
 # ============================================
 # 수동 매칭/재학습 트리거
 # ============================================
 
-@router.post("/match/trigger/{draw_no}")
+@router.post("/match/trigger/{draw_no}", status_code=202)
 def trigger_match(
     draw_no: int,
     db: Session = Depends(get_db),
     admin: User = Depends(require_admin)
 ):
-    """특정 회차 수동 매칭"""
-    from app.services.lotto.result_matcher import match_all_pending_logs
+    """특정 회차 수동 매칭 (백그라운드 작업)"""
+    if not db.query(LottoDraw).filter(LottoDraw.draw_no == draw_no).first():
+        raise HTTPException(status_code=400, detail=f"{draw_no}회차 당첨번호가 없습니다.")
 
-    result = match_all_pending_logs(db, draw_no)
+    job = _submit_admin_job(db, "match", {"draw_no": draw_no}, admin)
+    return {"ok": True, "job_id": job.id, "status": job.status, "message": f"{draw_no}회차 매칭 작업이 등록되었습니다."}
 
-    if "error" in result:
-        raise HTTPException(status_code=400, detail=result["error"])
 
-    return {
-        "ok": True,
-        "message": f"{draw_no}회차 매칭 완료",
-        "matched_count": result.get("matched_count", 0),
-        "plan_stats": result.get("plan_stats", {})
-    }
+@router.post("/user-hit-stats/rebuild", status_code=202)
+def trigger_user_hit_stats_rebuild(
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin)
+):
+    """유저별 적중 통계 전체 재계산 (백그라운드 작업)"""
+    job = _submit_admin_job(db, "user_hit_stats_backfill", {}, admin)
+    return {"ok": True, "job_id": job.id, "status": job.status, "message": "유저 적중 통계 재계산 작업이 등록되었습니다."}
 
 
-@router.post("/ml/retrain")
-def trigger_ml_retrain(
+@router.post("/recommend-lines/backfill", status_code=202)
+def trigger_recommend_lines_backfill(
     db: Session = Depends(get_db),
     admin: User = Depends(require_admin)
 ):
-    """수동 ML 재학습"""
-    from app.services.lotto.ml_trainer import LottoMLTrainer
-    from app.services.lotto.result_matcher import get_plan_performance_summary
+    """발급 줄 테이블 백필 (기존 추천 로그 → recommend_lines, 백그라운드 작업)"""
+    job = _submit_admin_job(db, "recommend_lines_backfill", {}, admin)
+    return {"ok": True, "job_id": job.id, "status": job.status, "message": "발급 줄 백필 작업이 등록되었습니다."}
 
-    draws = db.query(LottoDraw).order_by(LottoDraw.draw_no).all()
-    if not draws:
+
+@router.post("/pool-encoding/migrate", status_code=202)
+def trigger_pool_encoding_migrate(
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin)
+):
+    """기존 추천 로그의 JSON 풀 → 압축 풀 변환 (백그라운드 작업)"""
+    job = _submit_admin_job(db, "pool_encoding_migrate", {}, admin)
+    return {"ok": True, "job_id": job.id, "status": job.status, "message": "풀 인코딩 변환 작업이 등록되었습니다."}
+
+
+@router.post("/ml/retrain", status_code=202)
+def trigger_ml_retrain(
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin)
+):
+    """수동 ML 재학습 (백그라운드 작업)"""
+    if not db.query(LottoDraw.draw_no).first():
         raise HTTPException(status_code=400, detail="로또 데이터가 없습니다.")
 
-    draws_dict = [
-        {
-            "draw_no": d.draw_no,
-            "n1": d.n1, "n2": d.n2, "n3": d.n3,
-            "n4": d.n4, "n5": d.n5, "n6": d.n6,
-            "bonus": d.bonus,
-        }
-        for d in draws
-    ]
+    job = _submit_admin_job(db, "ml_retrain", {}, admin)
+    return {"ok": True, "job_id": job.id, "status": job.status, "message": "ML 재학습 작업이 등록되었습니다."}
 
-    trainer = LottoMLTrainer()
-    train_result = trainer.train(draws_dict)
-
-    # 학습 로그 저장
-    plan_perf = get_plan_performance_summary(db, recent_draws=10)
-    ml_log = MLTrainingLog(
-        total_draws=len(draws_dict),
-        total_feedback_records=0,
-        train_accuracy=train_result.get("train_accuracy"),
-        test_accuracy=train_result.get("test_accuracy"),
-        weight_logic1=train_result.get("ai_weights", {}).get("logic1"),
-        weight_logic2=train_result.get("ai_weights", {}).get("logic2"),
-        weight_logic3=train_result.get("ai_weights", {}).get("logic3"),
-        weight_logic4=train_result.get("ai_weights", {}).get("logic4"),
-        plan_performance=plan_perf,
-        notes="수동 재학습"
-    )
-    db.add(ml_log)
-    db.commit()
 
-    return {
-        "ok": True,
-        "message": "ML 재학습 완료",
-        "train_accuracy": train_result.get("train_accuracy"),
-        "test_accuracy": train_result.get("test_accuracy"),
-        "ai_weights": train_result.get("ai_weights")
-    }
+class WeightSearchRequest(BaseModel):
+    mode: str = "grid"  # grid, random
+    eval_draws: int = 500
+    grid_steps: int = 36
+    n_samples: int = 10000
+    seed: Optional[int] = None
+    apply: bool = False  # True면 1위 가중치를 모델에 저장
+
+
+@router.post("/ml/weight-search", status_code=202)
+def trigger_weight_search(
+    payload: WeightSearchRequest,
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin)
+):
+    """로직1~4 가중치 Grid/Random Search (백그라운드 작업)"""
+    if payload.mode not in ("grid", "random"):
+        raise HTTPException(status_code=400, detail="mode는 grid 또는 random만 가능합니다.")
+    if not 10 <= payload.eval_draws <= 2000:
+        raise HTTPException(status_code=400, detail="평가 회차 수는 10~2000 사이여야 합니다.")
+    if payload.mode == "grid" and not 1 <= payload.grid_steps <= 60:
+        raise HTTPException(status_code=400, detail="grid_steps는 1~60 사이여야 합니다.")
+    if payload.mode == "random" and not 1 <= payload.n_samples <= 100000:
+        raise HTTPException(status_code=400, detail="n_samples는 1~100000 사이여야 합니다.")
+    if not db.query(LottoDraw.draw_no).first():
+        raise HTTPException(status_code=400, detail="로또 데이터가 없습니다.")
+
+    job = _submit_admin_job(db, "weight_search", payload.model_dump(), admin)
+    return {"ok": True, "job_id": job.id, "status": job.status, "message": "가중치 탐색 작업이 등록되었습니다."}
 
 
 # ============================================
@@ -1215,135 +1297,71 @@ def get_ml_logic_analysis(
 ):
     """
     ML 로직별 성과 분석 (재학습 전 확인용)
-    - logic1/logic2/logic3 각각의 상위 번호 적중률
+    - logic1/logic2/logic3 각각의 상위 번호 적중률 (각 회차는 직전 회차까지의 점수로 평가)
     - 회차별 AI 예측 vs 실제 당첨 비교
+    - topN_numbers는 전체 데이터 기준 (다음 회차 예측용)
     """
-    from app.services.lotto.stats_calculator import LottoStatsCalculator
-
-    # 최근 N회차 데이터 조회
-    draws = db.query(LottoDraw).order_by(desc(LottoDraw.draw_no)).limit(recent_draws).all()
-    if not draws:
-        return {"error": "로또 데이터가 없습니다."}
+    import numpy as np
+    from app.services.lotto import draws_to_dict_list
+    from app.services.lotto.walk_forward import WalkForwardEvaluator
 
-    # 전체 데이터로 통계 계산
     all_draws = db.query(LottoDraw).order_by(LottoDraw.draw_no).all()
-    draws_dict = [
-        {
-            "draw_no": d.draw_no,
-            "n1": d.n1, "n2": d.n2, "n3": d.n3,
-            "n4": d.n4, "n5": d.n5, "n6": d.n6,
-            "bonus": d.bonus,
-        }
-        for d in all_draws
-    ]
+    if not all_draws:
+        return {"error": "로또 데이터가 없습니다."}
+    draws_dict = draws_to_dict_list(all_draws)
 
-    # 각 로직별 점수 계산
-    scores_logic1 = LottoStatsCalculator.calculate_ai_scores_logic1(draws_dict)
-    scores_logic2 = LottoStatsCalculator.calculate_ai_scores_logic2(draws_dict)
-    scores_logic3 = LottoStatsCalculator.calculate_ai_scores_logic3(draws_dict)
+    logic_meta = {
+        "logic1": "최근 출현 빈도 기반",
+        "logic2": "연속 미출현 기반",
+        "logic3": "패턴 분석 기반",
+    }
+    top_ks = (10, 15, 20)
 
-    # 로직별 상위 번호 추출
-    def get_top_numbers(scores, n):
-        sorted_nums = sorted(scores.items(), key=lambda x: x[1], reverse=True)
-        return [num for num, _ in sorted_nums[:n]]
+    # 최근 N회차 walk-forward 적중 (이력 10회 미만 회차는 제외)
+    evaluator = WalkForwardEvaluator(draws_dict)
+    cutoffs = evaluator.cutoffs_for_last(recent_draws)
+    result = evaluator.evaluate({name: name for name in logic_meta}, cutoffs=cutoffs, top_ks=top_ks)
 
-    logic1_top10 = set(get_top_numbers(scores_logic1, 10))
-    logic1_top15 = set(get_top_numbers(scores_logic1, 15))
-    logic1_top20 = set(get_top_numbers(scores_logic1, 20))
+    # 전체 데이터 기준 로직별 상위 번호 (동점은 작은 번호 우선)
+    current_scores = evaluator.builder.logic_scores(np.array([len(draws_dict)]))[0]
 
-    logic2_top10 = set(get_top_numbers(scores_logic2, 10))
-    logic2_top15 = set(get_top_numbers(scores_logic2, 15))
-    logic2_top20 = set(get_top_numbers(scores_logic2, 20))
+    total_draws = len(cutoffs)
+    max_hits = total_draws * 6  # 각 회차당 6개 당첨번호
 
-    logic3_top10 = set(get_top_numbers(scores_logic3, 10))
-    logic3_top15 = set(get_top_numbers(scores_logic3, 15))
-    logic3_top20 = set(get_top_numbers(scores_logic3, 20))
+    response = {"analysis_draws": total_draws}
+    logic_hits = {}
+    for idx, (name, label) in enumerate(logic_meta.items()):
+        order = np.argsort(-current_scores[idx], kind="stable") + 1
+        hits = {f"top{k}": int(result["hits"][name][k].sum()) for k in top_ks}
+        logic_hits[name] = hits
+        response[name] = {
+            "name": label,
+            **{f"top{k}_numbers": sorted(int(n) for n in order[:k]) for k in top_ks},
+            "hit_rate": {
+                key: round(value / max_hits * 100, 2) if max_hits else 0
+                for key, value in hits.items()
+            },
+            "total_hits": hits,
+        }
 
-    # 회차별 적중 분석
+    # 회차별 적중 분석 (최근 회차부터 10개만 상세 반환)
     draw_results = []
-    logic1_hits = {"top10": 0, "top15": 0, "top20": 0}
-    logic2_hits = {"top10": 0, "top15": 0, "top20": 0}
-    logic3_hits = {"top10": 0, "top15": 0, "top20": 0}
-
-    for draw in draws:
-        winning = {draw.n1, draw.n2, draw.n3, draw.n4, draw.n5, draw.n6}
-
-        l1_10 = len(winning & logic1_top10)
-        l1_15 = len(winning & logic1_top15)
-        l1_20 = len(winning & logic1_top20)
-
-        l2_10 = len(winning & logic2_top10)
-        l2_15 = len(winning & logic2_top15)
-        l2_20 = len(winning & logic2_top20)
-
-        l3_10 = len(winning & logic3_top10)
-        l3_15 = len(winning & logic3_top15)
-        l3_20 = len(winning & logic3_top20)
-
-        logic1_hits["top10"] += l1_10
-        logic1_hits["top15"] += l1_15
-        logic1_hits["top20"] += l1_20
-
-        logic2_hits["top10"] += l2_10
-        logic2_hits["top15"] += l2_15
-        logic2_hits["top20"] += l2_20
-
-        logic3_hits["top10"] += l3_10
-        logic3_hits["top15"] += l3_15
-        logic3_hits["top20"] += l3_20
-
+    for i in range(total_draws - 1, max(-1, total_draws - 11), -1):
+        draw = draws_dict[int(cutoffs[i])]
         draw_results.append({
-            "draw_no": draw.draw_no,
-            "winning": sorted(list(winning)),
-            "logic1": {"top10": l1_10, "top15": l1_15, "top20": l1_20},
-            "logic2": {"top10": l2_10, "top15": l2_15, "top20": l2_20},
-            "logic3": {"top10": l3_10, "top15": l3_15, "top20": l3_20},
+            "draw_no": draw["draw_no"],
+            "winning": sorted(draw[f"n{j}"] for j in range(1, 7)),
+            **{
+                name: {f"top{k}": int(result["hits"][name][k][i]) for k in top_ks}
+                for name in logic_meta
+            },
         })
 
-    total_draws = len(draws)
-    max_hits = total_draws * 6  # 각 회차당 6개 당첨번호
-
-    return {
-        "analysis_draws": total_draws,
-        "logic1": {
-            "name": "최근 출현 빈도 기반",
-            "top10_numbers": sorted(list(logic1_top10)),
-            "top15_numbers": sorted(list(logic1_top15)),
-            "top20_numbers": sorted(list(logic1_top20)),
-            "hit_rate": {
-                "top10": round(logic1_hits["top10"] / max_hits * 100, 2) if max_hits else 0,
-                "top15": round(logic1_hits["top15"] / max_hits * 100, 2) if max_hits else 0,
-                "top20": round(logic1_hits["top20"] / max_hits * 100, 2) if max_hits else 0,
-            },
-            "total_hits": logic1_hits,
-        },
-        "logic2": {
-            "name": "연속 미출현 기반",
-            "top10_numbers": sorted(list(logic2_top10)),
-            "top15_numbers": sorted(list(logic2_top15)),
-            "top20_numbers": sorted(list(logic2_top20)),
-            "hit_rate": {
-                "top10": round(logic2_hits["top10"] / max_hits * 100, 2) if max_hits else 0,
-                "top15": round(logic2_hits["top15"] / max_hits * 100, 2) if max_hits else 0,
-                "top20": round(logic2_hits["top20"] / max_hits * 100, 2) if max_hits else 0,
-            },
-            "total_hits": logic2_hits,
-        },
-        "logic3": {
-            "name": "패턴 분석 기반",
-            "top10_numbers": sorted(list(logic3_top10)),
-            "top15_numbers": sorted(list(logic3_top15)),
-            "top20_numbers": sorted(list(logic3_top20)),
-            "hit_rate": {
-                "top10": round(logic3_hits["top10"] / max_hits * 100, 2) if max_hits else 0,
-                "top15": round(logic3_hits["top15"] / max_hits * 100, 2) if max_hits else 0,
-                "top20": round(logic3_hits["top20"] / max_hits * 100, 2) if max_hits else 0,
-            },
-            "total_hits": logic3_hits,
-        },
-        "draw_results": draw_results[:10],  # 최근 10회차만 상세 반환
-        "recommendation": _get_logic_recommendation(logic1_hits, logic2_hits, logic3_hits)
-    }
+    response["draw_results"] = draw_results
+    response["recommendation"] = _get_logic_recommendation(
+        logic_hits["logic1"], logic_hits["logic2"], logic_hits["logic3"]
+    )
+    return response
 
 
 def _get_logic_recommendation(logic1_hits, logic2_hits, logic3_hits):
@@ -1371,6 +1389,7 @@ def _get_logic_recommendation(logic1_hits, logic2_hits, logic3_hits):
 class BacktestRequest(BaseModel):
     start_draw: int
     end_draw: int
+    seed: Optional[int] = None  # 같은 seed면 같은 결과 (None이면 기본 시드 - 결과 캐시 재사용)
 
 
 class BacktestSingleResult(BaseModel):
@@ -1395,129 +1414,233 @@ class BacktestSummary(BaseModel):
     avg_performance_score: float
     avg_matches_per_line: float
     logic_avg_scores: dict
+    random_baseline: Optional[dict] = None  # 무작위 구매 기준선 (완료 시)
 
 
-@router.post("/backtest/run")
+def _validate_backtest_range(db: Session, start_draw: int, end_draw: int) -> None:
+    """백테스팅 구간 검증 (데이터 없음/학습 이력 부족/범위 초과)"""
+    min_draw, max_draw = db.query(func.min(LottoDraw.draw_no), func.max(LottoDraw.draw_no)).one()
+    if min_draw is None:
+        raise HTTPException(status_code=400, detail="로또 데이터가 없습니다.")
+
+    # 범위 검증
+    if start_draw < min_draw + 10:
+        raise HTTPException(
+            status_code=400,
+            detail=f"시작 회차는 최소 {min_draw + 10}회차 이상이어야 합니다 (학습 데이터 필요)"
+        )
+
+    if end_draw > max_draw:
+        raise HTTPException(
+            status_code=400,
+            detail=f"종료 회차는 최대 {max_draw}회차까지만 가능합니다"
+        )
+
+    if start_draw > end_draw:
+        raise HTTPException(status_code=400, detail="시작 회차는 종료 회차보다 작거나 같아야 합니다")
+
+
+@router.post("/backtest/run", status_code=202)
 def run_backtest(
     payload: BacktestRequest,
     db: Session = Depends(get_db),
     admin: User = Depends(require_admin)
 ):
     """
-    백테스팅 실행
+    백테스팅 실행 (백그라운드 작업)
     - 과거 데이터로 알고리즘 성능 테스트
     - start_draw부터 end_draw까지 각 회차에 대해:
       1. 해당 회차 이전 데이터로 번호 생성
       2. 실제 당첨번호와 비교
       3. 적중률 계산
+    - 진행률/부분 결과는 GET /api/admin/jobs/{job_id} 로 조회
     """
-    from app.services.lotto.performance_evaluator import evaluate_single_draw, backtest_multiple_draws
+    _validate_backtest_range(db, payload.start_draw, payload.end_draw)
 
-    # 전체 회차 데이터 조회
-    draws = db.query(LottoDraw).order_by(LottoDraw.draw_no).all()
-    if not draws:
-        raise HTTPException(status_code=400, detail="로또 데이터가 없습니다.")
+    job = _submit_admin_job(
+        db, "backtest",
+        {"start_draw": payload.start_draw, "end_draw": payload.end_draw, "seed": payload.seed},
+        admin
+    )
+    return {
+        "ok": True,
+        "job_id": job.id,
+        "status": job.status,
+        "message": f"{payload.start_draw}~{payload.end_draw}회차 백테스팅 작업이 등록되었습니다."
+    }
 
-    draws_dict = [
-        {
-            "draw_no": d.draw_no,
-            "n1": d.n1, "n2": d.n2, "n3": d.n3,
-            "n4": d.n4, "n5": d.n5, "n6": d.n6,
-            "bonus": d.bonus,
+
+def _backtest_events(start_draw: int, end_draw: int, seed: int):
+    """스트리밍 백테스팅 이벤트 (이벤트 이름, 데이터)
+
+    누적 요약과 당첨 번호만 들고 가므로 메모리는 구간 길이와 관계없이 일정합니다.
+    DB 세션은 응답을 보내는 동안 직접 열고 닫습니다 (요청 의존성 세션은 응답 전에 닫힘).
+    """
+    from app.db.session import SessionLocal
+    from app.services.lotto import draws_to_dict_list
+    from app.services.lotto.backtest_cache import iter_backtest_cached
+    from app.services.lotto.feature_store import FeatureStoreSource
+    from app.services.lotto.performance_evaluator import BacktestSummary, format_backtest_result
+    from app.services.lotto.random_baseline import random_baseline
+
+    db = SessionLocal()
+    try:
+        draws_dict = draws_to_dict_list(db.query(LottoDraw).order_by(LottoDraw.draw_no).all())
+        winning_by_draw = {
+            d["draw_no"]: [d["n1"], d["n2"], d["n3"], d["n4"], d["n5"], d["n6"]] for d in draws_dict
         }
-        for d in draws
-    ]
+        total = end_draw - start_draw + 1
+        yield "start", {"start_draw": start_draw, "end_draw": end_draw, "total": total, "seed": seed}
+
+        summary = BacktestSummary()
+        winning = []
+        cached_draws = computed_draws = 0
+        for result, cached in iter_backtest_cached(
+            db, draws_dict, start_draw, end_draw, seed, feature_source=FeatureStoreSource(db)
+        ):
+            summary.add(result)
+            winning.append(winning_by_draw[result["draw_no"]])
+            if cached:
+                cached_draws += 1
+            else:
+                computed_draws += 1
+            event = format_backtest_result(result)
+            event["cached"] = cached
+            event["done"] = result["draw_no"] - start_draw + 1
+            event["total"] = total
+            yield "result", event
+
+        if not summary.total_draws:
+            yield "error", {"detail": "백테스팅 결과가 없습니다."}
+            return
+
+        summary_dict = summary.to_dict()
+        summary_dict["random_baseline"] = random_baseline(summary_dict, winning, seed=seed)
+        yield "summary", {
+            "summary": summary_dict,
+            "seed": seed,
+            "cached_draws": cached_draws,
+            "computed_draws": computed_draws,
+        }
+    except Exception as exc:
+        logger.exception("backtest stream failed")
+        yield "error", {"detail": f"백테스팅 실패: {exc}"}
+    finally:
+        db.close()
+
+
+@router.get("/backtest/stream")
+def stream_backtest(
+    start_draw: int = Query(...),
+    end_draw: int = Query(...),
+    seed: Optional[int] = Query(None),
+    format: str = Query("sse", pattern="^(sse|ndjson)$"),
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin)
+):
+    """
+    스트리밍 백테스팅 - 회차 결과를 계산되는 대로 바로 전송
+    - format=sse: text/event-stream (event: start / result / summary / error)
+    - format=ndjson: 한 줄에 JSON 하나 ({"event": ..., "data": ...})
+    - 마지막에 누적 요약(무작위 구매 기준선 포함)을 summary 이벤트로 전송
+    - 결과는 backtest_result_cache를 거치므로 캐시된 회차는 즉시 전송
+    """
+    from fastapi.responses import StreamingResponse
+    from app.services.lotto.performance_evaluator import DEFAULT_BACKTEST_SEED
+
+    _validate_backtest_range(db, start_draw, end_draw)
+    if seed is None:
+        seed = DEFAULT_BACKTEST_SEED
+
+    def encode():
+        for event, data in _backtest_events(start_draw, end_draw, seed):
+            payload = json.dumps(data, ensure_ascii=False)
+            if format == "ndjson":
+                yield f'{{"event": "{event}", "data": {payload}}}\n'
+            else:
+                yield f"event: {event}\ndata: {payload}\n\n"
+
+    media_type = "application/x-ndjson" if format == "ndjson" else "text/event-stream"
+    return StreamingResponse(
+        encode(),
+        media_type=media_type,
+        # 프록시(nginx) 버퍼링을 끄고 캐시하지 않음
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-    # 범위 검증
-    min_draw = min(d["draw_no"] for d in draws_dict)
-    max_draw = max(d["draw_no"] for d in draws_dict)
 
-    if payload.start_draw < min_draw + 10:
-        raise HTTPException(
-            status_code=400,
-            detail=f"시작 회차는 최소 {min_draw + 10}회차 이상이어야 합니다 (학습 데이터 필요)"
-        )
+class BacktestConfig(BaseModel):
+    name: str
+    ai_weights: Optional[Dict[str, float]] = None  # None이면 현재 모델 가중치
 
-    if payload.end_draw > max_draw:
-        raise HTTPException(
-            status_code=400,
-            detail=f"종료 회차는 최대 {max_draw}회차까지만 가능합니다"
-        )
 
-    # 백테스팅 실행
-    results = []
-    for draw_no in range(payload.start_draw, payload.end_draw + 1):
-        result = evaluate_single_draw(draw_no, draws=draws_dict)
-        if result:
-            results.append(result)
-
-    if not results:
-        raise HTTPException(status_code=400, detail="백테스팅 결과가 없습니다.")
-
-    # 요약 계산
-    total_draws = len(results)
-    total_lines = sum(r['total_lines'] for r in results)
-    total_match_3 = sum(r['match_3'] for r in results)
-    total_match_4 = sum(r['match_4'] for r in results)
-    total_match_5 = sum(r['match_5'] for r in results)
-    total_match_6 = sum(r['match_6'] for r in results)
-    avg_performance = sum(r['performance_score'] for r in results) / total_draws
-    avg_matches = sum(r['avg_matches_per_line'] for r in results) / total_draws
-
-    # 로직별 평균 점수
-    logic_totals = {}
-    for r in results:
-        for logic_name, score in r['logic_scores'].items():
-            if logic_name not in logic_totals:
-                logic_totals[logic_name] = []
-            logic_totals[logic_name].append(score)
-
-    logic_avg_scores = {
-        logic: round(sum(scores) / len(scores), 2)
-        for logic, scores in logic_totals.items()
-    }
+class BacktestCompareRequest(BaseModel):
+    start_draw: int
+    end_draw: int
+    configs: List[BacktestConfig]  # 첫 설정이 비교 기준
+    seed: Optional[int] = None
 
+
+@router.post("/backtest/compare", status_code=202)
+def run_backtest_compare(
+    payload: BacktestCompareRequest,
+    db: Session = Depends(get_db),
+    admin: User = Depends(require_admin)
+):
+    """
+    여러 가중치 설정 비교 백테스팅 (백그라운드 작업)
+    - 같은 구간/시드로 설정별 성능을 한 번의 순회에서 평가
+    - 결과의 table은 설정별 요약 + 첫 설정 대비 차이/회차별 승패
+    """
+    from app.services.lotto.backtest_compare import MAX_CONFIGS, WEIGHT_KEYS
+
+    _validate_backtest_range(db, payload.start_draw, payload.end_draw)
+    if not 2 <= len(payload.configs) <= MAX_CONFIGS:
+        raise HTTPException(status_code=400, detail=f"비교할 설정은 2~{MAX_CONFIGS}개여야 합니다.")
+    names = [c.name.strip() for c in payload.configs]
+    if any(not name for name in names) or len(set(names)) != len(names):
+        raise HTTPException(status_code=400, detail="설정 이름은 비어 있지 않고 서로 달라야 합니다.")
+    for config in payload.configs:
+        if config.ai_weights is None:
+            continue
+        unknown = set(config.ai_weights) - set(WEIGHT_KEYS)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"알 수 없는 가중치: {', '.join(sorted(unknown))}")
+        if any(w < 0 for w in config.ai_weights.values()):
+            raise HTTPException(status_code=400, detail="가중치는 0 이상이어야 합니다.")
+
+    # 빠진 로직은 0 (생성기는 빠진 키를 기본값 0.33으로 채우므로 명시)
+    configs = [
+        {
+            "name": name,
+            "ai_weights": None if c.ai_weights is None else {k: float(c.ai_weights.get(k, 0.0)) for k in WEIGHT_KEYS},
+        }
+        for name, c in zip(names, payload.configs)
+    ]
+    job = _submit_admin_job(
+        db, "backtest_compare",
+        {"start_draw": payload.start_draw, "end_draw": payload.end_draw, "seed": payload.seed, "configs": configs},
+        admin
+    )
     return {
-        "summary": {
-            "total_draws": total_draws,
-            "total_lines": total_lines,
-            "total_match_3": total_match_3,
-            "total_match_4": total_match_4,
-            "total_match_5": total_match_5,
-            "total_match_6": total_match_6,
-            "avg_performance_score": round(avg_performance, 2),
-            "avg_matches_per_line": round(avg_matches, 2),
-            "logic_avg_scores": logic_avg_scores,
-            "match_3_rate": round(total_match_3 / total_lines * 100, 2) if total_lines else 0,
-            "match_4_rate": round(total_match_4 / total_lines * 100, 2) if total_lines else 0,
-            "match_5_rate": round(total_match_5 / total_lines * 100, 2) if total_lines else 0,
-            "match_6_rate": round(total_match_6 / total_lines * 100, 2) if total_lines else 0,
-        },
-        "results": [
-            {
-                "draw_no": r["draw_no"],
-                "total_lines": r["total_lines"],
-                "match_3": r["match_3"],
-                "match_4": r["match_4"],
-                "match_5": r["match_5"],
-                "match_6": r["match_6"],
-                "avg_matches_per_line": round(r["avg_matches_per_line"], 2),
-                "performance_score": round(r["performance_score"], 2),
-                "logic_scores": {k: round(v, 2) for k, v in r["logic_scores"].items()},
-            }
-            for r in results
-        ]
+        "ok": True,
+        "job_id": job.id,
+        "status": job.status,
+        "message": f"{payload.start_draw}~{payload.end_draw}회차 설정 {len(configs)}개 비교 작업이 등록되었습니다."
     }
 
 
 @router.get("/backtest/single/{draw_no}")
 def run_single_backtest(
     draw_no: int,
+    seed: Optional[int] = Query(None),
     db: Session = Depends(get_db),
     admin: User = Depends(require_admin)
 ):
-    """단일 회차 백테스팅"""
-    from app.services.lotto.performance_evaluator import evaluate_single_draw
+    """단일 회차 백테스팅 (같은 조건의 결과가 캐시에 있으면 재사용)"""
+    from app.services.lotto.backtest_cache import BacktestResultStore
+    from app.services.lotto.feature_store import FeatureStoreSource
+    from app.services.lotto.performance_evaluator import DEFAULT_BACKTEST_SEED, evaluate_single_draw
 
     draws = db.query(LottoDraw).order_by(LottoDraw.draw_no).all()
     if not draws:
@@ -1538,7 +1661,17 @@ def run_single_backtest(
     if not target_draw:
         raise HTTPException(status_code=404, detail=f"{draw_no}회차 데이터가 없습니다.")
 
-    result = evaluate_single_draw(draw_no, draws=draws_dict)
+    if seed is None:
+        seed = DEFAULT_BACKTEST_SEED
+    store = BacktestResultStore(db, draws_dict, seed)
+    result = store.lookup([draw_no]).get(draw_no)
+    if result is None:
+        result = evaluate_single_draw(
+            draw_no, ai_weights=store.ai_weights, draws=draws_dict,
+            feature_source=FeatureStoreSource(db), seed=seed,
+        )
+        if result:
+            store.save([result])
 
     if not result:
         raise HTTPException(status_code=400, detail="백테스팅 실패")
@@ -1734,9 +1867,13 @@ def cron_fetch_lotto(
 
         # 통계 캐시 갱신
         if saved_count > 0:
-            _rebuild_cache_internal(db)
+            from app.services.lotto.stats_cache import rebuild_stats_cache
+            rebuild_stats_cache(db)
             logger.info(f"Cron fetch: 통계 캐시 갱신 완료")
 
+            from app.services.lotto.feature_store import refresh_feature_store
+            refresh_feature_store(db, new_draws)
+
             # 새 회차에 대해 미매칭 추천 로그 매칭
             from app.services.lotto.result_matcher import match_all_pending_logs
             for draw_no in new_draws:
@@ -1760,53 +1897,6 @@ def cron_fetch_lotto(
         raise HTTPException(status_code=500, detail=f"데이터 수집 실패: {str(e)}")
 
 
-def _rebuild_cache_internal(db: Session):
-    """통계 캐시 재생성 (내부용)"""
-    from app.services.lotto.stats_calculator import LottoStatsCalculator
-    import json
-
-    draws = db.query(LottoDraw).order_by(LottoDraw.draw_no).all()
-    if not draws:
-        return
-
-    draws_dict = [
-        {
-            "draw_no": d.draw_no,
-            "n1": d.n1, "n2": d.n2, "n3": d.n3,
-            "n4": d.n4, "n5": d.n5, "n6": d.n6,
-            "bonus": d.bonus,
-        }
-        for d in draws
-    ]
-
-    most_common, least_common = LottoStatsCalculator.calculate_most_least(draws_dict)
-    ai_scores = {
-        "logic1": LottoStatsCalculator.calculate_ai_scores_logic1(draws_dict),
-        "logic2": LottoStatsCalculator.calculate_ai_scores_logic2(draws_dict),
-        "logic3": LottoStatsCalculator.calculate_ai_scores_logic3(draws_dict),
-    }
-
-    cache = db.query(LottoStatsCache).filter(LottoStatsCache.id == 1).first()
-    if cache:
-        cache.updated_at = datetime.utcnow()
-        cache.total_draws = len(draws)
-        cache.most_common = json.dumps(most_common)
-        cache.least_common = json.dumps(least_common)
-        cache.ai_scores = json.dumps(ai_scores)
-    else:
-        cache = LottoStatsCache(
-            id=1,
-            updated_at=datetime.utcnow(),
-            total_draws=len(draws),
-            most_common=json.dumps(most_common),
-            least_common=json.dumps(least_common),
-            ai_scores=json.dumps(ai_scores),
-        )
-        db.add(cache)
-
-    db.commit()
-
-
 class LottoDrawImport(BaseModel):
     draw_no: int
     draw_date: str
@@ -1828,6 +1918,7 @@ def cron_import_draws(
     """로또 데이터 일괄 업로드 (마이그레이션용)"""
     saved_count = 0
     skipped_count = 0
+    saved_draw_nos = []
 
     for draw in draws:
         existing = db.query(LottoDraw).filter(LottoDraw.draw_no == draw.draw_no).first()
@@ -1848,11 +1939,16 @@ def cron_import_draws(
         )
         db.add(new_draw)
         saved_count += 1
+        saved_draw_nos.append(draw.draw_no)
 
     db.commit()
 
     if saved_count > 0:
-        _rebuild_cache_internal(db)
+        from app.services.lotto.stats_cache import rebuild_stats_cache
+        rebuild_stats_cache(db)
+
+        from app.services.lotto.feature_store import refresh_feature_store
+        refresh_feature_store(db, saved_draw_nos)
 
     return {
         "ok": True,
@@ -7,7 +7,7 @@ from sqlalchemy.orm import Session
 
 from app.db.models import LottoDraw
 from app.db.session import get_db
-from app.services.lotto import LottoStatsCalculator, draws_to_dict_list
+from app.services.lotto import LottoStatsCalculator, cached_response, draws_to_dict_list
 
 router = APIRouter(prefix="/api/guest", tags=["guest"])
 
@@ -23,6 +23,11 @@ class GuestDrawResponse(BaseModel):
 
 
 def _get_top_numbers_ml(db: Session, top_n: int = 5) -> list[int]:
+    """ML 로직 기반 상위 N개 번호 (회차 버전별 응답 캐시)"""
+    return cached_response(db, "guest_top_numbers", {"top_n": top_n}, lambda: _compute_top_numbers_ml(db, top_n))
+
+
+def _compute_top_numbers_ml(db: Session, top_n: int) -> list[int]:
     """
     ML 로직 기반 상위 N개 번호 반환
     - logic1, logic2, logic3 점수를 종합하여 최종 점수 계산
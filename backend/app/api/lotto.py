@@ -5,13 +5,18 @@ from typing import List, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel
-from sqlalchemy import desc
+from sqlalchemy import and_, desc, func, or_
 from sqlalchemy.orm import Session
 
 from app.api.auth import get_current_user
 from app.db.models import LottoDraw, LottoRecommendLog, LottoStatsCache
 from app.db.session import get_db
-from app.services.lotto import build_stats_from_draws, draws_to_dict_list, LottoStatsCalculator, PoolService
+from app.services.lotto import (
+    cached_response, count_issued_lines, draws_to_dict_list, get_log_lines, line_match_results, line_numbers,
+    LottoStatsCalculator, PoolService,
+)
+from app.services.lotto.stats_snapshot import cached_for_draws, get_stats_snapshot
+from app.services.lotto.user_hit_stats import get_user_hit_stats
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +61,10 @@ def _draws_to_numbers(draws: List[LottoDraw]):
 
 @router.get("/stats/overview")
 def stats_overview(db: Session = Depends(get_db)):
+    return cached_response(db, "stats_overview", {}, lambda: _stats_overview(db))
+
+
+def _stats_overview(db: Session) -> dict:
     cache = db.query(LottoStatsCache).first()
     total_draws = cache.total_draws if cache else db.query(LottoDraw).count()
     most_common = []
@@ -105,6 +114,10 @@ def stats_overview(db: Session = Depends(get_db)):
 
 @router.get("/stats/highlights")
 def stats_highlights(db: Session = Depends(get_db)):
+    return cached_response(db, "stats_highlights", {}, lambda: _stats_highlights(db))
+
+
+def _stats_highlights(db: Session) -> dict:
     recent = _recent_draws(db, 50)
     recent_10 = recent[:10]
 
@@ -154,6 +167,10 @@ def stats_highlights(db: Session = Depends(get_db)):
 
 @router.get("/stats/number")
 def stats_numbers(db: Session = Depends(get_db)):
+    return cached_response(db, "stats_number", {}, lambda: _stats_numbers(db))
+
+
+def _stats_numbers(db: Session) -> dict:
     draws = db.query(LottoDraw).all()
     counts = {}
     for numbers in _draws_to_numbers(draws):
@@ -167,6 +184,10 @@ def stats_numbers(db: Session = Depends(get_db)):
 
 @router.get("/stats/patterns")
 def stats_patterns(db: Session = Depends(get_db)):
+    return cached_response(db, "stats_patterns", {}, lambda: _stats_patterns(db))
+
+
+def _stats_patterns(db: Session) -> dict:
     draws = _recent_draws(db, 100)
     if not draws:
         return ApiResponse.items([])
@@ -248,6 +269,8 @@ def history(
         .all()
     )
     log_map = {log.target_draw_no: log for log in logs}
+    # 번호/당첨 결과는 발급 줄 테이블에서 (JSON 파싱 없음)
+    log_lines = get_log_lines(db, [log.id for log in log_map.values()])
 
     items = []
     for draw in draws:
@@ -269,8 +292,9 @@ def history(
         match_results = None
         user_checked = False
         if log:
-            my_lines = _parse_json(log.lines, "history_lines")
-            match_results = _parse_json(log.match_results, "history_match")
+            rows = log_lines[log.id]
+            my_lines = line_numbers(rows)
+            match_results = line_match_results(draw, rows, log.matched_at) if log.is_matched else None
             # 사용자가 MyPage에서 결과 확인을 완료했는지 여부
             user_checked = log.user_checked_at is not None
             logger.info(f"[History] draw_no={draw.draw_no}, my_lines count={len(my_lines) if my_lines else 0}, user_checked={user_checked}")
@@ -316,6 +340,11 @@ def history_public(
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=10, ge=1, le=100),
 ):
+    params = {"q": q, "sort": sort, "limit": limit, "page": page, "page_size": page_size}
+    return cached_response(db, "history_public", params, lambda: _history_public(db, **params))
+
+
+def _history_public(db: Session, q: Optional[str], sort: str, limit: int, page: int, page_size: int) -> dict:
     draws = _recent_draws(db, limit)
     items = []
     for draw in draws:
@@ -361,19 +390,25 @@ def mypage_summary(db: Session = Depends(get_db), user=Depends(get_current_user)
         .order_by(desc(LottoRecommendLog.id))
         .first()
     )
-    line_count = 0
-    if latest:
-        parsed = _parse_json(latest.lines, "mypage_summary")
-        line_count = len(parsed) if parsed else 0
+    line_count = len(get_log_lines(db, [latest.id])[latest.id]) if latest else 0
+
+    hit_stats = get_user_hit_stats(db, user.id)
+    avg_hit = f"{hit_stats['avg_match']:.2f}개" if hit_stats["total_lines"] else "-"
 
     items = [
         {"id": "weekly", "label": "이번 회차 추천", "value": f"{line_count}줄"},
         {"id": "month", "label": "최근 4주 추천", "value": f"{total_recent}줄"},
-        {"id": "hit", "label": "평균 적중", "value": "-"},
+        {"id": "hit", "label": "평균 적중", "value": avg_hit},
     ]
     return ApiResponse.items(items)
 
 
+@router.get("/mypage/stats")
+def mypage_stats(db: Session = Depends(get_db), user=Depends(get_current_user)):
+    """내 누적 적중 통계 (매칭 시 갱신되는 집계 조회)"""
+    return get_user_hit_stats(db, user.id)
+
+
 @router.get("/mypage/lines")
 def mypage_lines(db: Session = Depends(get_db), user=Depends(get_current_user)):
     """
@@ -410,27 +445,15 @@ def mypage_lines(db: Session = Depends(get_db), user=Depends(get_current_user)):
             .all()
         )
 
-        # 가장 줄 수가 많은 로그 선택
-        max_lines_count = 0
-        for log in prev_logs:
-            log_lines = _parse_json(log.lines, "log_lines") or []
-            # pool_lines가 있으면 그것을 사용 (전체 발급 번호)
-            if log.pool_lines:
-                pool = log.pool_lines if isinstance(log.pool_lines, list) else _parse_json(log.pool_lines, "pool") or []
-                if len(pool) > max_lines_count:
-                    max_lines_count = len(pool)
-                    prev_log = log
-            elif len(log_lines) > max_lines_count:
-                max_lines_count = len(log_lines)
-                prev_log = log
+        # 가장 줄 수가 많은 로그 선택 (풀이 있으면 공개 전 줄까지 전체 발급 번호)
+        prev_rows = get_log_lines(db, [log.id for log in prev_logs], revealed_only=False)
+        prev_log = max(prev_logs, key=lambda log: len(prev_rows[log.id]), default=None)
+        if prev_log and not prev_rows[prev_log.id]:
+            prev_log = None
 
         if prev_log:
-            # pool_lines가 있으면 전체 번호 사용, 없으면 lines 사용
-            if prev_log.pool_lines:
-                prev_lines = prev_log.pool_lines if isinstance(prev_log.pool_lines, list) else _parse_json(prev_log.pool_lines, "prev_pool") or []
-            else:
-                prev_lines = _parse_json(prev_log.lines, "prev_lines") or []
-            prev_match = _parse_json(prev_log.match_results, "prev_match")
+            rows = prev_rows[prev_log.id]
+            prev_lines = line_numbers(rows)
 
             # 이전 회차 당첨번호
             prev_draw_data = db.query(LottoDraw).filter(LottoDraw.draw_no == prev_draw_no).first()
@@ -444,6 +467,10 @@ def mypage_lines(db: Session = Depends(get_db), user=Depends(get_current_user)):
                 ]
                 bonus = prev_draw_data.bonus
                 draw_date = prev_draw_data.draw_date
+            prev_match = (
+                line_match_results(prev_draw_data, rows, prev_log.matched_at)
+                if prev_draw_data and prev_log.is_matched else None
+            )
 
             previous_draw = {
                 "draw_no": prev_draw_no,
@@ -458,7 +485,7 @@ def mypage_lines(db: Session = Depends(get_db), user=Depends(get_current_user)):
     # 현재 회차 데이터
     current_lines = []
     if current_log:
-        current_lines = _parse_json(current_log.lines, "current_lines") or []
+        current_lines = line_numbers(get_log_lines(db, [current_log.id])[current_log.id])
 
     return {
         "items": current_lines,
@@ -512,6 +539,10 @@ def mark_result_checked(
 
 @router.get("/latest")
 def latest_draw(db: Session = Depends(get_db)):
+    return cached_response(db, "latest", {}, lambda: _latest_draw(db))
+
+
+def _latest_draw(db: Session) -> dict:
     draw = db.query(LottoDraw).order_by(desc(LottoDraw.draw_no)).first()
     if not draw:
         return {
@@ -621,23 +652,9 @@ def request_free_recommendation(
             is_first_week = True
             weekly_limit += 1
 
-    # 이번 주 사용량 계산 (lines 배열의 총 길이)
+    # 이번 주 사용량 계산 (발급 줄 테이블 집계)
     week_start = _get_week_start()
-    weekly_logs = (
-        db.query(LottoRecommendLog)
-        .filter(LottoRecommendLog.account_user_id == user.id)
-        .filter(LottoRecommendLog.plan_type == "free_weekly")
-        .filter(LottoRecommendLog.recommend_time >= week_start)
-        .all()
-    )
-    weekly_usage = 0
-    for log in weekly_logs:
-        if log.lines:
-            try:
-                lines_data = json.loads(log.lines)
-                weekly_usage += len(lines_data) if isinstance(lines_data, list) else 1
-            except (json.JSONDecodeError, TypeError):
-                weekly_usage += 1
+    weekly_usage = count_issued_lines(db, user.id, "free_weekly", since=week_start)
 
     if weekly_usage >= weekly_limit:
         raise HTTPException(
@@ -698,17 +715,6 @@ def get_free_recommendation_status(
     user=Depends(get_current_user),
 ):
     """무료 추천 사용 현황 조회"""
-    plan_type = (user.subscription_type or "free").lower()
-    weekly_limit = PLAN_WEEKLY_FREE_LIMIT.get(plan_type, 1)
-
-    # 첫 주 보너스 체크
-    is_first_week = False
-    if user.created_at:
-        days_since_signup = (datetime.utcnow() - user.created_at).days
-        if days_since_signup <= 7:
-            is_first_week = True
-            weekly_limit += 1
-
     # 이번 주 받은 번호 목록 조회
     week_start = _get_week_start()
     weekly_logs = (
@@ -719,6 +725,21 @@ def get_free_recommendation_status(
         .order_by(desc(LottoRecommendLog.recommend_time))
         .all()
     )
+    return _free_weekly_status(user, weekly_logs)
+
+
+def _free_weekly_status(user, weekly_logs: List[LottoRecommendLog]) -> dict:
+    """이번 주 free_weekly 로그(최신순) → 무료 추천 사용 현황"""
+    plan_type = (user.subscription_type or "free").lower()
+    weekly_limit = PLAN_WEEKLY_FREE_LIMIT.get(plan_type, 1)
+
+    # 첫 주 보너스 체크
+    is_first_week = False
+    if user.created_at:
+        days_since_signup = (datetime.utcnow() - user.created_at).days
+        if days_since_signup <= 7:
+            is_first_week = True
+            weekly_limit += 1
 
     # 실제 발급된 줄 수 계산 (레코드 수가 아닌 실제 줄 수)
     lines = []
@@ -739,16 +760,8 @@ def get_free_recommendation_status(
 
 
 def _build_stats_from_db(db: Session) -> dict:
-    """DB에서 로또 데이터를 조회하여 stats 딕셔너리 생성"""
-    logger.debug("_build_stats_from_db 시작")
-    draws = db.query(LottoDraw).order_by(desc(LottoDraw.draw_no)).all()
-    logger.debug(f"draws 조회 완료: {len(draws)}개")
-    if not draws:
-        return None
-
-    result = build_stats_from_draws(draws_to_dict_list(draws))
-    logger.debug("_build_stats_from_db 완료")
-    return result
+    """전체 회차 stats 딕셔너리 (회차가 바뀌기 전까지 프로세스 캐시 스냅샷 공유 - 수정 금지)"""
+    return get_stats_snapshot(db, window=None)
 
 
 # 플랜별 줄 수 제한
@@ -1008,10 +1021,87 @@ def get_pool_status(
     return result
 
 
+@router.get("/recommend/session")
+def get_recommend_session(
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+):
+    """
+    추천 페이지 초기 상태 한 번에 조회
+
+    pool-status / fixed-candidates(check_only) / stats/premium / recommend/free/status를
+    각각 호출하던 것을 유저 로그 조회 1회 + 캐시된 프리미엄 통계로 합쳐 돌려줍니다.
+
+    Returns:
+        {
+            target_draw_no, plan_type,
+            pool: /recommend/pool-status와 같은 형식,
+            fixed_candidates: 저장된 AI 고정 후보 (PREMIUM/VIP, 없으면 []),
+            premium_stats: /stats/premium과 같은 형식 (BASIC 이상, 아니면 None),
+            free: /recommend/free/status와 같은 형식
+        }
+    """
+    plan_type = (user.subscription_type or "free").lower()
+
+    latest_draw_no = db.query(func.max(LottoDraw.draw_no)).scalar()
+    target_draw_no = (latest_draw_no + 1) if latest_draw_no else 1
+    week_start = _get_week_start()
+
+    # 대상 회차 로그 + 이번 주 무료 추천 로그를 한 번에 조회
+    logs = (
+        db.query(LottoRecommendLog)
+        .filter(LottoRecommendLog.account_user_id == user.id)
+        .filter(or_(
+            LottoRecommendLog.target_draw_no == target_draw_no,
+            and_(
+                LottoRecommendLog.plan_type == "free_weekly",
+                LottoRecommendLog.recommend_time >= week_start,
+            ),
+        ))
+        .order_by(desc(LottoRecommendLog.recommend_time))
+        .all()
+    )
+    pool_log = next(
+        (log for log in logs if log.target_draw_no == target_draw_no and log.plan_type == plan_type),
+        None,
+    )
+    weekly_logs = [
+        log for log in logs
+        if log.plan_type == "free_weekly" and log.recommend_time and log.recommend_time >= week_start
+    ]
+
+    pool = PoolService(db).status_from_log(pool_log, plan_type)
+    pool["target_draw_no"] = target_draw_no
+    pool["plan_type"] = plan_type
+
+    return {
+        "target_draw_no": target_draw_no,
+        "plan_type": plan_type,
+        "pool": pool,
+        "fixed_candidates": _saved_fixed_candidates(pool_log) if plan_type in ["premium", "vip"] else [],
+        "premium_stats": _premium_stats(db, plan_type) if plan_type in ["basic", "premium", "vip"] else None,
+        "free": _free_weekly_status(user, weekly_logs),
+    }
+
+
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # 고급 설정: 제외/고정 번호 지원
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
+def _saved_fixed_candidates(log: Optional[LottoRecommendLog]) -> List[int]:
+    """로그에 저장된 AI 고정 후보 (없으면 빈 리스트)"""
+    if not log or not log.settings_data:
+        return []
+    # settings_data가 문자열이면 JSON 파싱
+    settings = log.settings_data
+    if isinstance(settings, str):
+        try:
+            settings = json.loads(settings)
+        except (json.JSONDecodeError, TypeError):
+            settings = {}
+    return settings.get("fixed_candidates", []) if isinstance(settings, dict) else []
+
+
 @router.get("/recommend/fixed-candidates")
 def get_fixed_candidates(
     db: Session = Depends(get_db),
@@ -1054,15 +1144,8 @@ def get_fixed_candidates(
         ).first()
 
         # 이미 저장된 번호가 있고 refresh가 아니면 반환
-        if existing_log and existing_log.settings_data and not refresh:
-            # settings_data가 문자열이면 JSON 파싱
-            settings = existing_log.settings_data
-            if isinstance(settings, str):
-                try:
-                    settings = json.loads(settings)
-                except (json.JSONDecodeError, TypeError):
-                    settings = {}
-            saved_candidates = settings.get("fixed_candidates", []) if isinstance(settings, dict) else []
+        if existing_log and not refresh:
+            saved_candidates = _saved_fixed_candidates(existing_log)
             if saved_candidates:
                 return {
                     "success": True,
@@ -1287,8 +1370,6 @@ def get_premium_stats(
     - 구간별 출현 현황: 1-10, 11-20, 21-30, 31-40, 41-45 비율
     - 홀짝 밸런스: 최근 10회차 평균 홀수 개수
     """
-    from collections import Counter
-
     plan_type = (user.subscription_type or "free").lower()
 
     # 플랜 체크 - basic 이상만 접근 가능
@@ -1298,10 +1379,24 @@ def get_premium_stats(
             detail="프리미엄 통계는 BASIC 이상 플랜에서 이용 가능합니다."
         )
 
+    result = _premium_stats(db, plan_type)
+    if result is None:
+        raise HTTPException(status_code=404, detail="추첨 데이터가 없습니다.")
+    return result
+
+
+def _premium_stats(db: Session, plan_type: str) -> Optional[dict]:
+    """플랜별 프리미엄 통계 (회차 데이터가 바뀌기 전까지 캐시 - 수정 금지, 회차가 없으면 None)"""
+    return cached_for_draws(db, ("premium_stats", plan_type), lambda: _compute_premium_stats(db, plan_type))
+
+
+def _compute_premium_stats(db: Session, plan_type: str) -> Optional[dict]:
+    from collections import Counter
+
     # 전체 회차 데이터 가져오기
     draws = db.query(LottoDraw).order_by(desc(LottoDraw.draw_no)).all()
     if not draws:
-        raise HTTPException(status_code=404, detail="추첨 데이터가 없습니다.")
+        return None
 
     draws_data = draws_to_dict_list(draws)
     total_draws = len(draws_data)
@@ -1320,10 +1415,11 @@ def get_premium_stats(
         avoid_count = 2
         comeback_count = 2  # 3 → 2로 변경
 
-    # 1. ML 점수 계산 (추천 공용)
-    scores1 = LottoStatsCalculator.calculate_ai_scores_logic1(draws_data)
-    scores2 = LottoStatsCalculator.calculate_ai_scores_logic2(draws_data)
-    scores3 = LottoStatsCalculator.calculate_ai_scores_logic3(draws_data)
+    # 1. ML 점수 (추천 공용 - 같은 입력의 전체 회차 통계 스냅샷 재사용)
+    stats = _build_stats_from_db(db)
+    scores1 = stats['scores_logic1']
+    scores2 = stats['scores_logic2']
+    scores3 = stats['scores_logic3']
 
     scores_final = {}
     for n in range(1, 46):
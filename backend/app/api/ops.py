@@ -1,14 +1,19 @@
 from __future__ import annotations
 
+import secrets
 from datetime import datetime, timedelta
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from app.db.models import FreeTrialApplication, LottoRecommendLog, OpsRequestLog
 from app.db.session import get_db
 from app.api.auth import get_current_user, require_admin
+from app.config import settings
+from app.services.request_log_writer import request_log_writer_stats
+from app.services.request_metrics import render_prometheus, top_routes, window_summary
 
 router = APIRouter()
 
@@ -101,34 +106,17 @@ def ops_metrics(
     now = datetime.utcnow()
     since = now - timedelta(hours=24)
 
-    logs = (
+    # 요청 수/응답 시간은 분 단위 집계에서 계산 (최대 METRICS_FLUSH_SECONDS 지연)
+    summary = window_summary(db, since)
+    total = summary["requests"]
+
+    errors = (
         db.query(OpsRequestLog)
-        .filter(OpsRequestLog.created_at >= since)
+        .filter(OpsRequestLog.is_error == True, OpsRequestLog.created_at >= since)
         .order_by(OpsRequestLog.created_at.desc())
-        .all()
-    )
-    total = len(logs)
-    errors = [log for log in logs if log.is_error]
-    durations = [log.duration_ms for log in logs]
-    avg_ms = int(sum(durations) / len(durations)) if durations else 0
-    p95_ms = 0
-    if durations:
-        sorted_durations = sorted(durations)
-        index = int(round(0.95 * (len(sorted_durations) - 1)))
-        p95_ms = int(sorted_durations[index])
-
-    top_paths = (
-        db.query(OpsRequestLog.method, OpsRequestLog.path, func.count(OpsRequestLog.id))
-        .filter(OpsRequestLog.created_at >= since)
-        .group_by(OpsRequestLog.method, OpsRequestLog.path)
-        .order_by(func.count(OpsRequestLog.id).desc())
         .limit(5)
         .all()
     )
-    top_items = [
-        {"method": row[0], "path": row[1], "count": row[2]} for row in top_paths
-    ]
-
     recent_errors = [
         {
             "method": log.method,
@@ -136,19 +124,52 @@ def ops_metrics(
             "status": log.status_code,
             "created_at": log.created_at,
         }
-        for log in errors[:5]
+        for log in errors
     ]
-    error_rate = int((len(errors) / total) * 100) if total else 0
+    error_rate = int((summary["errors"] / total) * 100) if total else 0
 
     return {
         "window": {"from": since, "to": now},
         "totals": {
             "requests": total,
-            "errors": len(errors),
+            "errors": summary["errors"],
             "error_rate": error_rate,
-            "avg_ms": avg_ms,
-            "p95_ms": p95_ms,
+            "avg_ms": int(summary["avg_ms"]),
+            "p50_ms": int(summary["p50_ms"]),
+            "p95_ms": int(summary["p95_ms"]),
+            "p99_ms": int(summary["p99_ms"]),
+            "max_ms": int(summary["max_ms"]),
         },
-        "top_paths": top_items,
+        "top_paths": top_routes(db, since),
         "recent_errors": recent_errors,
+        # 이 워커의 요청 로그 저장 현황 (버린/실패 건수)
+        "request_log": request_log_writer_stats(),
     }
+
+
+def verify_metrics_api_key(authorization: str = Header(None)):
+    """Prometheus 수집기 API 키 검증"""
+    if not settings.METRICS_API_KEY:
+        raise HTTPException(status_code=500, detail="METRICS_API_KEY가 설정되지 않았습니다.")
+
+    if not authorization:
+        raise HTTPException(status_code=401, detail="Authorization 헤더가 필요합니다.")
+
+    # Bearer 토큰 형식 또는 직접 키 형식 모두 지원
+    token = authorization
+    if authorization.startswith("Bearer "):
+        token = authorization[7:]
+
+    if not secrets.compare_digest(token, settings.METRICS_API_KEY):
+        raise HTTPException(status_code=403, detail="유효하지 않은 API 키입니다.")
+
+    return True
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics(
+    db: Session = Depends(get_db),
+    _: bool = Depends(verify_metrics_api_key),
+) -> PlainTextResponse:
+    """라우트별 요청 수/에러/응답 시간 히스토그램 (Prometheus 텍스트 형식, 모든 워커 합계)"""
+    return PlainTextResponse(render_prometheus(db), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,5 +1,5 @@
 """설정 모듈"""
-from .constants import PLAN_CONFIG, PLAN_TYPES, SUBSCRIPTION_STATUS, PAYMENT_STATUS
+from .constants import PLAN_CONFIG, PLAN_TYPES, SUBSCRIPTION_STATUS, PAYMENT_STATUS, JOB_STATUS
 from .settings import (
     settings,
     get_cookie_settings,
@@ -12,7 +12,7 @@ from .settings import (
 )
 
 __all__ = [
-    'PLAN_CONFIG', 'PLAN_TYPES', 'SUBSCRIPTION_STATUS', 'PAYMENT_STATUS',
+    'PLAN_CONFIG', 'PLAN_TYPES', 'SUBSCRIPTION_STATUS', 'PAYMENT_STATUS', 'JOB_STATUS',
     'settings', 'get_cookie_settings', 'get_frontend_origins', 'get_admin_identifiers',
     'resolve_db_url', 'resolve_log_path', 'validate_production_settings', 'Settings',
 ]
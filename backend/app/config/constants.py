@@ -35,6 +35,14 @@ TRIAL_STATUS = {
     "FAILED": "failed",
 }
 
+JOB_STATUS = {
+    "PENDING": "pending",
+    "RUNNING": "running",
+    "COMPLETED": "completed",
+    "FAILED": "failed",
+    "CANCELLED": "cancelled",
+}
+
 
 # ============================================
 # 페이지네이션 기본값
@@ -105,6 +105,41 @@ class Settings:
     # Cron Job API 키 (외부 스케줄러에서 호출할 때 사용)
     CRON_API_KEY: str = os.getenv("AI_LOTTO_CRON_API_KEY", "")
 
+    # 관리자 백그라운드 작업 (재학습/백테스팅 등)
+    # 워커 프로세스당 동시 실행 수 (무거운 작업이 API 처리를 잠식하지 않도록 제한)
+    JOB_MAX_WORKERS: int = int(os.getenv("AI_LOTTO_JOB_MAX_WORKERS", "1"))
+    # 대기+실행 중 작업 최대 개수 (초과 시 제출 거부)
+    JOB_MAX_PENDING: int = int(os.getenv("AI_LOTTO_JOB_MAX_PENDING", "10"))
+    # 백테스팅 프로세스 수 (1이면 작업 스레드에서 순차 실행, 2 이상이면 프로세스 풀 병렬 실행)
+    BACKTEST_WORKERS: int = int(os.getenv("AI_LOTTO_BACKTEST_WORKERS", "1"))
+    # 당첨 매칭 시 한 번에 읽어 처리/커밋하는 추천 로그 수
+    MATCH_CHUNK_SIZE: int = int(os.getenv("AI_LOTTO_MATCH_CHUNK_SIZE", "5000"))
+
+    # 번호 풀 저장 형식 (true면 조합 순위/비트마스크 압축 컬럼, false면 기존 JSON 컬럼)
+    POOL_COMPACT_ENCODING: bool = os.getenv("AI_LOTTO_POOL_COMPACT_ENCODING", "true").lower() in {"1", "true", "yes"}
+
+    # API 요청 로그 일괄 저장 (ops_request_logs)
+    # 메모리 큐 최대 크기 (가득 차면 버림), 한 번에 저장하는 최대 행 수, 저장 간격 (ms)
+    REQUEST_LOG_QUEUE_SIZE: int = int(os.getenv("AI_LOTTO_REQUEST_LOG_QUEUE_SIZE", "10000"))
+    REQUEST_LOG_BATCH_SIZE: int = int(os.getenv("AI_LOTTO_REQUEST_LOG_BATCH_SIZE", "500"))
+    REQUEST_LOG_FLUSH_MS: int = int(os.getenv("AI_LOTTO_REQUEST_LOG_FLUSH_MS", "1000"))
+
+    # 라우트별 응답 시간 집계 저장 간격 (초), 분 단위 집계 보관 기간 (일)
+    METRICS_FLUSH_SECONDS: int = int(os.getenv("AI_LOTTO_METRICS_FLUSH_SECONDS", "10"))
+    METRICS_RETENTION_DAYS: int = int(os.getenv("AI_LOTTO_METRICS_RETENTION_DAYS", "30"))
+    # Prometheus /metrics 접근 키 (Authorization: Bearer <키>)
+    METRICS_API_KEY: str = os.getenv("AI_LOTTO_METRICS_API_KEY", "")
+
+    # 공개 통계 API 응답 캐시 (회차 버전별 LRU, 0이면 사용 안 함)
+    RESPONSE_CACHE_SIZE: int = int(os.getenv("AI_LOTTO_RESPONSE_CACHE_SIZE", "256"))
+    # 워커 간 공유 저장소 디렉터리 (설정 시 로컬 SQLite 파일로 응답/회차 버전 공유)
+    RESPONSE_CACHE_DIR: str = os.getenv("AI_LOTTO_RESPONSE_CACHE_DIR", "")
+    # 공유 저장소가 없을 때 회차 버전 재확인 주기 (초, 다른 워커에서 저장한 회차 반영)
+    RESPONSE_CACHE_VERSION_TTL: int = int(os.getenv("AI_LOTTO_RESPONSE_CACHE_VERSION_TTL", "60"))
+
+    # 공개 로또 API 브라우저/프록시 캐시 시간 (초, 0이면 매번 ETag로 재검증)
+    HTTP_CACHE_MAX_AGE: int = int(os.getenv("AI_LOTTO_HTTP_CACHE_MAX_AGE", "0"))
+
     # 네이버 검색 API (로또 데이터 수집용, 로그인용과 별도)
     NAVER_SEARCH_CLIENT_ID: str = os.getenv("NAVER_SEARCH_CLIENT_ID", "")
     NAVER_SEARCH_CLIENT_SECRET: str = os.getenv("NAVER_SEARCH_CLIENT_SECRET", "")
@@ -9,13 +9,17 @@ if __package__ is None:
         sys.path.insert(0, repo_root)
 
 from app.db import models  # noqa: F401
-from sqlalchemy import text
+from sqlalchemy import inspect, text
 
 from app.db.session import Base, engine, db_url
 
 
 def init_db() -> None:
     Base.metadata.create_all(bind=engine)
+    _ensure_plan_performance_unique()
+    _ensure_pool_packed_columns()
+    _ensure_admin_job_heartbeat_column()
+    _ensure_lines_synced_column()
     if _is_sqlite():
         _ensure_lotto_recommend_columns()
         _ensure_user_refresh_columns()
@@ -124,6 +128,112 @@ def _ensure_oauth_one_time_tokens_table() -> None:
                 conn.commit()
 
 
+def _ensure_plan_performance_unique() -> None:
+    """
+    plan_performance_stats (draw_no, plan_type) 유일 인덱스 추가 (SQLite/PostgreSQL 공통)
+
+    이전에는 매칭을 다시 돌릴 때마다 그때의 미매칭 로그 분량으로 행이 추가되었으므로,
+    중복 행은 합산해 가장 먼저 만든 행 하나로 합친 뒤 인덱스를 만듭니다.
+    """
+    inspector = inspect(engine)
+    if not inspector.has_table("plan_performance_stats"):
+        return
+    unique_columns = [c["column_names"] for c in inspector.get_unique_constraints("plan_performance_stats")]
+    unique_columns += [i["column_names"] for i in inspector.get_indexes("plan_performance_stats") if i.get("unique")]
+    if ["draw_no", "plan_type"] in unique_columns:
+        return
+
+    sum_columns = [
+        "total_lines", "total_users", "match_0", "match_1", "match_2", "match_3",
+        "match_4", "match_5", "match_5_bonus", "match_6",
+    ]
+    group_filter = (
+        "q.draw_no = plan_performance_stats.draw_no AND q.plan_type = plan_performance_stats.plan_type"
+    )
+    assignments = [
+        f"{col} = (SELECT SUM(q.{col}) FROM plan_performance_stats q WHERE {group_filter})"
+        for col in sum_columns
+    ] + [
+        f"{col} = (SELECT MAX(q.{col}) FROM plan_performance_stats q WHERE {group_filter})"
+        for col in ("top_10_hit_rate", "top_15_hit_rate", "top_20_hit_rate")
+    ]
+    with engine.connect() as conn:
+        conn.execute(text(f"""
+            UPDATE plan_performance_stats SET {", ".join(assignments)}
+            WHERE id IN (
+                SELECT MIN(id) FROM plan_performance_stats
+                GROUP BY draw_no, plan_type HAVING COUNT(*) > 1
+            )
+        """))
+        conn.execute(text("""
+            UPDATE plan_performance_stats
+            SET avg_match_count = (match_1 + 2 * match_2 + 3 * match_3 + 4 * match_4
+                                   + 5 * (match_5 + match_5_bonus) + 6 * match_6) * 1.0 / total_lines
+            WHERE total_lines > 0
+        """))
+        conn.execute(text("""
+            DELETE FROM plan_performance_stats
+            WHERE id NOT IN (SELECT MIN(id) FROM plan_performance_stats GROUP BY draw_no, plan_type)
+        """))
+        conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_plan_perf_draw_plan ON plan_performance_stats(draw_no, plan_type)"
+        ))
+        conn.commit()
+
+
+def _ensure_pool_packed_columns() -> None:
+    """lotto_recommend_logs에 압축 풀 컬럼 추가 (SQLite/PostgreSQL 공통)"""
+    columns = {col["name"] for col in inspect(engine).get_columns("lotto_recommend_logs")}
+    blob_type = "BLOB" if _is_sqlite() else "BYTEA"
+    new_columns = {
+        "pool_packed": blob_type,
+        "revealed_mask": "INTEGER",
+        "exclude_mask": "BIGINT",
+        "fixed_mask": "BIGINT",
+    }
+    with engine.connect() as conn:
+        for name, column_type in new_columns.items():
+            if name not in columns:
+                conn.execute(text(f"ALTER TABLE lotto_recommend_logs ADD COLUMN {name} {column_type}"))
+        conn.commit()
+
+
+def _ensure_admin_job_heartbeat_column() -> None:
+    """admin_jobs에 작업 프로세스 생존 확인 컬럼 추가 (SQLite/PostgreSQL 공통)"""
+    columns = {col["name"] for col in inspect(engine).get_columns("admin_jobs")}
+    if "heartbeat_at" in columns:
+        return
+    column_type = "DATETIME" if _is_sqlite() else "TIMESTAMP"
+    with engine.connect() as conn:
+        conn.execute(text(f"ALTER TABLE admin_jobs ADD COLUMN heartbeat_at {column_type}"))
+        conn.commit()
+
+
+def _ensure_lines_synced_column() -> None:
+    """
+    lotto_recommend_logs에 발급 줄 반영 여부 컬럼 추가 (SQLite/PostgreSQL 공통)
+
+    기존 로그는 미반영으로 추가한 뒤 발급 줄이 이미 있는 로그만 반영 완료로 표시합니다.
+    """
+    columns = {col["name"] for col in inspect(engine).get_columns("lotto_recommend_logs")}
+    if "lines_synced" in columns:
+        return
+    false = "0" if _is_sqlite() else "FALSE"
+    true = "1" if _is_sqlite() else "TRUE"
+    with engine.connect() as conn:
+        conn.execute(text(
+            f"ALTER TABLE lotto_recommend_logs ADD COLUMN lines_synced BOOLEAN NOT NULL DEFAULT {false}"
+        ))
+        conn.execute(text(
+            f"UPDATE lotto_recommend_logs SET lines_synced = {true} "
+            "WHERE EXISTS (SELECT 1 FROM recommend_lines WHERE recommend_lines.log_id = lotto_recommend_logs.id)"
+        ))
+        conn.execute(text(
+            "CREATE INDEX IF NOT EXISTS ix_lotto_recommend_logs_lines_synced ON lotto_recommend_logs(lines_synced)"
+        ))
+        conn.commit()
+
+
 def _ensure_postgres_oauth_columns() -> None:
     """PostgreSQL: oauth_one_time_tokens 테이블에 is_new_user 컬럼 추가"""
     with engine.connect() as conn:
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, Date, DateTime, Float, Integer, String, Text, JSON, CheckConstraint, UniqueConstraint, ForeignKey
+from sqlalchemy import BigInteger, Boolean, Column, Date, DateTime, Float, Integer, LargeBinary, String, Text, JSON, CheckConstraint, UniqueConstraint, ForeignKey, Index
 
 from app.db.session import Base
 
@@ -186,6 +186,15 @@ class FreeTrialApplication(Base):
     )
 
 
+class LottoDataVersion(Base):
+    """회차/통계 캐시 변경 세대 (쓰기마다 generation 증가 - 응답 캐시가 회차 집계 대신 이 행만 확인)"""
+    __tablename__ = "lotto_data_versions"
+
+    name = Column(String(50), primary_key=True)
+    generation = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
 class LottoStatsCache(Base):
     """로또 통계 캐시 (싱글톤)"""
     __tablename__ = "lotto_stats_cache"
@@ -238,17 +247,26 @@ class LottoRecommendLog(Base):
     target_draw_no = Column(Integer, nullable=False, index=True)
     lines = Column(Text, nullable=False)  # JSON string: 추천한 번호 조합들 (공개된 번호)
     recommend_time = Column(DateTime, default=datetime.utcnow)
-    match_results = Column(Text, nullable=True)  # JSON string: 당첨 결과
+    match_results = Column(Text, nullable=True)  # JSON string: 당첨 결과 (이전 매칭분/관리자 수정 - 새 매칭 결과는 recommend_lines)
 
     # 플랜 타입 (무료/베이직/프리미엄/VIP)
     plan_type = Column(String(20), nullable=True, index=True)  # free, basic, premium, vip
 
     # 번호 풀 시스템 (1줄씩 받기 기능용)
-    pool_lines = Column(JSON, nullable=True)  # 전체 풀 번호 (BASIC 5줄, PREMIUM 10줄, VIP 20줄)
-    revealed_indices = Column(JSON, nullable=True)  # 이미 공개된 줄 인덱스 [0, 3, 5, ...]
+    pool_lines = Column(JSON(none_as_null=True), nullable=True)  # 전체 풀 번호 (BASIC 5줄, PREMIUM 10줄, VIP 20줄)
+    revealed_indices = Column(JSON(none_as_null=True), nullable=True)  # 이미 공개된 줄 인덱스 [0, 3, 5, ...]
 
     # 고급 설정 메타데이터 (제외/고정 번호 등)
-    settings_data = Column(JSON, nullable=True)  # {"exclude": [1,2,3], "fixed": [7,8]}
+    settings_data = Column(JSON(none_as_null=True), nullable=True)  # {"exclude": [1,2,3], "fixed": [7,8]}
+
+    # 압축 풀 인코딩 (pool_codec - 값이 있으면 위 JSON 풀 컬럼 대신 사용)
+    pool_packed = Column(LargeBinary, nullable=True)  # 줄별 조합 순위 int32 배열 (VIP 80바이트)
+    revealed_mask = Column(Integer, nullable=True)  # 공개된 줄 비트마스크 (비트 i = i번째 줄)
+    exclude_mask = Column(BigInteger, nullable=True)  # 제외 번호 비트마스크 (비트 n = 번호 n)
+    fixed_mask = Column(BigInteger, nullable=True)  # 고정 번호 비트마스크
+
+    # 발급 줄 테이블(recommend_lines) 반영 여부 (False = 백필 대상, 줄이 없는 로그도 처리 후 True)
+    lines_synced = Column(Boolean, nullable=False, default=True, index=True)
 
     # 매칭 완료 여부
     is_matched = Column(Boolean, default=False, index=True)
@@ -263,6 +281,33 @@ class LottoRecommendLog(Base):
     )
 
 
+class LottoRecommendLine(Base):
+    """
+    추천 로그의 발급 줄 (줄당 1행)
+
+    lotto_recommend_logs의 pool_lines(없으면 lines)/revealed_indices와 자동 동기화됩니다
+    (services/lotto/recommend_lines.py). 번호는 비트마스크라 적중 수를 SQL로 계산할 수 있습니다.
+    """
+    __tablename__ = "recommend_lines"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    log_id = Column(Integer, ForeignKey("lotto_recommend_logs.id", ondelete="CASCADE"), nullable=False)
+    target_draw_no = Column(Integer, nullable=False)  # 로그의 대상 회차 (인덱스용 복제)
+    line_index = Column(Integer, nullable=False)  # 풀(없으면 lines) 내 순서
+    mask = Column(BigInteger, nullable=False)  # 비트 n = 번호 n (1~45)
+    revealed = Column(Boolean, nullable=False, default=True)  # 사용자에게 공개된 줄 여부
+
+    # 매칭 결과 (매칭 전 NULL)
+    match_count = Column(Integer, nullable=True)
+    bonus_match = Column(Boolean, nullable=True)
+    rank = Column(Integer, nullable=True)  # 1~5등, 낙첨 0
+
+    __table_args__ = (
+        UniqueConstraint('log_id', 'line_index', name='uq_recommend_line_index'),
+        Index('idx_recommend_lines_draw_rank', 'target_draw_no', 'rank'),
+    )
+
+
 class OpsRequestLog(Base):
     __tablename__ = "ops_request_logs"
 
@@ -275,6 +320,52 @@ class OpsRequestLog(Base):
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
 
+class OpsRequestRollup(Base):
+    """
+    분 단위 라우트별 응답 시간 집계 (services/request_metrics.py)
+
+    워커 프로세스마다 자기 분 집계를 통째로 덮어쓰므로 (분, 메서드, 라우트, 워커)가 키입니다.
+    path='*'는 해당 분의 전체 요청 합계입니다.
+    """
+    __tablename__ = "ops_request_rollups"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    bucket_start = Column(DateTime, nullable=False)  # 분 시작 시각 (UTC)
+    method = Column(String(10), nullable=False)
+    path = Column(String(200), nullable=False)  # 라우트 경로 템플릿
+    worker = Column(String(32), nullable=False)
+    request_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    sum_ms = Column(Float, nullable=False, default=0)
+    max_ms = Column(Float, nullable=False, default=0)
+    histogram = Column(LargeBinary, nullable=False)  # (버킷, 건수) 쌍 <HI 배열
+
+    __table_args__ = (
+        UniqueConstraint('bucket_start', 'method', 'path', 'worker', name='uq_ops_rollup_bucket'),
+        Index('idx_ops_rollups_path_bucket', 'path', 'bucket_start'),
+    )
+
+
+class OpsRequestTotal(Base):
+    """워커별 누적 응답 시간 집계 (프로세스 시작 이후 - Prometheus /metrics용, 종료된 워커 행은 worker='retired' 행으로 병합)"""
+    __tablename__ = "ops_request_totals"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    method = Column(String(10), nullable=False)
+    path = Column(String(200), nullable=False)
+    worker = Column(String(32), nullable=False)
+    request_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    sum_ms = Column(Float, nullable=False, default=0)
+    max_ms = Column(Float, nullable=False, default=0)
+    histogram = Column(LargeBinary, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint('method', 'path', 'worker', name='uq_ops_total_route'),
+    )
+
+
 class Payment(Base):
     """결제 내역"""
     __tablename__ = "payments"
@@ -371,6 +462,67 @@ class PlanPerformanceStats(Base):
 
     created_at = Column(DateTime, default=datetime.utcnow)
 
+    # 회차×플랜당 1행 (매칭 청크마다 증분 UPSERT)
+    __table_args__ = (
+        UniqueConstraint('draw_no', 'plan_type', name='uq_plan_perf_draw_plan'),
+    )
+
+
+class PlanPerformanceRollup(Base):
+    """플랜별 성과 구간 집계 (최근 10회/최근 50회/전체 - plan_performance_stats 변경 시 재계산)"""
+    __tablename__ = "plan_performance_rollups"
+
+    plan_type = Column(String(20), primary_key=True)  # free, basic, premium, vip
+    period = Column(String(10), primary_key=True)  # last_10, last_50, all
+
+    draws = Column(Integer, default=0)  # 구간에 포함된 회차 수
+    from_draw_no = Column(Integer, nullable=True)
+    to_draw_no = Column(Integer, nullable=True)
+
+    total_lines = Column(Integer, default=0)
+    total_users = Column(Integer, default=0)
+    total_match = Column(Integer, default=0)  # 적중 번호 수 합계
+    match_3 = Column(Integer, default=0)  # 5등
+    match_4 = Column(Integer, default=0)  # 4등
+    match_5 = Column(Integer, default=0)  # 3등
+    match_5_bonus = Column(Integer, default=0)  # 2등
+    match_6 = Column(Integer, default=0)  # 1등
+    avg_match_count = Column(Float, default=0.0)  # 줄당 평균 적중 수
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class UserHitStats(Base):
+    """유저별 누적 적중 통계 (당첨 매칭 시 증분 갱신 - MyPage 조회용)"""
+    __tablename__ = "user_hit_stats"
+
+    account_user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+
+    matched_logs = Column(Integer, default=0)  # 매칭된 추천 로그 수
+    total_lines = Column(Integer, default=0)  # 매칭된 줄 수
+    total_match = Column(Integer, default=0)  # 적중 번호 수 합계
+    rank1_count = Column(Integer, default=0)
+    rank2_count = Column(Integer, default=0)
+    rank3_count = Column(Integer, default=0)
+    rank4_count = Column(Integer, default=0)
+    rank5_count = Column(Integer, default=0)
+    best_rank = Column(Integer, nullable=True)  # 최고 등수 (당첨 없으면 NULL)
+    last_matched_draw_no = Column(Integer, nullable=True)
+
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class LottoMatchCheckpoint(Base):
+    """회차별 추천 로그 매칭 진행 상황 (청크 단위로 갱신 - 중단 후 재실행 시 이어서 처리)"""
+    __tablename__ = "lotto_match_checkpoints"
+
+    draw_no = Column(Integer, primary_key=True)
+    last_log_id = Column(Integer, nullable=False, default=0)  # 마지막으로 처리한 추천 로그 id
+    matched_count = Column(Integer, nullable=False, default=0)  # 지금까지 매칭한 로그 수
+    plan_stats = Column(JSON, nullable=True)  # 지금까지의 플랜별 누적 통계
+    completed_at = Column(DateTime, nullable=True)  # 완료 시각 (NULL이면 진행 중)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
 
 class PasswordResetToken(Base):
     """비밀번호 재설정 토큰"""
@@ -409,6 +561,32 @@ class OAuthState(Base):
     expires_at = Column(DateTime, nullable=False)
 
 
+class LottoFeatureStore(Base):
+    """번호별 ML 특성 저장소 (예측 대상 회차 × 번호, 대상 회차 이전 데이터로 계산)"""
+    __tablename__ = "lotto_feature_store"
+
+    draw_no = Column(Integer, primary_key=True)  # 예측 대상 회차
+    number = Column(Integer, primary_key=True)  # 1~45
+    version = Column(Integer, nullable=False, index=True)  # 특성 정의 버전 (FEATURE_SCHEMA_VERSION)
+    features = Column(JSON, nullable=False)  # 15개 특성 리스트 (FEATURE_NAMES 순서)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class BacktestResultCache(Base):
+    """회차별 백테스팅 결과 캐시 (입력 내용 해시로 식별 - 입력이 바뀌면 자동으로 미스)"""
+    __tablename__ = "backtest_result_cache"
+
+    cache_key = Column(String(64), primary_key=True)  # 아래 구성 요소 전체의 sha256
+    draw_no = Column(Integer, nullable=False, index=True)
+    generator_version = Column(String(16), nullable=False, index=True)  # 생성/평가 코드 해시
+    weights_hash = Column(String(16), nullable=False)  # AI 가중치 해시
+    model_version = Column(String(16), nullable=False)  # ML 모델 파일 해시 (없으면 "none")
+    history_hash = Column(String(16), nullable=False)  # 대상 회차 이전 회차 데이터 해시
+    seed = Column(Integer, nullable=False)
+    result = Column(JSON, nullable=False)  # evaluate_single_draw 결과
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
 class MLTrainingLog(Base):
     """ML 학습 로그"""
     __tablename__ = "ml_training_logs"
@@ -434,3 +612,29 @@ class MLTrainingLog(Base):
     plan_performance = Column(JSON, nullable=True)  # {"free": 1.5, "basic": 2.1, ...}
 
     notes = Column(Text, nullable=True)
+
+
+class AdminJob(Base):
+    """관리자 백그라운드 작업 (재학습/백테스팅/매칭/캐시 재생성)"""
+    __tablename__ = "admin_jobs"
+
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    job_type = Column(String(30), nullable=False, index=True)  # ml_retrain, backtest, match, rebuild_cache
+    status = Column(String(20), nullable=False, default="pending", index=True)  # pending, running, completed, failed, cancelled
+
+    params = Column(JSON, nullable=True)  # 작업 입력 파라미터
+
+    # 진행 상황
+    progress = Column(Float, default=0.0)  # 0.0 ~ 1.0
+    progress_message = Column(String(255), nullable=True)
+
+    result = Column(JSON, nullable=True)  # 진행 중에는 부분 결과, 완료 후 최종 결과
+    error = Column(Text, nullable=True)
+    cancel_requested = Column(Boolean, default=False)
+
+    created_by = Column(Integer, ForeignKey("users.id", ondelete="SET NULL"), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    # 작업을 맡은 프로세스가 주기적으로 갱신 (오래 갱신되지 않은 대기/실행 작업은 중단된 것으로 처리)
+    heartbeat_at = Column(DateTime, nullable=True)
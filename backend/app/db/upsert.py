@@ -0,0 +1,11 @@
+"""UPSERT용 INSERT (SQLite/PostgreSQL 공통 ON CONFLICT)"""
+from sqlalchemy.orm import Session
+
+
+def dialect_insert(db: Session, model):
+    """DB 방언별 INSERT 구문 - .on_conflict_do_update()/.excluded 사용 가능"""
+    if db.get_bind().dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert(model)
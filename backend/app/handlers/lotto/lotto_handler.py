@@ -292,7 +292,7 @@ async def show_lotto_result(message_or_query, draw_no: int) -> None:
             lines.append("💡 /lotto 명령어로 번호를 받으면")
             lines.append("   다음 회차부터 자동으로 당첨 확인됩니다!")
         else:
-            if not log.match_results:
+            if not log.is_matched:
                 lines.append("━━━━━━━━━━━━━━━━━━━")
                 lines.append("📊 당첨 분석 진행 중...")
                 lines.append("잠시 후 다시 확인해주세요!")
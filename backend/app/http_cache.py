@@ -0,0 +1,114 @@
+"""공개 로또 API conditional GET (ETag / Last-Modified)
+
+공개 통계 API는 회차 데이터가 바뀌기 전까지 같은 응답을 돌려주므로
+(경로, 쿼리 파라미터, 회차 버전)으로 강한 ETag를, 회차 수집 시각으로 Last-Modified를 만듭니다.
+If-None-Match / If-Modified-Since가 일치하면 핸들러를 호출하지 않고 304를 반환하므로
+재방문 요청은 헤더 비교만으로 끝납니다. 회차 버전은 response_cache가 기억한 값을 씁니다.
+"""
+from __future__ import annotations
+
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Optional, Tuple
+
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+from app.config import settings
+
+# 응답이 회차 데이터로만 결정되는 공개 GET 경로
+PUBLIC_PATHS = frozenset({
+    "/api/lotto/stats/overview",
+    "/api/lotto/stats/highlights",
+    "/api/lotto/stats/number",
+    "/api/lotto/stats/patterns",
+    "/api/lotto/history/public",
+    "/api/lotto/latest",
+})
+
+
+def _load_validators() -> Tuple[str, Optional[int]]:
+    """(회차 버전, Last-Modified epoch 초) - 기억된 버전이 있으면 DB 조회 없음"""
+    from app.db.session import SessionLocal
+    from app.services.lotto.response_cache import current_version, draws_last_modified
+
+    with SessionLocal() as db:
+        return current_version(db), draws_last_modified(db)
+
+
+def _make_etag(request: Request, version: str) -> str:
+    params = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha256(f"{request.url.path}?{params}|{version}".encode()).hexdigest()[:24]
+    return f'"{digest}"'
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """If-None-Match 비교 (약한 비교 - W/ 접두사 무시, * 허용)"""
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _not_modified_since(header: str, last_modified: Optional[int]) -> bool:
+    if last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(header)
+    except (TypeError, ValueError):
+        return False
+    return last_modified <= int(since.timestamp())
+
+
+def _cache_headers(etag: str, last_modified: Optional[int]) -> dict:
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.HTTP_CACHE_MAX_AGE}, must-revalidate",
+    }
+    if last_modified is not None:
+        headers["Last-Modified"] = formatdate(last_modified, usegmt=True)
+    return headers
+
+
+class ConditionalGetMiddleware(BaseHTTPMiddleware):
+    """공개 로또 API에 ETag/Last-Modified/Cache-Control을 붙이고 일치하면 304 반환"""
+
+    async def dispatch(self, request: Request, call_next):
+        if request.method not in ("GET", "HEAD") or request.url.path not in PUBLIC_PATHS:
+            return await call_next(request)
+
+        try:
+            version, last_modified = await run_in_threadpool(_load_validators)
+        except Exception:
+            # 검증값을 만들 수 없으면 일반 요청으로 처리
+            return await call_next(request)
+
+        etag = _make_etag(request, version)
+        headers = _cache_headers(etag, last_modified)
+
+        # If-None-Match가 있으면 If-Modified-Since는 무시 (RFC 9110)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            not_modified = _etag_matches(if_none_match, etag)
+        else:
+            if_modified_since = request.headers.get("if-modified-since")
+            not_modified = bool(if_modified_since) and _not_modified_since(if_modified_since, last_modified)
+        if not_modified:
+            return Response(status_code=304, headers=headers)
+
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+
+        # 처리 도중 회차가 바뀌었으면 본문과 ETag가 어긋날 수 있으므로 검증값을 붙이지 않음
+        current, _ = await run_in_threadpool(_load_validators)
+        if current != version:
+            response.headers["Cache-Control"] = "no-cache"
+            return response
+
+        for key, value in headers.items():
+            response.headers[key] = value
+        return response
@@ -9,10 +9,12 @@ from slowapi.errors import RateLimitExceeded
 from app.api import auth_router, free_trial_router, lotto_router, ops_router, admin_router, subscription_router, oauth_router, guest_router
 from app.config import get_frontend_origins, validate_production_settings
 from app.db.session import SessionLocal
-from app.db.models import OpsRequestLog
 from app.db.init_db import init_db
+from app.http_cache import PUBLIC_PATHS, ConditionalGetMiddleware
 from app.logging_config import setup_logging
 from app.rate_limit import limiter, rate_limit_exceeded_handler
+from app.services.request_log_writer import enqueue_request_log, shutdown_request_log_writer
+from app.services.request_metrics import UNMATCHED_ROUTE, record_request
 
 app = FastAPI(title="AI Lotto API")
 
@@ -20,6 +22,9 @@ app = FastAPI(title="AI Lotto API")
 app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, rate_limit_exceeded_handler)
 
+# 공개 로또 API ETag/Last-Modified (304 응답에도 CORS 헤더가 붙도록 CORS보다 먼저 등록)
+app.add_middleware(ConditionalGetMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=get_frontend_origins(),
@@ -44,6 +49,30 @@ def startup() -> None:
     setup_logging()
     init_db()
 
+    # ML 특성 저장소 버전 확인 (불일치/미생성 시 백그라운드 재생성)
+    from app.services.jobs import recover_interrupted_jobs
+    from app.services.lotto.feature_store import ensure_feature_store_current
+    from app.services.lotto.pool_codec import request_pool_encoding_migration
+    from app.services.lotto.recommend_lines import request_recommend_lines_backfill
+    from app.services.lotto.user_hit_stats import request_user_hit_stats_backfill
+    with SessionLocal() as db:
+        # 이전 프로세스가 비정상 종료되며 남긴 대기/실행 작업 정리
+        recover_interrupted_jobs(db)
+        ensure_feature_store_current(db)
+        # 발급 줄 테이블/유저 적중 통계가 비어 있으면 백그라운드 백필
+        request_recommend_lines_backfill(db)
+        request_user_hit_stats_backfill(db)
+        # JSON으로 저장된 기존 풀이 남아 있으면 압축 형식으로 변환
+        request_pool_encoding_migration(db)
+
+
+@app.on_event("shutdown")
+def shutdown() -> None:
+    from app.services.jobs import shutdown_job_runner
+    shutdown_job_runner()
+    # 큐에 남은 요청 로그/응답 시간 집계 저장
+    shutdown_request_log_writer()
+
 
 @app.middleware("http")
 async def request_logger(request: Request, call_next):
@@ -90,25 +119,17 @@ async def request_logger(request: Request, call_next):
 
 
 def _store_request_log(request: Request, status_code: int, duration_ms: float) -> None:
+    """요청 로그를 저장 큐에 추가하고 라우트별 응답 시간 집계 (DB 저장은 백그라운드 스레드가 일괄 처리)"""
     path = request.url.path
     if path.startswith("/static"):
         return
-    db = SessionLocal()
-    try:
-        db.add(
-            OpsRequestLog(
-                method=request.method,
-                path=path[:200],
-                status_code=status_code,
-                duration_ms=duration_ms,
-                is_error=status_code >= 400,
-            )
-        )
-        db.commit()
-    except Exception:
-        db.rollback()
-    finally:
-        db.close()
+    enqueue_request_log(request.method, path, status_code, duration_ms)
+    # 경로 파라미터가 들어간 실제 경로 대신 라우트 템플릿으로 집계
+    # (conditional GET 304는 라우팅 전에 반환되지만 공개 경로는 파라미터가 없어 경로가 곧 라우트)
+    route = getattr(request.scope.get("route"), "path", None)
+    if route is None:
+        route = path if path in PUBLIC_PATHS else UNMATCHED_ROUTE
+    record_request(request.method, route, status_code, duration_ms)
 
 
 @app.get("/health")
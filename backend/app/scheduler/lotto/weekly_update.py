@@ -9,6 +9,8 @@ from app.collectors.lotto.db_manager import LottoDBManager
 from app.services.lotto.stats_calculator import LottoStatsCalculator
 from app.services.lotto.result_matcher import match_all_pending_logs, get_plan_performance_summary
 from app.services.lotto.ml_trainer import LottoMLTrainer
+from app.services.lotto.feature_store import FeatureStoreSource, refresh_feature_store
+from app.services.lotto.response_cache import mark_draws_changed
 from app.db.session import SessionLocal
 from app.db.models import MLTrainingLog
 
@@ -49,6 +51,7 @@ async def weekly_lotto_update(session_factory=SessionLocal, bot=None, admin_chat
             # 신규 회차 수집
             new_count = 0
             new_draw_no = None
+            saved_draw_nos = []
 
             if latest_api > latest_db:
                 print(f"   신규 회차 수집 중... ({latest_db + 1}~{latest_api})")
@@ -67,10 +70,15 @@ async def weekly_lotto_update(session_factory=SessionLocal, bot=None, admin_chat
                     if saved:
                         new_count += 1
                         new_draw_no = draw_no
+                        saved_draw_nos.append(draw_no)
                         print(f"   ✅ 회차 {draw_no} 저장 완료")
             else:
                 print("   ℹ️  신규 회차 없음")
 
+            # 신규 회차 ML 특성 저장소 반영
+            if saved_draw_nos:
+                refresh_feature_store(db, saved_draw_nos)
+
             # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
             # [2/5] 당첨 결과 매칭
             # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -97,7 +105,7 @@ async def weekly_lotto_update(session_factory=SessionLocal, bot=None, admin_chat
                 for d in draws
             ]
 
-            trainer = LottoMLTrainer()
+            trainer = LottoMLTrainer(feature_source=FeatureStoreSource(db))
             train_result = trainer.train(draws_dict)
 
             # 학습 로그 저장
@@ -150,6 +158,8 @@ async def weekly_lotto_update(session_factory=SessionLocal, bot=None, admin_chat
                     "ai_scores": json.dumps(ai_scores),
                 },
             )
+            # text() 쓰기는 세션 이벤트가 감지하지 못하므로 응답 캐시 변경 세대를 직접 올림
+            mark_draws_changed(db)
             db.commit()
             print("   ✅ 통계 캐시 갱신 완료")
 
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import argparse
+import json
+
+from app.db.models import LottoDraw
+from app.db.session import SessionLocal
+from app.services.lotto import draws_to_dict_list
+from app.services.lotto.feature_store import FeatureStoreSource
+from app.services.lotto.logistic_model import DEFAULT_L2, benchmark_models
+from app.services.lotto.ml_trainer import LottoMLTrainer
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare logistic model vs feature-importance weighting")
+    parser.add_argument("--test-draws", type=int, default=200, help="Number of most recent draws held out")
+    parser.add_argument("--start-draw", type=int, default=100, help="First training target draw")
+    parser.add_argument("--l2", type=float, default=DEFAULT_L2, help="L2 regularization strength")
+    parser.add_argument("--top-k", type=int, default=15, help="Top-k numbers used for hit rate")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        draws = draws_to_dict_list(db.query(LottoDraw).order_by(LottoDraw.draw_no).all())
+        if not draws:
+            print("No draws found.")
+            return
+
+        trainer = LottoMLTrainer(feature_source=FeatureStoreSource(db))
+        result = benchmark_models(
+            draws,
+            test_draws=args.test_draws,
+            start_draw=args.start_draw,
+            l2=args.l2,
+            top_k=args.top_k,
+            trainer=trainer,
+        )
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
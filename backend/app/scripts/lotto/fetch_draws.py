@@ -23,14 +23,18 @@ def fetch_draws(start: Optional[int] = None, end: Optional[int] = None, delay: f
         if end < start:
             return 0
 
-        saved_count = 0
+        saved_draw_nos = []
         for draw_no in range(start, end + 1):
             draw_info = api.get_lotto_draw(draw_no, retries=3)
             if draw_info is None:
                 continue
             if db_manager.save_draw(draw_info):
-                saved_count += 1
-        return saved_count
+                saved_draw_nos.append(draw_no)
+
+        if saved_draw_nos:
+            from app.services.lotto.feature_store import refresh_feature_store
+            refresh_feature_store(db, saved_draw_nos)
+        return len(saved_draw_nos)
 
 
 def main() -> None:
@@ -0,0 +1,26 @@
+from app.services.jobs.job_runner import (
+    JobCancelled,
+    JobContext,
+    JobQueueFull,
+    cancel_job,
+    get_job,
+    job_to_dict,
+    recover_interrupted_jobs,
+    register_job,
+    shutdown_job_runner,
+    submit_job,
+)
+from app.services.jobs import lotto_jobs  # noqa: F401  (작업 핸들러 등록)
+
+__all__ = [
+    "JobCancelled",
+    "JobContext",
+    "JobQueueFull",
+    "cancel_job",
+    "get_job",
+    "job_to_dict",
+    "recover_interrupted_jobs",
+    "register_job",
+    "shutdown_job_runner",
+    "submit_job",
+]
@@ -0,0 +1,329 @@
+"""관리자 백그라운드 작업 실행기
+
+재학습/백테스팅/매칭/캐시 재생성처럼 오래 걸리는 작업을 요청 스레드에서 분리해
+스레드 풀에서 실행합니다. 작업 상태/진행률/결과는 admin_jobs 테이블에 저장되므로
+어느 워커 프로세스에서든 조회/취소할 수 있습니다.
+
+작업을 맡은 프로세스는 heartbeat_at을 주기적으로 갱신합니다. 프로세스가 비정상 종료되어
+오래 갱신되지 않은 대기/실행 작업은 서버 시작/작업 등록 시 실패로 정리되어 대기 한도를 차지하지 않습니다.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings, JOB_STATUS
+from app.db.models import AdminJob
+from app.db.session import SessionLocal
+
+logger = logging.getLogger("job_runner")
+
+ACTIVE_STATUSES = (JOB_STATUS["PENDING"], JOB_STATUS["RUNNING"])
+
+# 작업 생존 신호 갱신 간격 / 이 시간 이상 갱신되지 않으면 중단된 작업으로 판단 (초)
+HEARTBEAT_INTERVAL = 30
+HEARTBEAT_STALE_AFTER = 120
+
+_handlers: Dict[str, Callable[["JobContext", dict], Any]] = {}
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+# 이 프로세스에서 실행을 맡은 작업 (종료 시 정리용)
+_owned_jobs: set = set()
+_heartbeat_thread: Optional[threading.Thread] = None
+_heartbeat_stop = threading.Event()
+
+
+class JobCancelled(Exception):
+    """작업 취소 요청으로 중단됨"""
+
+
+class JobQueueFull(Exception):
+    """대기 중인 작업이 너무 많음"""
+
+
+def register_job(job_type: str):
+    """작업 핸들러 등록 데코레이터 - handler(ctx, params) -> result(dict)"""
+    def decorator(func_: Callable[["JobContext", dict], Any]):
+        _handlers[job_type] = func_
+        return func_
+    return decorator
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor, _heartbeat_thread
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, settings.JOB_MAX_WORKERS),
+                thread_name_prefix="admin-job",
+            )
+        if _heartbeat_thread is None or not _heartbeat_thread.is_alive():
+            _heartbeat_stop.clear()
+            _heartbeat_thread = threading.Thread(target=_heartbeat_loop, name="admin-job-heartbeat", daemon=True)
+            _heartbeat_thread.start()
+        return _executor
+
+
+def _heartbeat_loop() -> None:
+    """이 프로세스가 맡은 대기/실행 작업의 heartbeat_at 갱신"""
+    while not _heartbeat_stop.wait(HEARTBEAT_INTERVAL):
+        job_ids = list(_owned_jobs)
+        if not job_ids:
+            continue
+        db = SessionLocal()
+        try:
+            db.query(AdminJob).filter(
+                AdminJob.id.in_(job_ids),
+                AdminJob.status.in_(ACTIVE_STATUSES),
+            ).update({AdminJob.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            logger.exception("작업 생존 신호 갱신 실패")
+        finally:
+            db.close()
+
+
+def recover_interrupted_jobs(db: Session) -> int:
+    """
+    맡은 프로세스가 사라진 대기/실행 작업을 실패로 정리 (서버 시작/작업 등록 시 호출)
+
+    Returns:
+        정리한 작업 수
+    """
+    stale_before = datetime.utcnow() - timedelta(seconds=HEARTBEAT_STALE_AFTER)
+    last_seen = func.coalesce(AdminJob.heartbeat_at, AdminJob.started_at, AdminJob.created_at)
+    query = db.query(AdminJob).filter(
+        AdminJob.status.in_(ACTIVE_STATUSES),
+        last_seen < stale_before,
+    )
+    if _owned_jobs:
+        query = query.filter(AdminJob.id.notin_(list(_owned_jobs)))
+    count = query.update({
+        AdminJob.status: JOB_STATUS["FAILED"],
+        AdminJob.error: "작업 프로세스가 종료되어 작업이 중단되었습니다.",
+        AdminJob.finished_at: datetime.utcnow(),
+    }, synchronize_session=False)
+    db.commit()
+    if count:
+        logger.warning(f"중단된 작업 {count}건을 실패로 정리했습니다.")
+    return count
+
+
+class JobContext:
+    """작업 핸들러에 전달되는 진행률 보고/취소 확인 도구"""
+
+    # DB 쓰기 최소 간격 (초) - 회차마다 보고해도 DB 부하가 커지지 않도록 제한
+    REPORT_INTERVAL = 1.0
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self._last_report = 0.0
+        self._cancelled = False
+
+    def report(
+        self,
+        progress: float,
+        message: Optional[str] = None,
+        partial_result: Optional[dict] = None,
+        force: bool = False,
+    ) -> None:
+        """진행률 기록 (취소 요청이 있으면 JobCancelled 발생)"""
+        now = time.monotonic()
+        if not force and now - self._last_report < self.REPORT_INTERVAL:
+            return
+        self._last_report = now
+
+        db = SessionLocal()
+        try:
+            job = db.query(AdminJob).filter(AdminJob.id == self.job_id).first()
+            if not job:
+                return
+            job.progress = max(0.0, min(1.0, float(progress)))
+            if message is not None:
+                job.progress_message = message[:255]
+            if partial_result is not None:
+                job.result = partial_result
+            self._cancelled = bool(job.cancel_requested)
+            db.commit()
+        finally:
+            db.close()
+
+        self.check_cancelled()
+
+    def check_cancelled(self) -> None:
+        """마지막 보고 시점 기준 취소 요청 여부 확인"""
+        if self._cancelled:
+            raise JobCancelled()
+
+
+def submit_job(db: Session, job_type: str, params: Optional[dict] = None, created_by: Optional[int] = None) -> AdminJob:
+    """작업 등록 후 백그라운드 실행"""
+    if job_type not in _handlers:
+        raise ValueError(f"알 수 없는 작업 유형: {job_type}")
+
+    # 비정상 종료된 프로세스의 작업이 대기 한도를 차지하지 않도록 먼저 정리
+    recover_interrupted_jobs(db)
+    active_count = db.query(func.count(AdminJob.id)).filter(
+        AdminJob.status.in_(ACTIVE_STATUSES)
+    ).scalar() or 0
+    if active_count >= settings.JOB_MAX_PENDING:
+        raise JobQueueFull()
+
+    job = AdminJob(
+        id=uuid.uuid4().hex,
+        job_type=job_type,
+        status=JOB_STATUS["PENDING"],
+        params=params or {},
+        progress=0.0,
+        cancel_requested=False,
+        created_by=created_by,
+        created_at=datetime.utcnow(),
+        heartbeat_at=datetime.utcnow(),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+
+    _owned_jobs.add(job.id)
+    _get_executor().submit(_run_job, job.id)
+    logger.info(f"작업 등록: id={job.id}, type={job_type}, params={params}")
+    return job
+
+
+def _finish(job_id: str, status: str, result: Any = None, error: Optional[str] = None) -> None:
+    _owned_jobs.discard(job_id)
+    db = SessionLocal()
+    try:
+        job = db.query(AdminJob).filter(AdminJob.id == job_id).first()
+        if not job:
+            return
+        job.status = status
+        job.finished_at = datetime.utcnow()
+        if status == JOB_STATUS["COMPLETED"]:
+            job.progress = 1.0
+            job.progress_message = "완료"
+            job.result = result
+        elif status == JOB_STATUS["CANCELLED"]:
+            job.progress_message = "취소됨"
+        if error is not None:
+            job.error = error
+        db.commit()
+    finally:
+        db.close()
+
+
+def _run_job(job_id: str) -> None:
+    db = SessionLocal()
+    try:
+        job = db.query(AdminJob).filter(AdminJob.id == job_id).first()
+        if not job or job.status != JOB_STATUS["PENDING"]:
+            _owned_jobs.discard(job_id)
+            return
+        if job.cancel_requested:
+            job.status = JOB_STATUS["CANCELLED"]
+            job.finished_at = datetime.utcnow()
+            db.commit()
+            _owned_jobs.discard(job_id)
+            return
+        job.status = JOB_STATUS["RUNNING"]
+        job.started_at = datetime.utcnow()
+        job.heartbeat_at = job.started_at
+        db.commit()
+        job_type = job.job_type
+        params = dict(job.params or {})
+    finally:
+        db.close()
+
+    handler = _handlers[job_type]
+    ctx = JobContext(job_id)
+    started = time.monotonic()
+    try:
+        result = handler(ctx, params)
+    except JobCancelled:
+        logger.info(f"작업 취소: id={job_id}, type={job_type}")
+        _finish(job_id, JOB_STATUS["CANCELLED"])
+        return
+    except Exception as e:
+        logger.exception(f"작업 실패: id={job_id}, type={job_type}")
+        _finish(job_id, JOB_STATUS["FAILED"], error=str(e))
+        return
+
+    logger.info(f"작업 완료: id={job_id}, type={job_type}, {time.monotonic() - started:.1f}s")
+    _finish(job_id, JOB_STATUS["COMPLETED"], result=result)
+
+
+def get_job(db: Session, job_id: str) -> Optional[AdminJob]:
+    return db.query(AdminJob).filter(AdminJob.id == job_id).first()
+
+
+def cancel_job(db: Session, job_id: str) -> Optional[AdminJob]:
+    """작업 취소 요청 - 대기 중이면 즉시 취소, 실행 중이면 다음 진행률 보고 시점에 중단"""
+    job = get_job(db, job_id)
+    if not job:
+        return None
+
+    if job.status == JOB_STATUS["PENDING"]:
+        job.status = JOB_STATUS["CANCELLED"]
+        job.cancel_requested = True
+        job.finished_at = datetime.utcnow()
+        db.commit()
+    elif job.status == JOB_STATUS["RUNNING"]:
+        job.cancel_requested = True
+        db.commit()
+    return job
+
+
+def job_to_dict(job: AdminJob) -> dict:
+    return {
+        "id": job.id,
+        "job_type": job.job_type,
+        "status": job.status,
+        "params": job.params,
+        "progress": round(job.progress or 0.0, 4),
+        "progress_message": job.progress_message,
+        "result": job.result,
+        "error": job.error,
+        "cancel_requested": bool(job.cancel_requested),
+        "created_by": job.created_by,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "started_at": job.started_at.isoformat() if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+    }
+
+
+def shutdown_job_runner() -> None:
+    """프로세스 종료 시 정리 - 끝나지 않은 작업은 실패로 기록 (재시작 후 대기열에 남지 않도록)"""
+    global _executor
+    _heartbeat_stop.set()
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+    if not _owned_jobs:
+        return
+    db = SessionLocal()
+    try:
+        db.query(AdminJob).filter(
+            AdminJob.id.in_(list(_owned_jobs)),
+            AdminJob.status.in_(ACTIVE_STATUSES),
+        ).update({
+            AdminJob.status: JOB_STATUS["FAILED"],
+            AdminJob.error: "서버 종료로 작업이 중단되었습니다.",
+            AdminJob.finished_at: datetime.utcnow(),
+        }, synchronize_session=False)
+        db.commit()
+        _owned_jobs.clear()
+    except Exception:
+        logger.exception("작업 정리 실패")
+    finally:
+        db.close()
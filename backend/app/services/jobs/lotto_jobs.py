@@ -0,0 +1,347 @@
+"""로또 관리자 작업 핸들러 (재학습/백테스팅/매칭/캐시 재생성/가중치 탐색/특성 저장소/발급 줄·유저 통계 백필/풀 인코딩 변환)"""
+from __future__ import annotations
+
+from app.db.models import LottoDraw, MLTrainingLog
+from app.db.session import SessionLocal
+from app.services.jobs.job_runner import JobContext, register_job
+
+
+def _load_draws_dict(db) -> list:
+    from app.services.lotto import draws_to_dict_list
+
+    draws = db.query(LottoDraw).order_by(LottoDraw.draw_no).all()
+    return draws_to_dict_list(draws)
+
+
+@register_job("ml_retrain")
+def run_ml_retrain(ctx: JobContext, params: dict) -> dict:
+    """ML 재학습 + 학습 로그 저장"""
+    from app.services.lotto.feature_store import FeatureStoreSource
+    from app.services.lotto.ml_trainer import LottoMLTrainer
+    from app.services.lotto.result_matcher import get_plan_performance_summary
+
+    db = SessionLocal()
+    try:
+        ctx.report(0.05, "회차 데이터 로드 중", force=True)
+        draws_dict = _load_draws_dict(db)
+        if not draws_dict:
+            raise ValueError("로또 데이터가 없습니다.")
+
+        ctx.report(0.1, f"학습 중 ({len(draws_dict)}개 회차)", force=True)
+        trainer = LottoMLTrainer(feature_source=FeatureStoreSource(db))
+        train_result = trainer.train(draws_dict)
+
+        ctx.report(0.9, "학습 로그 저장 중", force=True)
+        ai_weights = train_result.get("ai_weights", {}) or {}
+        plan_perf = get_plan_performance_summary(db, recent_draws=10)
+        ml_log = MLTrainingLog(
+            total_draws=len(draws_dict),
+            total_feedback_records=0,
+            train_accuracy=train_result.get("train_accuracy"),
+            test_accuracy=train_result.get("test_accuracy"),
+            weight_logic1=ai_weights.get("logic1"),
+            weight_logic2=ai_weights.get("logic2"),
+            weight_logic3=ai_weights.get("logic3"),
+            weight_logic4=ai_weights.get("logic4"),
+            plan_performance=plan_perf,
+            notes=params.get("notes") or "수동 재학습"
+        )
+        db.add(ml_log)
+        db.commit()
+
+        return {
+            "message": "ML 재학습 완료",
+            "train_accuracy": train_result.get("train_accuracy"),
+            "test_accuracy": train_result.get("test_accuracy"),
+            "ai_weights": ai_weights,
+        }
+    finally:
+        db.close()
+
+
+@register_job("backtest")
+def run_backtest(ctx: JobContext, params: dict) -> dict:
+    """구간 백테스팅 - 진행 중에는 누적 요약을 부분 결과로 기록
+
+    회차별 결과는 backtest_result_cache에 저장되어, 같은 조건으로 다시 실행하면 캐시된 회차는
+    계산하지 않습니다. settings.BACKTEST_WORKERS가 2 이상이면 미스 회차를 프로세스 풀로 병렬 계산
+    (결과는 seed가 같으면 동일). 완료 시 요약에 무작위 구매 기준선(random_baseline)을 붙입니다.
+    """
+    from app.config import settings
+    from app.services.lotto.backtest_cache import purge_stale_backtest_cache, run_backtest_cached
+    from app.services.lotto.feature_store import FeatureStoreSource
+    from app.services.lotto.performance_evaluator import (
+        DEFAULT_BACKTEST_SEED, BacktestSummary, format_backtest_result,
+    )
+    from app.services.lotto.random_baseline import random_baseline
+
+    start_draw = int(params["start_draw"])
+    end_draw = int(params["end_draw"])
+    seed = params.get("seed")
+    if seed is None:
+        seed = DEFAULT_BACKTEST_SEED
+    workers = int(params.get("workers") or settings.BACKTEST_WORKERS)
+
+    formatted = []
+
+    def partial(summary: BacktestSummary) -> dict:
+        return {
+            "summary": summary.to_dict(),
+            "results": sorted(formatted, key=lambda r: r["draw_no"]),
+        }
+
+    db = SessionLocal()
+    try:
+        draws_dict = _load_draws_dict(db)
+        if not draws_dict:
+            raise ValueError("로또 데이터가 없습니다.")
+
+        purge_stale_backtest_cache(db)
+        # ML 5줄 생성에 쓰이는 특성을 저장소에서 한 번에 읽어둠
+        feature_source = FeatureStoreSource(db)
+        feature_source.prefetch(draws_dict, range(start_draw, end_draw + 1))
+
+        def on_progress(done: int, total: int, new_results, summary: BacktestSummary) -> None:
+            formatted.extend(format_backtest_result(r) for r in new_results)
+            ctx.report(
+                done / total if total else 1.0,
+                f"{done}/{total}회차 평가 완료" + (f" (프로세스 {workers}개)" if workers > 1 else ""),
+                partial_result=partial(summary) if formatted else None,
+                force=(done == total),
+            )
+
+        outcome = run_backtest_cached(
+            db, draws_dict, start_draw, end_draw, seed,
+            feature_source=feature_source, workers=workers, on_progress=on_progress,
+        )
+    finally:
+        db.close()
+
+    summary = outcome["summary"]
+    if not summary.total_draws:
+        raise ValueError("백테스팅 결과가 없습니다.")
+
+    result = partial(summary)
+    # 같은 회차/줄 수의 무작위 구매 기준선 (완료 시 한 번만 계산)
+    ctx.report(1.0, "무작위 구매 기준선 계산 중", force=True)
+    evaluated = {r["draw_no"] for r in formatted}
+    result["summary"]["random_baseline"] = random_baseline(
+        result["summary"],
+        [[d["n1"], d["n2"], d["n3"], d["n4"], d["n5"], d["n6"]] for d in draws_dict if d["draw_no"] in evaluated],
+        seed=seed,
+    )
+    result["seed"] = seed
+    result["cached_draws"] = outcome["cached_draws"]
+    result["computed_draws"] = outcome["computed_draws"]
+    return result
+
+
+@register_job("backtest_compare")
+def run_backtest_compare(ctx: JobContext, params: dict) -> dict:
+    """여러 가중치 설정 비교 백테스팅 - 회차별 통계는 한 번만 만들고 설정별 줄 선택만 반복"""
+    from app.services.lotto.backtest_cache import purge_stale_backtest_cache
+    from app.services.lotto.backtest_compare import run_backtest_comparison
+    from app.services.lotto.feature_store import FeatureStoreSource
+    from app.services.lotto.performance_evaluator import DEFAULT_BACKTEST_SEED
+
+    start_draw = int(params["start_draw"])
+    end_draw = int(params["end_draw"])
+    seed = params.get("seed")
+    if seed is None:
+        seed = DEFAULT_BACKTEST_SEED
+
+    db = SessionLocal()
+    try:
+        draws_dict = _load_draws_dict(db)
+        if not draws_dict:
+            raise ValueError("로또 데이터가 없습니다.")
+
+        purge_stale_backtest_cache(db)
+        feature_source = FeatureStoreSource(db)
+        feature_source.prefetch(draws_dict, range(start_draw, end_draw + 1))
+
+        def on_progress(done: int, total: int) -> None:
+            ctx.report(
+                done / total if total else 1.0,
+                f"{done}/{total}회차 평가 완료 (설정 {len(params['configs'])}개)",
+                force=(done == total),
+            )
+
+        return run_backtest_comparison(
+            db, draws_dict, start_draw, end_draw, params["configs"], seed,
+            feature_source=feature_source, on_progress=on_progress,
+        )
+    finally:
+        db.close()
+
+
+@register_job("match")
+def run_match(ctx: JobContext, params: dict) -> dict:
+    """
+    특정 회차 추천 로그 매칭 - 청크마다 커밋하므로 중단 후 다시 실행하면 이어서 처리
+
+    rebuild_user_stats=True(당첨 번호 수정 후 재매칭)면 매칭 후 유저별 적중 통계를 전체 재계산합니다.
+    """
+    from app.services.lotto.result_matcher import match_all_pending_logs
+    from app.services.lotto.user_hit_stats import rebuild_user_hit_stats
+
+    draw_no = int(params["draw_no"])
+
+    def on_progress(done: int, total: int) -> None:
+        ctx.report(done / total if total else 1.0, f"{draw_no}회차 매칭 중 ({done}/{total}건)")
+
+    db = SessionLocal()
+    try:
+        ctx.report(0.0, f"{draw_no}회차 매칭 중", force=True)
+        result = match_all_pending_logs(db, draw_no, on_progress=on_progress)
+        if "error" not in result and params.get("rebuild_user_stats"):
+            # 수정 전 번호로 더해진 적중분을 빼기 위해 증분 대신 전체 재계산
+            ctx.report(0.95, "유저별 적중 통계 재계산 중", force=True)
+            rebuild_user_hit_stats(db)
+    finally:
+        db.close()
+
+    if "error" in result:
+        raise ValueError(result["error"])
+
+    return {
+        "message": f"{draw_no}회차 매칭 완료",
+        "matched_count": result.get("matched_count", 0),
+        "plan_stats": result.get("plan_stats", {}),
+    }
+
+
+@register_job("rebuild_cache")
+def run_rebuild_cache(ctx: JobContext, params: dict) -> dict:
+    """통계 캐시 재생성"""
+    from app.services.lotto.stats_cache import rebuild_stats_cache
+
+    db = SessionLocal()
+    try:
+        total_draws = db.query(LottoDraw).count()
+        if not total_draws:
+            raise ValueError("로또 데이터가 없습니다.")
+
+        ctx.report(0.1, "통계 계산 중", force=True)
+        rebuild_stats_cache(db)
+    finally:
+        db.close()
+
+    return {"message": f"캐시가 재생성되었습니다. ({total_draws}개 회차)", "total_draws": total_draws}
+
+
+@register_job("weight_search")
+def run_weight_search(ctx: JobContext, params: dict) -> dict:
+    """로직 가중치 Grid/Random Search - apply=True면 1위 가중치를 모델에 저장"""
+    from app.services.lotto.ml_trainer import LottoMLTrainer
+    from app.services.lotto.result_matcher import get_plan_performance_summary
+    from app.services.lotto.weight_search import search_logic_weights
+
+    db = SessionLocal()
+    try:
+        draws_dict = _load_draws_dict(db)
+        if not draws_dict:
+            raise ValueError("로또 데이터가 없습니다.")
+
+        trainer = LottoMLTrainer()
+        current_weights = trainer.ai_weights if trainer.load_model() else None
+
+        ctx.report(0.1, "후보 가중치 평가 중", force=True)
+        result = search_logic_weights(
+            draws_dict,
+            mode=params.get("mode", "grid"),
+            eval_draws=int(params.get("eval_draws", 500)),
+            grid_steps=int(params.get("grid_steps", 36)),
+            n_samples=int(params.get("n_samples", 10000)),
+            seed=params.get("seed"),
+            current_weights=current_weights,
+        )
+
+        result["applied"] = False
+        if params.get("apply"):
+            ctx.report(0.9, "1위 가중치 저장 중", force=True)
+            best = result["best"]
+            if not trainer.apply_ai_weights(best["weights"]):
+                raise ValueError("학습된 모델이 없습니다. 먼저 재학습을 실행하세요.")
+
+            ml_log = MLTrainingLog(
+                total_draws=len(draws_dict),
+                total_feedback_records=0,
+                weight_logic1=best["weights"]["logic1"],
+                weight_logic2=best["weights"]["logic2"],
+                weight_logic3=best["weights"]["logic3"],
+                weight_logic4=best["weights"]["logic4"],
+                plan_performance=get_plan_performance_summary(db, recent_draws=10),
+                notes=(
+                    f"가중치 탐색({result['mode']}, 후보 {result['candidates']}개, "
+                    f"최근 {result['eval_draws']}회) - top15 적중률 {best['hit_rate']:.4f}"
+                )
+            )
+            db.add(ml_log)
+            db.commit()
+            result["applied"] = True
+
+        return result
+    finally:
+        db.close()
+
+
+@register_job("feature_store_sync")
+def run_feature_store_sync(ctx: JobContext, params: dict) -> dict:
+    """특성 저장소 채우기 (버전이 다른 행은 삭제 후 재계산)"""
+    from app.services.lotto.feature_store import sync_feature_store, FEATURE_SCHEMA_VERSION
+
+    db = SessionLocal()
+    try:
+        def on_progress(done: int, total: int) -> None:
+            ctx.report(done / total if total else 1.0, f"특성 계산 중 ({done}/{total}회차)")
+
+        result = sync_feature_store(db, rebuild=bool(params.get("rebuild")), on_progress=on_progress)
+    finally:
+        db.close()
+
+    result["version"] = FEATURE_SCHEMA_VERSION
+    return result
+
+
+@register_job("recommend_lines_backfill")
+def run_recommend_lines_backfill(ctx: JobContext, params: dict) -> dict:
+    """발급 줄 테이블(recommend_lines) 백필 - 줄이 없는 기존 추천 로그를 채우고 매칭 결과 계산"""
+    from app.services.lotto.recommend_lines import backfill_recommend_lines
+
+    db = SessionLocal()
+    try:
+        def on_progress(done: int, total: int) -> None:
+            ctx.report(done / total if total else 1.0, f"발급 줄 채우는 중 ({done}/{total}건)")
+
+        return backfill_recommend_lines(db, on_progress=on_progress)
+    finally:
+        db.close()
+
+
+@register_job("user_hit_stats_backfill")
+def run_user_hit_stats_backfill(ctx: JobContext, params: dict) -> dict:
+    """유저별 적중 통계 전체 재계산 (매칭 완료 로그 기준)"""
+    from app.services.lotto.user_hit_stats import rebuild_user_hit_stats
+
+    db = SessionLocal()
+    try:
+        ctx.report(0.1, "유저별 적중 통계 집계 중", force=True)
+        return rebuild_user_hit_stats(db)
+    finally:
+        db.close()
+
+
+@register_job("pool_encoding_migrate")
+def run_pool_encoding_migrate(ctx: JobContext, params: dict) -> dict:
+    """JSON 풀 컬럼 → 압축 풀 컬럼 변환 (기존 추천 로그)"""
+    from app.services.lotto.pool_codec import migrate_pool_encoding
+
+    db = SessionLocal()
+    try:
+        def on_progress(done: int, total: int) -> None:
+            ctx.report(done / total if total else 1.0, f"풀 인코딩 변환 중 ({done}/{total}건)")
+
+        return migrate_pool_encoding(db, on_progress=on_progress)
+    finally:
+        db.close()
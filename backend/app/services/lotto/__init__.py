@@ -43,9 +43,14 @@ from .result_matcher import (
     match_single_line,
     match_recommend_log,
     match_all_pending_logs,
+    reset_draw_matches,
     get_plan_performance_summary
 )
 from .pool_service import PoolService
+# 발급 줄 테이블 동기화 (import 시 세션 flush 훅 등록)
+from .recommend_lines import count_issued_lines, get_log_lines, line_match_results, line_numbers, match_recommend_lines
+# 공개 API 응답 캐시 (import 시 회차 변경 커밋 훅 등록)
+from .response_cache import cached_response, invalidate_response_cache, mark_draws_changed
 # 미사용 모듈 (향후 사용 가능성 있음 - 파일 유지)
 # from .ml_predictor import LottoMLPredictor
 # from .performance_evaluator import evaluate_single_draw, evaluate_latest_draw, backtest_multiple_draws, print_backtest_summary
@@ -114,7 +119,18 @@ __all__ = [
     'match_single_line',
     'match_recommend_log',
     'match_all_pending_logs',
+    'reset_draw_matches',
     'get_plan_performance_summary',
     # 풀 관리 (통합 서비스)
     'PoolService',
+    # 발급 줄 테이블
+    'count_issued_lines',
+    'get_log_lines',
+    'line_match_results',
+    'line_numbers',
+    'match_recommend_lines',
+    # 응답 캐시
+    'cached_response',
+    'invalidate_response_cache',
+    'mark_draws_changed',
 ]
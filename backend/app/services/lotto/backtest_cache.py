@@ -0,0 +1,320 @@
+"""회차별 백테스팅 결과 캐시 (backtest_result_cache)
+
+결과에 영향을 주는 입력을 모두 해시해 키로 씁니다.
+    - generator_version: 번호 생성/평가 코드 소스 해시 (코드가 바뀌면 자동으로 전부 미스)
+    - weights_hash: AI 가중치
+    - model_version: ML 모델 파일 내용 해시
+    - history_hash: 대상 회차까지의 회차 데이터 (대상 회차 당첨 번호 포함 - 회차가 수정되면 그 회차와 이후 회차 미스)
+    - seed: 난수 시드
+구간 요청은 캐시된 회차를 모으고 미스만 계산해 저장합니다.
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.models import BacktestResultCache
+
+# 결과에 영향을 주는 모듈 (이 파일들의 내용이 generator_version)
+_VERSIONED_MODULES = (
+    "generator.py",
+    "stats_calculator.py",
+    "score_tensor.py",
+    "feature_store.py",
+    "ml_trainer.py",
+    "ml_predictor.py",
+    "logistic_model.py",
+    "performance_evaluator.py",
+)
+
+_generator_version: Optional[str] = None
+
+
+def _short_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def generator_version() -> str:
+    """번호 생성/평가 코드 버전 (프로세스당 한 번 계산)"""
+    global _generator_version
+    if _generator_version is None:
+        base = Path(__file__).parent
+        digest = hashlib.sha256()
+        for name in _VERSIONED_MODULES:
+            digest.update(name.encode())
+            digest.update((base / name).read_bytes())
+        _generator_version = digest.hexdigest()[:16]
+    return _generator_version
+
+
+def model_version(model_path: Optional[str] = None) -> str:
+    """ML 모델 파일 내용 해시 (파일이 없으면 "none")"""
+    from app.services.lotto.ml_trainer import LottoMLTrainer
+
+    path = Path(model_path or LottoMLTrainer().model_path)
+    try:
+        return _short_hash(path.read_bytes())
+    except FileNotFoundError:
+        return "none"
+
+
+def weights_hash(ai_weights: Dict) -> str:
+    payload = json.dumps({k: float(v) for k, v in sorted(ai_weights.items())}, sort_keys=True)
+    return _short_hash(payload.encode())
+
+
+def history_hashes(draws: List[Dict]) -> Dict[int, str]:
+    """
+    회차별 "해당 회차까지의 회차 데이터" 연쇄 해시 {draw_no: 해시}
+
+    결과는 이전 회차로 생성한 번호를 대상 회차 당첨 번호로 채점한 것이므로 대상 회차 자신도 포함합니다.
+    """
+    out = {}
+    digest = hashlib.sha256()
+    for d in sorted(draws, key=lambda x: x['draw_no']):
+        digest.update(
+            f"{d['draw_no']}:{d['n1']},{d['n2']},{d['n3']},{d['n4']},{d['n5']},{d['n6']}+{d.get('bonus') or 0};".encode()
+        )
+        out[d['draw_no']] = digest.hexdigest()[:16]
+    return out
+
+
+def resolve_ai_weights(ai_weights: Optional[Dict] = None) -> Dict:
+    """evaluate_single_draw/BacktestEngine과 같은 규칙으로 실제 사용할 가중치 결정"""
+    from app.services.lotto.ml_trainer import LottoMLTrainer
+    from app.services.lotto.performance_evaluator import DEFAULT_AI_WEIGHTS
+
+    if ai_weights is not None:
+        return ai_weights
+    try:
+        trainer = LottoMLTrainer()
+        if trainer.load_model() and trainer.ai_weights:
+            return trainer.ai_weights
+    except Exception:
+        pass
+    return dict(DEFAULT_AI_WEIGHTS)
+
+
+class BacktestResultStore:
+    """한 번의 백테스팅 요청(같은 코드/가중치/모델/시드)에 대한 캐시 조회/저장"""
+
+    def __init__(self, db: Session, draws: List[Dict], seed: int, ai_weights: Optional[Dict] = None):
+        self.db = db
+        self.seed = int(seed)
+        self.ai_weights = resolve_ai_weights(ai_weights)
+        self.generator_version = generator_version()
+        self.weights_hash = weights_hash(self.ai_weights)
+        self.model_version = model_version()
+        self.history = history_hashes(draws)
+
+    def key_for(self, draw_no: int) -> Optional[str]:
+        history = self.history.get(draw_no)
+        if history is None:
+            return None
+        raw = "|".join([
+            str(draw_no), self.generator_version, self.weights_hash,
+            self.model_version, history, str(self.seed),
+        ])
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def lookup(self, draw_nos: Iterable[int]) -> Dict[int, Dict]:
+        """캐시된 회차 결과 {draw_no: 결과}"""
+        keys = {}
+        for draw_no in draw_nos:
+            key = self.key_for(draw_no)
+            if key:
+                keys[key] = draw_no
+        if not keys:
+            return {}
+
+        found = {}
+        key_list = list(keys)
+        for start in range(0, len(key_list), 500):
+            rows = self.db.query(BacktestResultCache.cache_key, BacktestResultCache.result).filter(
+                BacktestResultCache.cache_key.in_(key_list[start:start + 500])
+            ).all()
+            for cache_key, result in rows:
+                found[keys[cache_key]] = result
+        return found
+
+    def save(self, results: Iterable[Dict]) -> int:
+        """회차 결과 저장 (이미 있으면 건너뜀)"""
+        rows = []
+        for result in results:
+            key = self.key_for(result['draw_no'])
+            if key is None:
+                continue
+            rows.append({
+                "cache_key": key,
+                "draw_no": result['draw_no'],
+                "generator_version": self.generator_version,
+                "weights_hash": self.weights_hash,
+                "model_version": self.model_version,
+                "history_hash": self.history[result['draw_no']],
+                "seed": self.seed,
+                "result": result,
+            })
+        if not rows:
+            return 0
+
+        try:
+            self.db.bulk_insert_mappings(BacktestResultCache, rows)
+            self.db.commit()
+            return len(rows)
+        except IntegrityError:
+            # 다른 작업이 같은 회차를 먼저 저장한 경우 - 하나씩 다시 시도
+            self.db.rollback()
+            saved = 0
+            for row in rows:
+                try:
+                    self.db.bulk_insert_mappings(BacktestResultCache, [row])
+                    self.db.commit()
+                    saved += 1
+                except IntegrityError:
+                    self.db.rollback()
+            return saved
+
+
+def purge_stale_backtest_cache(db: Session) -> int:
+    """현재 코드 버전이 아닌 캐시 삭제 (어차피 다시 조회되지 않음)"""
+    removed = db.query(BacktestResultCache).filter(
+        BacktestResultCache.generator_version != generator_version()
+    ).delete(synchronize_session=False)
+    db.commit()
+    return removed
+
+
+def run_backtest_cached(
+    db: Session,
+    draws: List[Dict],
+    start_draw: int,
+    end_draw: int,
+    seed: int,
+    feature_source: Optional[Callable] = None,
+    workers: int = 1,
+    on_progress: Optional[Callable] = None,
+) -> Dict:
+    """
+    캐시를 거치는 구간 백테스팅
+
+    Args:
+        db: DB 세션 (캐시 조회/저장용)
+        draws: 전체 회차 데이터
+        start_draw: 시작 회차
+        end_draw: 종료 회차 (포함)
+        seed: 난수 시드 (캐시 키에 포함되므로 필수)
+        feature_source: ML 특성 공급자
+        workers: 2 이상이면 미스를 프로세스 풀로 병렬 계산
+        on_progress: (완료 회차 수, 전체 회차 수, 새 결과 리스트, 누적 BacktestSummary) 콜백
+
+    Returns:
+        {'results': 회차순 결과, 'summary': BacktestSummary, 'cached_draws', 'computed_draws'}
+    """
+    from app.services.lotto.performance_evaluator import BacktestEngine, BacktestSummary
+
+    store = BacktestResultStore(db, draws, seed)
+    draw_nos = list(range(start_draw, end_draw + 1))
+    total = len(draw_nos)
+
+    cached = store.lookup(draw_nos)
+    results = [cached[n] for n in draw_nos if n in cached]
+    summary = BacktestSummary()
+    for r in results:
+        summary.add(r)
+    done = len(cached)
+    if on_progress and cached:
+        on_progress(done, total, list(results), summary)
+
+    misses = [n for n in draw_nos if n not in cached]
+    computed: List[Dict] = []
+
+    if misses and workers > 1:
+        from app.services.lotto.parallel_backtest import run_backtest_parallel
+
+        def on_shard(shard_done: int, shard_total: int, shard_results: List[Dict], shard_summary) -> None:
+            store.save(shard_results)
+            computed.extend(shard_results)
+            if on_progress:
+                # 캐시분 + 지금까지 계산분 (묶음 요약은 결합법칙을 만족하므로 그대로 합침)
+                merged = BacktestSummary().merge(summary).merge(shard_summary)
+                on_progress(done + shard_done, total, shard_results, merged)
+
+        outcome = run_backtest_parallel(
+            draws, start_draw, end_draw,
+            workers=workers, seed=seed, ai_weights=store.ai_weights,
+            feature_source=feature_source, on_progress=on_shard, draw_nos=misses,
+        )
+        summary.merge(outcome['summary'])
+    elif misses:
+        engine = BacktestEngine(draws, ai_weights=store.ai_weights, feature_source=feature_source, seed=seed)
+        batch: List[Dict] = []
+        for i, (draw_no, result) in enumerate(engine.iter_draws(misses), start=1):
+            if result:
+                batch.append(result)
+                computed.append(result)
+                summary.add(result)
+            # 50회차씩 묶어 저장 (중간에 취소되어도 저장된 묶음은 다음 실행에서 재사용)
+            if len(batch) >= 50 or i == len(misses):
+                store.save(batch)
+                batch = []
+            if on_progress:
+                on_progress(done + i, total, [result] if result else [], summary)
+
+    results.extend(computed)
+    results.sort(key=lambda r: r['draw_no'])
+    return {
+        'results': results,
+        'summary': summary,
+        'cached_draws': len(cached),
+        'computed_draws': len(computed),
+    }
+
+
+def iter_backtest_cached(
+    db: Session,
+    draws: List[Dict],
+    start_draw: int,
+    end_draw: int,
+    seed: int,
+    feature_source: Optional[Callable] = None,
+    chunk_size: int = 50,
+) -> Iterator[Tuple[Dict, bool]]:
+    """
+    캐시를 거치는 구간 백테스팅을 회차순으로 하나씩 내보냄 (스트리밍 응답용)
+
+    chunk_size 회차씩 캐시를 조회하고 미스만 계산/저장하므로 메모리는 구간 길이와 관계없이
+    한 묶음 분량만 씁니다. 평가 엔진은 첫 미스가 나올 때 한 번만 만듭니다.
+
+    Yields:
+        (회차 결과, 캐시 여부) - 이력이 부족해 평가할 수 없는 회차는 건너뜀
+    """
+    from app.services.lotto.performance_evaluator import BacktestEngine
+
+    store = BacktestResultStore(db, draws, seed)
+    engine = None
+
+    for chunk_start in range(start_draw, end_draw + 1, chunk_size):
+        chunk = list(range(chunk_start, min(chunk_start + chunk_size, end_draw + 1)))
+        cached = store.lookup(chunk)
+        misses = [n for n in chunk if n not in cached]
+        if misses and engine is None:
+            engine = BacktestEngine(draws, ai_weights=store.ai_weights, feature_source=feature_source, seed=seed)
+        if misses:
+            engine.prepare(misses)
+
+        computed = []
+        try:
+            for draw_no in chunk:
+                if draw_no in cached:
+                    yield cached[draw_no], True
+                    continue
+                result = engine.evaluate(draw_no)
+                if result:
+                    computed.append(result)
+                    yield result, False
+        finally:
+            # 소비자가 중간에 끊어도(클라이언트 연결 종료) 계산한 회차는 저장
+            store.save(computed)
@@ -0,0 +1,150 @@
+"""여러 가중치 설정 비교 백테스팅
+
+설정 N개를 한 번의 walk-forward 순회로 평가합니다.
+회차마다 통계/로직 점수/ML 특성은 한 번만 만들고(BacktestEngine.evaluate_configs),
+설정별로는 종합 점수 혼합과 줄 선택만 반복하므로 비용은 대략 N × 줄 선택 비용입니다.
+
+- 설정마다 같은 회차 난수열을 쓰므로(공통 난수) 결과 차이는 가중치 차이만 반영합니다.
+- 회차 결과는 설정별로 backtest_result_cache에 저장/재사용합니다 (일반 백테스팅과 같은 키).
+"""
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+# 한 번에 비교할 수 있는 최대 설정 수
+MAX_CONFIGS = 10
+
+# 가중치에 쓸 수 있는 로직 이름
+WEIGHT_KEYS = ('logic1', 'logic2', 'logic3', 'logic4')
+
+
+def _comparison_row(name: str, ai_weights: Dict, summary: Dict, base: Optional[Dict], wins: Optional[Dict]) -> Dict:
+    row = {
+        "name": name,
+        "ai_weights": ai_weights,
+        "total_draws": summary["total_draws"],
+        "total_lines": summary["total_lines"],
+        "avg_performance_score": summary["avg_performance_score"],
+        "avg_matches_per_line": summary["avg_matches_per_line"],
+        "total_match_3": summary["total_match_3"],
+        "total_match_4": summary["total_match_4"],
+        "total_match_5": summary["total_match_5"],
+        "total_match_6": summary["total_match_6"],
+        "match_3_rate": summary["match_3_rate"],
+        "final_avg_score": summary["logic_avg_scores"].get("final", 0),
+        "ai_core_avg_score": summary["logic_avg_scores"].get("ai_core", 0),
+    }
+    if base is not None:
+        row["diff_performance_score"] = round(summary["avg_performance_score"] - base["avg_performance_score"], 2)
+        row["diff_matches_per_line"] = round(summary["avg_matches_per_line"] - base["avg_matches_per_line"], 2)
+    if wins is not None:
+        row.update(wins)
+    return row
+
+
+def run_backtest_comparison(
+    db: Session,
+    draws: List[Dict],
+    start_draw: int,
+    end_draw: int,
+    configs: List[Dict],
+    seed: int,
+    feature_source: Optional[Callable] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict:
+    """
+    여러 가중치 설정을 같은 구간/시드로 비교
+
+    Args:
+        db: DB 세션 (결과 캐시용)
+        draws: 전체 회차 데이터
+        start_draw: 시작 회차
+        end_draw: 종료 회차 (포함)
+        configs: [{'name': 이름, 'ai_weights': {'logic1': w1, ...} 또는 None(현재 모델)}, ...]
+            (첫 설정이 비교 기준)
+        seed: 난수 시드
+        feature_source: ML 특성 공급자
+        on_progress: (완료 회차 수, 계산할 회차 수) 콜백
+
+    Returns:
+        {
+            'seed', 'cached_results', 'computed_results',
+            'summaries': {이름: 요약},
+            'table': [설정별 비교 행 (기준 대비 차이, 회차별 승/패 포함)],
+        }
+    """
+    from app.services.lotto.backtest_cache import BacktestResultStore
+    from app.services.lotto.performance_evaluator import BacktestEngine, BacktestSummary
+
+    names = [c['name'] for c in configs]
+    stores = {c['name']: BacktestResultStore(db, draws, seed, ai_weights=c.get('ai_weights')) for c in configs}
+    draw_nos = list(range(start_draw, end_draw + 1))
+
+    results: Dict[str, Dict[int, Dict]] = {name: stores[name].lookup(draw_nos) for name in names}
+    cached_results = sum(len(r) for r in results.values())
+
+    # 하나라도 캐시에 없는 회차만 순회 (그 회차에서도 없는 설정만 평가)
+    pending = [n for n in draw_nos if any(n not in results[name] for name in names)]
+    computed_results = 0
+    if pending:
+        engine = BacktestEngine(draws, feature_source=feature_source, seed=seed)
+        engine.prepare(pending)
+        new_results: Dict[str, List[Dict]] = {name: [] for name in names}
+
+        def flush() -> None:
+            for name, batch in new_results.items():
+                if batch:
+                    stores[name].save(batch)
+                    batch.clear()
+
+        for i, draw_no in enumerate(pending, start=1):
+            weight_sets = {
+                name: stores[name].ai_weights for name in names if draw_no not in results[name]
+            }
+            evaluated = engine.evaluate_configs(draw_no, weight_sets) or {}
+            for name, result in evaluated.items():
+                if result:
+                    results[name][draw_no] = result
+                    new_results[name].append(result)
+                    computed_results += 1
+            if i % 50 == 0:
+                flush()
+            if on_progress:
+                on_progress(i, len(pending))
+        flush()
+
+    summaries = {}
+    for name in names:
+        summary = BacktestSummary()
+        for draw_no in sorted(results[name]):
+            summary.add(results[name][draw_no])
+        summaries[name] = summary.to_dict()
+
+    # 기준(첫 설정) 대비 회차별 줄당 평균 적중 승/무/패
+    base_name = names[0]
+    table = []
+    for name in names:
+        wins = None
+        if name != base_name:
+            common = [n for n in results[name] if n in results[base_name]]
+            diffs = [
+                results[name][n]['avg_matches_per_line'] - results[base_name][n]['avg_matches_per_line']
+                for n in common
+            ]
+            wins = {
+                "draws_better": sum(1 for d in diffs if d > 0),
+                "draws_equal": sum(1 for d in diffs if d == 0),
+                "draws_worse": sum(1 for d in diffs if d < 0),
+            }
+        table.append(_comparison_row(
+            name, stores[name].ai_weights, summaries[name],
+            summaries[base_name] if name != base_name else None, wins,
+        ))
+
+    return {
+        'seed': seed,
+        'cached_results': cached_results,
+        'computed_results': computed_results,
+        'summaries': summaries,
+        'table': table,
+    }
@@ -0,0 +1,64 @@
+"""번호 조합 비트마스크 유틸
+
+한 줄(6개 번호)을 64비트 정수 하나로 표현합니다 (비트 n = 번호 n, 1~45).
+    - 적중 수 = popcount(줄 마스크 & 당첨 마스크)
+    - 보너스 적중 = 줄 마스크 & (1 << 보너스)
+numpy 1.x에는 np.bitwise_count가 없으므로 popcount는 16비트 표 조회로 계산합니다.
+"""
+from typing import Iterable, List, Sequence
+
+import numpy as np
+
+# 16비트 popcount 표
+_POPCOUNT16 = np.array([bin(i).count("1") for i in range(1 << 16)], dtype=np.uint8)
+
+_ONE = np.uint64(1)
+
+
+def numbers_to_mask(numbers: Iterable[int]) -> int:
+    """번호 목록 → 비트마스크 (비트 n = 번호 n)"""
+    mask = 0
+    for n in numbers:
+        mask |= 1 << int(n)
+    return mask
+
+
+def mask_to_numbers(mask: int) -> List[int]:
+    """비트마스크 → 오름차순 번호 목록"""
+    mask = int(mask)
+    numbers = []
+    while mask:
+        low = mask & -mask
+        numbers.append(low.bit_length() - 1)
+        mask ^= low
+    return numbers
+
+
+def popcount64(masks: np.ndarray) -> np.ndarray:
+    """uint64 배열의 비트 수 (번호는 1~45이므로 하위 48비트만 봄)"""
+    masks = np.asarray(masks, dtype=np.uint64)
+    return (
+        _POPCOUNT16[masks & np.uint64(0xFFFF)]
+        + _POPCOUNT16[(masks >> np.uint64(16)) & np.uint64(0xFFFF)]
+        + _POPCOUNT16[(masks >> np.uint64(32)) & np.uint64(0xFFFF)]
+    )
+
+
+def lines_to_masks(lines: Sequence[Sequence[int]]) -> np.ndarray:
+    """
+    여러 줄 → (줄 수,) uint64 마스크 (줄 길이가 달라도 됨, 빈 줄은 0)
+
+    번호를 한 배열로 펼쳐 줄 경계마다 OR 누적(reduceat)합니다.
+    """
+    lengths = np.fromiter((len(line) for line in lines), dtype=np.int64, count=len(lines))
+    masks = np.zeros(len(lines), dtype=np.uint64)
+    total = int(lengths.sum())
+    if total == 0:
+        return masks
+
+    flat = np.fromiter((n for line in lines for n in line), dtype=np.uint64, count=total)
+    bits = _ONE << flat
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    nonempty = lengths > 0
+    masks[nonempty] = np.bitwise_or.reduceat(bits, starts[nonempty])
+    return masks
@@ -0,0 +1,282 @@
+"""번호별 ML 특성 저장소 (lotto_feature_store)
+
+(예측 대상 회차, 번호)마다 LottoMLTrainer.extract_features와 같은 15개 특성을 저장합니다.
+대상 회차 D의 특성은 D 이전 회차들로만 계산하므로 한 번 계산하면 바뀌지 않습니다.
+(과거 회차가 뒤늦게 추가/수정된 경우만 그 이후 대상 회차를 다시 계산)
+
+특성 정의를 바꾸면 FEATURE_SCHEMA_VERSION을 올리세요. 버전이 다른 행이 남아 있으면
+조회 시 사용하지 않고(즉석 계산으로 대체) 백그라운드 재생성 작업을 등록합니다.
+"""
+import logging
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.db.models import LottoDraw, LottoFeatureStore
+from app.services.lotto.score_tensor import ScoreTensorBuilder
+
+logger = logging.getLogger("feature_store")
+
+# 특성 정의 버전 - 특성 계산 방식이 바뀌면 올릴 것
+FEATURE_SCHEMA_VERSION = 1
+
+FEATURE_NAMES = [
+    'logic1_score', 'logic2_score', 'logic3_score', 'logic4_score',
+    'total_freq', 'recent10_freq', 'recent30_freq', 'recent100_freq',
+    'gap', 'is_hot', 'is_cold', 'bonus_freq', 'odd_even', 'zone', 'consecutive'
+]
+
+# 특성 계산에 필요한 최소 이력 (미만이면 0 벡터 - 저장하지 않음)
+MIN_HISTORY = 10
+
+# 한 번에 계산/저장할 대상 회차 수
+_CHUNK_SIZE = 100
+
+
+def compute_feature_tensor(draws: List[Dict], target_draw_nos: Sequence[int]) -> np.ndarray:
+    """
+    대상 회차별 15개 특성 즉석 계산
+
+    Args:
+        draws: 회차 데이터 (대상 회차 이전 회차가 모두 포함되어야 함)
+        target_draw_nos: 예측 대상 회차 리스트
+
+    Returns:
+        (len(target_draw_nos), 45, 15) - [t, n-1] = 대상 회차 t, 번호 n의 특성
+    """
+    draws = sorted(draws, key=lambda d: d['draw_no'])
+    draw_nos = np.array([d['draw_no'] for d in draws], dtype=np.int64)
+    # 대상 회차 이전 회차 수 = cutoff
+    cutoffs = np.searchsorted(draw_nos, np.asarray(target_draw_nos, dtype=np.int64), side='left')
+    return ScoreTensorBuilder(draws).feature_matrix(cutoffs)
+
+
+def _load_draws(db: Session) -> List[Dict]:
+    from app.services.lotto import draws_to_dict_list
+
+    return draws_to_dict_list(db.query(LottoDraw).order_by(LottoDraw.draw_no).all())
+
+
+def _target_draw_nos(draws: List[Dict]) -> List[int]:
+    """저장 대상 회차 = 보유 회차(이력 10회 이상) + 다음 회차"""
+    if len(draws) < MIN_HISTORY:
+        return []
+    targets = [d['draw_no'] for d in draws[MIN_HISTORY:]]
+    targets.append(draws[-1]['draw_no'] + 1)
+    return targets
+
+
+def stale_row_count(db: Session) -> int:
+    """현재 버전과 다른 특성 행 수"""
+    return db.query(func.count(LottoFeatureStore.draw_no)).filter(
+        LottoFeatureStore.version != FEATURE_SCHEMA_VERSION
+    ).scalar() or 0
+
+
+def sync_feature_store(
+    db: Session,
+    draws: Optional[List[Dict]] = None,
+    rebuild: bool = False,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict:
+    """
+    누락된 특성 채우기 (이미 저장된 대상 회차는 건너뜀)
+
+    Args:
+        db: DB 세션
+        draws: 전체 회차 데이터 (None이면 DB에서 로드)
+        rebuild: True면 전체 삭제 후 재생성
+        on_progress: 청크마다 호출 (완료 대상 수, 전체 대상 수)
+
+    Returns:
+        {'inserted_draws', 'removed_rows', 'total_targets'}
+    """
+    if draws is None:
+        draws = _load_draws(db)
+
+    if rebuild:
+        removed = db.query(LottoFeatureStore).delete(synchronize_session=False)
+    else:
+        removed = db.query(LottoFeatureStore).filter(
+            LottoFeatureStore.version != FEATURE_SCHEMA_VERSION
+        ).delete(synchronize_session=False)
+    db.commit()
+
+    targets = _target_draw_nos(draws)
+    existing = {
+        row[0] for row in db.query(LottoFeatureStore.draw_no).filter(
+            LottoFeatureStore.version == FEATURE_SCHEMA_VERSION
+        ).distinct()
+    }
+    missing = [t for t in targets if t not in existing]
+
+    inserted = 0
+    for start in range(0, len(missing), _CHUNK_SIZE):
+        chunk = missing[start:start + _CHUNK_SIZE]
+        tensor = compute_feature_tensor(draws, chunk)
+        rows = [
+            {
+                "draw_no": draw_no,
+                "number": n + 1,
+                "version": FEATURE_SCHEMA_VERSION,
+                "features": [round(float(v), 6) for v in tensor[i, n]],
+            }
+            for i, draw_no in enumerate(chunk)
+            for n in range(45)
+        ]
+        try:
+            db.bulk_insert_mappings(LottoFeatureStore, rows)
+            db.commit()
+            inserted += len(chunk)
+        except IntegrityError:
+            # 다른 워커가 같은 회차를 먼저 채운 경우
+            db.rollback()
+        if on_progress:
+            on_progress(min(start + _CHUNK_SIZE, len(missing)), len(missing))
+
+    return {"inserted_draws": inserted, "removed_rows": removed, "total_targets": len(targets)}
+
+
+def invalidate_feature_store(db: Session, from_draw_no: int) -> int:
+    """from_draw_no 회차 데이터가 바뀌었을 때 영향받는 대상 회차(이후 회차) 특성 삭제"""
+    removed = db.query(LottoFeatureStore).filter(
+        LottoFeatureStore.draw_no > from_draw_no
+    ).delete(synchronize_session=False)
+    db.commit()
+    return removed
+
+
+def request_feature_store_rebuild(db: Session) -> Optional[str]:
+    """백그라운드 재생성 작업 등록 (이미 대기/실행 중이면 등록하지 않음)"""
+    from app.db.models import AdminJob
+    from app.services.jobs import submit_job, JobQueueFull
+    from app.services.jobs.job_runner import ACTIVE_STATUSES
+
+    active = db.query(AdminJob.id).filter(
+        AdminJob.job_type == "feature_store_sync",
+        AdminJob.status.in_(ACTIVE_STATUSES),
+    ).first()
+    if active:
+        return active[0]
+
+    try:
+        job = submit_job(db, "feature_store_sync", {})
+    except JobQueueFull:
+        logger.warning("특성 저장소 재생성 작업 등록 실패: 대기 작업 초과")
+        return None
+    return job.id
+
+
+def refresh_feature_store(db: Session, changed_draw_nos: Iterable[int]) -> None:
+    """
+    회차 추가/수정/삭제 후 호출 - 영향받는 특성만 다시 계산
+
+    버전이 다른 행이 있으면 전체 재생성이 필요하므로 백그라운드 작업으로 넘깁니다.
+    실패해도 회차 저장 흐름을 막지 않습니다 (조회 시 즉석 계산으로 대체됨).
+    """
+    changed = list(changed_draw_nos)
+    if not changed:
+        return
+
+    try:
+        if stale_row_count(db) > 0:
+            request_feature_store_rebuild(db)
+            return
+
+        invalidate_feature_store(db, min(changed))
+        sync_feature_store(db)
+    except Exception:
+        db.rollback()
+        logger.exception("특성 저장소 갱신 실패")
+
+
+def ensure_feature_store_current(db: Session) -> None:
+    """서버 시작 시 버전 불일치/미생성 상태면 백그라운드 재생성 등록"""
+    try:
+        has_draws = db.query(LottoDraw.draw_no).first() is not None
+        if not has_draws:
+            return
+        current = db.query(LottoFeatureStore.draw_no).filter(
+            LottoFeatureStore.version == FEATURE_SCHEMA_VERSION
+        ).first()
+        if stale_row_count(db) > 0 or current is None:
+            request_feature_store_rebuild(db)
+    except Exception:
+        db.rollback()
+        logger.exception("특성 저장소 상태 확인 실패")
+
+
+def load_feature_tensor(db: Session, draws: List[Dict], target_draw_nos: Sequence[int]) -> np.ndarray:
+    """
+    대상 회차별 특성 일괄 조회 (저장소에 없으면 즉석 계산)
+
+    Returns:
+        (len(target_draw_nos), 45, 15)
+    """
+    targets = [int(t) for t in target_draw_nos]
+    out = np.zeros((len(targets), 45, 15), dtype=np.float64)
+    if not targets:
+        return out
+
+    position = {t: i for i, t in enumerate(targets)}
+    found = np.zeros(len(targets), dtype=np.int32)
+
+    rows = db.query(
+        LottoFeatureStore.draw_no, LottoFeatureStore.number, LottoFeatureStore.features
+    ).filter(
+        LottoFeatureStore.draw_no.in_(targets),
+        LottoFeatureStore.version == FEATURE_SCHEMA_VERSION,
+    ).all()
+    for draw_no, number, features in rows:
+        i = position[draw_no]
+        out[i, number - 1] = features
+        found[i] += 1
+
+    missing = [i for i, count in enumerate(found) if count < 45]
+    if missing:
+        out[missing] = compute_feature_tensor(draws, [targets[i] for i in missing])
+    return out
+
+
+class FeatureStoreSource:
+    """LottoMLTrainer.feature_source용 - 저장소 조회 결과를 프로세스 내에서 재사용"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self._cache: Dict[int, np.ndarray] = {}
+
+    def prefetch(self, draws: List[Dict], target_draw_nos: Sequence[int]) -> None:
+        targets = [int(t) for t in target_draw_nos if int(t) not in self._cache]
+        if not targets:
+            return
+        tensor = load_feature_tensor(self.db, draws, targets)
+        for i, t in enumerate(targets):
+            self._cache[t] = tensor[i]
+
+    def __call__(self, draws: List[Dict], target_draw_nos: Sequence[int]) -> np.ndarray:
+        self.prefetch(draws, target_draw_nos)
+        return np.stack([self._cache[int(t)] for t in target_draw_nos])
+
+
+class ComputedFeatureSource:
+    """FeatureStoreSource의 DB 없는 버전 - 대상 회차 특성을 한 번에 계산해 재사용"""
+
+    def __init__(self, draws: List[Dict]):
+        self.draws = draws
+        self._cache: Dict[int, np.ndarray] = {}
+
+    def prefetch(self, draws: List[Dict], target_draw_nos: Sequence[int]) -> None:
+        targets = [int(t) for t in target_draw_nos if int(t) not in self._cache]
+        if not targets:
+            return
+        # 대상 회차 특성은 그 이전 회차로만 계산되므로 전체 회차 기준으로 계산해도 같음
+        tensor = compute_feature_tensor(self.draws, targets)
+        for i, t in enumerate(targets):
+            self._cache[t] = tensor[i]
+
+    def __call__(self, draws: List[Dict], target_draw_nos: Sequence[int]) -> np.ndarray:
+        self.prefetch(draws, target_draw_nos)
+        return np.stack([self._cache[int(t)] for t in target_draw_nos])
@@ -72,8 +72,12 @@ def is_duplicate(line1: List[int], line2: List[int], threshold: int = 5) -> bool
     """두 조합이 중복인지 확인 (threshold개 이상 겹치면 중복)"""
     return len(set(line1) & set(line2)) >= threshold
 
-def generate_20_lines(user_id: int, stats: Dict, ai_weights: Dict = None) -> Dict:
-    """20줄 생성 (버그 수정)"""
+def generate_20_lines(user_id: int, stats: Dict, ai_weights: Dict = None, rng: random.Random = None) -> Dict:
+    """20줄 생성 (버그 수정)
+
+    rng: 난수 생성기 (백테스팅 재현용, None이면 random 모듈)
+    """
+    rng = rng or random
     most = stats['most_common']
     least = stats['least_common']
     scores1 = stats['scores_logic1']
@@ -129,7 +133,7 @@ def generate_20_lines(user_id: int, stats: Dict, ai_weights: Dict = None) -> Dic
                 pool = candidates[:]
             if len(pool) < 5:
                 continue
-            line = sorted([bonus] + random.sample(pool, 5))
+            line = sorted([bonus] + rng.sample(pool, 5))
             if not _is_exact_duplicate(line):
                 return line
         return []
@@ -147,10 +151,10 @@ def generate_20_lines(user_id: int, stats: Dict, ai_weights: Dict = None) -> Dic
 
     # ① 믹스
     line1 = set()
-    line1.add(random.choice(most))
-    line1.add(random.choice(least))
+    line1.add(rng.choice(most))
+    line1.add(rng.choice(least))
     while len(line1) < 6:
-        line1.add(random.randint(1, 45))
+        line1.add(rng.randint(1, 45))
     line1 = sorted(list(line1))
     result['basic'].append(line1)
     all_generated.append(line1)
@@ -167,7 +171,7 @@ def generate_20_lines(user_id: int, stats: Dict, ai_weights: Dict = None) -> Dic
 
     # ④ 최다믹스
     line4 = set(most[:3])
-    line4.update(random.sample(range(1, 46), 2))
+    line4.update(rng.sample(range(1, 46), 2))
     line4.add(lucky_number(user_id, 1)[0])
     line4 = sorted(list(line4))[:6]
     result['basic'].append(line4)
@@ -178,17 +182,17 @@ def generate_20_lines(user_id: int, stats: Dict, ai_weights: Dict = None) -> Dic
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     top1_15 = get_top_candidates(scores1, 15)
 
-    line5 = _unique_line(lambda: select_by_odd_even_balance(random.sample(top1_15, len(top1_15)), (3, 3)))
+    line5 = _unique_line(lambda: select_by_odd_even_balance(rng.sample(top1_15, len(top1_15)), (3, 3)))
     line5 = _ensure_unique(line5, top1_15)
     result['logic1'].append(line5)
     all_generated.append(line5)
 
-    line6 = _unique_line(lambda: select_by_zone_balance(random.sample(top1_15, len(top1_15)), (2, 2, 2)))
+    line6 = _unique_line(lambda: select_by_zone_balance(rng.sample(top1_15, len(top1_15)), (2, 2, 2)))
     line6 = _ensure_unique(line6, top1_15)
     result['logic1'].append(line6)
     all_generated.append(line6)
 
-    line7 = _unique_line(lambda: sorted(random.sample(top1_15, 6)))
+    line7 = _unique_line(lambda: sorted(rng.sample(top1_15, 6)))
     line7 = _ensure_unique(line7, top1_15)
     result['logic1'].append(line7)
     all_generated.append(line7)
@@ -198,12 +202,12 @@ def generate_20_lines(user_id: int, stats: Dict, ai_weights: Dict = None) -> Dic
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     top2_17 = get_top_candidates(scores2, 17)
 
-    line8 = _unique_line(lambda: select_by_odd_even_balance(random.sample(top2_17, len(top2_17)), (3, 3)))
+    line8 = _unique_line(lambda: select_by_odd_even_balance(rng.sample(top2_17, len(top2_17)), (3, 3)))
     line8 = _ensure_unique(line8, top2_17)
     result['logic2'].append(line8)
     all_generated.append(line8)
 
-    line9 = _unique_line(lambda: select_by_zone_balance(random.sample(top2_17, len(top2_17)), (2, 2, 2)))
+    line9 = _unique_line(lambda: select_by_zone_balance(rng.sample(top2_17, len(top2_17)), (2, 2, 2)))
     line9 = _ensure_unique(line9, top2_17)
     result['logic2'].append(line9)
     all_generated.append(line9)
@@ -223,7 +227,7 @@ def generate_20_lines(user_id: int, stats: Dict, ai_weights: Dict = None) -> Dic
     if best_combo:
         line10 = sorted(list(best_combo))
     else:
-        line10 = _unique_line(lambda: sorted(random.sample(top2_17, 6)))
+        line10 = _unique_line(lambda: sorted(rng.sample(top2_17, 6)))
     line10 = _ensure_unique(line10, top2_17)
 
     result['logic2'].append(line10)
@@ -234,12 +238,12 @@ def generate_20_lines(user_id: int, stats: Dict, ai_weights: Dict = None) -> Dic
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     top3_18 = get_top_candidates(scores3, 18)
 
-    line11 = _unique_line(lambda: select_by_odd_even_balance(random.sample(top3_18, len(top3_18)), (3, 3)))
+    line11 = _unique_line(lambda: select_by_odd_even_balance(rng.sample(top3_18, len(top3_18)), (3, 3)))
     line11 = _ensure_unique(line11, top3_18)
     result['logic3'].append(line11)
     all_generated.append(line11)
 
-    line12 = _unique_line(lambda: select_by_zone_balance(random.sample(top3_18, len(top3_18)), (2, 2, 2)))
+    line12 = _unique_line(lambda: select_by_zone_balance(rng.sample(top3_18, len(top3_18)), (2, 2, 2)))
     line12 = _ensure_unique(line12, top3_18)
     result['logic3'].append(line12)
     all_generated.append(line12)
@@ -259,7 +263,7 @@ def generate_20_lines(user_id: int, stats: Dict, ai_weights: Dict = None) -> Dic
     if best_combo:
         line13 = best_combo
     else:
-        line13 = _unique_line(lambda: sorted(random.sample(top3_18, 6)))
+        line13 = _unique_line(lambda: sorted(rng.sample(top3_18, 6)))
     line13 = _ensure_unique(line13, top3_18)
 
     result['logic3'].append(line13)
@@ -279,12 +283,12 @@ def generate_20_lines(user_id: int, stats: Dict, ai_weights: Dict = None) -> Dic
 
     top_final_18 = get_top_candidates(scores_final, 18)
 
-    line14 = _unique_line(lambda: select_by_zone_balance(random.sample(top_final_18, len(top_final_18)), (2, 2, 2)))
+    line14 = _unique_line(lambda: select_by_zone_balance(rng.sample(top_final_18, len(top_final_18)), (2, 2, 2)))
     line14 = _ensure_unique(line14, top_final_18)
     result['final'].append(line14)
     all_generated.append(line14)
 
-    line15 = _unique_line(lambda: sorted(random.sample(top_final_18, 6)))
+    line15 = _unique_line(lambda: sorted(rng.sample(top_final_18, 6)))
     line15 = _ensure_unique(line15, top_final_18)
     result['final'].append(line15)
     all_generated.append(line15)
@@ -296,40 +300,35 @@ def generate_20_lines(user_id: int, stats: Dict, ai_weights: Dict = None) -> Dic
     ai_core_15 = get_top_candidates(scores_final, 15)
     core_combos = list(combinations(ai_core_15, 6))
 
-    # 각 조합 평가
+    # 각 조합 평가 (5,005개 - 조합당 연산을 최소화)
+    # 기존 15줄과 6개 모두 같은 조합은 제외
+    generated_sets = {frozenset(line) for line in all_generated}
+
     scored_combos = []
     for combo in core_combos:
-        combo_list = sorted(list(combo))
-
-        # 기존 15줄과 중복 체크
-        is_dup = False
-        for existing in all_generated:
-            if is_duplicate(combo_list, existing, 6):  # 6개 모두 같으면
-                is_dup = True
-                break
-
-        if is_dup:
+        if frozenset(combo) in generated_sets:
             continue
 
+        combo_list = sorted(combo)
+        a, b, c, d, e, f = combo_list
+
         # 점수 계산
-        score = sum(scores_final.get(n, 0) for n in combo)
+        score = sum(map(scores_final.__getitem__, combo))
 
         # 패턴 보너스
-        odd_cnt = sum(1 for n in combo if n % 2 == 1)
-        if odd_cnt == 3:
+        # 홀짝 3:3
+        if (a & 1) + (b & 1) + (c & 1) + (d & 1) + (e & 1) + (f & 1) == 3:
             score += 10
 
-        z1 = sum(1 for n in combo if 1 <= n <= 15)
-        z2 = sum(1 for n in combo if 16 <= n <= 30)
-        z3 = sum(1 for n in combo if 31 <= n <= 45)
-        if (z1, z2, z3) == (2, 2, 2):
+        # 구간 2:2:2 (정렬된 조합: 1~15 두 개, 16~30 두 개, 31~45 두 개)
+        if b <= 15 < c and d <= 30 < e:
             score += 10
 
-        if has_consecutive(combo_list):
+        # 연속 번호
+        if 1 in (b - a, c - b, d - c, e - d, f - e):
             score += 5
 
-        s = calculate_sum(combo)
-        if 130 <= s <= 140:
+        if 130 <= a + b + c + d + e + f <= 140:
             score += 10
 
         scored_combos.append((combo_list, score))
@@ -339,7 +338,7 @@ def generate_20_lines(user_id: int, stats: Dict, ai_weights: Dict = None) -> Dic
     top_30_combos = scored_combos[:30]  # 상위 30개 후보
 
     # 랜덤 셔플 후 5개 선택
-    random.shuffle(top_30_combos)
+    rng.shuffle(top_30_combos)
 
     for combo, score in top_30_combos:
         # 이미 선택된 AI 핵심 번호와도 체크
@@ -359,7 +358,7 @@ def generate_20_lines(user_id: int, stats: Dict, ai_weights: Dict = None) -> Dic
     # 부족하면 채우기
     while len(result['ai_core']) < 5:
         # 랜덤 조합
-        random_combo = sorted(random.sample(ai_core_15, 6))
+        random_combo = sorted(rng.sample(ai_core_15, 6))
         result['ai_core'].append(random_combo)
 
     return result
@@ -0,0 +1,187 @@
+"""번호별 출현 확률 로지스틱 회귀 (numpy 구현)
+
+(대상 회차 × 45번호) 행마다 15개 특성(feature_store.FEATURE_NAMES)으로
+"이 번호가 대상 회차에 당첨될 확률"을 학습합니다.
+
+- 특성 표준화 후 L2 정규화 로지스틱 회귀를 Newton(IRLS)으로 풉니다.
+  변수가 16개(절편 포함)라 헤시안이 16×16이므로 수 회 반복으로 수렴합니다.
+- 표준화 계수는 원래 특성 공간으로 되돌려 저장하므로,
+  예측은 (45, 15) @ (15,) 행렬-벡터 곱 한 번 + 시그모이드입니다.
+"""
+import time
+from typing import Dict, List
+
+import numpy as np
+
+# 기본 L2 정규화 세기 (표준화된 계수 기준, 절편은 제외)
+DEFAULT_L2 = 1.0
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 0.5 * (1.0 + np.tanh(0.5 * z))
+
+
+def fit_logistic_regression(
+    X: np.ndarray,
+    y: np.ndarray,
+    l2: float = DEFAULT_L2,
+    max_iter: int = 50,
+    tol: float = 1e-8,
+) -> Dict:
+    """
+    L2 정규화 로지스틱 회귀 학습 (Newton-IRLS)
+
+    Args:
+        X: (샘플, 특성)
+        y: (샘플,) 0/1 라벨
+        l2: L2 정규화 세기
+        max_iter: 최대 반복 수
+        tol: 계수 변화량 수렴 기준
+
+    Returns:
+        {'coef': (특성,) 원래 특성 공간 계수, 'intercept', 'iterations', 'log_loss'}
+    """
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n_samples, n_features = X.shape
+    if n_samples == 0:
+        raise ValueError("학습 데이터가 없습니다.")
+
+    mean = X.mean(axis=0)
+    std = X.std(axis=0)
+    std[std == 0] = 1.0  # 상수 특성은 계수 0으로 수렴
+
+    # 절편 열 + 표준화 특성
+    Z = np.empty((n_samples, n_features + 1))
+    Z[:, 0] = 1.0
+    Z[:, 1:] = (X - mean) / std
+
+    penalty = np.full(n_features + 1, l2)
+    penalty[0] = 0.0
+
+    # 절편은 기저 출현율로 시작
+    beta = np.zeros(n_features + 1)
+    base_rate = np.clip(y.mean(), 1e-6, 1 - 1e-6)
+    beta[0] = np.log(base_rate / (1 - base_rate))
+
+    iterations = 0
+    for iterations in range(1, max_iter + 1):
+        p = _sigmoid(Z @ beta)
+        grad = Z.T @ (p - y) + penalty * beta
+        hessian = (Z * (p * (1 - p))[:, None]).T @ Z + np.diag(penalty)
+        step = np.linalg.solve(hessian, grad)
+        beta -= step
+        if np.max(np.abs(step)) < tol:
+            break
+
+    p = np.clip(_sigmoid(Z @ beta), 1e-12, 1 - 1e-12)
+    log_loss = float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p)))
+
+    # 표준화 되돌리기: w·(x-m)/s + b = (w/s)·x + (b - Σ w·m/s)
+    coef = beta[1:] / std
+    intercept = float(beta[0] - coef @ mean)
+
+    return {
+        'coef': coef,
+        'intercept': intercept,
+        'iterations': iterations,
+        'log_loss': log_loss,
+    }
+
+
+def predict_logistic(features: np.ndarray, coef: np.ndarray, intercept: float) -> np.ndarray:
+    """(..., 15) 특성 → (...) 출현 확률"""
+    return _sigmoid(features @ coef + intercept)
+
+
+def benchmark_models(
+    draws: List[Dict],
+    test_draws: int = 200,
+    start_draw: int = 100,
+    l2: float = DEFAULT_L2,
+    top_k: int = 15,
+    trainer=None,
+    latency_repeats: int = 200,
+) -> Dict:
+    """
+    로지스틱 회귀 vs 기존 특성 중요도 가중합 비교
+
+    최근 test_draws개 회차를 테스트 구간으로 두고, 두 모델 모두 그 이전 회차만으로 학습한 뒤
+    테스트 회차마다 상위 top_k 번호의 적중률, 로그 손실, 학습 시간, 예측 지연을 잽니다.
+
+    Args:
+        draws: 전체 회차 데이터 (draw_no 오름차순)
+        test_draws: 테스트 회차 수
+        start_draw: 학습 데이터 시작 회차
+        l2: 로지스틱 L2 정규화 세기
+        top_k: 적중률 기준 상위 번호 수
+        trainer: 특성 조회용 LottoMLTrainer (None이면 즉석 계산)
+        latency_repeats: 예측 지연 측정 반복 수
+
+    Returns:
+        {'train_range', 'test_range', 'models': {'statistical': {...}, 'logistic': {...}}}
+    """
+    from app.services.lotto.ml_trainer import LottoMLTrainer
+    from app.services.lotto.walk_forward import WalkForwardEvaluator
+
+    trainer = trainer or LottoMLTrainer()
+    split = len(draws) - test_draws
+    train_targets = [d['draw_no'] for d in draws[:split] if d['draw_no'] >= start_draw]
+    if split <= 10 or not train_targets:
+        raise ValueError("벤치마크할 회차가 부족합니다.")
+
+    cutoffs = np.arange(split, len(draws))
+    test_features = trainer.feature_tensor(draws, [draws[i]['draw_no'] for i in cutoffs])
+    evaluator = WalkForwardEvaluator(draws)
+    winning = evaluator.builder.winning_mask(cutoffs)
+
+    # 기존 방식: 학습 구간의 특성 중요도 가중합
+    started = time.perf_counter()
+    importance = trainer._calculate_feature_importance(draws[:split])
+    statistical_fit_sec = time.perf_counter() - started
+
+    # 로지스틱 회귀
+    started = time.perf_counter()
+    X, y = trainer.prepare_training_data(draws[:split], start_draw=start_draw)
+    fitted = fit_logistic_regression(X, y, l2=l2)
+    logistic_fit_sec = time.perf_counter() - started
+
+    scorers = {
+        'statistical': lambda builder, c: test_features @ importance,
+        'logistic': lambda builder, c: predict_logistic(test_features, fitted['coef'], fitted['intercept']),
+    }
+    result = evaluator.evaluate(scorers, cutoffs=cutoffs, top_ks=(top_k,))
+
+    def latency_ms(predict) -> float:
+        single = test_features[-1]
+        started = time.perf_counter()
+        for _ in range(latency_repeats):
+            predict(single)
+        return (time.perf_counter() - started) / latency_repeats * 1000
+
+    probs = np.clip(predict_logistic(test_features, fitted['coef'], fitted['intercept']), 1e-12, 1 - 1e-12)
+    test_log_loss = float(-np.mean(winning * np.log(probs) + (~winning) * np.log(1 - probs)))
+
+    return {
+        'train_range': [train_targets[0], train_targets[-1]],
+        'test_range': [draws[split]['draw_no'], draws[-1]['draw_no']],
+        'top_k': top_k,
+        'random_hit_rate': round(top_k / 45, 6),
+        'models': {
+            'statistical': {
+                'hit_rate': round(result['hit_rates']['statistical'][top_k], 6),
+                'fit_sec': round(statistical_fit_sec, 4),
+                'predict_ms': round(latency_ms(lambda f: f @ importance), 4),
+            },
+            'logistic': {
+                'hit_rate': round(result['hit_rates']['logistic'][top_k], 6),
+                'fit_sec': round(logistic_fit_sec, 4),
+                'predict_ms': round(latency_ms(
+                    lambda f: predict_logistic(f, fitted['coef'], fitted['intercept'])
+                ), 4),
+                'iterations': fitted['iterations'],
+                'train_log_loss': round(fitted['log_loss'], 6),
+                'test_log_loss': round(test_log_loss, 6),
+            },
+        },
+    }
@@ -15,7 +15,8 @@ class LottoMLPredictor:
         self,
         draws: List[Dict],
         user_patterns: List[Dict] = None,
-        existing_20_lines: List[List[int]] = None
+        existing_20_lines: List[List[int]] = None,
+        rng: random.Random = None
     ) -> List[List[int]]:
         """
         ML 기반 5줄 생성 (기존 20줄과 중복 방지)
@@ -31,6 +32,7 @@ class LottoMLPredictor:
                     {'type': 'sum_range', 'params': {'min': 130, 'max': 140}}
                 ]
             existing_20_lines: 기존 20줄 (중복 방지용)
+            rng: 난수 생성기 (백테스팅 재현용, None이면 random 모듈)
 
         Returns:
             5줄 리스트
@@ -66,7 +68,8 @@ class LottoMLPredictor:
                 probabilities,
                 top_15,
                 top_20,
-                all_generated
+                all_generated,
+                rng or random
             )
             result.append(line)
             all_generated.append(line)
@@ -79,7 +82,8 @@ class LottoMLPredictor:
         probabilities: Dict[int, float],
         top_15: List[int],
         top_20: List[int],
-        existing_lines: List[List[int]]
+        existing_lines: List[List[int]],
+        rng: random.Random = random
     ) -> List[int]:
         """패턴에 따라 1줄 생성"""
         pattern_type = pattern['type']
@@ -92,12 +96,12 @@ class LottoMLPredictor:
         elif pattern_type == 'balanced_zones':
             # 구간 밸런스
             zones = params.get('zones', (2, 2, 2))
-            return self._select_balanced_zones(top_15, zones, existing_lines)
+            return self._select_balanced_zones(top_15, zones, existing_lines, rng)
 
         elif pattern_type == 'odd_even_balanced':
             # 홀짝 밸런스
             ratio = params.get('ratio', (3, 3))
-            return self._select_odd_even_balanced(top_15, ratio, existing_lines)
+            return self._select_odd_even_balanced(top_15, ratio, existing_lines, rng)
 
         elif pattern_type == 'consecutive_optimal':
             # 연속 번호 최적화
@@ -127,7 +131,7 @@ class LottoMLPredictor:
         # 최악의 경우 상위 6개
         return sorted([num for num, _ in sorted_numbers[:6]])
 
-    def _select_balanced_zones(self, candidates: List[int], zones: Tuple[int, int, int], existing: List[List[int]]) -> List[int]:
+    def _select_balanced_zones(self, candidates: List[int], zones: Tuple[int, int, int], existing: List[List[int]], rng: random.Random = random) -> List[int]:
         """구간 밸런스 선택"""
         z1_cnt, z2_cnt, z3_cnt = zones
 
@@ -137,13 +141,13 @@ class LottoMLPredictor:
 
         for _ in range(10):  # 10번 시도
             selected = []
-            selected.extend(random.sample(z1, min(z1_cnt, len(z1))))
-            selected.extend(random.sample(z2, min(z2_cnt, len(z2))))
-            selected.extend(random.sample(z3, min(z3_cnt, len(z3))))
+            selected.extend(rng.sample(z1, min(z1_cnt, len(z1))))
+            selected.extend(rng.sample(z2, min(z2_cnt, len(z2))))
+            selected.extend(rng.sample(z3, min(z3_cnt, len(z3))))
 
             # 부족하면 채우기
             while len(selected) < 6:
-                selected.append(random.choice(candidates))
+                selected.append(rng.choice(candidates))
 
             line = sorted(list(set(selected)))[:6]
 
@@ -152,7 +156,7 @@ class LottoMLPredictor:
 
         return sorted(candidates[:6])
 
-    def _select_odd_even_balanced(self, candidates: List[int], ratio: Tuple[int, int], existing: List[List[int]]) -> List[int]:
+    def _select_odd_even_balanced(self, candidates: List[int], ratio: Tuple[int, int], existing: List[List[int]], rng: random.Random = random) -> List[int]:
         """홀짝 밸런스 선택"""
         odd_cnt, even_cnt = ratio
 
@@ -161,11 +165,11 @@ class LottoMLPredictor:
 
         for _ in range(10):
             selected = []
-            selected.extend(random.sample(odds, min(odd_cnt, len(odds))))
-            selected.extend(random.sample(evens, min(even_cnt, len(evens))))
+            selected.extend(rng.sample(odds, min(odd_cnt, len(odds))))
+            selected.extend(rng.sample(evens, min(even_cnt, len(evens))))
 
             while len(selected) < 6:
-                selected.append(random.choice(candidates))
+                selected.append(rng.choice(candidates))
 
             line = sorted(list(set(selected)))[:6]
 
@@ -1,8 +1,8 @@
-"""통계 기반 로또 ML 학습 모듈 (XGBoost 대체)"""
+"""통계 기반 로또 ML 학습 모듈 (XGBoost 대체 - 특성 중요도 + numpy 로지스틱 회귀)"""
 import pickle
 from pathlib import Path
 from collections import defaultdict, Counter
-from typing import List, Dict, Tuple
+from typing import Callable, List, Dict, Optional, Sequence, Tuple
 import numpy as np
 from app.services.lotto.stats_calculator import LottoStatsCalculator
 
@@ -10,11 +10,29 @@ from app.services.lotto.stats_calculator import LottoStatsCalculator
 class LottoMLTrainer:
     """로또 ML 모델 학습"""
 
-    def __init__(self, model_path: str = None):
+    def __init__(self, model_path: str = None, feature_source: Optional[Callable] = None):
+        """
+        Args:
+            model_path: 모델 파일 경로
+            feature_source: (draws, 대상 회차 리스트) -> (T, 45, 15) 특성 텐서.
+                None이면 즉석 계산 (feature_store.FeatureStoreSource로 저장소 사용 가능)
+        """
         self.model_path = model_path or str(Path(__file__).parent / "lotto_ml_model.pkl")
         self.model = None
         self.feature_importance = None
+        # 로지스틱 회귀 계수 (model == "logistic"일 때 predict_proba에 사용)
+        self.coef = None
+        self.intercept = None
         self.ai_weights = {'logic1': 0.33, 'logic2': 0.33, 'logic3': 0.34}
+        self.feature_source = feature_source
+
+    def feature_tensor(self, draws: List[Dict], target_draw_nos: Sequence[int]) -> np.ndarray:
+        """대상 회차별 15개 특성 (T, 45, 15) - extract_features의 일괄 버전"""
+        if self.feature_source is not None:
+            return self.feature_source(draws, target_draw_nos)
+
+        from app.services.lotto.feature_store import compute_feature_tensor
+        return compute_feature_tensor(draws, target_draw_nos)
 
     def extract_features(self, draws: List[Dict], target_draw_no: int, number: int) -> List[float]:
         """
@@ -132,25 +150,19 @@ class LottoMLTrainer:
         Returns:
             X (features), y (labels)
         """
-        X = []
-        y = []
-
         # 100회차부터 최신 회차까지 학습
-        for draw in draws:
-            if draw['draw_no'] < start_draw:
-                continue
-
-            target_numbers = {draw['n1'], draw['n2'], draw['n3'], draw['n4'], draw['n5'], draw['n6']}
+        targets = [d for d in draws if d['draw_no'] >= start_draw]
+        if not targets:
+            return np.empty((0, 15)), np.empty((0,), dtype=int)
 
-            # 각 번호(1~45)마다 특성 추출
-            for number in range(1, 46):
-                features = self.extract_features(draws, draw['draw_no'], number)
-                label = 1 if number in target_numbers else 0
+        features = self.feature_tensor(draws, [d['draw_no'] for d in targets])
 
-                X.append(features)
-                y.append(label)
+        y = np.zeros((len(targets), 45), dtype=int)
+        for i, draw in enumerate(targets):
+            for key in ('n1', 'n2', 'n3', 'n4', 'n5', 'n6'):
+                y[i, draw[key] - 1] = 1
 
-        return np.array(X), np.array(y)
+        return features.reshape(-1, 15), y.reshape(-1)
 
     def train(self, draws: List[Dict], test_size: float = 0.2) -> Dict:
         """
@@ -165,15 +177,32 @@ class LottoMLTrainer:
         """
         print("📊 학습 데이터 준비 중...")
 
-        # 최근 200회차로 특성 중요도 분석
+        # 최근 200회차로 평가
         recent_draws = draws[-200:] if len(draws) > 200 else draws
 
-        # 14개 특성의 예측 정확도 측정
-        feature_scores = self._calculate_feature_importance(recent_draws)
+        # 15개 특성의 예측 정확도 측정 (특성은 전체 이력 기준)
+        feature_scores = self._calculate_feature_importance(draws)
 
         self.feature_importance = feature_scores
         self.model = "statistical"  # 통계 모델 마커
 
+        # 번호별 출현 확률 로지스틱 회귀 (학습 데이터가 있으면 통계 모델 대신 사용)
+        logistic_info = None
+        X, y = self.prepare_training_data(draws)
+        if len(y) > 0 and y.any():
+            from app.services.lotto.logistic_model import fit_logistic_regression
+
+            fitted = fit_logistic_regression(X, y)
+            self.coef = fitted['coef']
+            self.intercept = fitted['intercept']
+            self.model = "logistic"
+            logistic_info = {
+                'samples': int(len(y)),
+                'iterations': fitted['iterations'],
+                'log_loss': fitted['log_loss'],
+            }
+            print(f"   로지스틱 회귀: {len(y)}개 샘플, {fitted['iterations']}회 반복, log loss {fitted['log_loss']:.4f}")
+
         # 평가 (간단한 hit rate)
         train_acc, test_acc = self._evaluate_model(recent_draws)
 
@@ -181,11 +210,8 @@ class LottoMLTrainer:
         print(f"   Train 정확도: {train_acc:.4f}")
         print(f"   Test 정확도: {test_acc:.4f}")
 
-        feature_names = [
-            'logic1_score', 'logic2_score', 'logic3_score', 'logic4_score',
-            'total_freq', 'recent10_freq', 'recent30_freq', 'recent100_freq',
-            'gap', 'is_hot', 'is_cold', 'bonus_freq', 'odd_even', 'zone', 'consecutive'
-        ]
+        from app.services.lotto.feature_store import FEATURE_NAMES
+        feature_names = FEATURE_NAMES
 
         print("\n📈 특성 중요도 (상위 10개):")
         importance_dict = dict(zip(feature_names, feature_scores))
@@ -217,6 +243,8 @@ class LottoMLTrainer:
             'test_accuracy': test_acc,
             'feature_importance': importance_dict,
             'ai_weights': self.ai_weights,
+            'model_type': self.model,
+            'logistic': logistic_info,
             'total_samples': len(recent_draws),
             'train_samples': int(len(recent_draws) * 0.8),
             'test_samples': int(len(recent_draws) * 0.2)
@@ -228,42 +256,18 @@ class LottoMLTrainer:
 
         각 특성이 다음 회차 예측에 얼마나 기여하는지 측정
         """
-        feature_hits = [0.0] * 15  # 15개 특성 (logic4 추가)
-
-        # 최근 50회차로 평가
-        eval_draws = draws[-50:] if len(draws) > 50 else draws
-
-        for i, draw in enumerate(eval_draws):
-            if i == 0:
-                continue  # 첫 회차는 이전 데이터 없음
-
-            actual_numbers = {draw['n1'], draw['n2'], draw['n3'], draw['n4'], draw['n5'], draw['n6']}
+        from app.services.lotto.feature_store import FEATURE_NAMES
+        from app.services.lotto.walk_forward import WalkForwardEvaluator
 
-            # 이전 회차들로 특성 계산
-            past_draws = draws[:draws.index(draw)]
+        # 최근 50회차로 평가 (첫 회차는 이전 데이터 없음으로 제외)
+        cutoffs = np.arange(max(1, len(draws) - 49), len(draws))
+        if len(cutoffs) == 0:
+            return np.zeros(15)
 
-            # 각 번호의 특성 추출
-            number_features = {}
-            for num in range(1, 46):
-                features = self.extract_features(past_draws, draw['draw_no'], num)
-                number_features[num] = features
-
-            # 특성별로 상위 15개 번호가 실제 당첨 번호와 얼마나 겹치는지 측정
-            for feat_idx in range(15):
-                # 이 특성 기준 상위 15개 번호
-                sorted_nums = sorted(
-                    number_features.items(),
-                    key=lambda x: x[1][feat_idx],
-                    reverse=True
-                )
-                top_15 = {num for num, _ in sorted_nums[:15]}
-
-                # 실제 당첨 번호와 겹치는 개수
-                hits = len(top_15 & actual_numbers)
-                feature_hits[feat_idx] += hits / 6.0  # 0~1 정규화
-
-        # 평균 hit rate
-        feature_scores = np.array(feature_hits) / len(eval_draws)
+        # 특성별 상위 15개 번호가 실제 당첨 번호와 얼마나 겹치는지 (평균 hit rate, 0~1)
+        evaluator = WalkForwardEvaluator(draws, feature_source=self.feature_tensor)
+        result = evaluator.evaluate({name: name for name in FEATURE_NAMES}, cutoffs=cutoffs, top_ks=(15,))
+        feature_scores = np.array([result['hit_rates'][name][15] for name in FEATURE_NAMES])
 
         # Logic4 가중치 부스팅 (ML 전체 학습 강화)
         feature_scores[3] *= 1.5  # Logic4 50% 증가
@@ -288,50 +292,23 @@ class LottoMLTrainer:
         return train_acc, test_acc
 
     def _calculate_hit_rate(self, draws: List[Dict]) -> float:
-        """Hit rate 계산 (3개 로직 종합 점수 기준)"""
-        if len(draws) < 10:
+        """Hit rate 계산 (4개 로직 종합 점수 기준)"""
+        if len(draws) < 11:
             return 0.0
 
-        hits = 0
-        total = 0
-
-        for i in range(10, len(draws)):
-            past_draws = draws[:i]
-            current_draw = draws[i]
+        from app.services.lotto.walk_forward import WalkForwardEvaluator
 
-            actual_numbers = {
-                current_draw['n1'], current_draw['n2'], current_draw['n3'],
-                current_draw['n4'], current_draw['n5'], current_draw['n6']
-            }
-
-            # 4가지 로직 점수 계산
-            scores1 = LottoStatsCalculator.calculate_ai_scores_logic1(past_draws)
-            scores2 = LottoStatsCalculator.calculate_ai_scores_logic2(past_draws)
-            scores3 = LottoStatsCalculator.calculate_ai_scores_logic3(past_draws)
-            scores4 = LottoStatsCalculator.calculate_ai_scores_logic4(past_draws)
-
-            # 종합 점수
-            final_scores = {}
-            for n in range(1, 46):
-                final_scores[n] = (
-                    scores1.get(n, 0) * self.ai_weights.get('logic1', 0.25) +
-                    scores2.get(n, 0) * self.ai_weights.get('logic2', 0.25) +
-                    scores3.get(n, 0) * self.ai_weights.get('logic3', 0.25) +
-                    scores4.get(n, 0) * self.ai_weights.get('logic4', 0.25)
-                )
-
-            # 상위 15개
-            top_15 = set([num for num, _ in sorted(final_scores.items(), key=lambda x: x[1], reverse=True)[:15]])
-
-            # Hit 계산
-            hits += len(top_15 & actual_numbers)
-            total += 6
-
-        return hits / total if total > 0 else 0.0
+        # 각 회차 직전까지의 로직 점수 가중합 상위 15개 (cutoff = 10 .. len-1)
+        weights = {name: self.ai_weights.get(name, 0.25) for name in ('logic1', 'logic2', 'logic3', 'logic4')}
+        result = WalkForwardEvaluator(draws).evaluate({'ai': weights}, top_ks=(15,))
+        return result['hit_rates']['ai'][15]
 
     def predict_proba(self, draws: List[Dict], target_draw_no: int) -> Dict[int, float]:
         """
-        다음 회차 각 번호의 출현 확률 예측 (특성 가중합)
+        다음 회차 각 번호의 출현 확률 예측
+
+        로지스틱 모델이면 시그모이드(특성 @ 계수 + 절편) 확률,
+        이전 통계 모델이면 특성 중요도 가중합을 0~1로 정규화한 점수
 
         Args:
             draws: 전체 회차 데이터
@@ -343,15 +320,18 @@ class LottoMLTrainer:
         if self.model is None:
             self.load_model()
 
-        predictions = {}
+        features = self.feature_tensor(draws, [target_draw_no])[0]  # (45, 15)
 
-        for number in range(1, 46):
-            features = self.extract_features(draws, target_draw_no, number)
+        if self.model == "logistic" and self.coef is not None:
+            from app.services.lotto.logistic_model import predict_logistic
 
-            # 특성 중요도 기반 가중합
-            score = sum(f * w for f, w in zip(features, self.feature_importance))
+            probs = predict_logistic(features, self.coef, self.intercept)
+            return {number: float(probs[number - 1]) for number in range(1, 46)}
 
-            predictions[number] = float(score)
+        # 특성 중요도 기반 가중합 (45개 번호 한 번에)
+        scores = features @ np.asarray(self.feature_importance, dtype=np.float64)
+
+        predictions = {number: float(scores[number - 1]) for number in range(1, 46)}
 
         # 0~1로 정규화
         min_score = min(predictions.values())
@@ -369,6 +349,8 @@ class LottoMLTrainer:
         model_data = {
             'model': self.model,
             'feature_importance': self.feature_importance,
+            'coef': self.coef,
+            'intercept': self.intercept,
             'ai_weights': self.ai_weights
         }
 
@@ -385,6 +367,9 @@ class LottoMLTrainer:
 
             self.model = model_data['model']
             self.feature_importance = model_data['feature_importance']
+            # 로지스틱 도입 전 모델 파일에는 계수가 없음 (통계 모델로 동작)
+            self.coef = model_data.get('coef')
+            self.intercept = model_data.get('intercept')
             self.ai_weights = model_data['ai_weights']
 
             print(f"✅ 모델 로드 완료: {self.model_path}")
@@ -393,6 +378,23 @@ class LottoMLTrainer:
             print(f"⚠️ 모델 파일 없음: {self.model_path}")
             return False
 
+    def apply_ai_weights(self, weights: Dict[str, float]) -> bool:
+        """
+        외부에서 찾은 로직 가중치(가중치 탐색 결과)를 모델에 반영 후 저장
+
+        Returns:
+            저장 성공 여부 (학습된 모델이 없으면 False)
+        """
+        if not self.load_model():
+            return False
+
+        self.ai_weights = {
+            name: float(weights.get(name, 0.0))
+            for name in ('logic1', 'logic2', 'logic3', 'logic4')
+        }
+        self.save_model()
+        return True
+
     def get_ai_weights(self) -> Dict[str, float]:
         """AI 가중치 반환"""
         if self.model is None:
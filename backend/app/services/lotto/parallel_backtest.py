@@ -0,0 +1,215 @@
+"""병렬 구간 백테스팅 (프로세스 풀)
+
+과거 이력이 고정되면 회차별 평가는 서로 독립이므로, 평가 구간을 여러 묶음(shard)으로 나눠
+프로세스 풀에서 동시에 계산합니다.
+
+- 회차 행렬(draw_no, n1~n6, bonus)과 ML 특성 텐서는 공유 메모리에 한 번만 올리고
+  워커는 읽기 전용으로 붙어서 사용합니다.
+- 난수는 회차별 시드(performance_evaluator.draw_rng)를 쓰므로 워커 수/묶음 크기와 관계없이
+  같은 seed면 같은 결과가 나옵니다.
+- 묶음별 요약(BacktestSummary)은 결합법칙을 만족하도록 누적해 합칩니다.
+"""
+import logging
+import multiprocessing
+import os
+import random
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.lotto.performance_evaluator import BacktestEngine, BacktestSummary
+
+logger = logging.getLogger("parallel_backtest")
+
+# 워커당 묶음 수 (진행률 갱신 단위)
+_SHARDS_PER_WORKER = 4
+
+# 워커 프로세스 전역 상태 (_init_worker에서 설정)
+_worker_engine: Optional[BacktestEngine] = None
+_worker_shms: List[shared_memory.SharedMemory] = []
+
+
+def draws_to_matrix(draws: List[Dict]) -> np.ndarray:
+    """회차 리스트 → (N, 8) int32 행렬 [draw_no, n1..n6, bonus]"""
+    matrix = np.zeros((len(draws), 8), dtype=np.int32)
+    for i, d in enumerate(draws):
+        matrix[i] = (
+            d['draw_no'], d['n1'], d['n2'], d['n3'], d['n4'], d['n5'], d['n6'], d.get('bonus') or 0
+        )
+    return matrix
+
+
+def matrix_to_draws(matrix: np.ndarray) -> List[Dict]:
+    """draws_to_matrix의 역변환"""
+    return [
+        {
+            'draw_no': int(row[0]),
+            'n1': int(row[1]), 'n2': int(row[2]), 'n3': int(row[3]),
+            'n4': int(row[4]), 'n5': int(row[5]), 'n6': int(row[6]),
+            'bonus': int(row[7]),
+        }
+        for row in matrix
+    ]
+
+
+class _ArrayFeatureSource:
+    """미리 계산된 (대상 회차 → 특성) 배열을 조회하는 feature_source"""
+
+    def __init__(self, target_draw_nos: np.ndarray, tensor: np.ndarray, fallback: Callable):
+        self.position = {int(t): i for i, t in enumerate(target_draw_nos)}
+        self.tensor = tensor
+        self.fallback = fallback
+
+    def prefetch(self, draws: List[Dict], target_draw_nos: Sequence[int]) -> None:
+        pass
+
+    def __call__(self, draws: List[Dict], target_draw_nos: Sequence[int]) -> np.ndarray:
+        if all(int(t) in self.position for t in target_draw_nos):
+            return self.tensor[[self.position[int(t)] for t in target_draw_nos]]
+        return self.fallback(draws, target_draw_nos)
+
+
+def _to_shared(array: np.ndarray) -> Tuple[shared_memory.SharedMemory, Tuple, str]:
+    shm = shared_memory.SharedMemory(create=True, size=max(1, array.nbytes))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+    return shm, array.shape, array.dtype.str
+
+
+def _attach(name: str, shape: Tuple, dtype: str) -> np.ndarray:
+    shm = shared_memory.SharedMemory(name=name)
+    _worker_shms.append(shm)
+    view = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+    view.flags.writeable = False
+    return view
+
+
+def _init_worker(draws_spec: Tuple, features_spec: Optional[Tuple], ai_weights: Optional[Dict], seed: int) -> None:
+    """워커 시작 시 공유 메모리에 붙고 평가 엔진을 한 번 만듦"""
+    from app.services.lotto.feature_store import ComputedFeatureSource
+
+    global _worker_engine
+    draws = matrix_to_draws(_attach(*draws_spec))
+
+    feature_source = ComputedFeatureSource(draws)
+    if features_spec is not None:
+        targets_spec, tensor_spec = features_spec
+        feature_source = _ArrayFeatureSource(_attach(*targets_spec), _attach(*tensor_spec), feature_source)
+
+    _worker_engine = BacktestEngine(draws, ai_weights=ai_weights, feature_source=feature_source, seed=seed)
+
+
+def _run_shard(draw_nos: List[int]) -> Tuple[List[Dict], BacktestSummary]:
+    """묶음 평가 → (회차별 결과, 묶음 요약)"""
+    results = []
+    summary = BacktestSummary()
+    for _, result in _worker_engine.iter_draws(draw_nos):
+        if result:
+            results.append(result)
+            summary.add(result)
+    return results, summary
+
+
+def _split_shards(draw_nos: List[int], workers: int) -> List[List[int]]:
+    """회차 순서를 유지한 묶음으로 분할"""
+    n_shards = max(1, min(len(draw_nos), workers * _SHARDS_PER_WORKER))
+    size = -(-len(draw_nos) // n_shards)
+    return [draw_nos[i:i + size] for i in range(0, len(draw_nos), size)]
+
+
+def run_backtest_parallel(
+    draws: List[Dict],
+    start_draw: int,
+    end_draw: int,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+    ai_weights: Optional[Dict] = None,
+    feature_source: Optional[Callable] = None,
+    on_progress: Optional[Callable[[int, int, List[Dict], BacktestSummary], None]] = None,
+    draw_nos: Optional[Sequence[int]] = None,
+) -> Dict:
+    """
+    구간 백테스팅을 프로세스 풀로 병렬 실행
+
+    Args:
+        draws: 전체 회차 데이터
+        start_draw: 시작 회차
+        end_draw: 종료 회차 (포함)
+        workers: 프로세스 수 (None이면 CPU 수)
+        seed: 난수 시드 (None이면 임의로 정해 결과에 기록 - 같은 seed로 재현 가능)
+        ai_weights: AI 가중치 (None이면 현재 ML 모델 가중치)
+        feature_source: ML 특성 공급자 (FeatureStoreSource 등). 구간 특성을 미리 읽어 워커에 공유
+        on_progress: 묶음 완료마다 호출 (완료 회차 수, 전체 회차 수, 묶음 결과, 누적 요약).
+            콜백에서 예외를 던지면 남은 묶음을 취소하고 중단합니다.
+        draw_nos: 평가할 회차 목록 (지정하면 start_draw~end_draw 대신 사용 - 캐시 미스만 계산할 때)
+
+    Returns:
+        {'seed', 'workers', 'results': 회차순 결과, 'summary': BacktestSummary}
+    """
+    draws = sorted(draws, key=lambda d: d['draw_no'])
+    workers = max(1, workers or os.cpu_count() or 1)
+    if seed is None:
+        seed = random.SystemRandom().randrange(2 ** 31)
+
+    draw_nos = sorted(draw_nos) if draw_nos is not None else list(range(start_draw, end_draw + 1))
+    total = len(draw_nos)
+    summary = BacktestSummary()
+    if not draw_nos:
+        return {'seed': seed, 'workers': workers, 'results': [], 'summary': summary}
+
+    shms = []
+    try:
+        shm, shape, dtype = _to_shared(draws_to_matrix(draws))
+        shms.append(shm)
+        draws_spec = (shm.name, shape, dtype)
+
+        # ML 특성: 구간 예측 대상(직전 회차 + 1) 특성을 한 번에 읽어 공유
+        features_spec = None
+        if feature_source is not None:
+            index = {d['draw_no']: i for i, d in enumerate(draws)}
+            targets = sorted({
+                draws[index[n] - 1]['draw_no'] + 1 for n in draw_nos if index.get(n, 0) >= 10
+            })
+            if targets:
+                targets_arr = np.array(targets, dtype=np.int64)
+                tensor = np.ascontiguousarray(feature_source(draws, targets), dtype=np.float64)
+                t_shm, t_shape, t_dtype = _to_shared(targets_arr)
+                f_shm, f_shape, f_dtype = _to_shared(tensor)
+                shms.extend([t_shm, f_shm])
+                features_spec = ((t_shm.name, t_shape, t_dtype), (f_shm.name, f_shape, f_dtype))
+
+        shards = _split_shards(draw_nos, workers)
+        results: List[Dict] = []
+        done = 0
+
+        # fork는 멀티스레드 서버 프로세스에서 안전하지 않으므로 spawn 사용
+        ctx = multiprocessing.get_context("spawn")
+        executor = ProcessPoolExecutor(
+            max_workers=min(workers, len(shards)),
+            mp_context=ctx,
+            initializer=_init_worker,
+            initargs=(draws_spec, features_spec, ai_weights, seed),
+        )
+        try:
+            pending = {executor.submit(_run_shard, shard): shard for shard in shards}
+            while pending:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    shard = pending.pop(future)
+                    shard_results, shard_summary = future.result()
+                    results.extend(shard_results)
+                    summary.merge(shard_summary)
+                    done += len(shard)
+                    if on_progress:
+                        on_progress(done, total, shard_results, summary)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+    finally:
+        for shm in shms:
+            shm.close()
+            shm.unlink()
+
+    results.sort(key=lambda r: r['draw_no'])
+    return {'seed': seed, 'workers': workers, 'results': results, 'summary': summary}
@@ -1,14 +1,52 @@
 """로또 ML 성능 평가 및 백테스팅"""
+import random
 from datetime import datetime
-from typing import Dict, List, Tuple
+from fractions import Fraction
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import numpy as np
 from app.services.lotto.generator import generate_20_lines
 from app.services.lotto.stats_calculator import LottoStatsCalculator
 from app.services.lotto.ml_predictor import LottoMLPredictor
 from app.services.lotto.ml_trainer import LottoMLTrainer
 import json
 
+# 평가용 임시 사용자 ID
+BACKTEST_USER_ID = 99999
 
-def evaluate_single_draw(draw_no: int, ai_weights: dict = None, draws: List[Dict] = None) -> Dict:
+DEFAULT_AI_WEIGHTS = {'logic1': 0.25, 'logic2': 0.25, 'logic3': 0.25, 'logic4': 0.25}
+
+# 관리자 백테스팅 기본 시드 (고정해야 반복 실행 시 결과 캐시를 재사용)
+DEFAULT_BACKTEST_SEED = 0
+
+# ML 5줄 패턴
+ML_PATTERNS = [
+    {'type': 'top_probability', 'params': {}},
+    {'type': 'balanced_zones', 'params': {'zones': (2, 2, 2)}},
+    {'type': 'odd_even_balanced', 'params': {'ratio': (3, 3)}},
+    {'type': 'consecutive_optimal', 'params': {}},
+    {'type': 'sum_range', 'params': {'min': 130, 'max': 140}}
+]
+
+LINE_GROUPS = ('basic', 'logic1', 'logic2', 'logic3', 'final', 'ai_core', 'ml')
+
+
+def draw_rng(seed: Optional[int], draw_no: int) -> Optional[random.Random]:
+    """회차별 난수 생성기 (seed가 None이면 None = random 모듈 사용)
+
+    회차마다 (seed, 회차)로 독립된 생성기를 만들므로 평가 순서와 관계없이 같은 결과가 나옵니다.
+    """
+    if seed is None:
+        return None
+    return random.Random(f"{seed}:{draw_no}")
+
+
+def evaluate_single_draw(
+    draw_no: int,
+    ai_weights: dict = None,
+    draws: List[Dict] = None,
+    feature_source: Optional[Callable] = None,
+    seed: Optional[int] = None,
+) -> Dict:
     """
     단일 회차에 대한 성능 평가
 
@@ -16,6 +54,8 @@ def evaluate_single_draw(draw_no: int, ai_weights: dict = None, draws: List[Dict
         draw_no: 평가할 회차 번호
         ai_weights: AI 가중치 (None이면 현재 ML 모델 가중치 사용)
         draws: 전체 회차 데이터 (제공하지 않으면 내부에서 로드)
+        feature_source: ML 특성 공급자 (feature_store.FeatureStoreSource 등, None이면 즉석 계산)
+        seed: 난수 시드 (draw_rng 참고, None이면 매번 다른 결과)
 
     Returns:
         평가 결과 딕셔너리
@@ -77,7 +117,7 @@ def evaluate_single_draw(draw_no: int, ai_weights: dict = None, draws: List[Dict
 
     # 4. AI 가중치 로드 (또는 제공된 가중치 사용)
     if ai_weights is None:
-        ai_weights = {'logic1': 0.25, 'logic2': 0.25, 'logic3': 0.25, 'logic4': 0.25}
+        ai_weights = dict(DEFAULT_AI_WEIGHTS)
         try:
             trainer = LottoMLTrainer()
             if trainer.load_model() and trainer.ai_weights:
@@ -85,38 +125,46 @@ def evaluate_single_draw(draw_no: int, ai_weights: dict = None, draws: List[Dict
         except Exception:
             pass
 
+    rng = draw_rng(seed, draw_no)
+
     # 5. 20줄 생성
-    user_id = 99999  # 평가용 임시 ID
-    result = generate_20_lines(user_id, stats, ai_weights)
+    result = generate_20_lines(BACKTEST_USER_ID, stats, ai_weights, rng=rng)
 
     # 6. ML 5줄 생성
     ml_lines = []
     try:
-        trainer = LottoMLTrainer()
+        trainer = LottoMLTrainer(feature_source=feature_source)
         if trainer.load_model():
-            predictor = LottoMLPredictor(trainer)
-
-            existing_20_lines = []
-            existing_20_lines.extend(result['basic'])
-            existing_20_lines.extend(result['logic1'])
-            existing_20_lines.extend(result['logic2'])
-            existing_20_lines.extend(result['logic3'])
-            existing_20_lines.extend(result['final'])
-            existing_20_lines.extend(result['ai_core'])
-
-            user_patterns = [
-                {'type': 'top_probability', 'params': {}},
-                {'type': 'balanced_zones', 'params': {'zones': (2, 2, 2)}},
-                {'type': 'odd_even_balanced', 'params': {'ratio': (3, 3)}},
-                {'type': 'consecutive_optimal', 'params': {}},
-                {'type': 'sum_range', 'params': {'min': 130, 'max': 140}}
-            ]
-
-            ml_lines = predictor.generate_ml_5_lines(draws_dict, user_patterns, existing_20_lines)
+            ml_lines = _generate_ml_lines(LottoMLPredictor(trainer), draws_dict, result, rng)
     except Exception as e:
         print(f"⚠️ ML 5줄 생성 실패: {e}")
         ml_lines = []
 
+    return _analyze_lines(draw_no, winning_numbers, result, ml_lines, ai_weights)
+
+
+def _generate_ml_lines(
+    predictor: LottoMLPredictor,
+    past_draws: List[Dict],
+    result: Dict,
+    rng: Optional[random.Random],
+) -> List[List[int]]:
+    """ML 5줄 생성 (기존 20줄과 중복 방지)"""
+    existing_20_lines = []
+    for group in ('basic', 'logic1', 'logic2', 'logic3', 'final', 'ai_core'):
+        existing_20_lines.extend(result[group])
+
+    return predictor.generate_ml_5_lines(past_draws, ML_PATTERNS, existing_20_lines, rng=rng)
+
+
+def _analyze_lines(
+    draw_no: int,
+    winning_numbers: set,
+    result: Dict,
+    ml_lines: List[List[int]],
+    ai_weights: Dict,
+) -> Dict:
+    """25줄 당첨 분석 → 회차 평가 결과"""
     # 7. 25줄 구성
     all_25_lines = {
         'basic': result['basic'],
@@ -131,14 +179,8 @@ def evaluate_single_draw(draw_no: int, ai_weights: dict = None, draws: List[Dict
     # 8. 당첨 분석
     match_3 = match_4 = match_5 = match_6 = 0
     total_matches = 0
-    logic_matches = {
-        'basic': 0, 'logic1': 0, 'logic2': 0, 'logic3': 0,
-        'final': 0, 'ai_core': 0, 'ml': 0
-    }
-    logic_counts = {
-        'basic': 0, 'logic1': 0, 'logic2': 0, 'logic3': 0,
-        'final': 0, 'ai_core': 0, 'ml': 0
-    }
+    logic_matches = {name: 0 for name in LINE_GROUPS}
+    logic_counts = {name: 0 for name in LINE_GROUPS}
 
     for logic_name, lines in all_25_lines.items():
         for line in lines:
@@ -185,6 +227,162 @@ def evaluate_single_draw(draw_no: int, ai_weights: dict = None, draws: List[Dict
     }
 
 
+class BacktestEngine:
+    """
+    구간 백테스팅 엔진 - 평가 컨텍스트를 회차 간에 재사용
+
+    evaluate_single_draw와 같은 결과를 내지만 회차마다 반복하던 작업을 한 번만 합니다.
+    - 통계: ScoreTensorBuilder 누적합으로 cutoff별 최다/최소/보너스 순위와 로직 점수 계산
+    - 모델: 학습 모델/예측기를 한 번만 로드
+    - ML 특성: 평가 구간 대상 회차 특성을 한 번에 조회/계산
+
+    같은 seed면 evaluate_single_draw(..., seed=seed)와 회차별 결과가 같습니다.
+    """
+
+    def __init__(
+        self,
+        draws: List[Dict],
+        ai_weights: Optional[Dict] = None,
+        feature_source: Optional[Callable] = None,
+        seed: Optional[int] = None,
+    ):
+        """
+        Args:
+            draws: 전체 회차 데이터
+            ai_weights: AI 가중치 (None이면 현재 ML 모델 가중치 사용)
+            feature_source: ML 특성 공급자 (None이면 feature_store.ComputedFeatureSource)
+            seed: 난수 시드 (draw_rng 참고)
+        """
+        from app.services.lotto.feature_store import ComputedFeatureSource
+        from app.services.lotto.score_tensor import ScoreTensorBuilder
+
+        self.draws = sorted(draws, key=lambda d: d['draw_no'])
+        self.draw_nos = np.array([d['draw_no'] for d in self.draws], dtype=np.int64)
+        self.index = {d['draw_no']: i for i, d in enumerate(self.draws)}
+        self.seed = seed
+        self.builder = ScoreTensorBuilder(self.draws)
+        self.feature_source = feature_source or ComputedFeatureSource(self.draws)
+
+        # 동점 순위 = 최초 출현 순서 (Counter 삽입 순서)
+        self._tie_rank = np.argsort(np.argsort(self.builder.first_order))
+        self._bonus_tie_rank = self._bonus_first_rank()
+
+        # 모델/예측기 (한 번만 로드)
+        self.trainer = LottoMLTrainer(feature_source=self.feature_source)
+        try:
+            self.model_loaded = self.trainer.load_model()
+        except Exception:
+            self.model_loaded = False
+        self.predictor = LottoMLPredictor(self.trainer) if self.model_loaded else None
+
+        if ai_weights is None:
+            ai_weights = dict(DEFAULT_AI_WEIGHTS)
+            if self.model_loaded and self.trainer.ai_weights:
+                ai_weights = self.trainer.ai_weights
+        self.ai_weights = ai_weights
+
+        self._logic_cache: Dict[int, np.ndarray] = {}
+
+    def _bonus_first_rank(self) -> np.ndarray:
+        order = np.full(45, len(self.draws), dtype=np.int64)
+        for i, d in enumerate(self.draws):
+            b = d.get('bonus')
+            if b and order[b - 1] == len(self.draws):
+                order[b - 1] = i
+        return np.argsort(np.argsort(order, kind='stable'))
+
+    @staticmethod
+    def _ranked(counts: np.ndarray, tie_rank: np.ndarray, descending: bool) -> List[int]:
+        """출현한 번호를 횟수순(동점은 먼저 나온 번호 우선)으로 정렬"""
+        appeared = np.flatnonzero(counts > 0)
+        primary = -counts[appeared] if descending else counts[appeared]
+        order = np.lexsort((tie_rank[appeared], primary))
+        return [int(n) + 1 for n in appeared[order]]
+
+    def prepare(self, draw_nos: List[int]) -> None:
+        """평가 대상 회차의 로직 점수/ML 특성 일괄 계산"""
+        cutoffs = [self.index[n] for n in draw_nos if n in self.index and self.index[n] not in self._logic_cache]
+        if cutoffs:
+            scores = self.builder.logic_scores(np.array(cutoffs))
+            for i, cutoff in enumerate(cutoffs):
+                self._logic_cache[cutoff] = scores[i]
+
+        if self.predictor is not None and hasattr(self.feature_source, 'prefetch'):
+            # ML 예측 대상 = 직전 회차 + 1 (LottoMLPredictor 기준)
+            targets = [
+                self.draws[self.index[n] - 1]['draw_no'] + 1
+                for n in draw_nos if self.index.get(n, 0) >= 10
+            ]
+            self.feature_source.prefetch(self.draws, targets)
+
+    def stats_at(self, cutoff: int) -> Dict:
+        """draws[:cutoff] 기준 20줄 생성용 통계 (evaluate_single_draw의 stats와 동일)"""
+        if cutoff not in self._logic_cache:
+            self._logic_cache[cutoff] = self.builder.logic_scores(np.array([cutoff]))[0]
+        logic = self._logic_cache[cutoff]
+
+        counts = self.builder.cum[cutoff]
+        bonus_counts = self.builder.bonus_cum[cutoff]
+
+        return {
+            'most_common': self._ranked(counts, self._tie_rank, descending=True)[:15],
+            'least_common': self._ranked(counts, self._tie_rank, descending=False)[:15],
+            'scores_logic1': {n: float(logic[0, n - 1]) for n in range(1, 46)},
+            'scores_logic2': {n: float(logic[1, n - 1]) for n in range(1, 46)},
+            'scores_logic3': {n: float(logic[2, n - 1]) for n in range(1, 46)},
+            'bonus_top': self._ranked(bonus_counts, self._bonus_tie_rank, descending=True),
+        }
+
+    def _evaluate_at(self, cutoff: int, stats: Dict, ai_weights: Dict) -> Dict:
+        draw = self.draws[cutoff]
+        draw_no = draw['draw_no']
+        winning_numbers = {draw['n1'], draw['n2'], draw['n3'], draw['n4'], draw['n5'], draw['n6']}
+        rng = draw_rng(self.seed, draw_no)
+
+        result = generate_20_lines(BACKTEST_USER_ID, stats, ai_weights, rng=rng)
+
+        ml_lines = []
+        if self.predictor is not None:
+            try:
+                ml_lines = _generate_ml_lines(self.predictor, self.draws[:cutoff], result, rng)
+            except Exception as e:
+                print(f"⚠️ ML 5줄 생성 실패: {e}")
+                ml_lines = []
+
+        return _analyze_lines(draw_no, winning_numbers, result, ml_lines, ai_weights)
+
+    def evaluate(self, draw_no: int) -> Optional[Dict]:
+        """단일 회차 평가 (데이터가 없거나 이력이 10회 미만이면 None)"""
+        cutoff = self.index.get(draw_no)
+        if cutoff is None or cutoff < 10:
+            return None
+        return self._evaluate_at(cutoff, self.stats_at(cutoff), self.ai_weights)
+
+    def evaluate_configs(self, draw_no: int, weight_sets: Dict[str, Dict]) -> Optional[Dict[str, Dict]]:
+        """
+        여러 가중치로 같은 회차 평가 {이름: 결과}
+
+        통계/로직 점수/ML 특성은 한 번만 만들고 가중치별로는 줄 생성과 당첨 분석만 반복합니다.
+        가중치마다 같은 회차 난수열(draw_rng)로 시작하므로 가중치 외 차이는 없습니다.
+        """
+        cutoff = self.index.get(draw_no)
+        if cutoff is None or cutoff < 10:
+            return None
+        stats = self.stats_at(cutoff)
+        return {name: self._evaluate_at(cutoff, stats, weights) for name, weights in weight_sets.items()}
+
+    def iter_draws(self, draw_nos: List[int]) -> Iterator[Tuple[int, Optional[Dict]]]:
+        """주어진 회차들을 순서대로 평가하며 (회차, 결과)를 하나씩 내보냄"""
+        draw_nos = list(draw_nos)
+        self.prepare(draw_nos)
+        for draw_no in draw_nos:
+            yield draw_no, self.evaluate(draw_no)
+
+    def iter_range(self, start_draw: int, end_draw: int) -> Iterator[Tuple[int, Optional[Dict]]]:
+        """구간 회차를 순서대로 평가하며 (회차, 결과)를 하나씩 내보냄"""
+        return self.iter_draws(range(start_draw, end_draw + 1))
+
+
 def evaluate_latest_draw(draws: List[Dict]) -> Dict:
     """
     가장 최근 회차에 대한 성능 평가
@@ -238,10 +436,10 @@ def backtest_multiple_draws(draws: List[Dict], start_draw: int, end_draw: int) -
         평가 결과 리스트
     """
     results = []
+    engine = BacktestEngine(draws)
 
-    for draw_no in range(start_draw, end_draw + 1):
+    for draw_no, evaluation_result in engine.iter_range(start_draw, end_draw):
         print(f"\n🔍 {draw_no}회 백테스팅...")
-        evaluation_result = evaluate_single_draw(draw_no, draws=draws)
 
         if evaluation_result:
             results.append(evaluation_result)
@@ -253,6 +451,144 @@ def backtest_multiple_draws(draws: List[Dict], start_draw: int, end_draw: int) -
     return results
 
 
+def run_backtest_range(
+    draws: List[Dict],
+    start_draw: int,
+    end_draw: int,
+    on_progress: Optional[Callable[[int, int, Optional[Dict]], None]] = None,
+    feature_source: Optional[Callable] = None,
+    seed: Optional[int] = None,
+) -> List[Dict]:
+    """
+    구간 백테스팅 (관리자 작업용)
+
+    Args:
+        draws: 전체 회차 데이터
+        start_draw: 시작 회차
+        end_draw: 종료 회차 (포함)
+        on_progress: 회차마다 호출되는 콜백 (완료 수, 전체 수, 회차 결과).
+            콜백에서 예외를 던지면 백테스팅이 중단됩니다 (작업 취소용).
+        feature_source: ML 특성 공급자 (evaluate_single_draw 참고)
+        seed: 난수 시드 (같은 seed면 같은 결과)
+
+    Returns:
+        평가 결과 리스트
+    """
+    results = []
+    total = max(0, end_draw - start_draw + 1)
+    engine = BacktestEngine(draws, feature_source=feature_source, seed=seed)
+
+    for i, (draw_no, evaluation_result) in enumerate(engine.iter_range(start_draw, end_draw), start=1):
+        if evaluation_result:
+            results.append(evaluation_result)
+        if on_progress:
+            on_progress(i, total, evaluation_result)
+
+    return results
+
+
+def format_backtest_result(result: Dict) -> Dict:
+    """회차별 백테스팅 결과를 응답용으로 정리"""
+    return {
+        "draw_no": result["draw_no"],
+        "total_lines": result["total_lines"],
+        "match_3": result["match_3"],
+        "match_4": result["match_4"],
+        "match_5": result["match_5"],
+        "match_6": result["match_6"],
+        "avg_matches_per_line": round(result["avg_matches_per_line"], 2),
+        "performance_score": round(result["performance_score"], 2),
+        "logic_scores": {k: round(v, 2) for k, v in result["logic_scores"].items()},
+    }
+
+
+class BacktestSummary:
+    """
+    백테스팅 요약 누적기
+
+    합계를 정수/분수(Fraction)로 정확히 누적하므로 merge가 결합법칙을 만족합니다.
+    회차를 어떤 순서/묶음으로 나눠 더해도 같은 요약이 나옵니다 (병렬 백테스팅용).
+    """
+
+    def __init__(self):
+        self.total_draws = 0
+        self.total_lines = 0
+        self.match_counts = {3: 0, 4: 0, 5: 0, 6: 0}
+        self.performance_sum = Fraction(0)
+        self.avg_matches_sum = Fraction(0)
+        self.logic_sums: Dict[str, Fraction] = {}
+        self.logic_draws: Dict[str, int] = {}
+
+    def add(self, result: Dict) -> "BacktestSummary":
+        """회차 평가 결과 1개 추가"""
+        self.total_draws += 1
+        self.total_lines += result['total_lines']
+        for k in self.match_counts:
+            self.match_counts[k] += result[f'match_{k}']
+        self.performance_sum += Fraction(result['performance_score'])
+        self.avg_matches_sum += Fraction(result['avg_matches_per_line'])
+        for logic_name, score in result['logic_scores'].items():
+            self.logic_sums[logic_name] = self.logic_sums.get(logic_name, Fraction(0)) + Fraction(score)
+            self.logic_draws[logic_name] = self.logic_draws.get(logic_name, 0) + 1
+        return self
+
+    def merge(self, other: "BacktestSummary") -> "BacktestSummary":
+        """다른 누적기 합치기"""
+        self.total_draws += other.total_draws
+        self.total_lines += other.total_lines
+        for k in self.match_counts:
+            self.match_counts[k] += other.match_counts[k]
+        self.performance_sum += other.performance_sum
+        self.avg_matches_sum += other.avg_matches_sum
+        for logic_name, total in other.logic_sums.items():
+            self.logic_sums[logic_name] = self.logic_sums.get(logic_name, Fraction(0)) + total
+            self.logic_draws[logic_name] = self.logic_draws.get(logic_name, 0) + other.logic_draws[logic_name]
+        return self
+
+    def to_dict(self) -> Dict:
+        """관리자 API 응답의 summary 형식"""
+        total_draws = self.total_draws
+        total_lines = self.total_lines
+
+        def rate(count: int) -> float:
+            return round(count / total_lines * 100, 2) if total_lines else 0
+
+        # 로직별 평균 점수 (등장 순서 유지)
+        logic_order = [name for name in LINE_GROUPS if name in self.logic_sums]
+        logic_order += [name for name in self.logic_sums if name not in LINE_GROUPS]
+
+        return {
+            "total_draws": total_draws,
+            "total_lines": total_lines,
+            "total_match_3": self.match_counts[3],
+            "total_match_4": self.match_counts[4],
+            "total_match_5": self.match_counts[5],
+            "total_match_6": self.match_counts[6],
+            "avg_performance_score": round(float(self.performance_sum / total_draws), 2) if total_draws else 0,
+            "avg_matches_per_line": round(float(self.avg_matches_sum / total_draws), 2) if total_draws else 0,
+            "logic_avg_scores": {
+                name: round(float(self.logic_sums[name] / self.logic_draws[name]), 2)
+                for name in logic_order
+            },
+            "match_3_rate": rate(self.match_counts[3]),
+            "match_4_rate": rate(self.match_counts[4]),
+            "match_5_rate": rate(self.match_counts[5]),
+            "match_6_rate": rate(self.match_counts[6]),
+        }
+
+
+def summarize_backtest(results: List[Dict]) -> Dict:
+    """백테스팅 결과 요약 (관리자 API 응답 형식)"""
+    summary = BacktestSummary()
+    for r in results:
+        summary.add(r)
+
+    return {
+        "summary": summary.to_dict(),
+        "results": [format_backtest_result(r) for r in sorted(results, key=lambda r: r['draw_no'])],
+    }
+
+
 def print_backtest_summary(results: List[Dict]) -> None:
     """백테스팅 결과 요약 출력"""
     if not results:
@@ -0,0 +1,304 @@
+"""번호 풀 압축 인코딩
+
+추천 로그의 풀 상태를 JSON 대신 고정 크기 컬럼에 저장합니다.
+    - pool_packed: 줄마다 6개 조합 순위(0 ~ C(45,6)-1)를 int32 리틀엔디언으로 이어 붙인 값 (VIP 20줄 = 80바이트)
+    - revealed_mask: 공개된 줄 비트마스크 (비트 i = i번째 줄, 풀은 최대 20줄)
+    - exclude_mask / fixed_mask: 제외/고정 번호 비트마스크 (비트 n = 번호 n, bitmask.numbers_to_mask와 동일)
+
+read_*/write_* 접근 함수는 압축 컬럼이 있으면 그것을, 없으면(기존 행) JSON 컬럼
+(pool_lines/revealed_indices/settings_data)을 읽어 같은 값을 돌려주므로 호출 측은 저장 형식을 몰라도 됩니다.
+기존 행 변환은 pool_encoding_migrate 작업이 맡고, 변환 전 행도 다음 공개 시 압축 형식으로 바뀝니다.
+"""
+import logging
+import struct
+from bisect import bisect_right
+from functools import lru_cache
+from math import comb
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.config import settings as app_settings
+from app.db.models import LottoRecommendLog
+from app.services.lotto.bitmask import mask_to_numbers, numbers_to_mask
+
+logger = logging.getLogger("pool_codec")
+
+LINE_SIZE = 6
+MAX_NUMBER = 45
+
+# _COMB[a][k] = C(a, k) (조합 순위 계산용)
+_COMB = [[comb(a, k) for k in range(LINE_SIZE + 1)] for a in range(MAX_NUMBER + 1)]
+# _COMB_BY_K[k] = [C(0, k), C(1, k), ..., C(44, k)] (k별 오름차순 - 역변환 이분 탐색용)
+_COMB_BY_K = [[comb(a, k) for a in range(MAX_NUMBER)] for k in range(LINE_SIZE + 1)]
+
+# 변환 작업 시 한 번에 처리하는 로그 수
+_MIGRATE_CHUNK = 2000
+
+
+# ============================================
+# 코덱
+# ============================================
+
+def rank_line(line: List[int]) -> int:
+    """6개 번호 조합 → 순위 (colex, 0 ~ 8,145,059)"""
+    return sum(_COMB[n - 1][k + 1] for k, n in enumerate(sorted(line)))
+
+
+def unrank_line(rank: int) -> List[int]:
+    """순위 → 오름차순 6개 번호 (자리마다 C(a, k) <= 순위인 최대 a를 이분 탐색)"""
+    numbers = [0] * LINE_SIZE
+    for k in range(LINE_SIZE, 0, -1):
+        a = bisect_right(_COMB_BY_K[k], rank) - 1
+        numbers[k - 1] = a + 1
+        rank -= _COMB_BY_K[k][a]
+    return numbers
+
+
+def pack_pool(pool: List[List[int]]) -> Optional[bytes]:
+    """풀 → int32 순위 배열 바이트 (6개 서로 다른 1~45 번호가 아닌 줄이 있으면 None)"""
+    ranks = []
+    for line in pool:
+        numbers = set(line)
+        if len(line) != LINE_SIZE or len(numbers) != LINE_SIZE or not all(1 <= n <= MAX_NUMBER for n in numbers):
+            return None
+        ranks.append(rank_line(line))
+    return struct.pack(f"<{len(ranks)}i", *ranks)
+
+
+@lru_cache(maxsize=4096)
+def _unpack_cached(data: bytes) -> Tuple[Tuple[int, ...], ...]:
+    return tuple(tuple(unrank_line(rank)) for rank in struct.unpack(f"<{len(data) // 4}i", data))
+
+
+def unpack_pool(data: bytes) -> List[List[int]]:
+    """int32 순위 배열 바이트 → 풀 (같은 풀의 반복 조회는 캐시)"""
+    return [list(line) for line in _unpack_cached(bytes(data))]
+
+
+def indices_to_mask(indices) -> int:
+    """줄 인덱스 목록 → 비트마스크"""
+    mask = 0
+    for i in indices:
+        mask |= 1 << int(i)
+    return mask
+
+
+def mask_to_indices(mask: int) -> List[int]:
+    """비트마스크 → 오름차순 줄 인덱스"""
+    return [i for i in range(int(mask).bit_length()) if mask >> i & 1]
+
+
+# ============================================
+# 접근 함수 (압축 컬럼 우선, 없으면 JSON 컬럼)
+# ============================================
+
+def is_packed(log) -> bool:
+    return log.pool_packed is not None
+
+
+def read_pool(log) -> List[List[int]]:
+    """전체 풀 (없으면 빈 리스트)"""
+    if is_packed(log):
+        return unpack_pool(log.pool_packed)
+    from app.services.lotto.pool_service import PoolService
+    return PoolService.from_json(log.pool_lines, None) or []
+
+
+def read_revealed(log) -> List[int]:
+    """공개된 줄 인덱스 (오름차순)"""
+    if is_packed(log):
+        return mask_to_indices(log.revealed_mask or 0)
+    from app.services.lotto.pool_service import PoolService
+    return sorted(set(PoolService.from_json(log.revealed_indices, None) or []))
+
+
+def read_settings(log) -> Dict[str, List[int]]:
+    """풀 생성 설정 {"exclude": [...], "fixed": [...]}"""
+    if is_packed(log):
+        return {
+            "exclude": mask_to_numbers(log.exclude_mask or 0),
+            "fixed": mask_to_numbers(log.fixed_mask or 0),
+        }
+    from app.services.lotto.pool_service import PoolService
+    data = PoolService.from_json(log.settings_data, None)
+    if not isinstance(data, dict):
+        data = {}
+    return {"exclude": data.get("exclude", []), "fixed": data.get("fixed", [])}
+
+
+def _other_settings(log) -> Optional[dict]:
+    """settings_data에서 풀 설정 외 키(fixed_candidates 등)만 남김"""
+    from app.services.lotto.pool_service import PoolService
+    data = PoolService.from_json(log.settings_data, None)
+    if not isinstance(data, dict):
+        return None
+    rest = {key: value for key, value in data.items() if key not in ("exclude", "fixed")}
+    return rest or None
+
+
+def _packed_values(pool, revealed, exclude, fixed) -> Optional[Dict]:
+    packed = pack_pool(pool)
+    if packed is None:
+        return None
+    return {
+        "pool_packed": packed,
+        "revealed_mask": indices_to_mask(revealed),
+        "exclude_mask": numbers_to_mask(exclude),
+        "fixed_mask": numbers_to_mask(fixed),
+    }
+
+
+def write_pool(log: LottoRecommendLog, pool: List[List[int]],
+               exclude: List[int], fixed: List[int]) -> None:
+    """새 풀 저장 (공개 상태 초기화) - POOL_COMPACT_ENCODING이면 압축 컬럼, 아니면 JSON 컬럼"""
+    packed = _packed_values(pool, [], exclude, fixed) if app_settings.POOL_COMPACT_ENCODING else None
+    if packed:
+        for key, value in packed.items():
+            setattr(log, key, value)
+        log.pool_lines = None
+        log.revealed_indices = None
+        log.settings_data = _other_settings(log)
+        return
+
+    log.pool_packed = None
+    log.revealed_mask = None
+    log.exclude_mask = None
+    log.fixed_mask = None
+    log.pool_lines = pool
+    log.revealed_indices = []
+    log.settings_data = {**(_other_settings(log) or {}), "exclude": exclude, "fixed": fixed}
+
+
+def write_revealed(log: LottoRecommendLog, indices: List[int]) -> None:
+    """공개 인덱스 저장 (JSON 행은 압축 모드면 이때 압축 형식으로 변환)"""
+    if is_packed(log):
+        log.revealed_mask = indices_to_mask(indices)
+        return
+
+    if app_settings.POOL_COMPACT_ENCODING:
+        current = read_settings(log)
+        packed = _packed_values(read_pool(log), indices, current["exclude"], current["fixed"])
+        if packed:
+            for key, value in packed.items():
+                setattr(log, key, value)
+            log.pool_lines = None
+            log.revealed_indices = None
+            log.settings_data = _other_settings(log)
+            return
+
+    log.revealed_indices = sorted(indices)
+
+
+# ============================================
+# 기존 행 변환
+# ============================================
+
+def migrate_pool_encoding(
+    db: Session,
+    chunk_size: int = _MIGRATE_CHUNK,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict:
+    """
+    JSON 풀 컬럼을 압축 컬럼으로 변환 (id 순 청크 커밋 - 중단 후 다시 실행해도 이어서 처리)
+
+    UPDATE는 pool_packed가 아직 NULL인 행에만 적용되므로 변환 도중 공개 요청이
+    먼저 압축 형식으로 바꾼 행은 덮어쓰지 않습니다.
+    """
+    from sqlalchemy import bindparam, func
+
+    pending = (LottoRecommendLog.pool_packed.is_(None), LottoRecommendLog.pool_lines.isnot(None))
+    total = db.query(func.count(LottoRecommendLog.id)).filter(*pending).scalar() or 0
+
+    table = LottoRecommendLog.__table__
+    stmt = update(table).where(
+        table.c.id == bindparam("log_id"),
+        table.c.pool_packed.is_(None),
+    ).values(
+        pool_packed=bindparam("pool_packed"),
+        revealed_mask=bindparam("revealed_mask"),
+        exclude_mask=bindparam("exclude_mask"),
+        fixed_mask=bindparam("fixed_mask"),
+        pool_lines=None,
+        revealed_indices=None,
+        settings_data=bindparam("settings_data"),
+    )
+
+    last_id = 0
+    done = 0
+    converted = 0
+    while True:
+        logs = db.query(
+            LottoRecommendLog.id, LottoRecommendLog.pool_packed, LottoRecommendLog.pool_lines,
+            LottoRecommendLog.revealed_indices, LottoRecommendLog.settings_data,
+        ).filter(
+            *pending, LottoRecommendLog.id > last_id
+        ).order_by(LottoRecommendLog.id).limit(chunk_size).all()
+        if not logs:
+            break
+
+        rows = []
+        empty_ids = []
+        for log in logs:
+            pool = read_pool(log)
+            if not pool:
+                empty_ids.append(log.id)
+                continue
+            current = read_settings(log)
+            packed = _packed_values(pool, read_revealed(log), current["exclude"], current["fixed"])
+            if packed:
+                rows.append({"log_id": log.id, "settings_data": _other_settings(log), **packed})
+        if rows:
+            db.execute(stmt, rows)
+        if empty_ids:
+            # 빈 풀('[]' 등)은 NULL로 정리해 다음 실행에서 다시 읽지 않음
+            db.execute(
+                update(LottoRecommendLog)
+                .where(LottoRecommendLog.id.in_(empty_ids))
+                .values(pool_lines=None)
+            )
+        db.commit()
+
+        last_id = logs[-1].id
+        done += len(logs)
+        converted += len(rows)
+        if on_progress:
+            on_progress(done, total)
+
+    logger.info(f"Pool encoding migrated: {converted}/{done} logs")
+    return {"logs": done, "converted": converted}
+
+
+def request_pool_encoding_migration(db: Session) -> Optional[str]:
+    """압축 모드인데 JSON 풀이 남은 로그가 있으면 변환 작업 등록 (이미 대기/실행 중이면 등록하지 않음)"""
+    from app.db.models import AdminJob
+    from app.services.jobs import submit_job, JobQueueFull
+    from app.services.jobs.job_runner import ACTIVE_STATUSES
+
+    if not app_settings.POOL_COMPACT_ENCODING:
+        return None
+
+    try:
+        pending = db.query(LottoRecommendLog.id).filter(
+            LottoRecommendLog.pool_packed.is_(None),
+            LottoRecommendLog.pool_lines.isnot(None),
+        ).first()
+        if not pending:
+            return None
+
+        active = db.query(AdminJob.id).filter(
+            AdminJob.job_type == "pool_encoding_migrate",
+            AdminJob.status.in_(ACTIVE_STATUSES),
+        ).first()
+        if active:
+            return active[0]
+
+        return submit_job(db, "pool_encoding_migrate", {}).id
+    except JobQueueFull:
+        logger.warning("풀 인코딩 변환 작업 등록 실패: 대기 작업 초과")
+        return None
+    except Exception:
+        db.rollback()
+        logger.exception("풀 인코딩 변환 상태 확인 실패")
+        return None
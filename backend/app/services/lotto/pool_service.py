@@ -9,11 +9,12 @@ import json
 import random
 import logging
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from sqlalchemy.orm import Session
-from sqlalchemy.orm.attributes import flag_modified
 
-from app.db.models import LottoRecommendLog, LottoDraw
+from app.db.models import LottoRecommendLog
+from app.services.lotto.pool_codec import read_pool, read_revealed, read_settings, write_pool, write_revealed
+from app.services.lotto.stats_snapshot import get_stats_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -47,13 +48,20 @@ class PoolService:
     번호 풀 관리 통합 서비스
 
     모든 풀 관련 DB 접근은 이 클래스를 통해서만 수행
-    - JSON 변환 일원화
+    - JSON 변환 일원화 (풀 상태 읽기/쓰기는 pool_codec 접근 함수 - 압축/JSON 형식 공통)
     - 비즈니스 로직 중앙화
     - 에러 처리 통합
     """
 
-    def __init__(self, db: Session):
+    def __init__(self, db: Session,
+                 stats_provider: Optional[Callable[[Session], Optional[dict]]] = None):
+        """
+        Args:
+            db: DB 세션
+            stats_provider: 번호 생성용 통계 제공 함수 (기본: 프로세스 캐시 스냅샷 get_stats_snapshot)
+        """
         self.db = db
+        self.stats_provider = stats_provider or get_stats_snapshot
 
     # ============================================
     # JSON 변환 (통합)
@@ -97,20 +105,67 @@ class PoolService:
             LottoRecommendLog.plan_type == plan_type,
         ).first()
 
-    def _build_stats(self) -> Optional[dict]:
-        """통계 데이터 생성 (번호 생성에 필요)"""
-        # 순환 import 방지를 위해 함수 내에서 import
-        from . import build_stats_from_draws, draws_to_dict_list
+    def _has_pool(self, log: LottoRecommendLog, exclude: List[int], fixed: List[int]) -> bool:
+        """풀이 있고 설정(제외/고정)이 같은지 확인"""
+        if log.pool_packed is None and not self.from_json(log.pool_lines, None):
+            return False
+        existing_settings = read_settings(log)
+        return (sorted(existing_settings["exclude"]) == exclude and
+                sorted(existing_settings["fixed"]) == fixed)
 
-        draws = self.db.query(LottoDraw).order_by(
-            LottoDraw.draw_no.desc()
-        ).limit(200).all()
+    def _claim_log(self, user_id: int, target_draw_no: int, plan_type: str) -> int:
+        """
+        빈 추천 로그 행 확보 (INSERT ... ON CONFLICT DO NOTHING)
 
-        if not draws:
-            logger.warning("로또 추첨 데이터가 없습니다")
-            return None
+        동시 첫 요청이 같은 행을 동시에 INSERT해도 IntegrityError 없이 한 행으로 모입니다.
+        풀은 행 잠금 후 채웁니다.
+        """
+        from app.db.upsert import dialect_insert
+
+        self.db.execute(
+            dialect_insert(self.db, LottoRecommendLog).values(
+                user_id=user_id,
+                account_user_id=user_id,
+                target_draw_no=target_draw_no,
+                lines=self.to_json([]),
+                recommend_time=datetime.utcnow(),
+                plan_type=plan_type,
+                revealed_indices=[],
+                is_matched=False,
+            ).on_conflict_do_nothing(
+                index_elements=["account_user_id", "target_draw_no", "plan_type"]
+            )
+        )
+        return self.db.query(LottoRecommendLog.id).filter(
+            LottoRecommendLog.account_user_id == user_id,
+            LottoRecommendLog.target_draw_no == target_draw_no,
+            LottoRecommendLog.plan_type == plan_type,
+        ).scalar()
+
+    def _lock_log(self, log_id: int) -> LottoRecommendLog:
+        """
+        추천 로그 행 잠금 후 최신 값으로 다시 읽기 (커밋/롤백 시 해제)
+
+        PostgreSQL은 SELECT ... FOR UPDATE로 해당 행만 잠그고, 행 잠금이 없는 SQLite는
+        BEGIN IMMEDIATE로 쓰기 잠금을 먼저 잡습니다. 동시 요청은 앞 요청의 커밋까지 대기한 뒤
+        갱신된 값을 읽으므로 공개 인덱스가 유실되지 않습니다.
+        """
+        if self.db.get_bind().dialect.name == "sqlite":
+            connection = self.db.connection()
+            # 이미 쓰기 트랜잭션 중이면 쓰기 잠금을 보유한 상태
+            if not connection.connection.dbapi_connection.in_transaction:
+                connection.exec_driver_sql("BEGIN IMMEDIATE")
 
-        return build_stats_from_draws(draws_to_dict_list(draws))
+        return self.db.query(LottoRecommendLog).filter(
+            LottoRecommendLog.id == log_id
+        ).populate_existing().with_for_update().one()
+
+    def _build_stats(self) -> Optional[dict]:
+        """통계 데이터 조회 (번호 생성에 필요, 회차가 바뀌기 전까지 캐시된 스냅샷 공유)"""
+        stats = self.stats_provider(self.db)
+        if not stats:
+            logger.warning("로또 추첨 데이터가 없습니다")
+        return stats
 
     def _generate_pool(self, plan_type: str, stats: Optional[dict],
                        exclude: List[int] = None,
@@ -183,7 +238,10 @@ class PoolService:
                 settings: {exclude: [], fixed: []}
             }
         """
-        log = self._get_log(user_id, target_draw_no, plan_type)
+        return self.status_from_log(self._get_log(user_id, target_draw_no, plan_type), plan_type)
+
+    def status_from_log(self, log: Optional[LottoRecommendLog], plan_type: str) -> dict:
+        """이미 조회한 추천 로그 → 풀 상태 (get_pool_status와 같은 형식, 로그가 없으면 빈 풀)"""
         max_lines = PLAN_LINE_LIMITS.get(plan_type, 1)
 
         if not log:
@@ -196,12 +254,12 @@ class PoolService:
                 "settings": {"exclude": [], "fixed": []},
             }
 
-        pool = self.from_json(log.pool_lines, [])
-        revealed = self.from_json(log.revealed_indices, [])
-        settings = self.from_json(log.settings_data, {"exclude": [], "fixed": []})
+        pool = read_pool(log)
+        revealed = read_revealed(log)
+        settings = read_settings(log)
 
         pool_total = len(pool) if pool else max_lines
-        revealed_lines = [pool[i] for i in sorted(revealed)] if pool else []
+        revealed_lines = [pool[i] for i in revealed] if pool else []
 
         return {
             "pool_exists": bool(pool),
@@ -218,64 +276,36 @@ class PoolService:
         """
         풀 조회 또는 생성
 
-        - 기존 풀이 있고 설정이 같으면 재사용
+        - 기존 풀이 있고 설정이 같으면 재사용 (잠금 없음)
         - 설정이 다르면 새 풀 생성 (기존 풀 교체)
         - 풀이 없으면 새로 생성
+
+        번호 생성은 잠금 밖에서 하고, 행 잠금 후 다시 확인해 동시 요청이 먼저 만든 풀이
+        있으면 그 풀을 사용합니다.
         """
         exclude = sorted(exclude or [])
         fixed = sorted(fixed or [])
         settings = {"exclude": exclude, "fixed": fixed}
 
         log = self._get_log(user_id, target_draw_no, plan_type)
-
-        if log:
-            existing_pool = self.from_json(log.pool_lines, None)
-            existing_settings = self.from_json(log.settings_data, {"exclude": [], "fixed": []})
-
-            # 풀이 있고 설정이 같으면 재사용
-            if existing_pool:
-                if (existing_settings.get("exclude", []) == exclude and
-                    existing_settings.get("fixed", []) == fixed):
-                    logger.debug(f"기존 풀 재사용: user={user_id}, draw={target_draw_no}")
-                    return log
-
-            # 설정 변경 또는 풀 없음 → 새로 생성
-            logger.info(f"풀 재생성: user={user_id}, 설정 변경={settings}")
-            stats = self._build_stats()
-            pool = self._generate_pool(plan_type, stats, exclude, fixed)
-
-            log.pool_lines = pool
-            log.revealed_indices = []
-            log.lines = self.to_json([])
-            log.settings_data = self.to_json(settings)
-            # JSON 컬럼 변경 명시적 알림
-            flag_modified(log, "pool_lines")
-            flag_modified(log, "revealed_indices")
-            flag_modified(log, "lines")
-            flag_modified(log, "settings_data")
-            self.db.commit()
+        if log and self._has_pool(log, exclude, fixed):
+            logger.debug(f"기존 풀 재사용: user={user_id}, draw={target_draw_no}")
             return log
 
-        # 새 로그 생성
-        logger.info(f"새 풀 생성: user={user_id}, plan={plan_type}")
         stats = self._build_stats()
         pool = self._generate_pool(plan_type, stats, exclude, fixed)
 
-        log = LottoRecommendLog(
-            user_id=user_id,
-            account_user_id=user_id,
-            target_draw_no=target_draw_no,
-            lines=self.to_json([]),
-            recommend_time=datetime.utcnow(),
-            plan_type=plan_type,
-            pool_lines=pool,
-            revealed_indices=[],
-            settings_data=self.to_json(settings),
-            is_matched=False,
-        )
-        self.db.add(log)
+        log_id = log.id if log else self._claim_log(user_id, target_draw_no, plan_type)
+        log = self._lock_log(log_id)
+        if self._has_pool(log, exclude, fixed):
+            logger.debug(f"동시 요청이 생성한 풀 사용: user={user_id}, draw={target_draw_no}")
+            self.db.commit()
+            return log
+
+        logger.info(f"풀 생성: user={user_id}, plan={plan_type}, 설정={settings}")
+        write_pool(log, pool, exclude, fixed)
+        log.lines = self.to_json([])
         self.db.commit()
-        self.db.refresh(log)
         return log
 
     def reveal_one_line(self, user_id: int, target_draw_no: int,
@@ -284,6 +314,9 @@ class PoolService:
         """
         1줄 공개
 
+        행 잠금 → 미공개 인덱스 선택 → 공개 컬럼 UPDATE → 커밋 순으로 처리하므로
+        동시에 눌러도 같은 줄이 두 번 공개되거나 공개 기록이 덮어써지지 않습니다.
+
         Returns:
             {
                 success: bool,
@@ -297,14 +330,16 @@ class PoolService:
             }
         """
         log = self.get_or_create_pool(user_id, target_draw_no, plan_type, exclude, fixed)
+        log = self._lock_log(log.id)
 
-        pool = self.from_json(log.pool_lines, [])
-        revealed = self.from_json(log.revealed_indices, [])
-        settings = self.from_json(log.settings_data, {"exclude": [], "fixed": []})
+        pool = read_pool(log)
+        revealed = read_revealed(log)
+        settings = read_settings(log)
 
         # 이미 모두 공개됨
         if len(revealed) >= len(pool):
-            revealed_lines = [pool[i] for i in sorted(revealed)]
+            self.db.commit()
+            revealed_lines = [pool[i] for i in revealed]
             return {
                 "success": False,
                 "message": "이미 모든 번호를 받았습니다.",
@@ -322,18 +357,14 @@ class PoolService:
         selected_line = pool[selected_idx]
 
         # 업데이트
-        revealed.append(selected_idx)
-        revealed_lines = [pool[i] for i in sorted(revealed)]
+        revealed = sorted(revealed + [selected_idx])
+        revealed_lines = [pool[i] for i in revealed]
 
-        # 새 리스트로 할당하여 SQLAlchemy가 변경 감지하도록 함
-        log.revealed_indices = list(revealed)
+        write_revealed(log, revealed)
         log.lines = self.to_json(revealed_lines)
-        # JSON 컬럼 변경 명시적 알림
-        flag_modified(log, "revealed_indices")
-        flag_modified(log, "lines")
         self.db.commit()
 
-        logger.info(f"1줄 공개: user={user_id}, {len(revealed)}/{len(pool)}, indices={log.revealed_indices}")
+        logger.info(f"1줄 공개: user={user_id}, {len(revealed)}/{len(pool)}, index={selected_idx}")
 
         return {
             "success": True,
@@ -349,7 +380,7 @@ class PoolService:
                          plan_type: str, exclude: List[int] = None,
                          fixed: List[int] = None) -> dict:
         """
-        전체 공개
+        전체 공개 (행 잠금 후 처리, 이미 모두 공개된 풀은 쓰기 없음)
 
         Returns:
             {
@@ -362,21 +393,18 @@ class PoolService:
             }
         """
         log = self.get_or_create_pool(user_id, target_draw_no, plan_type, exclude, fixed)
+        log = self._lock_log(log.id)
 
-        pool = self.from_json(log.pool_lines, [])
-        revealed = self.from_json(log.revealed_indices, [])
-        settings = self.from_json(log.settings_data, {"exclude": [], "fixed": []})
+        pool = read_pool(log)
+        revealed = read_revealed(log)
+        settings = read_settings(log)
 
         already_revealed = len(revealed) >= len(pool)
 
-        # 모두 공개 처리
-        all_indices = list(range(len(pool)))
-
-        log.revealed_indices = list(all_indices)
-        log.lines = self.to_json(pool)
-        # JSON 컬럼 변경 명시적 알림
-        flag_modified(log, "revealed_indices")
-        flag_modified(log, "lines")
+        if not already_revealed:
+            # 모두 공개 처리
+            write_revealed(log, list(range(len(pool))))
+            log.lines = self.to_json(pool)
         self.db.commit()
 
         logger.info(f"전체 공개: user={user_id}, {len(pool)}줄, already={already_revealed}")
@@ -0,0 +1,163 @@
+"""무작위 구매 기준선 (Monte-Carlo)
+
+백테스팅 점수(performance_score, avg_matches_per_line)만으로는 로직이 무작위 구매보다
+나은지 알 수 없으므로, 같은 회차/같은 줄 수로 "무작위 6개 번호"를 산 경우를 시뮬레이션합니다.
+
+- 한 줄은 번호 비트마스크(bitmask 모듈)이고 적중 수 = popcount(줄 & 당첨 마스크)
+- 회차마다 replicates × lines_per_draw 줄(기본 회차당 수백만 줄)을 뽑아 반복 실험 replicates회를 동시에 돌리고,
+  반복 실험별 요약의 2.5~97.5% 분위수를 95% 신뢰구간으로 씁니다.
+- 메모리는 한 번에 뽑는 줄 수(CHUNK_LINES)로 제한해 반복 실험을 묶음별로 나눠 돌립니다.
+- lift = 실제 값 / 무작위 기대값 (1보다 크면 무작위보다 나음)
+"""
+from math import comb
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from app.services.lotto.bitmask import numbers_to_mask, popcount64
+
+# 반복 실험 수 (회차당 시뮬레이션 줄 수 = replicates × 회차당 줄 수, 회차당 25줄이면 250만 줄)
+DEFAULT_REPLICATES = 100_000
+
+# 한 번에 뽑는 최대 줄 수 (줄당 임시 배열 약 150바이트 - 묶음당 약 80MB)
+CHUNK_LINES = 1 << 19
+
+# 무작위 한 줄의 적중 수 이론 분포 (초기하분포)
+HYPERGEOMETRIC_RATES = {k: comb(6, k) * comb(39, 6 - k) / comb(45, 6) for k in range(7)}
+
+
+def sample_random_lines(rng: np.random.Generator, n_lines: int) -> np.ndarray:
+    """
+    서로 다른 6개 번호 무작위 줄 n_lines개 (uint64 비트마스크)
+
+    6개를 복원 추출해 중복이 있는 줄만 다시 뽑습니다 (채택률 약 70%).
+    중복 없는 순서쌍이 균등하므로 6개 조합도 균등합니다.
+    """
+    one = np.uint64(1)
+    lines = np.zeros(n_lines, dtype=np.uint64)
+    todo = np.arange(n_lines)
+    while len(todo):
+        picks = rng.integers(1, 46, size=(len(todo), 6), dtype=np.uint64)
+        masks = np.bitwise_or.reduce(one << picks, axis=1)
+        ok = popcount64(masks) == 6
+        lines[todo[ok]] = masks[ok]
+        todo = todo[~ok]
+    return lines
+
+
+def simulate_random_play(
+    winning_masks: Sequence[int],
+    lines_per_draw: int,
+    replicates: int = DEFAULT_REPLICATES,
+    seed: Optional[int] = None,
+) -> Dict:
+    """
+    회차마다 무작위 lines_per_draw줄을 사는 백테스팅을 replicates번 시뮬레이션
+
+    Args:
+        winning_masks: 회차별 당첨 번호 비트마스크
+        lines_per_draw: 회차당 줄 수
+        replicates: 반복 실험 수
+        seed: 난수 시드
+
+    Returns:
+        {
+            'match_counts': (replicates, 7) 반복 실험별 적중 수(0~6개) 줄 수,
+            'avg_performance_score': (replicates,) 반복 실험별 평균 성능 점수,
+        }
+    """
+    rng = np.random.default_rng(seed)
+    counts = np.zeros((replicates, 7), dtype=np.int64)
+    score_sum = np.zeros(replicates)
+    chunk = max(1, CHUNK_LINES // lines_per_draw)
+
+    for start in range(0, replicates, chunk):
+        size = min(chunk, replicates - start)
+        offsets = (7 * np.arange(size))[:, None]
+        for win in winning_masks:
+            lines = sample_random_lines(rng, size * lines_per_draw)
+            matches = popcount64(lines & np.uint64(win)).reshape(size, lines_per_draw).astype(np.int64)
+            counts[start:start + size] += np.bincount(
+                (matches + offsets).ravel(), minlength=7 * size
+            ).reshape(size, 7)
+            # 회차 성능 점수와 같은 식 (performance_evaluator._analyze_lines)
+            score_sum[start:start + size] += np.minimum(100.0, matches.mean(axis=1) / 3.0 * 100)
+
+    n_draws = max(1, len(winning_masks))
+    return {
+        'match_counts': counts,
+        'avg_performance_score': score_sum / n_draws,
+    }
+
+
+def _compare(actual: float, samples: np.ndarray, digits: int) -> Dict:
+    random_mean = float(samples.mean())
+    low, high = np.percentile(samples, [2.5, 97.5])
+    return {
+        'actual': round(actual, digits),
+        'random': round(random_mean, digits),
+        'ci95': [round(float(low), digits), round(float(high), digits)],
+        'lift': round(actual / random_mean, 3) if random_mean > 0 else None,
+        'above_random': bool(actual > high),
+    }
+
+
+def random_baseline(
+    summary: Dict,
+    winning_numbers: List[Sequence[int]],
+    replicates: int = DEFAULT_REPLICATES,
+    seed: Optional[int] = None,
+) -> Dict:
+    """
+    백테스팅 요약(BacktestSummary.to_dict())과 같은 회차/줄 수의 무작위 구매 기준선
+
+    Args:
+        summary: 백테스팅 요약
+        winning_numbers: 평가한 회차들의 당첨 번호 6개
+        replicates: 반복 실험 수
+        seed: 난수 시드
+
+    Returns:
+        {
+            'replicates', 'lines_per_draw', 'simulated_lines',
+            'avg_matches_per_line': {'actual', 'random', 'ci95', 'lift', 'above_random'},
+            'avg_performance_score': {...},
+            'match_rates': {'3'..'6': {... 줄 비율(%), 'theoretical'}},
+        }
+    """
+    total_draws = summary['total_draws']
+    total_lines = summary['total_lines']
+    if not total_draws or not total_lines or not winning_numbers:
+        return {}
+
+    lines_per_draw = max(1, round(total_lines / total_draws))
+    masks = [numbers_to_mask(nums) for nums in winning_numbers]
+    simulated = simulate_random_play(masks, lines_per_draw, replicates=replicates, seed=seed)
+
+    counts = simulated['match_counts']
+    lines_per_replicate = lines_per_draw * len(masks)
+    avg_matches = (counts * np.arange(7)).sum(axis=1) / lines_per_replicate
+
+    match_rates = {}
+    for k in (3, 4, 5, 6):
+        comparison = _compare(
+            summary[f'total_match_{k}'] / total_lines * 100,
+            counts[:, k] / lines_per_replicate * 100,
+            digits=6,
+        )
+        # 희귀 등수는 시뮬레이션 평균이 0일 수 있으므로 lift는 이론값 기준
+        theoretical = HYPERGEOMETRIC_RATES[k] * 100
+        comparison['theoretical'] = round(theoretical, 6)
+        comparison['lift'] = round(comparison['actual'] / theoretical, 3)
+        match_rates[str(k)] = comparison
+
+    return {
+        'replicates': replicates,
+        'lines_per_draw': lines_per_draw,
+        'simulated_lines': int(replicates * lines_per_replicate),
+        'avg_matches_per_line': _compare(summary['avg_matches_per_line'], avg_matches, digits=4),
+        'avg_performance_score': _compare(
+            summary['avg_performance_score'], simulated['avg_performance_score'], digits=2
+        ),
+        'match_rates': match_rates,
+    }
@@ -0,0 +1,344 @@
+"""추천 발급 줄 정규화 테이블 (recommend_lines)
+
+lotto_recommend_logs는 번호를 JSON(lines/pool_lines)으로 저장하므로 줄 단위 조회/집계마다
+Python에서 JSON을 파싱해야 합니다. recommend_lines는 발급된 줄마다 1행(번호는 비트마스크)을 두어
+    - 당첨 매칭을 SQL UPDATE 한 번(비트 연산으로 적중 수 계산)으로 처리하고
+    - 주간 사용량/유저별 적중 통계를 인덱스 집계 쿼리로 구하며
+    - 히스토리/내 조합/관리자 목록의 번호와 줄별 당첨 결과를 (log_id, line_index) 인덱스 조회로 만듭니다.
+
+동기화:
+    - 세션 flush 시 새로 추가/수정된 추천 로그의 pool_lines/lines/revealed_indices를 보고 자동 갱신
+      (공개 여부만 바뀌면 revealed 컬럼만 UPDATE)
+    - 이 모듈 도입 전 로그(lines_synced=False)는 recommend_lines_backfill 작업으로 채웁니다.
+      번호가 없거나 파싱할 수 없는 로그도 처리 후 lines_synced=True로 표시해 다시 백필하지 않습니다.
+"""
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, case, delete, event, func, insert, select, update
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.db.models import LottoDraw, LottoRecommendLine, LottoRecommendLog
+from app.services.lotto.bitmask import mask_to_numbers, numbers_to_mask
+
+logger = logging.getLogger("recommend_lines")
+
+# 줄 구성에 영향을 주는 추천 로그 컬럼 (하나라도 바뀌면 동기화)
+_TRACKED_ATTRS = ("lines", "pool_lines", "revealed_indices", "pool_packed", "revealed_mask", "target_draw_no")
+
+# 백필 시 한 번에 처리하는 로그 수
+_BACKFILL_CHUNK = 2000
+
+
+def issued_lines(log) -> List[Tuple[int, int, bool]]:
+    """
+    추천 로그(ORM 객체 또는 같은 이름의 컬럼을 가진 행) → 발급 줄 [(줄 순서, 마스크, 공개 여부), ...]
+
+    풀이 있으면 풀 전체가 발급 줄이고 공개된 줄만 공개 상태,
+    풀이 없으면 lines의 모든 줄이 공개 상태입니다. 파싱할 수 없으면 빈 리스트.
+    """
+    from app.services.lotto.pool_codec import read_pool, read_revealed
+    from app.services.lotto.result_matcher import parse_recommend_lines
+
+    try:
+        pool = read_pool(log)
+        if pool:
+            revealed = set(read_revealed(log))
+            return [
+                (i, numbers_to_mask(line), i in revealed)
+                for i, line in enumerate(parse_recommend_lines(pool))
+            ]
+        if not log.lines:
+            return []
+        return [
+            (i, numbers_to_mask(line), True)
+            for i, line in enumerate(parse_recommend_lines(log.lines))
+        ]
+    except Exception as e:
+        logger.warning(f"recommend lines parse failed: {e}")
+        return []
+
+
+def _line_rows(log_id: int, target_draw_no: int, lines: List[Tuple[int, int, bool]]) -> List[Dict]:
+    return [
+        {
+            "log_id": log_id,
+            "target_draw_no": target_draw_no,
+            "line_index": index,
+            "mask": mask,
+            "revealed": revealed,
+        }
+        for index, mask, revealed in lines
+    ]
+
+
+def _unsynced():
+    """발급 줄 백필 대상 조건 (백필 작업과 자동 등록 확인이 같은 조건 사용)"""
+    return LottoRecommendLog.lines_synced == False
+
+
+def _sync_log(session: Session, log: LottoRecommendLog, is_new: bool) -> None:
+    """추천 로그 1건의 발급 줄 동기화"""
+    lines = issued_lines(log)
+
+    if not is_new and log.lines_synced is False:
+        # 백필 전 로그가 수정됨 - 지금 동기화하므로 백필 대상에서 제외
+        session.execute(
+            update(LottoRecommendLog).where(LottoRecommendLog.id == log.id).values(lines_synced=True)
+        )
+        set_committed_value(log, "lines_synced", True)
+
+    if not is_new:
+        existing = session.execute(
+            select(LottoRecommendLine.line_index, LottoRecommendLine.mask, LottoRecommendLine.revealed, LottoRecommendLine.target_draw_no)
+            .where(LottoRecommendLine.log_id == log.id)
+            .order_by(LottoRecommendLine.line_index)
+        ).all()
+        same_lines = (
+            [(row.line_index, row.mask) for row in existing] == [(index, mask) for index, mask, _ in lines]
+            and all(row.target_draw_no == log.target_draw_no for row in existing)
+        )
+        if same_lines:
+            # 번호는 그대로 - 공개 여부만 갱신 (1줄 공개 시 UPDATE 1건)
+            current = {row.line_index: bool(row.revealed) for row in existing}
+            for flag in (True, False):
+                changed = [index for index, _, revealed in lines if revealed == flag and current[index] != flag]
+                if changed:
+                    session.execute(
+                        update(LottoRecommendLine)
+                        .where(LottoRecommendLine.log_id == log.id, LottoRecommendLine.line_index.in_(changed))
+                        .values(revealed=flag)
+                    )
+            return
+        session.execute(delete(LottoRecommendLine).where(LottoRecommendLine.log_id == log.id))
+
+    if lines:
+        session.execute(insert(LottoRecommendLine), _line_rows(log.id, log.target_draw_no, lines))
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_recommend_lines(session: Session, flush_context) -> None:
+    """flush된 추천 로그의 발급 줄 동기화 (flush 직후, 같은 트랜잭션)"""
+    for obj in session.new:
+        if isinstance(obj, LottoRecommendLog):
+            _sync_log(session, obj, is_new=True)
+
+    for obj in session.dirty:
+        if not isinstance(obj, LottoRecommendLog):
+            continue
+        # 속성 대입/flag_modified가 있었던 컬럼만 committed_state에 남음
+        changed = sa_inspect(obj).committed_state
+        if any(attr in changed for attr in _TRACKED_ATTRS):
+            _sync_log(session, obj, is_new=False)
+
+    deleted_ids = [obj.id for obj in session.deleted if isinstance(obj, LottoRecommendLog)]
+    if deleted_ids:
+        # SQLite는 외래키 CASCADE가 꺼져 있을 수 있으므로 직접 삭제
+        session.execute(delete(LottoRecommendLine).where(LottoRecommendLine.log_id.in_(deleted_ids)))
+
+
+def _hit_count_expr(winning_numbers: List[int]):
+    """마스크 적중 수 SQL 식 - 당첨 번호 6개 비트를 더함 (SQLite/PostgreSQL 공통 비트 연산)"""
+    mask = LottoRecommendLine.mask
+    expr = None
+    for n in winning_numbers:
+        bit = mask.op(">>")(int(n)).op("&")(1)
+        expr = bit if expr is None else expr + bit
+    return expr
+
+
+def match_recommend_lines(db: Session, draw: LottoDraw) -> int:
+    """
+    회차의 모든 발급 줄 매칭 (SQL UPDATE 1회, 커밋은 호출자가)
+
+    Returns:
+        갱신한 줄 수
+    """
+    winning_numbers = [draw.n1, draw.n2, draw.n3, draw.n4, draw.n5, draw.n6]
+    hits = _hit_count_expr(winning_numbers)
+    bonus_match = LottoRecommendLine.mask.op("&")(1 << int(draw.bonus)) != 0
+
+    result = db.execute(
+        update(LottoRecommendLine)
+        .where(LottoRecommendLine.target_draw_no == draw.draw_no)
+        .values(
+            match_count=hits,
+            bonus_match=bonus_match,
+            rank=case(
+                (hits == 6, 1),
+                (and_(hits == 5, bonus_match), 2),
+                (hits == 5, 3),
+                (hits == 4, 4),
+                (hits == 3, 5),
+                else_=0,
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount or 0
+
+
+def count_issued_lines(db: Session, account_user_id: int, plan_type: str, since=None) -> int:
+    """유저의 플랜별 공개된 발급 줄 수 (since 이후 추천분)"""
+    query = db.query(func.count(LottoRecommendLine.id)).join(
+        LottoRecommendLog, LottoRecommendLog.id == LottoRecommendLine.log_id
+    ).filter(
+        LottoRecommendLog.account_user_id == account_user_id,
+        LottoRecommendLog.plan_type == plan_type,
+        LottoRecommendLine.revealed == True,
+    )
+    if since is not None:
+        query = query.filter(LottoRecommendLog.recommend_time >= since)
+    return query.scalar() or 0
+
+
+def get_log_lines(db: Session, log_ids: List[int], revealed_only: bool = True) -> Dict[int, List]:
+    """
+    로그별 발급 줄 {log_id: [행, ...]} (줄 순서, 행: line_index/mask/revealed/match_count/bonus_match/rank)
+
+    revealed_only=False면 공개되지 않은 풀 줄도 포함합니다.
+    """
+    out: Dict[int, List] = {log_id: [] for log_id in log_ids}
+    if not log_ids:
+        return out
+    query = db.query(
+        LottoRecommendLine.log_id, LottoRecommendLine.line_index, LottoRecommendLine.mask,
+        LottoRecommendLine.revealed, LottoRecommendLine.match_count, LottoRecommendLine.bonus_match,
+        LottoRecommendLine.rank,
+    ).filter(LottoRecommendLine.log_id.in_(log_ids))
+    if revealed_only:
+        query = query.filter(LottoRecommendLine.revealed == True)
+    for row in query.order_by(LottoRecommendLine.log_id, LottoRecommendLine.line_index):
+        out[row.log_id].append(row)
+    return out
+
+
+def line_numbers(rows: List) -> List[List[int]]:
+    """발급 줄 행 → 번호 리스트"""
+    return [mask_to_numbers(row.mask) for row in rows]
+
+
+def line_match_results(draw: LottoDraw, rows: List, matched_at=None) -> Optional[Dict]:
+    """
+    발급 줄 행의 당첨 결과 (기존 match_results JSON과 같은 형식, 매칭 전이면 None)
+    """
+    if not rows or any(row.match_count is None for row in rows):
+        return None
+    winning_numbers = [draw.n1, draw.n2, draw.n3, draw.n4, draw.n5, draw.n6]
+    winning_mask = numbers_to_mask(winning_numbers)
+    line_results = [
+        {
+            "match_count": row.match_count,
+            "matched_numbers": mask_to_numbers(row.mask & winning_mask),
+            "bonus_match": bool(row.bonus_match),
+            "rank": row.rank or None,
+        }
+        for row in rows
+    ]
+    total_match = sum(row.match_count for row in rows)
+    ranks = [row.rank for row in rows if row.rank]
+    return {
+        "draw_no": draw.draw_no,
+        "winning_numbers": winning_numbers,
+        "bonus": draw.bonus,
+        "line_results": line_results,
+        "total_lines": len(rows),
+        "total_match_count": total_match,
+        "avg_match_count": total_match / len(rows),
+        "best_rank": min(ranks) if ranks else None,
+        "matched_at": matched_at.isoformat() if matched_at else None,
+    }
+
+
+def backfill_recommend_lines(
+    db: Session,
+    chunk_size: int = _BACKFILL_CHUNK,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+    draw_no: Optional[int] = None,
+) -> Dict:
+    """
+    발급 줄 미반영(lines_synced=False) 추천 로그 채우기 (id 순 청크 커밋 - 중단 후 다시 실행해도 이어서 처리)
+
+    줄이 없거나 파싱할 수 없는 로그도 반영 완료로 표시합니다.
+    채운 뒤 당첨 번호가 있는 회차는 매칭 결과도 SQL로 계산합니다.
+
+    Args:
+        draw_no: 지정하면 해당 회차 로그만 (당첨 매칭 전 호출)
+    """
+    missing = _unsynced()
+    if draw_no is not None:
+        missing = and_(missing, LottoRecommendLog.target_draw_no == draw_no)
+    total = db.query(func.count(LottoRecommendLog.id)).filter(missing).scalar() or 0
+
+    last_id = 0
+    done = 0
+    inserted_lines = 0
+    draw_nos = set()
+    while True:
+        logs = db.query(
+            LottoRecommendLog.id, LottoRecommendLog.target_draw_no, LottoRecommendLog.lines,
+            LottoRecommendLog.pool_lines, LottoRecommendLog.revealed_indices,
+            LottoRecommendLog.pool_packed, LottoRecommendLog.revealed_mask,
+        ).filter(
+            missing, LottoRecommendLog.id > last_id
+        ).order_by(LottoRecommendLog.id).limit(chunk_size).all()
+        if not logs:
+            break
+
+        rows = []
+        for log in logs:
+            lines = issued_lines(log)
+            if lines:
+                rows.extend(_line_rows(log.id, log.target_draw_no, lines))
+                draw_nos.add(log.target_draw_no)
+        log_ids = [log.id for log in logs]
+        db.execute(delete(LottoRecommendLine).where(LottoRecommendLine.log_id.in_(log_ids)))
+        if rows:
+            db.execute(insert(LottoRecommendLine), rows)
+        db.execute(
+            update(LottoRecommendLog).where(LottoRecommendLog.id.in_(log_ids)).values(lines_synced=True)
+        )
+        db.commit()
+
+        last_id = logs[-1].id
+        done += len(logs)
+        inserted_lines += len(rows)
+        if on_progress:
+            on_progress(done, total)
+
+    matched_lines = 0
+    for draw in db.query(LottoDraw).filter(LottoDraw.draw_no.in_(draw_nos)).all() if draw_nos else []:
+        matched_lines += match_recommend_lines(db, draw)
+        db.commit()
+
+    return {"logs": done, "inserted_lines": inserted_lines, "matched_lines": matched_lines}
+
+
+def request_recommend_lines_backfill(db: Session) -> Optional[str]:
+    """발급 줄 미반영 추천 로그가 있으면 백필 작업 등록 (이미 대기/실행 중이면 등록하지 않음)"""
+    from app.db.models import AdminJob
+    from app.services.jobs import submit_job, JobQueueFull
+    from app.services.jobs.job_runner import ACTIVE_STATUSES
+
+    try:
+        missing = db.query(LottoRecommendLog.id).filter(_unsynced()).first()
+        if not missing:
+            return None
+
+        active = db.query(AdminJob.id).filter(
+            AdminJob.job_type == "recommend_lines_backfill",
+            AdminJob.status.in_(ACTIVE_STATUSES),
+        ).first()
+        if active:
+            return active[0]
+
+        return submit_job(db, "recommend_lines_backfill", {}).id
+    except JobQueueFull:
+        logger.warning("발급 줄 백필 작업 등록 실패: 대기 작업 초과")
+        return None
+    except Exception:
+        db.rollback()
+        logger.exception("발급 줄 백필 상태 확인 실패")
+        return None
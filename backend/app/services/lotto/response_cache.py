@@ -0,0 +1,344 @@
+"""공개 통계 API 응답 캐시 (회차 버전별)
+
+/stats/*, /history/public, /latest, 비회원 공 뽑기 상위 번호처럼 회차 데이터로만 결정되는 응답을
+(엔드포인트, 쿼리 파라미터, 회차 버전) 키로 프로세스 메모리 LRU에 보관합니다.
+회차 버전은 변경 세대(lotto_data_versions)와 stats_snapshot의 (최신 회차, 회차 수, 번호 체크섬),
+통계 캐시 갱신 시각을 합친 값이며 매 요청 조회하지 않고 기억해 둡니다. (conditional GET의 ETag/Last-Modified도 이 버전을 씁니다)
+    - 회차/통계 캐시 쓰기는 세션 이벤트가 같은 트랜잭션에서 변경 세대를 올리고, 커밋되면 이 프로세스 캐시를 즉시 무효화
+      (ORM 객체 변경과 db.query(LottoDraw).update()/db.execute(update(LottoDraw)) 같은 일괄 문장 모두)
+    - RESPONSE_CACHE_DIR 설정 시 로컬 SQLite 파일에 버전과 응답을 함께 두어 모든 워커가 공유
+      (다른 워커가 회차를 저장해도 파일의 버전 표시가 지워져 바로 반영)
+    - 공유 저장소가 없으면 RESPONSE_CACHE_VERSION_TTL초마다 변경 세대 1행만 기본키로 확인하고,
+      세대가 바뀐 경우에만 lotto_draws를 다시 집계 (다른 워커 저장분 반영)
+따라서 비회원 랜딩 페이지 요청은 회차가 바뀌기 전까지 lotto_draws를 조회하지 않습니다.
+text()/다른 연결로 회차나 통계 캐시를 직접 쓰는 코드는 커밋 전에 mark_draws_changed(session)을 호출해야 합니다.
+
+반환된 값은 여러 요청이 공유하므로 수정하지 마세요.
+"""
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+
+from app.config import settings as app_settings
+from app.db.models import LottoDataVersion, LottoDraw, LottoStatsCache
+from app.db.upsert import dialect_insert
+
+logger = logging.getLogger("response_cache")
+
+T = TypeVar("T")
+
+_SHARED_FILE = "response_cache.sqlite3"
+_VERSION_KEY = "draw_version"
+_GENERATION_KEY = "generation"
+# lotto_data_versions 행 이름
+_DATA_VERSION_NAME = "lotto_draws"
+
+_lock = threading.Lock()
+# (엔드포인트, 파라미터 JSON, 버전) → 응답 (오래 안 쓴 순)
+_entries: "OrderedDict[Tuple[str, str, str], Any]" = OrderedDict()
+# 마지막으로 확인한 회차 버전, 그 버전의 변경 세대와 확인 시각 (공유 저장소가 없을 때)
+_version: Optional[str] = None
+_version_data_generation: Optional[int] = None
+_version_checked_at = 0.0
+# 무효화 횟수 (버전 조회 도중 무효화되면 조회한 버전을 기억하지 않음)
+_generation = 0
+_stats = {"hits": 0, "shared_hits": 0, "misses": 0}
+
+
+def _enabled() -> bool:
+    return app_settings.RESPONSE_CACHE_SIZE > 0
+
+
+# ============================================
+# 공유 저장소 (워커 간 공유 로컬 SQLite 파일)
+# ============================================
+
+_local = threading.local()
+
+
+def _shared_conn() -> Optional[sqlite3.Connection]:
+    """스레드별 공유 저장소 연결 (RESPONSE_CACHE_DIR 미설정이면 None)"""
+    if not app_settings.RESPONSE_CACHE_DIR:
+        return None
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        return conn
+
+    path = Path(app_settings.RESPONSE_CACHE_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path / _SHARED_FILE), timeout=5, isolation_level=None, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, body TEXT NOT NULL)")
+    _local.conn = conn
+    return conn
+
+
+def _shared_key(endpoint: str, params: str, version: str) -> str:
+    return f"{version}|{endpoint}|{params}"
+
+
+def _shared_get_meta(conn: sqlite3.Connection, key: str) -> Optional[str]:
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return row[0] if row else None
+
+
+def _shared_get_version(conn: sqlite3.Connection) -> Tuple[Optional[str], str]:
+    """(기록된 버전, 무효화 세대) - 한 트랜잭션에서 읽음"""
+    with conn:
+        conn.execute("BEGIN")
+        return _shared_get_meta(conn, _VERSION_KEY), _shared_get_meta(conn, _GENERATION_KEY) or "0"
+
+
+def _shared_set_version(conn: sqlite3.Connection, version: str, generation: str) -> None:
+    """버전 기록 - 조회 후 다른 프로세스가 무효화했으면(세대 변경) 기록하지 않음"""
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        if (_shared_get_meta(conn, _GENERATION_KEY) or "0") != generation:
+            return
+        conn.execute("DELETE FROM responses")
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (_VERSION_KEY, version)
+        )
+
+
+def _shared_invalidate(conn: sqlite3.Connection) -> None:
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        generation = int(_shared_get_meta(conn, _GENERATION_KEY) or 0) + 1
+        conn.execute("DELETE FROM meta WHERE key = ?", (_VERSION_KEY,))
+        conn.execute(
+            "INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (_GENERATION_KEY, str(generation))
+        )
+        conn.execute("DELETE FROM responses")
+
+
+def _shared_get(conn: sqlite3.Connection, key: str):
+    row = conn.execute("SELECT body FROM responses WHERE key = ?", (key,)).fetchone()
+    return json.loads(row[0]) if row else None
+
+
+def _shared_put(conn: sqlite3.Connection, key: str, value: Any) -> None:
+    """응답 저장 (RESPONSE_CACHE_SIZE개 초과분은 오래된 행부터 삭제)"""
+    body = json.dumps(value, ensure_ascii=False, default=str)
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.execute("INSERT OR REPLACE INTO responses (key, body) VALUES (?, ?)", (key, body))
+        conn.execute(
+            "DELETE FROM responses WHERE rowid <= (SELECT MAX(rowid) FROM responses) - ?",
+            (app_settings.RESPONSE_CACHE_SIZE,),
+        )
+
+
+def _shared_call(func: Callable[..., T], *args) -> Optional[T]:
+    """공유 저장소 작업 - 실패해도 요청은 프로세스 캐시/직접 계산으로 처리"""
+    try:
+        conn = _shared_conn()
+        return func(conn, *args) if conn is not None else None
+    except (sqlite3.Error, OSError):
+        logger.exception("응답 캐시 공유 저장소 오류")
+        return None
+
+
+# ============================================
+# 회차 버전
+# ============================================
+
+def _data_generation(db: Session) -> Tuple[int, Optional[datetime]]:
+    """(변경 세대, 마지막 변경 시각) - 기본키 1행 조회 (행이 없으면 (0, None))"""
+    row = db.query(LottoDataVersion.generation, LottoDataVersion.updated_at).filter(
+        LottoDataVersion.name == _DATA_VERSION_NAME
+    ).first()
+    return (row.generation, row.updated_at) if row else (0, None)
+
+
+def mark_draws_changed(session: Session) -> None:
+    """
+    회차/통계 캐시 변경 표시 (같은 트랜잭션에서 변경 세대 증가, 커밋 후 이 프로세스 캐시 무효화)
+
+    ORM 쓰기는 세션 이벤트가 자동으로 호출하므로 text() 등으로 직접 쓰는 코드만 호출하면 됩니다.
+    """
+    if session.info.get(_CHANGED_FLAG):
+        return
+    session.info[_CHANGED_FLAG] = True
+    now = datetime.utcnow()
+    stmt = dialect_insert(session, LottoDataVersion).values(name=_DATA_VERSION_NAME, generation=1, updated_at=now)
+    session.execute(stmt.on_conflict_do_update(
+        index_elements=["name"],
+        set_={"generation": LottoDataVersion.__table__.c.generation + 1, "updated_at": now},
+    ))
+
+
+def _load_version(db: Session, data_generation: int) -> str:
+    from app.services.lotto.stats_snapshot import _draw_version
+
+    stats_updated = db.query(func.max(LottoStatsCache.updated_at)).scalar()
+    stats_ts = int(stats_updated.replace(tzinfo=timezone.utc).timestamp()) if stats_updated else 0
+    return ":".join(str(value) for value in (data_generation, *_draw_version(db), stats_ts))
+
+
+def current_version(db: Session) -> str:
+    """
+    회차 버전 "변경세대:최신회차:회차수:번호체크섬:통계갱신시각"
+
+    공유 저장소/프로세스에 기억된 값이 있으면 DB 조회 없음. 기억된 값을 다시 확인할 때도
+    변경 세대가 같으면 lotto_draws를 집계하지 않습니다.
+    """
+    global _version, _version_data_generation, _version_checked_at
+
+    shared = _shared_call(_shared_get_version) if app_settings.RESPONSE_CACHE_DIR else None
+    if shared and shared[0] is not None:
+        return shared[0]
+    if shared is None:
+        ttl = app_settings.RESPONSE_CACHE_VERSION_TTL
+        version = _version
+        if version is not None and (ttl <= 0 or time.monotonic() - _version_checked_at < ttl):
+            return version
+
+    generation = _generation
+    data_generation, _ = _data_generation(db)
+    with _lock:
+        if _version is not None and _version_data_generation == data_generation and _generation == generation:
+            # 다른 워커의 회차 변경 없음 - 기억된 버전 유지
+            _version_checked_at = time.monotonic()
+            return _version
+
+    version = _load_version(db, data_generation)
+    if shared:
+        _shared_call(_shared_set_version, version, shared[1])
+    with _lock:
+        if _generation == generation:
+            _version = version
+            _version_data_generation = data_generation
+            _version_checked_at = time.monotonic()
+    return version
+
+
+def cached_response(db: Session, endpoint: str, params: Dict[str, Any], build: Callable[[], T]) -> T:
+    """
+    회차 버전별 응답 캐시
+
+    Args:
+        endpoint: 엔드포인트 이름
+        params: 응답에 영향을 주는 쿼리 파라미터
+        build: 미스일 때 응답 계산 (JSON 직렬화 가능한 값)
+    """
+    if not _enabled():
+        return build()
+
+    version = current_version(db)
+    key = (endpoint, json.dumps(params, sort_keys=True, default=str), version)
+    with _lock:
+        if key in _entries:
+            _entries.move_to_end(key)
+            _stats["hits"] += 1
+            return _entries[key]
+
+    shared_key = _shared_key(*key)
+    value = _shared_call(_shared_get, shared_key) if app_settings.RESPONSE_CACHE_DIR else None
+    if value is not None:
+        _stats["shared_hits"] += 1
+    else:
+        _stats["misses"] += 1
+        value = build()
+        if app_settings.RESPONSE_CACHE_DIR:
+            _shared_call(_shared_put, shared_key, value)
+
+    with _lock:
+        _entries[key] = value
+        _entries.move_to_end(key)
+        while len(_entries) > app_settings.RESPONSE_CACHE_SIZE:
+            _entries.popitem(last=False)
+    return value
+
+
+def invalidate_response_cache() -> None:
+    """회차/통계 변경 후 호출 - 다음 요청에서 버전을 다시 읽고 응답을 다시 계산"""
+    global _version, _generation
+
+    with _lock:
+        _entries.clear()
+        _version = None
+        _generation += 1
+    if app_settings.RESPONSE_CACHE_DIR:
+        _shared_call(_shared_invalidate)
+    logger.info("Response cache invalidated")
+
+
+def draws_last_modified(db: Session) -> Optional[int]:
+    """
+    회차 수집/수정/통계 갱신 중 가장 최근 시각 (UTC epoch 초, 데이터가 없으면 None) - 버전별 캐시
+
+    회차 번호 수정은 created_at을 바꾸지 않으므로 변경 세대의 마지막 변경 시각도 포함합니다.
+    (빠지면 수정 전 If-Modified-Since 요청에 304로 옛 본문이 유지됨)
+    """
+    def build() -> Optional[int]:
+        latest = [
+            value for value in (
+                db.query(func.max(LottoDraw.created_at)).scalar(),
+                db.query(func.max(LottoStatsCache.updated_at)).scalar(),
+                _data_generation(db)[1],
+            ) if value
+        ]
+        return int(max(latest).replace(tzinfo=timezone.utc).timestamp()) if latest else None
+
+    return cached_response(db, "draws_last_modified", {}, build)
+
+
+def response_cache_stats() -> Dict[str, int]:
+    with _lock:
+        return {**_stats, "entries": len(_entries)}
+
+
+# ============================================
+# 자동 무효화 (회차/통계 캐시 커밋 시 - 통계 스냅샷 포함)
+# ============================================
+
+_WATCHED_MODELS = (LottoDraw, LottoStatsCache)
+_CHANGED_FLAG = "response_cache_draws_changed"
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_draws_changed(session: Session, flush_context) -> None:
+    """flush에 회차/통계 캐시 변경이 있으면 변경 세대 증가 (커밋 후 무효화)"""
+    if session.info.get(_CHANGED_FLAG):
+        return
+    for objects in (session.new, session.dirty, session.deleted):
+        if any(isinstance(obj, _WATCHED_MODELS) for obj in objects):
+            mark_draws_changed(session)
+            return
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_draw_writes(orm_execute_state) -> None:
+    """회차/통계 캐시 일괄 INSERT/UPDATE/DELETE 문장도 변경으로 표시 (ORM 객체를 거치지 않는 쓰기)"""
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, _WATCHED_MODELS):
+        mark_draws_changed(orm_execute_state.session)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop(_CHANGED_FLAG, False):
+        from app.services.lotto.stats_snapshot import clear_stats_snapshots
+
+        # 이 프로세스의 통계 스냅샷도 버전 확인을 기다리지 않고 비움
+        clear_stats_snapshots()
+        invalidate_response_cache()
+
+
+@event.listens_for(Session, "after_rollback")
+def _clear_changed_flag(session: Session) -> None:
+    session.info.pop(_CHANGED_FLAG, None)
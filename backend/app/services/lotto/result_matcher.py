@@ -1,16 +1,33 @@
 """당첨 결과 매칭 서비스"""
+import copy
 import json
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
+from sqlalchemy import case, func, insert, update
 from sqlalchemy.orm import Session
 
-from app.db.models import LottoDraw, LottoRecommendLog, PlanPerformanceStats
+from app.db.models import (
+    LottoDraw, LottoMatchCheckpoint, LottoRecommendLine, LottoRecommendLog, PlanPerformanceRollup,
+    PlanPerformanceStats,
+)
+from app.db.upsert import dialect_insert
+from app.services.lotto.recommend_lines import backfill_recommend_lines, match_recommend_lines
+from app.services.lotto.user_hit_stats import apply_user_hit_deltas, init_user_stats
 from app.services.lotto.stats_calculator import LottoStatsCalculator
 
 logger = logging.getLogger("result_matcher")
 
+PLAN_TYPES = ("free", "basic", "premium", "vip")
+
+# 매칭 완료 표시 UPDATE 한 번에 보내는 로그 수
+_UPDATE_BATCH = 1000
+
+# 플랜별 성과 집계 구간 (구간 이름 → 최근 회차 수, None이면 전체)
+ROLLUP_PERIODS = {"last_10": 10, "last_50": 50, "all": None}
+ROLLUP_PERIOD_BY_DRAWS = {size: period for period, size in ROLLUP_PERIODS.items()}
+
 
 def match_single_line(line: List[int], winning_numbers: List[int], bonus: int) -> Dict:
     """
@@ -75,19 +92,7 @@ def match_recommend_log(
     """
     try:
         # 추천 번호 파싱
-        lines_raw = recommend_log.lines
-        if isinstance(lines_raw, str):
-            lines = json.loads(lines_raw)
-        else:
-            lines = lines_raw
-
-        # 문자열 형태 "1, 2, 3, 4, 5, 6" → 리스트로 변환
-        parsed_lines = []
-        for line in lines:
-            if isinstance(line, str):
-                parsed_lines.append([int(n.strip()) for n in line.split(",")])
-            else:
-                parsed_lines.append(line)
+        parsed_lines = parse_recommend_lines(recommend_log.lines)
 
         # 당첨 번호
         winning_numbers = [draw.n1, draw.n2, draw.n3, draw.n4, draw.n5, draw.n6]
@@ -131,13 +136,121 @@ def match_recommend_log(
         return {}
 
 
-def match_all_pending_logs(db: Session, draw_no: int) -> Dict:
+def parse_recommend_lines(lines_raw) -> List[List[int]]:
+    """추천 로그 lines 파싱 (JSON 문자열/리스트, 줄이 "1, 2, 3, 4, 5, 6" 문자열인 옛 형식 포함)"""
+    lines = json.loads(lines_raw) if isinstance(lines_raw, str) else lines_raw
+    return [
+        [int(n.strip()) for n in line.split(",")] if isinstance(line, str) else line
+        for line in lines
+    ]
+
+
+def _aggregate_chunk(
+    db: Session,
+    draw_no: int,
+    after_id: int,
+    last_id: int,
+) -> Tuple[Dict[str, Dict], Dict[int, Dict]]:
+    """
+    미매칭 로그 묶음(id 범위)의 공개 줄 집계 - recommend_lines 매칭 결과(match_count/rank)를 GROUP BY로 합산
+
+    Returns:
+        (플랜별 통계, 유저별 통계 증분)
+    """
+    line = LottoRecommendLine
+    log = LottoRecommendLog
+    conditions = (
+        log.target_draw_no == draw_no,
+        log.is_matched == False,
+        log.id > after_id,
+        log.id <= last_id,
+        line.revealed == True,
+        line.match_count.isnot(None),
+    )
+
+    plan_stats = {plan_type: _init_plan_stats() for plan_type in PLAN_TYPES}
+    user_stats: Dict[int, Dict] = {}
+
+    # 플랜별 적중 분포 (등수 2 = 5개+보너스)
+    distribution = db.query(
+        func.coalesce(log.plan_type, "free"), line.match_count, line.rank, func.count(line.id),
+    ).join(
+        log, log.id == line.log_id
+    ).filter(*conditions).group_by(
+        func.coalesce(log.plan_type, "free"), line.match_count, line.rank
+    ).all()
+    for plan_type, match_count, rank, count in distribution:
+        stats = plan_stats.get(plan_type)
+        if stats is None:
+            continue  # 알 수 없는 플랜은 집계 제외
+        key = "5+bonus" if rank == 2 else match_count
+        stats["match_counts"][key] += count
+        stats["total_lines"] += count
+        stats["total_match"] += match_count * count
+        if rank and (stats["best_rank"] is None or rank < stats["best_rank"]):
+            stats["best_rank"] = rank
+
+    # 로그별 합계 (플랜별 로그 수, 유저별 증분)
+    rank_sums = [func.sum(case((line.rank == rank, 1), else_=0)) for rank in range(1, 6)]
+    per_log = db.query(
+        func.coalesce(log.plan_type, "free"), log.account_user_id,
+        func.count(line.id), func.sum(line.match_count), *rank_sums,
+        func.min(case((line.rank > 0, line.rank), else_=None)),
+    ).join(
+        log, log.id == line.log_id
+    ).filter(*conditions).group_by(log.id, log.plan_type, log.account_user_id).all()
+    for row in per_log:
+        plan_type, account_user_id, n_lines, total_match = row[0], row[1], row[2], int(row[3] or 0)
+        best_rank = row[9]
+        if plan_type in plan_stats:
+            plan_stats[plan_type]["total_users"] += 1
+        if account_user_id is None:
+            continue
+        user = user_stats.setdefault(account_user_id, init_user_stats())
+        user["matched_logs"] += 1
+        user["total_lines"] += n_lines
+        user["total_match"] += total_match
+        for rank in range(1, 6):
+            user[f"rank{rank}_count"] += int(row[3 + rank] or 0)
+        if best_rank and (user["best_rank"] is None or best_rank < user["best_rank"]):
+            user["best_rank"] = best_rank
+        user["last_matched_draw_no"] = draw_no
+
+    return plan_stats, user_stats
+
+
+def _merge_plan_stats(total: Dict, part: Dict) -> None:
+    """플랜 통계 합치기 (묶음별 결과 누적)"""
+    total["total_users"] += part["total_users"]
+    total["total_lines"] += part["total_lines"]
+    total["total_match"] += part["total_match"]
+    for key, count in part["match_counts"].items():
+        total["match_counts"][key] = total["match_counts"].get(key, 0) + count
+    best = part["best_rank"]
+    if best and (total["best_rank"] is None or best < total["best_rank"]):
+        total["best_rank"] = best
+
+
+def match_all_pending_logs(
+    db: Session,
+    draw_no: int,
+    chunk_size: Optional[int] = None,
+    on_progress: Optional[Callable[[int, int], None]] = None,
+) -> Dict:
     """
     특정 회차의 모든 미매칭 추천 로그 매칭
 
+    적중 수는 회차의 모든 발급 줄(recommend_lines)에 SQL UPDATE 한 번으로 계산하고(match_recommend_lines),
+    미매칭 로그를 id 순 키셋 페이지(id > 마지막 id)로 chunk_size개씩 나눠 줄 적중 결과를 GROUP BY로 집계합니다.
+    청크마다 매칭 완료 표시, 플랜별/유저별 통계 증분, 체크포인트(마지막 id, 플랜별 누적 통계)를 같은 트랜잭션으로 커밋하므로
+    중간에 중단되면 다시 실행할 때 체크포인트부터 이어서 처리합니다. 줄별 결과는 recommend_lines에 있으므로
+    로그의 match_results JSON은 쓰지 않습니다.
+
     Args:
         db: DB 세션
         draw_no: 매칭할 회차 번호
+        chunk_size: 청크당 로그 수 (기본 settings.MATCH_CHUNK_SIZE)
+        on_progress: (이번 실행에서 처리한 로그 수, 시작 시점 미매칭 로그 수) 콜백
 
     Returns:
         {
@@ -145,48 +258,79 @@ def match_all_pending_logs(db: Session, draw_no: int) -> Dict:
             "plan_stats": {"free": {...}, "basic": {...}, ...}
         }
     """
+    from app.config import settings
+
+    chunk_size = chunk_size or settings.MATCH_CHUNK_SIZE
+
     # 당첨 번호 조회
     draw = db.query(LottoDraw).filter(LottoDraw.draw_no == draw_no).first()
     if not draw:
         logger.warning(f"Draw {draw_no} not found")
         return {"error": "draw_not_found"}
 
-    # 미매칭 로그 조회
-    pending_logs = db.query(LottoRecommendLog).filter(
+    # 발급 줄이 아직 없는(백필 전) 로그를 먼저 채운 뒤 회차의 모든 줄 적중 수 계산
+    backfill_recommend_lines(db, draw_no=draw_no)
+    match_recommend_lines(db, draw)
+    db.commit()
+
+    pending_query = db.query(LottoRecommendLog.id).filter(
         LottoRecommendLog.target_draw_no == draw_no,
         LottoRecommendLog.is_matched == False
-    ).all()
-
-    if not pending_logs:
+    )
+
+    checkpoint = _load_checkpoint(db, draw_no)
+    if checkpoint.last_log_id:
+        logger.info(f"Resuming match for draw {draw_no} after log {checkpoint.last_log_id}")
+    plan_stats = _stats_from_json(checkpoint.plan_stats)
+
+    total_pending = pending_query.filter(LottoRecommendLog.id > checkpoint.last_log_id).count()
+    processed = 0
+    while True:
+        # 미매칭 로그 한 청크 (필요한 컬럼만, id 순)
+        log_ids = [row.id for row in pending_query.filter(
+            LottoRecommendLog.id > checkpoint.last_log_id
+        ).order_by(LottoRecommendLog.id).limit(chunk_size).all()]
+        if not log_ids:
+            break
+
+        chunk_stats, user_deltas = _aggregate_chunk(db, draw_no, checkpoint.last_log_id, log_ids[-1])
+        for start in range(0, len(log_ids), _UPDATE_BATCH):
+            db.execute(
+                update(LottoRecommendLog)
+                .where(LottoRecommendLog.id.in_(log_ids[start:start + _UPDATE_BATCH]))
+                .values(is_matched=True, matched_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+        for plan_type, stats in chunk_stats.items():
+            _merge_plan_stats(plan_stats[plan_type], stats)
+        # 이번 청크 분량만 플랜별 성과/유저별 적중 통계에 더함 (같은 트랜잭션이라 중복 집계 없음)
+        _apply_plan_stats_delta(db, draw_no, chunk_stats)
+        apply_user_hit_deltas(db, user_deltas)
+
+        # 완료 표시/통계/체크포인트를 함께 커밋 (줄이 없는 로그도 매칭 완료로 표시)
+        checkpoint.last_log_id = log_ids[-1]
+        checkpoint.matched_count += len(log_ids)
+        checkpoint.plan_stats = copy.deepcopy(plan_stats)
+        db.commit()
+
+        processed += len(log_ids)
+        if on_progress:
+            on_progress(processed, total_pending)
+        # 다음 청크를 위해 세션 식별자 맵 비움 (체크포인트는 다시 로드됨)
+        db.expire_all()
+
+    matched_count = checkpoint.matched_count
+    if not matched_count:
+        db.delete(checkpoint)
+        db.commit()
         logger.info(f"No pending logs for draw {draw_no}")
         return {"matched_count": 0, "plan_stats": {}}
 
-    # 플랜별 통계 초기화
-    plan_stats = {
-        "free": _init_plan_stats(),
-        "basic": _init_plan_stats(),
-        "premium": _init_plan_stats(),
-        "vip": _init_plan_stats()
-    }
-
-    matched_count = 0
-
-    for log in pending_logs:
-        result = match_recommend_log(db, log, draw)
-        if not result:
-            continue
-
-        matched_count += 1
-        plan_type = log.plan_type or "free"
-
-        if plan_type in plan_stats:
-            _update_plan_stats(plan_stats[plan_type], result)
-
+    # 플랜별 구간 집계 갱신 + 체크포인트 완료 처리
+    refresh_plan_performance_rollups(db)
+    checkpoint.completed_at = datetime.utcnow()
     db.commit()
 
-    # 플랜별 성과 통계 저장
-    _save_plan_performance_stats(db, draw_no, plan_stats)
-
     logger.info(f"Matched {matched_count} logs for draw {draw_no}")
 
     return {
@@ -196,6 +340,65 @@ def match_all_pending_logs(db: Session, draw_no: int) -> Dict:
     }
 
 
+def reset_draw_matches(db: Session, draw_no: int) -> int:
+    """
+    회차 매칭 결과 초기화 (당첨 번호 수정 후 다시 매칭하기 전, 커밋은 호출자가)
+
+    로그를 미매칭으로 되돌리고 해당 회차 플랜별 성과/체크포인트를 지운 뒤 구간 집계를 다시 계산합니다.
+    유저별 적중 통계는 다시 매칭한 뒤 rebuild_user_hit_stats로 재계산해야 합니다.
+
+    Returns:
+        미매칭으로 되돌린 로그 수
+    """
+    reset = db.query(LottoRecommendLog).filter(
+        LottoRecommendLog.target_draw_no == draw_no,
+        LottoRecommendLog.is_matched == True,
+    ).update(
+        {"is_matched": False, "match_results": None, "matched_at": None},
+        synchronize_session=False,
+    )
+    db.query(PlanPerformanceStats).filter(
+        PlanPerformanceStats.draw_no == draw_no
+    ).delete(synchronize_session=False)
+    db.query(LottoMatchCheckpoint).filter(
+        LottoMatchCheckpoint.draw_no == draw_no
+    ).delete(synchronize_session=False)
+    refresh_plan_performance_rollups(db)
+    return reset
+
+
+def _load_checkpoint(db: Session, draw_no: int) -> LottoMatchCheckpoint:
+    """진행 중인 체크포인트를 가져오거나 새로 시작 (완료된 체크포인트는 초기화)"""
+    checkpoint = db.get(LottoMatchCheckpoint, draw_no)
+    if checkpoint is None:
+        checkpoint = LottoMatchCheckpoint(draw_no=draw_no)
+        db.add(checkpoint)
+    elif checkpoint.completed_at is None:
+        return checkpoint
+
+    checkpoint.last_log_id = 0
+    checkpoint.matched_count = 0
+    checkpoint.plan_stats = None
+    checkpoint.completed_at = None
+    db.flush()
+    return checkpoint
+
+
+def _stats_from_json(saved: Optional[Dict]) -> Dict:
+    """체크포인트의 플랜별 통계 복원 (JSON에서 문자열이 된 적중 수 키를 정수로)"""
+    plan_stats = {plan_type: _init_plan_stats() for plan_type in PLAN_TYPES}
+    for plan_type, stats in (saved or {}).items():
+        if plan_type not in plan_stats:
+            continue
+        stats = dict(stats)
+        stats["match_counts"] = {
+            int(key) if str(key).isdigit() else key: count
+            for key, count in stats["match_counts"].items()
+        }
+        _merge_plan_stats(plan_stats[plan_type], stats)
+    return plan_stats
+
+
 def _init_plan_stats() -> Dict:
     """플랜 통계 초기화"""
     return {
@@ -207,55 +410,47 @@ def _init_plan_stats() -> Dict:
     }
 
 
-def _update_plan_stats(stats: Dict, result: Dict) -> None:
-    """플랜 통계 업데이트"""
-    stats["total_users"] += 1
-    stats["total_lines"] += result.get("total_lines", 0)
-    stats["total_match"] += result.get("total_match_count", 0)
-
-    for line_result in result.get("line_results", []):
-        match_count = line_result["match_count"]
-        bonus_match = line_result["bonus_match"]
-
-        if match_count == 5 and bonus_match:
-            stats["match_counts"]["5+bonus"] += 1
-        else:
-            stats["match_counts"][match_count] = stats["match_counts"].get(match_count, 0) + 1
-
-    best = result.get("best_rank")
-    if best:
-        if stats["best_rank"] is None or best < stats["best_rank"]:
-            stats["best_rank"] = best
-
+def _apply_plan_stats_delta(db: Session, draw_no: int, plan_stats: Dict) -> None:
+    """
+    플랜별 통계 증분을 (회차, 플랜) 행에 더함 (없으면 생성, 커밋은 호출자가)
 
-def _save_plan_performance_stats(db: Session, draw_no: int, plan_stats: Dict) -> None:
-    """플랜별 성과 통계 DB 저장"""
+    이미 매칭된 로그는 다시 집계하지 않으므로 매칭을 여러 번/청크로 나눠 실행해도 합계가 정확하고,
+    평균 적중 수는 누적된 분포로 다시 계산합니다.
+    """
+    table = PlanPerformanceStats.__table__
     for plan_type, stats in plan_stats.items():
         if stats["total_lines"] == 0:
             continue
 
-        avg_match = stats["total_match"] / stats["total_lines"] if stats["total_lines"] > 0 else 0
-
-        perf = PlanPerformanceStats(
+        counts = stats["match_counts"]
+        delta = {
+            "total_lines": stats["total_lines"],
+            "total_users": stats["total_users"],
+            "match_0": counts.get(0, 0),
+            "match_1": counts.get(1, 0),
+            "match_2": counts.get(2, 0),
+            "match_3": counts.get(3, 0),
+            "match_4": counts.get(4, 0),
+            "match_5": counts.get(5, 0),
+            "match_5_bonus": counts.get("5+bonus", 0),
+            "match_6": counts.get(6, 0),
+        }
+        stmt = dialect_insert(db, PlanPerformanceStats).values(
             draw_no=draw_no,
             plan_type=plan_type,
-            total_lines=stats["total_lines"],
-            total_users=stats["total_users"],
-            match_0=stats["match_counts"].get(0, 0),
-            match_1=stats["match_counts"].get(1, 0),
-            match_2=stats["match_counts"].get(2, 0),
-            match_3=stats["match_counts"].get(3, 0),
-            match_4=stats["match_counts"].get(4, 0),
-            match_5=stats["match_counts"].get(5, 0),
-            match_5_bonus=stats["match_counts"].get("5+bonus", 0),
-            match_6=stats["match_counts"].get(6, 0),
-            avg_match_count=avg_match
+            avg_match_count=stats["total_match"] / stats["total_lines"],
+            created_at=datetime.utcnow(),
+            **delta,
         )
-
-        db.add(perf)
-
-    db.commit()
-    logger.info(f"Saved plan performance stats for draw {draw_no}")
+        summed = {col: table.c[col] + stmt.excluded[col] for col in delta}
+        total_match = (
+            summed["match_1"] + 2 * summed["match_2"] + 3 * summed["match_3"] + 4 * summed["match_4"]
+            + 5 * (summed["match_5"] + summed["match_5_bonus"]) + 6 * summed["match_6"]
+        )
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=["draw_no", "plan_type"],
+            set_={**summed, "avg_match_count": total_match * 1.0 / summed["total_lines"]},
+        ))
 
 
 def calculate_ml_hit_rates(
@@ -307,45 +502,102 @@ def calculate_ml_hit_rates(
     }
 
 
-def get_plan_performance_summary(db: Session, recent_draws: int = 10) -> Dict:
+def refresh_plan_performance_rollups(db: Session) -> None:
+    """
+    플랜별 구간 집계 재계산 (plan_performance_stats 한 번 순회, 커밋은 호출자가)
+
+    플랜마다 해당 플랜 통계가 있는 최근 10회/50회/전체 회차를 합산합니다.
+    """
+    rows = db.query(
+        PlanPerformanceStats.plan_type, PlanPerformanceStats.draw_no,
+        PlanPerformanceStats.total_lines, PlanPerformanceStats.total_users,
+        PlanPerformanceStats.match_1, PlanPerformanceStats.match_2, PlanPerformanceStats.match_3,
+        PlanPerformanceStats.match_4, PlanPerformanceStats.match_5, PlanPerformanceStats.match_5_bonus,
+        PlanPerformanceStats.match_6,
+    ).filter(
+        PlanPerformanceStats.plan_type.in_(PLAN_TYPES)
+    ).order_by(
+        PlanPerformanceStats.plan_type, PlanPerformanceStats.draw_no.desc()
+    ).all()
+
+    now = datetime.utcnow()
+    rollups = {}
+    seen = {plan_type: 0 for plan_type in PLAN_TYPES}
+    for row in rows:
+        seen[row.plan_type] += 1
+        position = seen[row.plan_type]
+        total_match = (
+            (row.match_1 or 0) + 2 * (row.match_2 or 0) + 3 * (row.match_3 or 0) + 4 * (row.match_4 or 0)
+            + 5 * ((row.match_5 or 0) + (row.match_5_bonus or 0)) + 6 * (row.match_6 or 0)
+        )
+        for period, size in ROLLUP_PERIODS.items():
+            if size is not None and position > size:
+                continue
+            rollup = rollups.setdefault((row.plan_type, period), {
+                "plan_type": row.plan_type, "period": period, "draws": 0,
+                "from_draw_no": row.draw_no, "to_draw_no": row.draw_no,
+                "total_lines": 0, "total_users": 0, "total_match": 0,
+                "match_3": 0, "match_4": 0, "match_5": 0, "match_5_bonus": 0, "match_6": 0,
+                "updated_at": now,
+            })
+            rollup["draws"] += 1
+            rollup["from_draw_no"] = row.draw_no
+            rollup["total_lines"] += row.total_lines or 0
+            rollup["total_users"] += row.total_users or 0
+            rollup["total_match"] += total_match
+            for col in ("match_3", "match_4", "match_5", "match_5_bonus", "match_6"):
+                rollup[col] += getattr(row, col) or 0
+
+    for rollup in rollups.values():
+        lines = rollup["total_lines"]
+        rollup["avg_match_count"] = rollup["total_match"] / lines if lines else 0.0
+
+    db.query(PlanPerformanceRollup).delete(synchronize_session=False)
+    if rollups:
+        db.execute(insert(PlanPerformanceRollup), list(rollups.values()))
+
+
+def get_plan_performance_summary(db: Session, recent_draws: Optional[int] = 10) -> Dict:
     """
-    최근 N회차 플랜별 성과 요약
+    최근 N회차 플랜별 성과 요약 (구간 집계 테이블 1회 조회)
+
+    Args:
+        recent_draws: 10, 50 또는 None/0(전체)
 
     Returns:
         {
-            "free": {"avg_match": 1.5, "best_rank": 5, ...},
-            "basic": {"avg_match": 2.1, "best_rank": 4, ...},
+            "free": {"total_lines": 100, "avg_match": 1.5, "rank5_count": 3, ...},
+            "basic": {...},
             ...
         }
     """
-    from sqlalchemy import func
+    period = ROLLUP_PERIOD_BY_DRAWS.get(recent_draws or None)
+    if period is None:
+        raise ValueError(f"지원하지 않는 집계 구간입니다: {recent_draws}")
 
-    results = {}
+    rollups = db.query(PlanPerformanceRollup).filter(PlanPerformanceRollup.period == period).all()
+    if not rollups and db.query(PlanPerformanceStats.id).first():
+        # 구간 집계가 아직 없으면 (도입 직후) 한 번 만들어 둠
+        refresh_plan_performance_rollups(db)
+        db.commit()
+        rollups = db.query(PlanPerformanceRollup).filter(PlanPerformanceRollup.period == period).all()
 
-    for plan_type in ["free", "basic", "premium", "vip"]:
-        stats = db.query(
-            func.sum(PlanPerformanceStats.total_lines).label("total_lines"),
-            func.sum(PlanPerformanceStats.match_3).label("rank5"),
-            func.sum(PlanPerformanceStats.match_4).label("rank4"),
-            func.sum(PlanPerformanceStats.match_5).label("rank3"),
-            func.sum(PlanPerformanceStats.match_5_bonus).label("rank2"),
-            func.sum(PlanPerformanceStats.match_6).label("rank1"),
-            func.avg(PlanPerformanceStats.avg_match_count).label("avg_match")
-        ).filter(
-            PlanPerformanceStats.plan_type == plan_type
-        ).order_by(
-            PlanPerformanceStats.draw_no.desc()
-        ).limit(recent_draws).first()
-
-        if stats and stats.total_lines:
-            results[plan_type] = {
-                "total_lines": stats.total_lines or 0,
-                "rank1_count": stats.rank1 or 0,
-                "rank2_count": stats.rank2 or 0,
-                "rank3_count": stats.rank3 or 0,
-                "rank4_count": stats.rank4 or 0,
-                "rank5_count": stats.rank5 or 0,
-                "avg_match": round(stats.avg_match or 0, 2)
-            }
+    results = {}
+    for rollup in rollups:
+        if not rollup.total_lines:
+            continue
+        results[rollup.plan_type] = {
+            "total_lines": rollup.total_lines,
+            "total_users": rollup.total_users,
+            "rank1_count": rollup.match_6,
+            "rank2_count": rollup.match_5_bonus,
+            "rank3_count": rollup.match_5,
+            "rank4_count": rollup.match_4,
+            "rank5_count": rollup.match_3,
+            "avg_match": round(rollup.avg_match_count or 0, 2),
+            "draws": rollup.draws,
+            "from_draw_no": rollup.from_draw_no,
+            "to_draw_no": rollup.to_draw_no,
+        }
 
     return results
@@ -0,0 +1,249 @@
+"""로직1~4 점수 텐서 (numpy 벡터화)
+
+LottoStatsCalculator의 로직별 점수를 "cutoff(= 앞에서부터 사용한 회차 수)"마다
+한 번에 계산합니다. cutoff i의 점수는 calculate_ai_scores_logicN(draws[:i])와 같습니다.
+
+회차 × 번호 출현 행렬의 누적합으로 전체/최근 N회 빈도, 마지막 출현, 연속 출현을
+구하므로 회차마다 전체 이력을 다시 훑지 않습니다. 가중치 탐색/백테스팅처럼
+여러 cutoff의 점수가 필요한 곳에서 사용합니다.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+NUMBERS = np.arange(1, 46)
+LOGIC_NAMES = ('logic1', 'logic2', 'logic3', 'logic4')
+
+
+def draws_to_hit_matrix(draws: List[Dict]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    회차 리스트 → (당첨번호 출현 행렬, 보너스 출현 행렬)
+
+    Returns:
+        hits: (N, 45) bool - hits[i, n-1] = i번째 회차에 n 출현
+        bonus: (N, 45) bool - bonus[i, n-1] = i번째 회차 보너스가 n
+    """
+    n_draws = len(draws)
+    hits = np.zeros((n_draws, 45), dtype=bool)
+    bonus = np.zeros((n_draws, 45), dtype=bool)
+    for i, d in enumerate(draws):
+        for key in ('n1', 'n2', 'n3', 'n4', 'n5', 'n6'):
+            hits[i, d[key] - 1] = True
+        b = d.get('bonus')
+        if b:
+            bonus[i, b - 1] = True
+    return hits, bonus
+
+
+def _first_appearance_order(draws: List[Dict]) -> np.ndarray:
+    """번호별 최초 출현 순서 (Counter 삽입 순서 = 동점 정렬 기준)"""
+    order = np.full(45, np.iinfo(np.int64).max, dtype=np.int64)
+    pos = 0
+    for d in draws:
+        for key in ('n1', 'n2', 'n3', 'n4', 'n5', 'n6'):
+            n = d[key] - 1
+            if order[n] == np.iinfo(np.int64).max:
+                order[n] = pos
+            pos += 1
+    return order
+
+
+def _hot_cold_masks(counts: np.ndarray, first_order: np.ndarray, top_n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    calculate_most_least(top_n)과 같은 순위의 HOT/COLD 여부 (cutoff별)
+
+    동점은 최초 출현 순서로 정렬 (Counter.most_common / sorted의 안정 정렬과 동일).
+    한 번도 나오지 않은 번호는 어느 쪽에도 포함되지 않습니다.
+    """
+    appeared = counts > 0
+    # 정렬 키: 출현 횟수 우선, 동점이면 먼저 나온 번호 우선
+    tie = np.argsort(np.argsort(first_order)).astype(np.float64)  # 0..44
+    most_key = np.where(appeared, counts * 64.0 - tie, -np.inf)
+    least_key = np.where(appeared, counts * 64.0 + tie, np.inf)
+
+    hot = np.zeros(counts.shape, dtype=bool)
+    cold = np.zeros(counts.shape, dtype=bool)
+    most_idx = np.argsort(-most_key, axis=-1, kind='stable')[..., :top_n]
+    least_idx = np.argsort(least_key, axis=-1, kind='stable')[..., :top_n]
+    np.put_along_axis(hot, most_idx, True, axis=-1)
+    np.put_along_axis(cold, least_idx, True, axis=-1)
+    hot &= appeared
+    cold &= appeared
+    return hot, cold
+
+
+class ScoreTensorBuilder:
+    """회차 이력으로부터 cutoff별 로직 점수/기초 통계를 계산"""
+
+    def __init__(self, draws: List[Dict]):
+        self.draws = draws
+        self.hits, self.bonus = draws_to_hit_matrix(draws)
+        n_draws = len(draws)
+
+        # cum[i] = draws[:i] 구간 누적 출현 횟수
+        self.cum = np.zeros((n_draws + 1, 45), dtype=np.int32)
+        np.cumsum(self.hits, axis=0, out=self.cum[1:])
+        self.bonus_cum = np.zeros((n_draws + 1, 45), dtype=np.int32)
+        np.cumsum(self.bonus, axis=0, out=self.bonus_cum[1:])
+
+        # last[i] = draws[:i] 구간 마지막 출현 위치 (1부터, 없으면 0)
+        idx = np.arange(1, n_draws + 1, dtype=np.int32)[:, None]
+        self.last = np.zeros((n_draws + 1, 45), dtype=np.int32)
+        np.maximum.accumulate(np.where(self.hits, idx, 0), axis=0, out=self.last[1:])
+
+        self.first_order = _first_appearance_order(draws)
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # 기초 통계
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    def window_counts(self, cutoffs: np.ndarray, window: int) -> np.ndarray:
+        """최근 window회 출현 횟수 (회차가 부족하면 전체)"""
+        start = np.maximum(cutoffs - window, 0)
+        return self.cum[cutoffs] - self.cum[start]
+
+    def recent_streak(self, cutoffs: np.ndarray, depth: int = 3) -> np.ndarray:
+        """직전 회차부터 연속 출현 여부 (cutoffs, depth) - [:, k] = k+1회 전 출현"""
+        out = np.zeros((len(cutoffs), depth, 45), dtype=bool)
+        for k in range(depth):
+            rows = cutoffs - 1 - k
+            valid = rows >= 0
+            out[valid, k] = self.hits[rows[valid]]
+        return out
+
+    def consecutive_streak(self, cutoffs: np.ndarray) -> np.ndarray:
+        """직전 회차부터 끊기지 않고 연속 출현한 횟수"""
+        out = np.zeros((len(cutoffs), 45), dtype=np.int32)
+        alive = np.ones((len(cutoffs), 45), dtype=bool)
+        k = 0
+        while alive.any():
+            rows = cutoffs - 1 - k
+            valid = rows >= 0
+            step = np.zeros_like(alive)
+            step[valid] = self.hits[rows[valid]]
+            alive &= step
+            out += alive
+            k += 1
+        return out
+
+    def gaps(self, cutoffs: np.ndarray, missing: int = 999) -> np.ndarray:
+        """마지막 출현 이후 간격 (한 번도 안 나왔으면 missing)"""
+        last = self.last[cutoffs]
+        return np.where(last > 0, cutoffs[:, None] - last, missing)
+
+    def hot_cold(self, cutoffs: np.ndarray, top_n: int = 15) -> Tuple[np.ndarray, np.ndarray]:
+        return _hot_cold_masks(self.cum[cutoffs].astype(np.float64), self.first_order, top_n)
+
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    # 로직별 점수 (stats_calculator와 동일 공식)
+    # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+    def logic_scores(self, cutoffs: Optional[Sequence[int]] = None) -> np.ndarray:
+        """
+        Args:
+            cutoffs: 사용할 회차 수 리스트 (None이면 1..N 전체)
+
+        Returns:
+            (len(cutoffs), 4, 45) float64 - [:, 0..3] = logic1..logic4
+        """
+        if cutoffs is None:
+            cutoffs = np.arange(1, len(self.draws) + 1)
+        cutoffs = np.asarray(cutoffs, dtype=np.int64)
+        c = cutoffs[:, None]
+
+        total_count = self.cum[cutoffs].astype(np.float64)
+        recent10 = self.window_counts(cutoffs, 10)
+        recent30 = self.window_counts(cutoffs, 30)
+        recent100 = self.window_counts(cutoffs, 100)
+        last = self.last[cutoffs]
+
+        streak = self.recent_streak(cutoffs, 3)
+        two_in_row = streak[:, 0] & streak[:, 1]
+        three_in_row = two_in_row & streak[:, 2]
+
+        gap = np.where(last > 0, c - last, 999)
+
+        out = np.empty((len(cutoffs), 4, 45), dtype=np.float64)
+
+        # 로직1: 전체 출현 + 연속 페널티 + 최근10회 보너스 + 간격
+        penalty1 = np.where(three_in_row, -50, np.where(two_in_row, -30, 0))
+        hot_bonus = np.select([recent10 >= 3, recent10 == 2, recent10 == 1], [6, 4, 2], 0)
+        gap_bonus1 = np.select([(gap >= 16) & (gap <= 40), (gap >= 3) & (gap <= 15)], [15, 10], 0)
+        out[:, 0] = total_count + penalty1 + hot_bonus + gap_bonus1
+
+        # 로직2: (전체 × 0.6) + (최근30회 × 5) + 간격 (미출현은 간격 = 전체 회차 수)
+        gap2 = c - last
+        gap_bonus2 = np.select([(gap2 >= 16) & (gap2 <= 40), (gap2 >= 3) & (gap2 <= 15)], [30, 20], 0)
+        out[:, 1] = total_count * 0.6 + recent30 * 5 + gap_bonus2
+
+        # 로직3: 최근 100회만 사용
+        window_start = np.maximum(c - 100, 0)
+        gap3 = np.where(last > window_start, c - last, 999)
+        penalty3 = np.where(three_in_row, -20, np.where(two_in_row, -10, 0))
+        gap_bonus3 = np.select([(gap3 >= 10) & (gap3 <= 25), (gap3 >= 3) & (gap3 <= 9)], [10, 5], 0)
+        out[:, 2] = recent100 + penalty3 + gap_bonus3
+
+        # 로직4: 전체 회차 특성 종합
+        hot, cold = self.hot_cold(cutoffs, top_n=10)
+        bonus_freq = self.bonus_cum[cutoffs] * 1.5
+        gap_score4 = np.select(
+            [(gap >= 16) & (gap <= 40), (gap >= 3) & (gap <= 15), (gap >= 1) & (gap <= 2)],
+            [20, 15, -20], 0
+        )
+        penalty4 = np.where(three_in_row, -40, np.where(two_in_row, -25, 0))
+        odd_bonus = np.where(NUMBERS % 2 == 1, 5, 0)
+        zone_bonus = np.where((NUMBERS >= 16) & (NUMBERS <= 30), 5, 2)
+        out[:, 3] = (
+            total_count
+            + recent10 * 3.0
+            + recent30 * 2.0
+            + recent100 * 1.5
+            + gap_score4
+            + penalty4
+            + np.where(hot, 10, 0)
+            + np.where(cold, -5, 0)
+            + bonus_freq
+            + odd_bonus
+            + zone_bonus
+        )
+
+        return out
+
+    def feature_matrix(self, cutoffs: Sequence[int]) -> np.ndarray:
+        """
+        LottoMLTrainer.extract_features와 같은 15개 특성 (cutoff별)
+
+        Returns:
+            (len(cutoffs), 45, 15) float64 - 이력이 10회 미만인 cutoff는 0
+        """
+        cutoffs = np.asarray(cutoffs, dtype=np.int64)
+        out = np.zeros((len(cutoffs), 45, 15), dtype=np.float64)
+
+        valid = cutoffs >= 10
+        if not valid.any():
+            return out
+        c = cutoffs[valid]
+
+        hot, cold = self.hot_cold(c, top_n=15)
+        feats = out[valid]
+        feats[..., 0:4] = self.logic_scores(c).transpose(0, 2, 1)
+        feats[..., 4] = self.cum[c]
+        feats[..., 5] = self.window_counts(c, 10)
+        feats[..., 6] = self.window_counts(c, 30)
+        feats[..., 7] = self.window_counts(c, 100)
+        feats[..., 8] = self.gaps(c)
+        feats[..., 9] = hot
+        feats[..., 10] = cold
+        feats[..., 11] = self.bonus_cum[c]
+        feats[..., 12] = NUMBERS % 2
+        feats[..., 13] = (NUMBERS - 1) // 15
+        feats[..., 14] = self.consecutive_streak(c)
+        out[valid] = feats
+        return out
+
+    def winning_mask(self, cutoffs: Sequence[int]) -> np.ndarray:
+        """cutoff 직후 회차(= 예측 대상)의 당첨번호 마스크 (len(cutoffs), 45)"""
+        return self.hits[np.asarray(cutoffs, dtype=np.int64)]
+
+
+def build_score_tensor(draws: List[Dict], cutoffs: Optional[Sequence[int]] = None) -> np.ndarray:
+    """cutoff별 로직1~4 점수 텐서 (len(cutoffs), 4, 45)"""
+    return ScoreTensorBuilder(draws).logic_scores(cutoffs)
@@ -0,0 +1,51 @@
+"""통계 캐시 (lotto_stats_cache) 재생성"""
+import json
+from datetime import datetime
+
+from sqlalchemy.orm import Session
+
+from app.db.models import LottoDraw, LottoStatsCache
+from app.services.lotto.stats_calculator import LottoStatsCalculator
+
+
+def rebuild_stats_cache(db: Session) -> int:
+    """
+    전체 회차로 통계 캐시 재생성 후 커밋
+
+    Returns:
+        계산에 사용한 회차 수 (회차가 없으면 0 - 캐시는 그대로 둠)
+    """
+    from app.services.lotto import draws_to_dict_list
+
+    draws = db.query(LottoDraw).order_by(LottoDraw.draw_no).all()
+    if not draws:
+        return 0
+
+    draws_dict = draws_to_dict_list(draws)
+    most_common, least_common = LottoStatsCalculator.calculate_most_least(draws_dict)
+    ai_scores = {
+        "logic1": LottoStatsCalculator.calculate_ai_scores_logic1(draws_dict),
+        "logic2": LottoStatsCalculator.calculate_ai_scores_logic2(draws_dict),
+        "logic3": LottoStatsCalculator.calculate_ai_scores_logic3(draws_dict),
+    }
+
+    cache = db.query(LottoStatsCache).filter(LottoStatsCache.id == 1).first()
+    if cache:
+        cache.updated_at = datetime.utcnow()
+        cache.total_draws = len(draws)
+        cache.most_common = json.dumps(most_common)
+        cache.least_common = json.dumps(least_common)
+        cache.ai_scores = json.dumps(ai_scores)
+    else:
+        cache = LottoStatsCache(
+            id=1,
+            updated_at=datetime.utcnow(),
+            total_draws=len(draws),
+            most_common=json.dumps(most_common),
+            least_common=json.dumps(least_common),
+            ai_scores=json.dumps(ai_scores),
+        )
+        db.add(cache)
+
+    db.commit()
+    return len(draws)
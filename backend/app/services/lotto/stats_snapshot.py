@@ -0,0 +1,101 @@
+"""번호 생성용 통계 스냅샷 (프로세스 캐시)
+
+build_stats_from_draws(최다/최소 출현 + 점수 로직 3종)는 회차 데이터가 바뀌기 전까지 결과가 같으므로
+(최신 회차, 회차 수, 번호 체크섬, 윈도우)를 버전으로 프로세스 메모리에 보관합니다.
+요청마다 버전 확인 집계 쿼리 1회만 실행하므로 풀 생성 비용은 번호 생성만 남습니다.
+회차 추가는 물론 관리자 수정/삭제도 버전이 바뀌어 다른 워커 프로세스에서도 다시 계산됩니다.
+(번호 체크섬은 번호 위치와 회차 번호를 반영하므로 합계가 같은 수정 - 예: n1과 보너스 교환 - 도 감지합니다)
+회차 데이터로만 결정되는 다른 계산 결과(프리미엄 통계 등)도 cached_for_draws로 같은 방식으로 캐시합니다.
+
+반환된 값은 여러 요청이 공유하므로 수정하지 마세요.
+"""
+import logging
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+from sqlalchemy import BigInteger, cast, func
+from sqlalchemy.orm import Session
+
+from app.db.models import LottoDraw
+
+logger = logging.getLogger("stats_snapshot")
+
+# 풀 생성에 쓰는 최근 회차 수
+POOL_STATS_WINDOW = 200
+
+T = TypeVar("T")
+
+# build 안에서 다른 스냅샷을 조회할 수 있으므로 재진입 가능 잠금
+_lock = threading.RLock()
+# 번호 체크섬 자릿수 (번호 1~45 → 46진수 한 자리)
+_CHECKSUM_BASE = 46
+
+# 캐시 키 → (버전, 값)
+_snapshots: Dict[Hashable, Tuple[Tuple[int, int, int], Any]] = {}
+
+
+def _draw_version(db: Session) -> Tuple[int, int, int]:
+    """
+    회차 데이터 버전 (최신 회차, 회차 수, 번호 체크섬)
+
+    체크섬: 회차별 번호 7개를 위치별 46진수 자리로 만든 값(회차마다 고유)에 회차 번호를 곱해 합산
+    (한 회차의 어떤 번호가 바뀌어도 값이 바뀜, 최대 약 10^18로 BIGINT 범위 내)
+    """
+    columns = (
+        LottoDraw.n1, LottoDraw.n2, LottoDraw.n3, LottoDraw.n4,
+        LottoDraw.n5, LottoDraw.n6, LottoDraw.bonus,
+    )
+    numbers_code = sum(
+        cast(column, BigInteger) * _CHECKSUM_BASE ** position
+        for position, column in enumerate(columns)
+    )
+    row = db.query(
+        func.max(LottoDraw.draw_no),
+        func.count(LottoDraw.draw_no),
+        func.sum(numbers_code * LottoDraw.draw_no),
+    ).one()
+    return tuple(int(value or 0) for value in row)
+
+
+def cached_for_draws(db: Session, key: Hashable, build: Callable[[], T]) -> T:
+    """회차 데이터 버전별 캐시 (버전이 같으면 build를 다시 호출하지 않음)"""
+    version = _draw_version(db)
+    cached = _snapshots.get(key)
+    if cached and cached[0] == version:
+        return cached[1]
+
+    with _lock:
+        # 다른 스레드가 먼저 계산했으면 재사용
+        cached = _snapshots.get(key)
+        if cached and cached[0] == version:
+            return cached[1]
+
+        value = build()
+        _snapshots[key] = (version, value)
+        logger.info(f"Draw snapshot rebuilt: key={key}, latest_draw={version[0]}")
+        return value
+
+
+def get_stats_snapshot(db: Session, window: Optional[int] = POOL_STATS_WINDOW) -> Optional[dict]:
+    """
+    최근 window개 회차 통계 (None이면 전체 회차, 회차가 없으면 None)
+
+    입력 순서는 기존 PoolService/_build_stats_from_db와 같은 최신순입니다.
+    """
+    def build() -> Optional[dict]:
+        # 순환 import 방지를 위해 함수 내에서 import
+        from . import build_stats_from_draws, draws_to_dict_list
+
+        query = db.query(LottoDraw).order_by(LottoDraw.draw_no.desc())
+        if window:
+            query = query.limit(window)
+        draws = query.all()
+        return build_stats_from_draws(draws_to_dict_list(draws)) if draws else None
+
+    return cached_for_draws(db, ("stats", window), build)
+
+
+def clear_stats_snapshots() -> None:
+    """캐시 비우기 (다음 조회 시 다시 계산)"""
+    with _lock:
+        _snapshots.clear()
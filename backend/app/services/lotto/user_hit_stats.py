@@ -0,0 +1,178 @@
+"""유저별 누적 적중 통계 (user_hit_stats)
+
+당첨 매칭 청크마다 새로 매칭된 로그 분량만 증분 UPSERT하므로(결과 UPDATE와 같은 트랜잭션)
+MyPage는 match_results JSON을 파싱하지 않고 기본키 조회 한 번으로 통계를 보여줄 수 있습니다.
+도입 전 매칭분은 user_hit_stats_backfill 작업(recommend_lines 집계로 전체 재계산)으로 채웁니다.
+"""
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import case, func, insert
+from sqlalchemy.orm import Session
+
+from app.db.models import LottoRecommendLine, LottoRecommendLog, UserHitStats
+from app.db.upsert import dialect_insert
+
+logger = logging.getLogger("user_hit_stats")
+
+_RANK_COLUMNS = ("rank1_count", "rank2_count", "rank3_count", "rank4_count", "rank5_count")
+_SUM_COLUMNS = ("matched_logs", "total_lines", "total_match") + _RANK_COLUMNS
+
+
+def init_user_stats() -> Dict:
+    """유저 통계 증분 초기값"""
+    stats = {col: 0 for col in _SUM_COLUMNS}
+    stats["best_rank"] = None
+    stats["last_matched_draw_no"] = None
+    return stats
+
+
+def apply_user_hit_deltas(db: Session, deltas: Dict[int, Dict]) -> None:
+    """
+    유저별 증분을 누적 통계에 더함 (없으면 생성, 커밋은 호출자가)
+
+    best_rank는 더 높은 등수(작은 값), last_matched_draw_no는 더 큰 회차로 갱신합니다.
+    """
+    if not deltas:
+        return
+
+    table = UserHitStats.__table__
+    now = datetime.utcnow()
+    rows = [
+        {"account_user_id": user_id, "updated_at": now, **delta}
+        for user_id, delta in deltas.items()
+    ]
+    stmt = dialect_insert(db, UserHitStats)
+    current_best, new_best = table.c.best_rank, stmt.excluded.best_rank
+    current_last, new_last = table.c.last_matched_draw_no, stmt.excluded.last_matched_draw_no
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=["account_user_id"],
+        set_={
+            **{col: table.c[col] + stmt.excluded[col] for col in _SUM_COLUMNS},
+            "best_rank": case(
+                (new_best.is_(None), current_best),
+                (current_best.is_(None), new_best),
+                (new_best < current_best, new_best),
+                else_=current_best,
+            ),
+            "last_matched_draw_no": case(
+                (current_last.is_(None), new_last),
+                (new_last > current_last, new_last),
+                else_=current_last,
+            ),
+            "updated_at": stmt.excluded.updated_at,
+        },
+    ), rows)
+
+
+def get_user_hit_stats(db: Session, account_user_id: int) -> Dict:
+    """유저 누적 적중 통계 (기본키 조회 1회)"""
+    stats: Optional[UserHitStats] = db.get(UserHitStats, account_user_id)
+    if not stats:
+        return {
+            "matched_logs": 0,
+            "total_lines": 0,
+            "total_match": 0,
+            "avg_match": 0,
+            "rank_counts": {rank: 0 for rank in range(1, 6)},
+            "best_rank": None,
+            "last_matched_draw_no": None,
+        }
+
+    return {
+        "matched_logs": stats.matched_logs or 0,
+        "total_lines": stats.total_lines or 0,
+        "total_match": stats.total_match or 0,
+        "avg_match": round(stats.total_match / stats.total_lines, 2) if stats.total_lines else 0,
+        "rank_counts": {rank: getattr(stats, f"rank{rank}_count") or 0 for rank in range(1, 6)},
+        "best_rank": stats.best_rank,
+        "last_matched_draw_no": stats.last_matched_draw_no,
+    }
+
+
+def rebuild_user_hit_stats(db: Session) -> Dict:
+    """
+    유저별 통계 전체 재계산 (매칭 완료 로그의 공개 줄을 recommend_lines에서 집계)
+
+    발급 줄 테이블이 비어 있는 로그가 있으면 먼저 채웁니다. 매칭 작업과 동시에 실행하지 마세요.
+    """
+    from app.services.lotto.recommend_lines import backfill_recommend_lines
+
+    backfill_recommend_lines(db)
+
+    line = LottoRecommendLine
+    log = LottoRecommendLog
+    rank_sums = [func.sum(case((line.rank == rank, 1), else_=0)) for rank in range(1, 6)]
+    rows = db.query(
+        log.account_user_id,
+        func.count(func.distinct(log.id)),
+        func.count(line.id),
+        func.sum(line.match_count),
+        *rank_sums,
+        func.min(case((line.rank > 0, line.rank), else_=None)),
+        func.max(line.target_draw_no),
+    ).join(
+        log, log.id == line.log_id
+    ).filter(
+        log.is_matched == True,
+        log.account_user_id.isnot(None),
+        line.revealed == True,
+        line.match_count.isnot(None),
+    ).group_by(log.account_user_id).all()
+
+    now = datetime.utcnow()
+    values = [
+        {
+            "account_user_id": row[0],
+            "matched_logs": row[1],
+            "total_lines": row[2],
+            "total_match": int(row[3] or 0),
+            **{col: int(row[4 + i] or 0) for i, col in enumerate(_RANK_COLUMNS)},
+            "best_rank": row[9],
+            "last_matched_draw_no": row[10],
+            "updated_at": now,
+        }
+        for row in rows
+    ]
+
+    db.query(UserHitStats).delete(synchronize_session=False)
+    if values:
+        db.execute(insert(UserHitStats), values)
+    db.commit()
+
+    logger.info(f"Rebuilt user hit stats for {len(values)} users")
+    return {"users": len(values)}
+
+
+def request_user_hit_stats_backfill(db: Session) -> Optional[str]:
+    """매칭된 로그는 있는데 유저 통계가 비어 있으면 재계산 작업 등록 (도입 직후 1회)"""
+    from app.db.models import AdminJob
+    from app.services.jobs import submit_job, JobQueueFull
+    from app.services.jobs.job_runner import ACTIVE_STATUSES
+
+    try:
+        if db.query(UserHitStats.account_user_id).first():
+            return None
+        matched = db.query(LottoRecommendLog.id).filter(
+            LottoRecommendLog.is_matched == True,
+            LottoRecommendLog.account_user_id.isnot(None),
+        ).first()
+        if not matched:
+            return None
+
+        active = db.query(AdminJob.id).filter(
+            AdminJob.job_type == "user_hit_stats_backfill",
+            AdminJob.status.in_(ACTIVE_STATUSES),
+        ).first()
+        if active:
+            return active[0]
+
+        return submit_job(db, "user_hit_stats_backfill", {}).id
+    except JobQueueFull:
+        logger.warning("유저 적중 통계 재계산 작업 등록 실패: 대기 작업 초과")
+        return None
+    except Exception:
+        db.rollback()
+        logger.exception("유저 적중 통계 상태 확인 실패")
+        return None
@@ -0,0 +1,123 @@
+"""Walk-forward 적중률 평가기
+
+각 회차를 "직전 회차까지의 데이터로 만든 점수"로 평가합니다 (미래 데이터 누수 없음).
+이력은 ScoreTensorBuilder로 한 번만 훑고(누적합 기반 증분 통계), 여러 점수 함수의
+회차별 상위 k개 적중 수를 한 번에 배열로 기록합니다.
+
+점수 함수(scorer) 지정 방법:
+    - "logic1".."logic4": 로직 점수
+    - FEATURE_NAMES의 특성 이름 (예: "recent10_freq"): 해당 특성 값
+    - {"logic1": w1, ...}: 로직 점수 가중합
+    - callable(builder, cutoffs) -> (D, 45) 배열
+"""
+from typing import Callable, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from app.services.lotto.feature_store import FEATURE_NAMES, MIN_HISTORY
+from app.services.lotto.score_tensor import LOGIC_NAMES, ScoreTensorBuilder
+
+Scorer = Union[str, Dict[str, float], Callable[[ScoreTensorBuilder, np.ndarray], np.ndarray]]
+
+
+def top_k_hits(scores: np.ndarray, winning: np.ndarray, top_ks: Sequence[int]) -> Dict[int, np.ndarray]:
+    """
+    회차별 상위 k개 번호 중 당첨 번호 수
+
+    Args:
+        scores: (D, 45) 점수 (동점은 작은 번호 우선)
+        winning: (D, 45) 당첨 마스크
+        top_ks: k 목록
+
+    Returns:
+        {k: (D,) 적중 수}
+    """
+    order = np.argsort(-scores, axis=1, kind='stable')[:, :max(top_ks)]
+    ranked_hits = np.take_along_axis(winning, order, axis=1)
+    cumulative = np.cumsum(ranked_hits, axis=1)
+    return {k: cumulative[:, k - 1].astype(np.int32) for k in top_ks}
+
+
+class WalkForwardEvaluator:
+    """회차 이력을 한 번 훑어 여러 점수 함수의 walk-forward 적중 기록"""
+
+    def __init__(self, draws: List[Dict], feature_source: Optional[Callable] = None):
+        """
+        Args:
+            draws: 회차 데이터 (draw_no 오름차순)
+            feature_source: 특성 이름 scorer용 (draws, 대상 회차) -> (T, 45, 15).
+                None이면 builder에서 즉석 계산
+        """
+        self.draws = draws
+        self.builder = ScoreTensorBuilder(draws)
+        self.feature_source = feature_source
+        self.draw_nos = np.array([d['draw_no'] for d in draws], dtype=np.int64)
+
+    def cutoffs_for_last(self, n_draws: int) -> np.ndarray:
+        """최근 n_draws개 회차 평가용 cutoff (이력 10회 미만 회차 제외)"""
+        start = max(MIN_HISTORY, len(self.draws) - n_draws)
+        return np.arange(start, len(self.draws))
+
+    def _scores(self, scorer: Scorer, cutoffs: np.ndarray, cache: Dict) -> np.ndarray:
+        if callable(scorer):
+            return scorer(self.builder, cutoffs)
+
+        if isinstance(scorer, dict) or scorer in LOGIC_NAMES:
+            if 'logic' not in cache:
+                cache['logic'] = self.builder.logic_scores(cutoffs)
+            logic = cache['logic']
+            if isinstance(scorer, dict):
+                weights = np.array([scorer.get(name, 0.0) for name in LOGIC_NAMES])
+                return np.einsum('l,dln->dn', weights, logic)
+            return logic[:, LOGIC_NAMES.index(scorer)]
+
+        if scorer in FEATURE_NAMES:
+            if 'features' not in cache:
+                if self.feature_source is not None:
+                    cache['features'] = self.feature_source(self.draws, self.draw_nos[cutoffs])
+                else:
+                    cache['features'] = self.builder.feature_matrix(cutoffs)
+            return cache['features'][..., FEATURE_NAMES.index(scorer)]
+
+        raise ValueError(f"알 수 없는 점수 함수: {scorer}")
+
+    def evaluate(
+        self,
+        scorers: Dict[str, Scorer],
+        cutoffs: Optional[Sequence[int]] = None,
+        top_ks: Sequence[int] = (15,),
+    ) -> Dict:
+        """
+        Args:
+            scorers: {이름: 점수 함수}
+            cutoffs: 평가할 cutoff (draws[cutoff]가 대상 회차). None이면 이력 10회 이후 전체
+            top_ks: 기록할 상위 k 목록
+
+        Returns:
+            {
+                'draw_nos': (D,) 대상 회차,
+                'hits': {이름: {k: (D,) 적중 수}},
+                'hit_rates': {이름: {k: 평균 적중률(0~1, 6개 기준)}},
+            }
+        """
+        if cutoffs is None:
+            cutoffs = np.arange(MIN_HISTORY, len(self.draws))
+        cutoffs = np.asarray(cutoffs, dtype=np.int64)
+
+        winning = self.builder.winning_mask(cutoffs)
+        cache: Dict = {}
+        hits = {}
+        hit_rates = {}
+        for name, scorer in scorers.items():
+            scores = self._scores(scorer, cutoffs, cache)
+            hits[name] = top_k_hits(scores, winning, top_ks)
+            hit_rates[name] = {
+                k: float(v.sum()) / (6 * len(cutoffs)) if len(cutoffs) else 0.0
+                for k, v in hits[name].items()
+            }
+
+        return {
+            'draw_nos': self.draw_nos[cutoffs],
+            'hits': hits,
+            'hit_rates': hit_rates,
+        }
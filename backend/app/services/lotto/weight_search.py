@@ -0,0 +1,164 @@
+"""로직1~4 가중치 탐색 (Grid / Random Search)
+
+학습기(_calculate_hit_rate)와 같은 기준 - 원점수 가중합 상위 15개의 적중률 - 으로
+후보를 평가하므로, 찾은 가중치를 그대로 ai_weights에 저장해 쓸 수 있습니다.
+
+cutoff별 점수 텐서(score_tensor)를 한 번 만든 뒤, 후보 가중치 K개에 대해
+(회차 × 후보 × 번호) 종합 점수를 배치 행렬곱으로 계산하고
+argpartition으로 상위 15개를 뽑아 적중률을 구합니다.
+"""
+import time
+from itertools import combinations
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.services.lotto.score_tensor import LOGIC_NAMES, ScoreTensorBuilder
+
+# 배치당 (회차 × 후보 × 45) float32 원소 수 상한 (~64MB)
+_MAX_BATCH_ELEMENTS = 16_000_000
+
+
+def simplex_grid(steps: int) -> np.ndarray:
+    """합이 1인 4차원 격자 (간격 1/steps) - 후보 수 C(steps+3, 3)"""
+    points = []
+    # stars and bars: 막대 3개 위치로 4개 구간 분할
+    for bars in combinations(range(steps + 3), 3):
+        a = bars[0]
+        b = bars[1] - bars[0] - 1
+        c = bars[2] - bars[1] - 1
+        d = steps + 2 - bars[2]
+        points.append((a, b, c, d))
+    return np.array(points, dtype=np.float64) / steps
+
+
+def random_simplex(n_samples: int, seed: Optional[int] = None) -> np.ndarray:
+    """합이 1인 4차원 가중치 균등 샘플 (Dirichlet(1,1,1,1))"""
+    rng = np.random.default_rng(seed)
+    return rng.dirichlet(np.ones(4), size=n_samples)
+
+
+def evaluate_weight_candidates(
+    tensor: np.ndarray,
+    winning: np.ndarray,
+    candidates: np.ndarray,
+    top_k: int = 15,
+) -> np.ndarray:
+    """
+    후보 가중치별 상위 top_k 적중 개수 합계
+
+    Args:
+        tensor: (D, 4, 45) cutoff별 로직 점수
+        winning: (D, 45) 예측 대상 회차 당첨 마스크
+        candidates: (K, 4) 후보 가중치
+        top_k: 상위 몇 개 번호를 뽑을지
+
+    Returns:
+        (K,) 후보별 총 적중 개수 (D회차 합)
+    """
+    n_draws = tensor.shape[0]
+    n_candidates = candidates.shape[0]
+    tensor32 = tensor.astype(np.float32)
+    win = winning.astype(np.int32)
+    weights32 = candidates.astype(np.float32)
+
+    batch = max(1, _MAX_BATCH_ELEMENTS // max(1, n_draws * 45))
+    total_hits = np.zeros(n_candidates, dtype=np.int64)
+
+    for start in range(0, n_candidates, batch):
+        w = weights32[start:start + batch]
+        # (D, 4, 45) x (Kb, 4) -> (D, Kb, 45)
+        scores = np.matmul(w, tensor32)
+        top_idx = np.argpartition(-scores, top_k - 1, axis=-1)[..., :top_k]
+        hits = np.take_along_axis(win[:, None, :], top_idx, axis=-1).sum(axis=-1)
+        total_hits[start:start + batch] = hits.sum(axis=0)
+
+    return total_hits
+
+
+def search_logic_weights(
+    draws: List[Dict],
+    mode: str = "grid",
+    eval_draws: int = 500,
+    grid_steps: int = 36,
+    n_samples: int = 10000,
+    top_k: int = 15,
+    seed: Optional[int] = None,
+    current_weights: Optional[Dict[str, float]] = None,
+    table_size: int = 20,
+) -> Dict:
+    """
+    로직 가중치 탐색
+
+    Args:
+        draws: 전체 회차 데이터 (draw_no 오름차순)
+        mode: "grid" (격자) 또는 "random" (무작위 샘플)
+        eval_draws: 평가할 최근 회차 수 (각 회차는 직전까지의 데이터로 점수 계산)
+        grid_steps: 격자 간격 (36 → 9,139개 후보)
+        n_samples: random 모드 후보 수
+        top_k: 상위 몇 개 번호로 적중률을 잴지
+        seed: random 모드 시드
+        current_weights: 비교용 현재 가중치
+        table_size: 순위표에 담을 상위 후보 수
+
+    Returns:
+        {'best', 'ranked', 'baseline', 'candidates', 'eval_draws', 'elapsed_sec', ...}
+    """
+    started = time.perf_counter()
+
+    if mode == "grid":
+        candidates = simplex_grid(grid_steps)
+    elif mode == "random":
+        candidates = random_simplex(n_samples, seed)
+    else:
+        raise ValueError(f"지원하지 않는 탐색 방식: {mode}")
+
+    # 최소 10회차 이력이 있어야 점수 계산 (trainer와 동일 기준)
+    first_cutoff = max(10, len(draws) - eval_draws)
+    cutoffs = np.arange(first_cutoff, len(draws))
+    if len(cutoffs) == 0:
+        raise ValueError("평가할 회차가 부족합니다.")
+
+    builder = ScoreTensorBuilder(draws)
+    tensor = builder.logic_scores(cutoffs)
+    winning = builder.winning_mask(cutoffs)
+
+    total_hits = evaluate_weight_candidates(tensor, winning, candidates, top_k)
+    hit_rates = total_hits / (6.0 * len(cutoffs))
+
+    order = np.argsort(-hit_rates, kind="stable")
+    ranked = [
+        {
+            "rank": rank,
+            "weights": {name: round(float(candidates[i, j]), 4) for j, name in enumerate(LOGIC_NAMES)},
+            "hit_rate": round(float(hit_rates[i]), 6),
+            "avg_hits": round(float(total_hits[i]) / len(cutoffs), 4),
+        }
+        for rank, i in enumerate(order[:table_size], start=1)
+    ]
+
+    baseline = None
+    if current_weights:
+        w = np.array([[current_weights.get(name, 0.0) for name in LOGIC_NAMES]])
+        base_hits = evaluate_weight_candidates(tensor, winning, w, top_k)[0]
+        baseline = {
+            "weights": {name: round(float(w[0, j]), 4) for j, name in enumerate(LOGIC_NAMES)},
+            "hit_rate": round(float(base_hits) / (6.0 * len(cutoffs)), 6),
+            "avg_hits": round(float(base_hits) / len(cutoffs), 4),
+        }
+
+    best_idx = int(order[0])
+    return {
+        "mode": mode,
+        "top_k": top_k,
+        "candidates": int(len(candidates)),
+        "eval_draws": int(len(cutoffs)),
+        "eval_range": [draws[int(cutoffs[0])]["draw_no"], draws[int(cutoffs[-1])]["draw_no"]],
+        "best": {
+            "weights": {name: float(candidates[best_idx, j]) for j, name in enumerate(LOGIC_NAMES)},
+            "hit_rate": float(hit_rates[best_idx]),
+        },
+        "baseline": baseline,
+        "ranked": ranked,
+        "elapsed_sec": round(time.perf_counter() - started, 3),
+    }
@@ -0,0 +1,138 @@
+"""API 요청 로그 비동기 일괄 저장 (ops_request_logs)
+
+요청마다 세션을 열어 INSERT/커밋하던 방식 대신 미들웨어는 메모리 큐에 행을 넣기만 하고,
+백그라운드 스레드가 REQUEST_LOG_FLUSH_MS마다 또는 REQUEST_LOG_BATCH_SIZE개가 모이면 한 번에 INSERT합니다.
+큐가 가득 차면 요청을 기다리게 하지 않고 버린 뒤 개수만 셉니다. 종료 시 남은 로그를 저장합니다.
+라우트별 응답 시간 집계(request_metrics)도 같은 스레드에서 주기적으로 저장합니다.
+"""
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert
+
+from app.config import settings
+from app.db.models import OpsRequestLog
+from app.db.session import SessionLocal
+
+logger = logging.getLogger("request_log_writer")
+
+# 종료 시 남은 로그 저장을 기다리는 최대 시간 (초)
+_SHUTDOWN_TIMEOUT = 5.0
+
+_queue: "queue.Queue[dict]" = queue.Queue(maxsize=max(1, settings.REQUEST_LOG_QUEUE_SIZE))
+_stop = threading.Event()
+_thread: Optional[threading.Thread] = None
+_thread_lock = threading.Lock()
+_stats = {"written": 0, "dropped": 0, "failed": 0}
+
+
+def enqueue_request_log(method: str, path: str, status_code: int, duration_ms: float) -> None:
+    """요청 로그 1건 추가 (대기 없음 - 큐가 가득 차면 버림)"""
+    _ensure_started()
+    try:
+        _queue.put_nowait({
+            "method": method,
+            "path": path[:200],
+            "status_code": status_code,
+            "duration_ms": duration_ms,
+            "is_error": status_code >= 400,
+            "created_at": datetime.utcnow(),
+        })
+    except queue.Full:
+        _stats["dropped"] += 1
+
+
+def _ensure_started() -> None:
+    """워커 프로세스마다 첫 로그에서 저장 스레드 시작 (fork 이후 시작되도록 지연)"""
+    global _thread
+    if _thread is not None and _thread.is_alive():
+        return
+    with _thread_lock:
+        if _thread is not None and _thread.is_alive():
+            return
+        _stop.clear()
+        _thread = threading.Thread(target=_run, name="request-log-writer", daemon=True)
+        _thread.start()
+
+
+def _write(rows: List[dict]) -> None:
+    db = SessionLocal()
+    try:
+        db.execute(insert(OpsRequestLog), rows)
+        db.commit()
+        _stats["written"] += len(rows)
+    except Exception:
+        db.rollback()
+        _stats["failed"] += len(rows)
+        logger.exception(f"요청 로그 저장 실패: {len(rows)}건")
+    finally:
+        db.close()
+
+
+def _drain(batch: List[dict], limit: int) -> None:
+    while len(batch) < limit:
+        try:
+            batch.append(_queue.get_nowait())
+        except queue.Empty:
+            return
+
+
+def _run() -> None:
+    from app.services.request_metrics import flush_request_metrics
+
+    batch_size = max(1, settings.REQUEST_LOG_BATCH_SIZE)
+    interval = max(1, settings.REQUEST_LOG_FLUSH_MS) / 1000
+
+    while not _stop.is_set():
+        flush_request_metrics()
+        batch: List[dict] = []
+        try:
+            batch.append(_queue.get(timeout=interval))
+        except queue.Empty:
+            continue
+
+        # 첫 행부터 flush 간격 동안 배치 크기까지 모음
+        deadline = time.monotonic() + interval
+        while len(batch) < batch_size and not _stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+            _drain(batch, batch_size)
+        _write(batch)
+
+    # 종료: 남은 로그/집계 모두 저장
+    while True:
+        batch = []
+        _drain(batch, batch_size)
+        if not batch:
+            break
+        _write(batch)
+    flush_request_metrics(force=True)
+
+
+def shutdown_request_log_writer(timeout: float = _SHUTDOWN_TIMEOUT) -> None:
+    """서버 종료 시 호출 - 남은 로그를 저장하고 스레드 종료"""
+    global _thread
+    with _thread_lock:
+        thread = _thread
+        _thread = None
+    if thread is None:
+        return
+    _stop.set()
+    thread.join(timeout)
+    if thread.is_alive():
+        logger.warning(f"요청 로그 저장 스레드 종료 대기 시간 초과: 남은 로그 {_queue.qsize()}건")
+
+
+def request_log_writer_stats() -> Dict[str, int]:
+    return {**_stats, "queued": _queue.qsize()}
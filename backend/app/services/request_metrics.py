@@ -0,0 +1,392 @@
+"""라우트별 응답 시간 히스토그램 (ops_request_rollups / ops_request_totals)
+
+요청마다 메모리의 로그 버킷 히스토그램(HDR 방식, 버킷 폭 10% - 백분위 상대 오차 10% 이내)에 더하고
+요청 로그 저장 스레드가 METRICS_FLUSH_SECONDS마다 두 테이블에 덮어씁니다.
+    - ops_request_rollups: (분, 메서드, 라우트, 워커)별 집계 + 분별 전체 합계(path='*')
+    - ops_request_totals: 워커별 프로세스 시작 이후 누적 (Prometheus 카운터는 단조 증가해야 하므로 분 집계와 분리)
+워커마다 자기 행만 쓰므로 잠금 없이 UPSERT하고, 조회 시 워커 행을 합칩니다.
+워커는 flush마다 자기 누적 행의 updated_at을 갱신하고, 오래 갱신되지 않은(종료된) 워커의 누적 행은
+라우트별 'retired' 행 하나로 합친 뒤 삭제하므로 재시작을 반복해도 누적 행 수가 늘지 않습니다.
+/ops/metrics는 요청 로그 대신 분 집계 행만 읽어 백분위를 계산합니다.
+"""
+from __future__ import annotations
+
+import logging
+import math
+import os
+import struct
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.models import OpsRequestRollup, OpsRequestTotal
+from app.db.session import SessionLocal
+from app.db.upsert import dialect_insert
+
+logger = logging.getLogger("request_metrics")
+
+# 버킷 i의 상한 = _MIN_MS * _GROWTH^i (버킷 0은 _MIN_MS 이하, 마지막 버킷은 그 이상 전부)
+_MIN_MS = 0.05
+_GROWTH = 1.1
+_LOG_GROWTH = math.log(_GROWTH)
+_MAX_BUCKET = 160  # 약 210초
+_BUCKET_UPPER_MS = np.array([_MIN_MS * _GROWTH ** i for i in range(_MAX_BUCKET + 1)])
+_PAIR_DTYPE = np.dtype([("bucket", "<u2"), ("count", "<u4")])
+
+# 전체 합계 행의 메서드/라우트
+ALL_ROUTES = "*"
+# 라우트가 매칭되지 않은 요청(404 등)은 경로 대신 이 이름으로 집계 (라벨 수 제한)
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Prometheus 히스토그램 버킷 상한 (초)
+_PROM_BOUNDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 오래된 분 집계 정리 / 종료된 워커 누적 행 병합 간격 (초)
+_PRUNE_INTERVAL = 3600
+# 종료된 워커 누적 행을 합쳐 두는 워커 이름
+RETIRED_WORKER = "retired"
+# 누적 행이 이 시간(초) 이상 갱신되지 않으면 종료된 워커로 판단 (최소 METRICS_FLUSH_SECONDS의 10배)
+_RETIRE_AFTER = 600
+
+
+def bucket_index(duration_ms: float) -> int:
+    if duration_ms <= _MIN_MS:
+        return 0
+    return min(_MAX_BUCKET, math.ceil(math.log(duration_ms / _MIN_MS) / _LOG_GROWTH))
+
+
+class Histogram:
+    """응답 시간 히스토그램 (희소 버킷 + 건수/에러/합계/최대)"""
+
+    __slots__ = ("count", "errors", "sum_ms", "max_ms", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.sum_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets: Dict[int, int] = {}
+
+    def add(self, duration_ms: float, is_error: bool) -> None:
+        self.count += 1
+        self.errors += is_error
+        self.sum_ms += duration_ms
+        if duration_ms > self.max_ms:
+            self.max_ms = duration_ms
+        index = bucket_index(duration_ms)
+        self.buckets[index] = self.buckets.get(index, 0) + 1
+
+    def values(self) -> dict:
+        """DB 행 값 (histogram은 (버킷, 건수) <HI 쌍 배열)"""
+        items = sorted(self.buckets.items())
+        return {
+            "request_count": self.count,
+            "error_count": self.errors,
+            "sum_ms": self.sum_ms,
+            "max_ms": self.max_ms,
+            "histogram": struct.pack(f"<{'HI' * len(items)}", *(v for item in items for v in item)),
+        }
+
+
+def merge_histograms(blobs: Iterable[bytes]) -> np.ndarray:
+    """저장된 히스토그램들을 합친 버킷별 건수 (길이 _MAX_BUCKET + 1)"""
+    data = b"".join(bytes(blob) for blob in blobs if blob)
+    if not data:
+        return np.zeros(_MAX_BUCKET + 1, dtype=np.int64)
+    pairs = np.frombuffer(data, dtype=_PAIR_DTYPE)
+    return np.bincount(pairs["bucket"], weights=pairs["count"], minlength=_MAX_BUCKET + 1).astype(np.int64)
+
+
+def _pack_counts(counts: np.ndarray) -> bytes:
+    """버킷별 건수 → 저장 형식 (0이 아닌 버킷만)"""
+    pairs = np.zeros(int(np.count_nonzero(counts)), dtype=_PAIR_DTYPE)
+    pairs["bucket"] = np.flatnonzero(counts)
+    pairs["count"] = counts[counts > 0]
+    return pairs.tobytes()
+
+
+def percentile_ms(counts: np.ndarray, q: float, max_ms: float) -> float:
+    """버킷 건수에서 q 백분위 (버킷 상한, 관측 최대값을 넘지 않음)"""
+    total = int(counts.sum())
+    if total == 0:
+        return 0.0
+    rank = max(1, math.ceil(q * total))
+    index = int(np.searchsorted(np.cumsum(counts), rank))
+    return float(min(_BUCKET_UPPER_MS[index], max_ms))
+
+
+# ============================================
+# 워커 메모리 집계
+# ============================================
+
+_lock = threading.Lock()
+# (분 시작, 메서드, 라우트) → 히스토그램
+_minutes: Dict[Tuple[datetime, str, str], Histogram] = {}
+# (메서드, 라우트) → 프로세스 시작 이후 누적
+_totals: Dict[Tuple[str, str], Histogram] = {}
+_dirty_minutes: set = set()
+_dirty_totals: set = set()
+# DB에 저장된 이 워커의 누적 행 (다른 워커가 병합해 삭제했는지 확인용)
+_persisted_totals: set = set()
+_last_flush = 0.0
+_last_prune = 0.0
+_worker: Optional[Tuple[int, str]] = None
+
+
+def _worker_id() -> str:
+    """워커 식별자 (pid 재사용으로 다른 프로세스 누적값을 덮어쓰지 않도록 난수 포함, fork 후 새로 생성)"""
+    global _worker
+    pid = os.getpid()
+    if _worker is None or _worker[0] != pid:
+        _worker = (pid, f"{pid}-{uuid.uuid4().hex[:12]}")
+    return _worker[1]
+
+
+def record_request(method: str, route: str, status_code: int, duration_ms: float) -> None:
+    """요청 1건 집계 (메모리만 갱신)"""
+    minute = datetime.utcnow().replace(second=0, microsecond=0)
+    is_error = status_code >= 400
+    route = route[:200]
+    with _lock:
+        for key in ((minute, method, route), (minute, ALL_ROUTES, ALL_ROUTES)):
+            hist = _minutes.get(key)
+            if hist is None:
+                hist = _minutes[key] = Histogram()
+            hist.add(duration_ms, is_error)
+            _dirty_minutes.add(key)
+
+        total_key = (method, route)
+        hist = _totals.get(total_key)
+        if hist is None:
+            hist = _totals[total_key] = Histogram()
+        hist.add(duration_ms, is_error)
+        _dirty_totals.add(total_key)
+
+
+def _upsert(db: Session, model, rows: List[dict], index_elements: List[str]) -> None:
+    if not rows:
+        return
+    stmt = dialect_insert(db, model)
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={col: stmt.excluded[col] for col in rows[0] if col not in index_elements},
+    ), rows)
+
+
+def _touch_own_totals(db: Session, worker: str, updated_at: datetime) -> bool:
+    """이 워커 누적 행의 갱신 시각 표시 - 저장한 행이 병합되어 사라졌으면 False"""
+    touched = db.query(OpsRequestTotal).filter(
+        OpsRequestTotal.worker == worker
+    ).update({OpsRequestTotal.updated_at: updated_at}, synchronize_session=False)
+    return touched >= len(_persisted_totals)
+
+
+def _retire_stale_totals(db: Session, now: datetime) -> int:
+    """갱신이 멈춘(종료된) 워커 누적 행을 라우트별 retired 행에 더하고 삭제 - 병합한 행 수"""
+    cutoff = now - timedelta(seconds=max(_RETIRE_AFTER, settings.METRICS_FLUSH_SECONDS * 10))
+    stale = db.query(
+        OpsRequestTotal.id, OpsRequestTotal.method, OpsRequestTotal.path,
+        OpsRequestTotal.request_count, OpsRequestTotal.error_count,
+        OpsRequestTotal.sum_ms, OpsRequestTotal.max_ms, OpsRequestTotal.histogram,
+    ).filter(
+        OpsRequestTotal.worker != RETIRED_WORKER,
+        OpsRequestTotal.updated_at < cutoff,
+    ).all()
+
+    routes: Dict[Tuple[str, str], list] = {}
+    for row in stale:
+        # 다른 워커가 동시에 병합한 행은 삭제 건수 0 → 건너뜀 (중복 합산 방지)
+        deleted = db.query(OpsRequestTotal).filter(
+            OpsRequestTotal.id == row.id
+        ).delete(synchronize_session=False)
+        if deleted:
+            routes.setdefault((row.method, row.path), []).append(row)
+
+    for (method, path), rows in routes.items():
+        retired = db.query(OpsRequestTotal).filter(
+            OpsRequestTotal.method == method,
+            OpsRequestTotal.path == path,
+            OpsRequestTotal.worker == RETIRED_WORKER,
+        ).with_for_update().one_or_none()
+        if retired is None:
+            retired = OpsRequestTotal(
+                method=method, path=path, worker=RETIRED_WORKER,
+                request_count=0, error_count=0, sum_ms=0.0, max_ms=0.0, histogram=b"",
+            )
+            db.add(retired)
+        retired.request_count += sum(row.request_count for row in rows)
+        retired.error_count += sum(row.error_count for row in rows)
+        retired.sum_ms += sum(row.sum_ms for row in rows)
+        retired.max_ms = max([retired.max_ms] + [row.max_ms for row in rows])
+        retired.histogram = _pack_counts(merge_histograms([retired.histogram] + [row.histogram for row in rows]))
+        retired.updated_at = now
+    return sum(len(rows) for rows in routes.values())
+
+
+def flush_request_metrics(force: bool = False) -> None:
+    """변경된 분/누적 집계를 DB에 덮어씀 (METRICS_FLUSH_SECONDS 간격, 요청 로그 저장 스레드에서 호출)"""
+    global _last_flush, _last_prune
+
+    now = time.monotonic()
+    if not force and now - _last_flush < settings.METRICS_FLUSH_SECONDS:
+        return
+    _last_flush = now
+
+    worker = _worker_id()
+    updated_at = datetime.utcnow()
+    with _lock:
+        minute_keys = list(_dirty_minutes)
+        total_keys = list(_dirty_totals)
+        minute_rows = [
+            {"bucket_start": key[0], "method": key[1], "path": key[2], "worker": worker, **_minutes[key].values()}
+            for key in minute_keys
+        ]
+        total_rows = [
+            {"method": key[0], "path": key[1], "worker": worker, **_totals[key].values(), "updated_at": updated_at}
+            for key in total_keys
+        ]
+        _dirty_minutes.clear()
+        _dirty_totals.clear()
+    prune = now - _last_prune >= _PRUNE_INTERVAL
+    if not minute_rows and not total_rows and not _persisted_totals and not prune:
+        return
+
+    db = SessionLocal()
+    try:
+        # 요청이 없어도 갱신 시각을 표시해 살아 있는 워커 행이 병합되지 않도록 함
+        retired = not _touch_own_totals(db, worker, updated_at)
+        if retired:
+            # 오래 flush하지 못한 사이 병합된 누적값을 다시 쓰지 않도록 이번 누적분은 버리고 새로 시작
+            logger.warning("응답 시간 누적 행이 종료된 워커로 병합되어 누적 집계를 초기화합니다.")
+            total_rows = []
+        _upsert(db, OpsRequestRollup, minute_rows, ["bucket_start", "method", "path", "worker"])
+        _upsert(db, OpsRequestTotal, total_rows, ["method", "path", "worker"])
+        if prune:
+            _last_prune = now
+            cutoff = updated_at - timedelta(days=settings.METRICS_RETENTION_DAYS)
+            db.query(OpsRequestRollup).filter(
+                OpsRequestRollup.bucket_start < cutoff
+            ).delete(synchronize_session=False)
+            merged = _retire_stale_totals(db, updated_at)
+            if merged:
+                logger.info(f"종료된 워커 응답 시간 누적 행 병합: {merged}건")
+        db.commit()
+    except Exception:
+        db.rollback()
+        logger.exception("응답 시간 집계 저장 실패")
+        # 다음 flush에서 다시 저장
+        with _lock:
+            _dirty_minutes.update(minute_keys)
+            _dirty_totals.update(total_keys)
+        return
+    finally:
+        db.close()
+
+    # 저장이 끝난 지난 분 집계는 메모리에서 제거 (현재 분은 계속 누적)
+    current = updated_at.replace(second=0, microsecond=0)
+    with _lock:
+        if retired:
+            _totals.clear()
+            _dirty_totals.clear()
+            _persisted_totals.clear()
+        else:
+            _persisted_totals.update(total_keys)
+        for key in [key for key in _minutes if key[0] < current and key not in _dirty_minutes]:
+            del _minutes[key]
+
+
+# ============================================
+# 조회
+# ============================================
+
+def window_summary(db: Session, since: datetime) -> dict:
+    """기간 내 전체 요청 수/에러/평균/백분위 (분별 전체 합계 행만 읽음)"""
+    rows = db.query(
+        OpsRequestRollup.request_count, OpsRequestRollup.error_count, OpsRequestRollup.sum_ms,
+        OpsRequestRollup.max_ms, OpsRequestRollup.histogram,
+    ).filter(
+        OpsRequestRollup.path == ALL_ROUTES,
+        OpsRequestRollup.bucket_start >= since.replace(second=0, microsecond=0),
+    ).all()
+
+    total = sum(row[0] for row in rows)
+    max_ms = max((row[3] for row in rows), default=0.0)
+    counts = merge_histograms(row[4] for row in rows)
+    return {
+        "requests": total,
+        "errors": sum(row[1] for row in rows),
+        "avg_ms": sum(row[2] for row in rows) / total if total else 0.0,
+        "p50_ms": percentile_ms(counts, 0.50, max_ms),
+        "p95_ms": percentile_ms(counts, 0.95, max_ms),
+        "p99_ms": percentile_ms(counts, 0.99, max_ms),
+        "max_ms": max_ms,
+    }
+
+
+def top_routes(db: Session, since: datetime, limit: int = 5) -> List[dict]:
+    """기간 내 요청 수 상위 라우트"""
+    count = func.sum(OpsRequestRollup.request_count)
+    rows = db.query(
+        OpsRequestRollup.method, OpsRequestRollup.path, count, func.sum(OpsRequestRollup.sum_ms),
+    ).filter(
+        OpsRequestRollup.path != ALL_ROUTES,
+        OpsRequestRollup.bucket_start >= since.replace(second=0, microsecond=0),
+    ).group_by(
+        OpsRequestRollup.method, OpsRequestRollup.path
+    ).order_by(count.desc()).limit(limit).all()
+    return [
+        {"method": row[0], "path": row[1], "count": int(row[2] or 0),
+         "avg_ms": int((row[3] or 0) / row[2]) if row[2] else 0}
+        for row in rows
+    ]
+
+
+def _label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_prometheus(db: Session) -> str:
+    """Prometheus 텍스트 형식 (모든 워커의 누적 행 합계 - 종료된 워커분은 retired 행에 남아 카운터는 단조 증가)"""
+    routes: Dict[Tuple[str, str], dict] = {}
+    for row in db.query(OpsRequestTotal).all():
+        entry = routes.setdefault((row.method, row.path), {"count": 0, "errors": 0, "sum_ms": 0.0, "blobs": []})
+        entry["count"] += row.request_count
+        entry["errors"] += row.error_count
+        entry["sum_ms"] += row.sum_ms
+        entry["blobs"].append(row.histogram)
+
+    # 버킷 상한(초)이 le 이하인 세부 버킷 누적 (세부 버킷 경계가 le와 어긋나는 부분은 다음 le로 집계)
+    upper_seconds = _BUCKET_UPPER_MS / 1000
+    lines = [
+        "# HELP ai_lotto_http_requests_total Total HTTP requests by route.",
+        "# TYPE ai_lotto_http_requests_total counter",
+    ]
+    errors = [
+        "# HELP ai_lotto_http_request_errors_total HTTP responses with status >= 400 by route.",
+        "# TYPE ai_lotto_http_request_errors_total counter",
+    ]
+    durations = [
+        "# HELP ai_lotto_http_request_duration_seconds HTTP request latency by route.",
+        "# TYPE ai_lotto_http_request_duration_seconds histogram",
+    ]
+    for (method, path), entry in sorted(routes.items()):
+        labels = f'method="{_label_value(method)}",route="{_label_value(path)}"'
+        lines.append(f"ai_lotto_http_requests_total{{{labels}}} {entry['count']}")
+        errors.append(f"ai_lotto_http_request_errors_total{{{labels}}} {entry['errors']}")
+
+        cumulative = np.cumsum(merge_histograms(entry["blobs"]))
+        for bound in _PROM_BOUNDS:
+            index = int(np.searchsorted(upper_seconds, bound, side="right")) - 1
+            value = int(cumulative[index]) if index >= 0 else 0
+            durations.append(f'ai_lotto_http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {value}')
+        durations.append(f'ai_lotto_http_request_duration_seconds_bucket{{{labels},le="+Inf"}} {entry["count"]}')
+        durations.append(f"ai_lotto_http_request_duration_seconds_sum{{{labels}}} {entry['sum_ms'] / 1000:.6f}")
+        durations.append(f"ai_lotto_http_request_duration_seconds_count{{{labels}}} {entry['count']}")
+
+    return "\n".join(lines + errors + durations) + "\n"
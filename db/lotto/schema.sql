@@ -22,6 +22,17 @@ COMMENT ON COLUMN lotto_draws.draw_no IS '회차 번호';
 COMMENT ON COLUMN lotto_draws.draw_date IS '추첨일';
 COMMENT ON COLUMN lotto_draws.bonus IS '보너스 번호';
 
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+-- 회차/통계 캐시 변경 세대 (응답 캐시 무효화 확인용)
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CREATE TABLE IF NOT EXISTS lotto_data_versions (
+    name VARCHAR(50) PRIMARY KEY,
+    generation INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP NOT NULL
+);
+
+COMMENT ON TABLE lotto_data_versions IS '회차/통계 캐시 쓰기마다 generation 증가 (name=lotto_draws)';
+
 -- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 -- 통계 캐시 테이블 (주 1회 갱신)
 -- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -54,6 +65,11 @@ CREATE TABLE IF NOT EXISTS lotto_recommend_logs (
     pool_lines JSONB,
     revealed_indices JSONB,
     settings_data JSONB,
+    pool_packed BYTEA,
+    revealed_mask INTEGER,
+    exclude_mask BIGINT,
+    fixed_mask BIGINT,
+    lines_synced BOOLEAN NOT NULL DEFAULT TRUE,
     is_matched BOOLEAN DEFAULT FALSE,
     matched_at TIMESTAMP
 );
@@ -62,12 +78,34 @@ CREATE INDEX IF NOT EXISTS idx_lotto_logs_user ON lotto_recommend_logs(user_id);
 CREATE INDEX IF NOT EXISTS idx_lotto_logs_account_user ON lotto_recommend_logs(account_user_id);
 CREATE INDEX IF NOT EXISTS idx_lotto_logs_draw ON lotto_recommend_logs(target_draw_no);
 CREATE INDEX IF NOT EXISTS idx_lotto_logs_time ON lotto_recommend_logs(recommend_time);
+CREATE INDEX IF NOT EXISTS ix_lotto_recommend_logs_lines_synced ON lotto_recommend_logs(lines_synced);
 CREATE UNIQUE INDEX IF NOT EXISTS uq_user_draw_plan ON lotto_recommend_logs(account_user_id, target_draw_no, plan_type);
 
 COMMENT ON TABLE lotto_recommend_logs IS '유저별 로또 추천 이력 및 당첨 결과';
 COMMENT ON COLUMN lotto_recommend_logs.target_draw_no IS '추천 대상 회차';
 COMMENT ON COLUMN lotto_recommend_logs.lines IS '추천 번호 (JSON 배열)';
-COMMENT ON COLUMN lotto_recommend_logs.match_results IS '당첨 후 일치 개수 (JSON 객체)';
+COMMENT ON COLUMN lotto_recommend_logs.match_results IS '당첨 후 일치 개수 (JSON 객체, 이전 매칭분 - 새 매칭 결과는 recommend_lines)';
+COMMENT ON COLUMN lotto_recommend_logs.pool_packed IS '압축 풀 (줄별 6개 조합 순위 int32 리틀엔디언 배열)';
+COMMENT ON COLUMN lotto_recommend_logs.revealed_mask IS '공개된 줄 비트마스크 (비트 i = i번째 줄)';
+COMMENT ON COLUMN lotto_recommend_logs.lines_synced IS 'recommend_lines 반영 여부 (FALSE = 백필 대상)';
+
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+-- 추천 로그 발급 줄 (줄당 1행, 번호 비트마스크)
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CREATE TABLE IF NOT EXISTS recommend_lines (
+    id SERIAL PRIMARY KEY,
+    log_id INTEGER NOT NULL REFERENCES lotto_recommend_logs(id) ON DELETE CASCADE,
+    target_draw_no INTEGER NOT NULL,
+    line_index INTEGER NOT NULL,
+    mask BIGINT NOT NULL,
+    revealed BOOLEAN NOT NULL DEFAULT TRUE,
+    match_count INTEGER,
+    bonus_match BOOLEAN,
+    rank INTEGER,
+    CONSTRAINT uq_recommend_line_index UNIQUE (log_id, line_index)
+);
+
+CREATE INDEX IF NOT EXISTS idx_recommend_lines_draw_rank ON recommend_lines(target_draw_no, rank);
 
 -- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 -- 무료 체험 신청 테이블
@@ -160,6 +198,44 @@ CREATE INDEX IF NOT EXISTS idx_ops_logs_error ON ops_request_logs(is_error);
 COMMENT ON TABLE ops_request_logs IS 'API 요청 로그 (모니터링용)';
 COMMENT ON COLUMN ops_request_logs.duration_ms IS '응답 시간 (밀리초)';
 
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+-- 운영 응답 시간 집계 (분 단위 / 워커별 누적)
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CREATE TABLE IF NOT EXISTS ops_request_rollups (
+    id SERIAL PRIMARY KEY,
+    bucket_start TIMESTAMP NOT NULL,
+    method VARCHAR(10) NOT NULL,
+    path VARCHAR(200) NOT NULL,
+    worker VARCHAR(32) NOT NULL,
+    request_count INTEGER NOT NULL DEFAULT 0,
+    error_count INTEGER NOT NULL DEFAULT 0,
+    sum_ms FLOAT NOT NULL DEFAULT 0,
+    max_ms FLOAT NOT NULL DEFAULT 0,
+    histogram BYTEA NOT NULL,
+    CONSTRAINT uq_ops_rollup_bucket UNIQUE (bucket_start, method, path, worker)
+);
+
+CREATE INDEX IF NOT EXISTS idx_ops_rollups_path_bucket ON ops_request_rollups(path, bucket_start);
+
+COMMENT ON TABLE ops_request_rollups IS '분 단위 라우트별 응답 시간 집계 (path=*는 전체 합계)';
+COMMENT ON COLUMN ops_request_rollups.histogram IS '로그 버킷 히스토그램 (버킷 uint16, 건수 uint32 쌍)';
+
+CREATE TABLE IF NOT EXISTS ops_request_totals (
+    id SERIAL PRIMARY KEY,
+    method VARCHAR(10) NOT NULL,
+    path VARCHAR(200) NOT NULL,
+    worker VARCHAR(32) NOT NULL,
+    request_count INTEGER NOT NULL DEFAULT 0,
+    error_count INTEGER NOT NULL DEFAULT 0,
+    sum_ms FLOAT NOT NULL DEFAULT 0,
+    max_ms FLOAT NOT NULL DEFAULT 0,
+    histogram BYTEA NOT NULL,
+    updated_at TIMESTAMP DEFAULT NOW(),
+    CONSTRAINT uq_ops_total_route UNIQUE (method, path, worker)
+);
+
+COMMENT ON TABLE ops_request_totals IS '워커별 누적 응답 시간 집계 (Prometheus /metrics용, 종료된 워커 행은 worker=retired 행으로 병합)';
+
 -- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 -- 결제 내역
 -- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -245,6 +321,59 @@ CREATE TABLE IF NOT EXISTS plan_performance_stats (
 
 CREATE INDEX IF NOT EXISTS idx_plan_perf_draw ON plan_performance_stats(draw_no);
 CREATE INDEX IF NOT EXISTS idx_plan_perf_plan ON plan_performance_stats(plan_type);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_plan_perf_draw_plan ON plan_performance_stats(draw_no, plan_type);
+
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+-- 플랜별 성과 구간 집계 (최근 10회/최근 50회/전체)
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CREATE TABLE IF NOT EXISTS plan_performance_rollups (
+    plan_type VARCHAR(20) NOT NULL,
+    period VARCHAR(10) NOT NULL,
+    draws INTEGER DEFAULT 0,
+    from_draw_no INTEGER,
+    to_draw_no INTEGER,
+    total_lines INTEGER DEFAULT 0,
+    total_users INTEGER DEFAULT 0,
+    total_match INTEGER DEFAULT 0,
+    match_3 INTEGER DEFAULT 0,
+    match_4 INTEGER DEFAULT 0,
+    match_5 INTEGER DEFAULT 0,
+    match_5_bonus INTEGER DEFAULT 0,
+    match_6 INTEGER DEFAULT 0,
+    avg_match_count FLOAT DEFAULT 0.0,
+    updated_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (plan_type, period)
+);
+
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+-- 유저별 누적 적중 통계 (매칭 시 증분 갱신)
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CREATE TABLE IF NOT EXISTS user_hit_stats (
+    account_user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    matched_logs INTEGER DEFAULT 0,
+    total_lines INTEGER DEFAULT 0,
+    total_match INTEGER DEFAULT 0,
+    rank1_count INTEGER DEFAULT 0,
+    rank2_count INTEGER DEFAULT 0,
+    rank3_count INTEGER DEFAULT 0,
+    rank4_count INTEGER DEFAULT 0,
+    rank5_count INTEGER DEFAULT 0,
+    best_rank INTEGER,
+    last_matched_draw_no INTEGER,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+-- 추천 로그 매칭 체크포인트 (회차별, 청크 단위 갱신)
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CREATE TABLE IF NOT EXISTS lotto_match_checkpoints (
+    draw_no INTEGER PRIMARY KEY,
+    last_log_id INTEGER NOT NULL DEFAULT 0,
+    matched_count INTEGER NOT NULL DEFAULT 0,
+    plan_stats JSONB,
+    completed_at TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT NOW()
+);
 
 -- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 -- 비밀번호 재설정 토큰
@@ -260,6 +389,38 @@ CREATE TABLE IF NOT EXISTS password_reset_tokens (
 
 CREATE INDEX IF NOT EXISTS idx_reset_tokens_user ON password_reset_tokens(user_id);
 
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+-- ML 특성 저장소 (예측 대상 회차 × 번호, 15개 특성)
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CREATE TABLE IF NOT EXISTS lotto_feature_store (
+    draw_no INTEGER NOT NULL,
+    number INTEGER NOT NULL,
+    version INTEGER NOT NULL,
+    features JSONB NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (draw_no, number)
+);
+
+CREATE INDEX IF NOT EXISTS idx_feature_store_version ON lotto_feature_store(version);
+
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+-- 백테스팅 결과 캐시 (회차별, 입력 내용 해시 키)
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CREATE TABLE IF NOT EXISTS backtest_result_cache (
+    cache_key VARCHAR(64) PRIMARY KEY,
+    draw_no INTEGER NOT NULL,
+    generator_version VARCHAR(16) NOT NULL,
+    weights_hash VARCHAR(16) NOT NULL,
+    model_version VARCHAR(16) NOT NULL,
+    history_hash VARCHAR(16) NOT NULL,
+    seed INTEGER NOT NULL,
+    result JSONB NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_backtest_cache_draw ON backtest_result_cache(draw_no);
+CREATE INDEX IF NOT EXISTS idx_backtest_cache_generator ON backtest_result_cache(generator_version);
+
 -- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 -- ML 학습 로그
 -- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -277,3 +438,27 @@ CREATE TABLE IF NOT EXISTS ml_training_logs (
     plan_performance JSONB,
     notes TEXT
 );
+
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+-- 관리자 백그라운드 작업 (재학습/백테스팅/매칭/캐시 재생성)
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CREATE TABLE IF NOT EXISTS admin_jobs (
+    id VARCHAR(32) PRIMARY KEY,
+    job_type VARCHAR(30) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    params JSONB,
+    progress FLOAT DEFAULT 0,
+    progress_message VARCHAR(255),
+    result JSONB,
+    error TEXT,
+    cancel_requested BOOLEAN DEFAULT FALSE,
+    created_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+    created_at TIMESTAMP DEFAULT NOW(),
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP,
+    heartbeat_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_admin_jobs_type ON admin_jobs(job_type);
+CREATE INDEX IF NOT EXISTS idx_admin_jobs_status ON admin_jobs(status);
+CREATE INDEX IF NOT EXISTS idx_admin_jobs_created ON admin_jobs(created_at);
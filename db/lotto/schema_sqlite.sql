@@ -16,6 +16,15 @@ CREATE TABLE IF NOT EXISTS lotto_draws (
 
 CREATE INDEX IF NOT EXISTS idx_lotto_draws_date ON lotto_draws(draw_date);
 
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+-- 회차/통계 캐시 변경 세대 (응답 캐시 무효화 확인용)
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CREATE TABLE IF NOT EXISTS lotto_data_versions (
+    name VARCHAR(50) PRIMARY KEY,
+    generation INTEGER NOT NULL DEFAULT 0,
+    updated_at DATETIME NOT NULL
+);
+
 -- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 -- 통계 캐시 테이블 (SQLite)
 -- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -43,6 +52,11 @@ CREATE TABLE IF NOT EXISTS lotto_recommend_logs (
     pool_lines TEXT,
     revealed_indices TEXT,
     settings_data TEXT,
+    pool_packed BLOB,
+    revealed_mask INTEGER,
+    exclude_mask INTEGER,
+    fixed_mask INTEGER,
+    lines_synced INTEGER NOT NULL DEFAULT 1,
     is_matched INTEGER DEFAULT 0,
     matched_at DATETIME
 );
@@ -51,6 +65,25 @@ CREATE INDEX IF NOT EXISTS idx_lotto_logs_user ON lotto_recommend_logs(user_id);
 CREATE INDEX IF NOT EXISTS idx_lotto_logs_account_user ON lotto_recommend_logs(account_user_id);
 CREATE INDEX IF NOT EXISTS idx_lotto_logs_draw ON lotto_recommend_logs(target_draw_no);
 CREATE INDEX IF NOT EXISTS idx_lotto_logs_time ON lotto_recommend_logs(recommend_time);
+CREATE INDEX IF NOT EXISTS ix_lotto_recommend_logs_lines_synced ON lotto_recommend_logs(lines_synced);
+
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+-- 추천 로그 발급 줄 (줄당 1행, 번호 비트마스크)
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CREATE TABLE IF NOT EXISTS recommend_lines (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    log_id INTEGER NOT NULL REFERENCES lotto_recommend_logs(id) ON DELETE CASCADE,
+    target_draw_no INTEGER NOT NULL,
+    line_index INTEGER NOT NULL,
+    mask BIGINT NOT NULL,
+    revealed BOOLEAN NOT NULL DEFAULT 1,
+    match_count INTEGER,
+    bonus_match BOOLEAN,
+    rank INTEGER,
+    CONSTRAINT uq_recommend_line_index UNIQUE (log_id, line_index)
+);
+
+CREATE INDEX IF NOT EXISTS idx_recommend_lines_draw_rank ON recommend_lines(target_draw_no, rank);
 
 -- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 -- 무료 체험 신청 테이블 (SQLite)
@@ -127,6 +160,39 @@ CREATE TABLE IF NOT EXISTS ops_request_logs (
 
 CREATE INDEX IF NOT EXISTS idx_ops_logs_created ON ops_request_logs(created_at);
 
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+-- 운영 응답 시간 집계 (SQLite)
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CREATE TABLE IF NOT EXISTS ops_request_rollups (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    bucket_start DATETIME NOT NULL,
+    method TEXT NOT NULL,
+    path TEXT NOT NULL,
+    worker TEXT NOT NULL,
+    request_count INTEGER NOT NULL DEFAULT 0,
+    error_count INTEGER NOT NULL DEFAULT 0,
+    sum_ms REAL NOT NULL DEFAULT 0,
+    max_ms REAL NOT NULL DEFAULT 0,
+    histogram BLOB NOT NULL,
+    UNIQUE (bucket_start, method, path, worker)
+);
+
+CREATE INDEX IF NOT EXISTS idx_ops_rollups_path_bucket ON ops_request_rollups(path, bucket_start);
+
+CREATE TABLE IF NOT EXISTS ops_request_totals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    method TEXT NOT NULL,
+    path TEXT NOT NULL,
+    worker TEXT NOT NULL,
+    request_count INTEGER NOT NULL DEFAULT 0,
+    error_count INTEGER NOT NULL DEFAULT 0,
+    sum_ms REAL NOT NULL DEFAULT 0,
+    max_ms REAL NOT NULL DEFAULT 0,
+    histogram BLOB NOT NULL,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (method, path, worker)
+);
+
 -- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 -- 결제 내역 (SQLite)
 -- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -210,6 +276,59 @@ CREATE TABLE IF NOT EXISTS plan_performance_stats (
 
 CREATE INDEX IF NOT EXISTS idx_plan_perf_draw ON plan_performance_stats(draw_no);
 CREATE INDEX IF NOT EXISTS idx_plan_perf_plan ON plan_performance_stats(plan_type);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_plan_perf_draw_plan ON plan_performance_stats(draw_no, plan_type);
+
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+-- 플랜별 성과 구간 집계 (SQLite)
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CREATE TABLE IF NOT EXISTS plan_performance_rollups (
+    plan_type VARCHAR(20) NOT NULL,
+    period VARCHAR(10) NOT NULL,
+    draws INTEGER DEFAULT 0,
+    from_draw_no INTEGER,
+    to_draw_no INTEGER,
+    total_lines INTEGER DEFAULT 0,
+    total_users INTEGER DEFAULT 0,
+    total_match INTEGER DEFAULT 0,
+    match_3 INTEGER DEFAULT 0,
+    match_4 INTEGER DEFAULT 0,
+    match_5 INTEGER DEFAULT 0,
+    match_5_bonus INTEGER DEFAULT 0,
+    match_6 INTEGER DEFAULT 0,
+    avg_match_count REAL DEFAULT 0.0,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (plan_type, period)
+);
+
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+-- 유저별 누적 적중 통계 (SQLite)
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CREATE TABLE IF NOT EXISTS user_hit_stats (
+    account_user_id INTEGER PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    matched_logs INTEGER DEFAULT 0,
+    total_lines INTEGER DEFAULT 0,
+    total_match INTEGER DEFAULT 0,
+    rank1_count INTEGER DEFAULT 0,
+    rank2_count INTEGER DEFAULT 0,
+    rank3_count INTEGER DEFAULT 0,
+    rank4_count INTEGER DEFAULT 0,
+    rank5_count INTEGER DEFAULT 0,
+    best_rank INTEGER,
+    last_matched_draw_no INTEGER,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+-- 추천 로그 매칭 체크포인트 (SQLite)
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CREATE TABLE IF NOT EXISTS lotto_match_checkpoints (
+    draw_no INTEGER PRIMARY KEY,
+    last_log_id INTEGER NOT NULL DEFAULT 0,
+    matched_count INTEGER NOT NULL DEFAULT 0,
+    plan_stats TEXT,
+    completed_at DATETIME,
+    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
 
 -- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 -- 비밀번호 재설정 토큰 (SQLite)
@@ -225,6 +344,38 @@ CREATE TABLE IF NOT EXISTS password_reset_tokens (
 
 CREATE INDEX IF NOT EXISTS idx_reset_tokens_user ON password_reset_tokens(user_id);
 
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+-- ML 특성 저장소 (예측 대상 회차 × 번호, 15개 특성)
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CREATE TABLE IF NOT EXISTS lotto_feature_store (
+    draw_no INTEGER NOT NULL,
+    number INTEGER NOT NULL,
+    version INTEGER NOT NULL,
+    features TEXT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (draw_no, number)
+);
+
+CREATE INDEX IF NOT EXISTS idx_feature_store_version ON lotto_feature_store(version);
+
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+-- 백테스팅 결과 캐시 (회차별, 입력 내용 해시 키)
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CREATE TABLE IF NOT EXISTS backtest_result_cache (
+    cache_key VARCHAR(64) PRIMARY KEY,
+    draw_no INTEGER NOT NULL,
+    generator_version VARCHAR(16) NOT NULL,
+    weights_hash VARCHAR(16) NOT NULL,
+    model_version VARCHAR(16) NOT NULL,
+    history_hash VARCHAR(16) NOT NULL,
+    seed INTEGER NOT NULL,
+    result TEXT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_backtest_cache_draw ON backtest_result_cache(draw_no);
+CREATE INDEX IF NOT EXISTS idx_backtest_cache_generator ON backtest_result_cache(generator_version);
+
 -- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 -- ML 학습 로그 (SQLite)
 -- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -242,3 +393,27 @@ CREATE TABLE IF NOT EXISTS ml_training_logs (
     plan_performance TEXT,
     notes TEXT
 );
+
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+-- 관리자 백그라운드 작업 (재학습/백테스팅/매칭/캐시 재생성)
+-- ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+CREATE TABLE IF NOT EXISTS admin_jobs (
+    id VARCHAR(32) PRIMARY KEY,
+    job_type VARCHAR(30) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    params TEXT,
+    progress REAL DEFAULT 0,
+    progress_message VARCHAR(255),
+    result TEXT,
+    error TEXT,
+    cancel_requested INTEGER DEFAULT 0,
+    created_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    started_at DATETIME,
+    finished_at DATETIME,
+    heartbeat_at DATETIME
+);
+
+CREATE INDEX IF NOT EXISTS idx_admin_jobs_type ON admin_jobs(job_type);
+CREATE INDEX IF NOT EXISTS idx_admin_jobs_status ON admin_jobs(status);
+CREATE INDEX IF NOT EXISTS idx_admin_jobs_created ON admin_jobs(created_at);
@@ -1,4 +1,4 @@
-import { request } from './client.js'
+import { request, streamRequest } from './client.js'
 import { buildQuery } from '../utils/apiUtils.js'
 
 // 대시보드
@@ -172,6 +172,13 @@ export function triggerMLRetrain() {
   })
 }
 
+export function runWeightSearch(params) {
+  return request('/api/admin/ml/weight-search', {
+    method: 'POST',
+    body: JSON.stringify(params),
+  })
+}
+
 // 매칭 관리
 export function fetchMatchStatus() {
   return request('/api/admin/match/status')
@@ -195,10 +202,58 @@ export function runBacktest(startDraw, endDraw) {
   })
 }
 
+// 회차 결과를 계산되는 대로 받음 (onEvent(event, data): start / result / summary / error)
+export function streamBacktest(startDraw, endDraw, onEvent, signal) {
+  return streamRequest(
+    `/api/admin/backtest/stream${buildQuery({ start_draw: startDraw, end_draw: endDraw })}`,
+    onEvent,
+    { signal },
+  )
+}
+
+// configs: [{ name, ai_weights: { logic1, logic2, logic3, logic4 } | null }] (첫 설정이 비교 기준)
+export function runBacktestCompare(startDraw, endDraw, configs) {
+  return request('/api/admin/backtest/compare', {
+    method: 'POST',
+    body: JSON.stringify({ start_draw: startDraw, end_draw: endDraw, configs }),
+  })
+}
+
 export function runSingleBacktest(drawNo) {
   return request(`/api/admin/backtest/single/${drawNo}`)
 }
 
+// 백그라운드 작업 (재학습/백테스팅/매칭/캐시 재생성)
+export function fetchJobs(params) {
+  return request(`/api/admin/jobs${buildQuery(params)}`)
+}
+
+export function fetchJob(jobId) {
+  return request(`/api/admin/jobs/${jobId}`)
+}
+
+export function cancelJob(jobId) {
+  return request(`/api/admin/jobs/${jobId}/cancel`, {
+    method: 'POST',
+  })
+}
+
+const JOB_POLL_INTERVAL_MS = 1500
+
+// 작업이 끝날 때까지 폴링 - 완료 시 result 반환, 실패/취소 시 예외
+export async function waitForJob(jobId, onProgress) {
+  for (;;) {
+    const job = await fetchJob(jobId)
+    if (onProgress) onProgress(job)
+
+    if (job.status === 'completed') return job.result
+    if (job.status === 'failed') throw new Error(job.error || '작업 실패')
+    if (job.status === 'cancelled') throw new Error('작업이 취소되었습니다.')
+
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS))
+  }
+}
+
 // 소셜 계정 관리
 export function fetchSocialAccounts(params) {
   return request(`/api/admin/social-accounts${buildQuery(params)}`)
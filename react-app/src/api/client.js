@@ -171,4 +171,65 @@ async function request(path, options = {}) {
   return data
 }
 
-export { API_BASE_URL, request, getTokens, saveTokens, getAccessToken, getRefreshToken }
+// ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+// 스트리밍 응답 (Server-Sent Events)
+// ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+// EventSource는 Authorization 헤더를 못 붙이므로 fetch 본문을 직접 읽어 SSE를 파싱
+async function streamRequest(path, onEvent, options = {}) {
+  const method = options.method || 'GET'
+  logApiCall('STREAM', { method, path })
+
+  const accessToken = getAccessToken()
+  const headers = { Accept: 'text/event-stream', ...options.headers }
+  if (accessToken) {
+    headers['Authorization'] = `Bearer ${accessToken}`
+  }
+
+  const response = await fetch(`${API_BASE_URL}${path}`, { ...options, headers })
+
+  if (!response.ok) {
+    if (response.status === 401 && !options._retry) {
+      const refreshed = await refreshSession()
+      if (refreshed) {
+        return streamRequest(path, onEvent, { ...options, _retry: true })
+      }
+    }
+    let message = '요청에 실패했습니다.'
+    try {
+      const data = await response.json()
+      message = data.detail || data.message || message
+    } catch {
+      // 본문 없음
+    }
+    const error = new Error(message)
+    error.status = response.status
+    throw error
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+
+  for (;;) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+
+    // 이벤트는 빈 줄로 구분
+    let boundary = buffer.indexOf('\n\n')
+    while (boundary !== -1) {
+      const block = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+      let event = 'message'
+      const dataLines = []
+      for (const line of block.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim()
+        else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim())
+      }
+      if (dataLines.length) onEvent(event, JSON.parse(dataLines.join('\n')))
+      boundary = buffer.indexOf('\n\n')
+    }
+  }
+}
+
+export { API_BASE_URL, request, streamRequest, getTokens, saveTokens, getAccessToken, getRefreshToken }
@@ -86,6 +86,11 @@ export function getPoolStatus() {
   return request('/api/lotto/recommend/pool-status')
 }
 
+// 추천 페이지 초기 상태 한 번에 조회 (풀 상태 + 저장된 고정 후보 + 프리미엄 통계 + 주간 무료 사용량)
+export function getRecommendSession() {
+  return request('/api/lotto/recommend/session')
+}
+
 // =========================================
 // 고급 설정 (번호 제외/고정)
 // =========================================
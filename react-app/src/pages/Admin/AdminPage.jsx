@@ -25,11 +25,13 @@ import {
   fetchMLLatest,
   fetchMLTrainingLogs,
   triggerMLRetrain,
+  runWeightSearch,
   fetchPerformanceSummary,
   fetchPerformanceByDraw,
   fetchPerformanceHistory,
   fetchMatchStatus,
   triggerMatch,
+  waitForJob,
   fetchRecommendLogs,
   updateRecommendLog,
   deleteRecommendLog,
@@ -99,6 +101,8 @@ function AdminPage() {
   const [mlLatest, setMLLatest] = useState(null)
   const [mlLogs, setMLLogs] = useState({ logs: [], total: 0, page: 1, page_size: 10 })
   const [retraining, setRetraining] = useState(false)
+  const [weightSearch, setWeightSearch] = useState(null)
+  const [searchingWeights, setSearchingWeights] = useState(false)
 
   // 플랜 성과 state
   const [performanceSummary, setPerformanceSummary] = useState(null)
@@ -402,8 +406,9 @@ function AdminPage() {
   const handleRebuildCache = async () => {
     if (!window.confirm('캐시를 재생성하시겠습니까?')) return
     try {
-      await rebuildLottoCache()
-      alert('캐시가 재생성되었습니다.')
+      const job = await rebuildLottoCache()
+      const result = await waitForJob(job.job_id)
+      alert(result.message || '캐시가 재생성되었습니다.')
     } catch (err) {
       alert(err.message || '캐시 재생성 실패')
     }
@@ -432,7 +437,8 @@ function AdminPage() {
     if (!window.confirm('ML 모델을 재학습하시겠습니까? 시간이 걸릴 수 있습니다.')) return
     setRetraining(true)
     try {
-      const result = await triggerMLRetrain()
+      const job = await triggerMLRetrain()
+      const result = await waitForJob(job.job_id)
       alert(`재학습 완료! 정확도: ${(result.test_accuracy * 100).toFixed(2)}%`)
       loadMLData()
     } catch (err) {
@@ -442,6 +448,24 @@ function AdminPage() {
     }
   }
 
+  const handleWeightSearch = async (apply) => {
+    const message = apply
+      ? '가중치 탐색 후 1위 가중치를 모델에 적용하시겠습니까?'
+      : '가중치 탐색을 실행하시겠습니까? (모델은 변경되지 않습니다)'
+    if (!window.confirm(message)) return
+    setSearchingWeights(true)
+    try {
+      const job = await runWeightSearch({ mode: 'grid', apply })
+      const result = await waitForJob(job.job_id)
+      setWeightSearch(result)
+      if (result.applied) loadMLData()
+    } catch (err) {
+      alert(err.message || '가중치 탐색 실패')
+    } finally {
+      setSearchingWeights(false)
+    }
+  }
+
   const loadPerformanceData = async () => {
     setLoading(true)
     try {
@@ -539,7 +563,8 @@ function AdminPage() {
     if (!window.confirm(`${matchDrawNo}회차 매칭을 실행하시겠습니까?`)) return
     setMatching(true)
     try {
-      const result = await triggerMatch(parseInt(matchDrawNo))
+      const job = await triggerMatch(parseInt(matchDrawNo))
+      const result = await waitForJob(job.job_id)
       alert(`매칭 완료! ${result.matched_count}건 처리됨`)
       setMatchDrawNo('')
       loadMatchData()
@@ -692,6 +717,9 @@ function AdminPage() {
               mlLogs={mlLogs}
               retraining={retraining}
               handleRetrain={handleRetrain}
+              weightSearch={weightSearch}
+              searchingWeights={searchingWeights}
+              handleWeightSearch={handleWeightSearch}
             />
           )}
 
@@ -1,5 +1,13 @@
-import { useState, useEffect } from 'react'
-import { fetchBacktestRange, runBacktest, runSingleBacktest } from '../../../api/adminApi.js'
+import { useState, useEffect, useRef } from 'react'
+import {
+  fetchBacktestRange, streamBacktest, runBacktestCompare, runSingleBacktest, waitForJob,
+} from '../../../api/adminApi.js'
+
+const DEFAULT_COMPARE_CONFIGS = JSON.stringify([
+  { name: '현재 모델', ai_weights: null },
+  { name: '균등', ai_weights: { logic1: 0.33, logic2: 0.33, logic3: 0.34 } },
+  { name: '로직1 중심', ai_weights: { logic1: 0.6, logic2: 0.2, logic3: 0.2 } },
+], null, 2)
 
 function BacktestTab() {
   const [range, setRange] = useState(null)
@@ -10,6 +18,11 @@ function BacktestTab() {
   const [result, setResult] = useState(null)
   const [singleResult, setSingleResult] = useState(null)
   const [error, setError] = useState('')
+  const [job, setJob] = useState(null)
+  const [compareConfigs, setCompareConfigs] = useState(DEFAULT_COMPARE_CONFIGS)
+  const [compareResult, setCompareResult] = useState(null)
+  const [streamProgress, setStreamProgress] = useState(null)
+  const streamAbort = useRef(null)
 
   useEffect(() => {
     loadRange()
@@ -36,14 +49,75 @@ function BacktestTab() {
     }
     setLoading(true)
     setError('')
-    setResult(null)
+    setResult({ summary: null, results: [] })
+
+    // 회차 결과는 모아서 100ms마다 화면에 반영 (회차마다 다시 그리지 않도록)
+    let pending = []
+    const flush = () => {
+      if (!pending.length) return
+      const batch = pending
+      pending = []
+      setResult((prev) => ({ ...prev, results: [...prev.results, ...batch] }))
+    }
+    const timer = setInterval(flush, 100)
+    const controller = new AbortController()
+    streamAbort.current = controller
+
     try {
-      const data = await runBacktest(Number(startDraw), Number(endDraw))
-      setResult(data)
+      await streamBacktest(Number(startDraw), Number(endDraw), (event, data) => {
+        if (event === 'start') {
+          setStreamProgress({ done: 0, total: data.total })
+        } else if (event === 'result') {
+          pending.push(data)
+          setStreamProgress({ done: data.done, total: data.total })
+        } else if (event === 'summary') {
+          flush()
+          setResult((prev) => ({ ...prev, ...data }))
+        } else if (event === 'error') {
+          throw new Error(data.detail)
+        }
+      }, controller.signal)
     } catch (err) {
-      setError('백테스팅 실패: ' + err.message)
+      if (err.name !== 'AbortError') {
+        setError('백테스팅 실패: ' + err.message)
+      }
     } finally {
+      clearInterval(timer)
+      flush()
       setLoading(false)
+      setStreamProgress(null)
+      streamAbort.current = null
+    }
+  }
+
+  function handleCancelBacktest() {
+    streamAbort.current?.abort()
+  }
+
+  async function handleCompareBacktest() {
+    if (!startDraw || !endDraw) {
+      setError('시작/종료 회차를 입력하세요')
+      return
+    }
+    let configs
+    try {
+      configs = JSON.parse(compareConfigs)
+    } catch (err) {
+      setError('설정 JSON 형식이 올바르지 않습니다: ' + err.message)
+      return
+    }
+    setLoading(true)
+    setError('')
+    setCompareResult(null)
+    try {
+      const submitted = await runBacktestCompare(Number(startDraw), Number(endDraw), configs)
+      const data = await waitForJob(submitted.job_id, (current) => setJob(current))
+      setCompareResult(data)
+    } catch (err) {
+      setError('비교 백테스팅 실패: ' + err.message)
+    } finally {
+      setLoading(false)
+      setJob(null)
     }
   }
 
@@ -114,87 +188,152 @@ function BacktestTab() {
           >
             {loading ? '테스트 중...' : '백테스팅 실행'}
           </button>
+          {streamProgress && (
+            <button className="admin__btn" onClick={handleCancelBacktest}>
+              취소
+            </button>
+          )}
         </div>
+        {streamProgress && (
+          <p className="admin__info">
+            진행률: {streamProgress.total ? Math.round((streamProgress.done / streamProgress.total) * 100) : 0}%
+            {` - ${streamProgress.done}/${streamProgress.total}회차 평가 완료`}
+          </p>
+        )}
+        {job && (
+          <p className="admin__info">
+            진행률: {Math.round((job.progress || 0) * 100)}%
+            {job.progress_message ? ` - ${job.progress_message}` : ''}
+          </p>
+        )}
       </div>
 
       {/* 다중 회차 결과 */}
       {result && (
         <div className="admin__section">
           <h4>백테스팅 결과 요약</h4>
-          <div className="admin__stats-grid">
-            <div className="admin__stat-card">
-              <h5>테스트 회차</h5>
-              <p className="admin__stat-value">{result.summary.total_draws}회</p>
-            </div>
-            <div className="admin__stat-card">
-              <h5>총 생성 줄</h5>
-              <p className="admin__stat-value">{result.summary.total_lines}줄</p>
-            </div>
-            <div className="admin__stat-card">
-              <h5>평균 성능 점수</h5>
-              <p className="admin__stat-value">{result.summary.avg_performance_score}/100</p>
-            </div>
-            <div className="admin__stat-card">
-              <h5>줄당 평균 적중</h5>
-              <p className="admin__stat-value">{result.summary.avg_matches_per_line}개</p>
-            </div>
-          </div>
+          {result.summary ? (
+            <>
+              <div className="admin__stats-grid">
+                <div className="admin__stat-card">
+                  <h5>테스트 회차</h5>
+                  <p className="admin__stat-value">{result.summary.total_draws}회</p>
+                </div>
+                <div className="admin__stat-card">
+                  <h5>총 생성 줄</h5>
+                  <p className="admin__stat-value">{result.summary.total_lines}줄</p>
+                </div>
+                <div className="admin__stat-card">
+                  <h5>평균 성능 점수</h5>
+                  <p className="admin__stat-value">{result.summary.avg_performance_score}/100</p>
+                </div>
+                <div className="admin__stat-card">
+                  <h5>줄당 평균 적중</h5>
+                  <p className="admin__stat-value">{result.summary.avg_matches_per_line}개</p>
+                </div>
+              </div>
 
-          <h5>당첨 통계</h5>
-          <table className="admin__table">
-            <thead>
-              <tr>
-                <th>등수</th>
-                <th>적중 조건</th>
-                <th>횟수</th>
-                <th>적중률</th>
-              </tr>
-            </thead>
-            <tbody>
-              <tr>
-                <td>5등</td>
-                <td>3개 일치</td>
-                <td>{result.summary.total_match_3}줄</td>
-                <td>{result.summary.match_3_rate}%</td>
-              </tr>
-              <tr>
-                <td>4등</td>
-                <td>4개 일치</td>
-                <td>{result.summary.total_match_4}줄</td>
-                <td>{result.summary.match_4_rate}%</td>
-              </tr>
-              <tr>
-                <td>3등</td>
-                <td>5개 일치</td>
-                <td>{result.summary.total_match_5}줄</td>
-                <td>{result.summary.match_5_rate}%</td>
-              </tr>
-              <tr>
-                <td>1등</td>
-                <td>6개 일치</td>
-                <td>{result.summary.total_match_6}줄</td>
-                <td>{result.summary.match_6_rate}%</td>
-              </tr>
-            </tbody>
-          </table>
+              <h5>당첨 통계</h5>
+              <table className="admin__table">
+                <thead>
+                  <tr>
+                    <th>등수</th>
+                    <th>적중 조건</th>
+                    <th>횟수</th>
+                    <th>적중률</th>
+                  </tr>
+                </thead>
+                <tbody>
+                  <tr>
+                    <td>5등</td>
+                    <td>3개 일치</td>
+                    <td>{result.summary.total_match_3}줄</td>
+                    <td>{result.summary.match_3_rate}%</td>
+                  </tr>
+                  <tr>
+                    <td>4등</td>
+                    <td>4개 일치</td>
+                    <td>{result.summary.total_match_4}줄</td>
+                    <td>{result.summary.match_4_rate}%</td>
+                  </tr>
+                  <tr>
+                    <td>3등</td>
+                    <td>5개 일치</td>
+                    <td>{result.summary.total_match_5}줄</td>
+                    <td>{result.summary.match_5_rate}%</td>
+                  </tr>
+                  <tr>
+                    <td>1등</td>
+                    <td>6개 일치</td>
+                    <td>{result.summary.total_match_6}줄</td>
+                    <td>{result.summary.match_6_rate}%</td>
+                  </tr>
+                </tbody>
+              </table>
 
-          <h5>로직별 평균 성능</h5>
-          <table className="admin__table">
-            <thead>
-              <tr>
-                <th>로직</th>
-                <th>평균 적중 개수</th>
-              </tr>
-            </thead>
-            <tbody>
-              {Object.entries(result.summary.logic_avg_scores).map(([logic, score]) => (
-                <tr key={logic}>
-                  <td>{logic}</td>
-                  <td>{score}개/줄</td>
-                </tr>
-              ))}
-            </tbody>
-          </table>
+              {result.summary.random_baseline?.avg_matches_per_line && (
+                <>
+                  <h5>무작위 구매 대비</h5>
+                  <p className="admin__hint">
+                    같은 회차에 회차당 {result.summary.random_baseline.lines_per_draw}줄을 무작위로 산 경우를{' '}
+                    {result.summary.random_baseline.replicates}번 시뮬레이션한 기준선입니다 (95% 구간).
+                    lift가 1보다 크고 실제 값이 구간 위에 있어야 무작위보다 낫다고 볼 수 있습니다.
+                  </p>
+                  <table className="admin__table">
+                    <thead>
+                      <tr>
+                        <th>지표</th>
+                        <th>실제</th>
+                        <th>무작위 평균</th>
+                        <th>무작위 95% 구간</th>
+                        <th>lift</th>
+                      </tr>
+                    </thead>
+                    <tbody>
+                      {[
+                        ['줄당 평균 적중', result.summary.random_baseline.avg_matches_per_line, '개'],
+                        ['평균 성능 점수', result.summary.random_baseline.avg_performance_score, ''],
+                        ...Object.entries(result.summary.random_baseline.match_rates).map(([k, row]) => [
+                          `${k}개 일치 비율`, row, '%',
+                        ]),
+                      ].map(([label, row, unit]) => (
+                        <tr key={label}>
+                          <td>{label}</td>
+                          <td>
+                            {row.actual}{unit}
+                            {row.above_random ? ' ✅' : ''}
+                          </td>
+                          <td>{row.random}{unit}</td>
+                          <td>{row.ci95[0]} ~ {row.ci95[1]}{unit}</td>
+                          <td>{row.lift ?? '-'}</td>
+                        </tr>
+                      ))}
+                    </tbody>
+                  </table>
+                </>
+              )}
+
+              <h5>로직별 평균 성능</h5>
+              <table className="admin__table">
+                <thead>
+                  <tr>
+                    <th>로직</th>
+                    <th>평균 적중 개수</th>
+                  </tr>
+                </thead>
+                <tbody>
+                  {Object.entries(result.summary.logic_avg_scores).map(([logic, score]) => (
+                    <tr key={logic}>
+                      <td>{logic}</td>
+                      <td>{score}개/줄</td>
+                    </tr>
+                  ))}
+                </tbody>
+              </table>
+            </>
+          ) : (
+            <p className="admin__info">요약은 모든 회차 평가가 끝나면 표시됩니다.</p>
+          )}
 
           <h5>회차별 상세 결과</h5>
           <div className="admin__table-wrapper">
@@ -230,6 +369,81 @@ function BacktestTab() {
         </div>
       )}
 
+      {/* 가중치 설정 비교 */}
+      <div className="admin__section">
+        <h4>가중치 설정 비교</h4>
+        <p className="admin__hint">
+          위 시작/종료 회차 구간에서 여러 가중치 설정을 한 번에 비교합니다.
+          첫 설정이 비교 기준이며, ai_weights가 null이면 현재 모델 가중치를 씁니다.
+        </p>
+        <textarea
+          rows={8}
+          value={compareConfigs}
+          onChange={(e) => setCompareConfigs(e.target.value)}
+          style={{ width: '100%', fontFamily: 'monospace' }}
+        />
+        <div className="admin__form-row">
+          <button
+            className="admin__btn admin__btn--primary"
+            onClick={handleCompareBacktest}
+            disabled={loading}
+          >
+            {loading ? '테스트 중...' : '비교 실행'}
+          </button>
+        </div>
+
+        {compareResult && (
+          <div className="admin__table-wrapper">
+            <table className="admin__table">
+              <thead>
+                <tr>
+                  <th>설정</th>
+                  <th>가중치</th>
+                  <th>평균 점수</th>
+                  <th>줄당 적중</th>
+                  <th>3개</th>
+                  <th>4개</th>
+                  <th>5개</th>
+                  <th>6개</th>
+                  <th>종합/AI핵심</th>
+                  <th>기준 대비</th>
+                  <th>회차 승/무/패</th>
+                </tr>
+              </thead>
+              <tbody>
+                {compareResult.table.map((row) => (
+                  <tr key={row.name}>
+                    <td>{row.name}</td>
+                    <td>
+                      {Object.entries(row.ai_weights)
+                        .map(([logic, w]) => `${logic}:${Number(w).toFixed(2)}`)
+                        .join(' ')}
+                    </td>
+                    <td>{row.avg_performance_score}</td>
+                    <td>{row.avg_matches_per_line}</td>
+                    <td>{row.total_match_3}</td>
+                    <td>{row.total_match_4}</td>
+                    <td>{row.total_match_5}</td>
+                    <td>{row.total_match_6}</td>
+                    <td>{row.final_avg_score} / {row.ai_core_avg_score}</td>
+                    <td>
+                      {row.diff_performance_score === undefined
+                        ? '기준'
+                        : `${row.diff_performance_score >= 0 ? '+' : ''}${row.diff_performance_score}점`}
+                    </td>
+                    <td>
+                      {row.draws_better === undefined
+                        ? '-'
+                        : `${row.draws_better}/${row.draws_equal}/${row.draws_worse}`}
+                    </td>
+                  </tr>
+                ))}
+              </tbody>
+            </table>
+          </div>
+        )}
+      </div>
+
       {/* 단일 회차 백테스팅 */}
       <div className="admin__section">
         <h4>단일 회차 백테스팅</h4>
@@ -1,6 +1,15 @@
 import { formatDate } from './AdminUtils.js'
 
-function MLTab({ mlAnalysis, mlLatest, mlLogs, retraining, handleRetrain }) {
+function MLTab({
+  mlAnalysis,
+  mlLatest,
+  mlLogs,
+  retraining,
+  handleRetrain,
+  weightSearch,
+  searchingWeights,
+  handleWeightSearch,
+}) {
   return (
     <div className="admin__ml">
       <div className="admin__toolbar">
@@ -11,8 +20,63 @@ function MLTab({ mlAnalysis, mlLatest, mlLogs, retraining, handleRetrain }) {
         >
           {retraining ? '재학습 중...' : 'ML 재학습'}
         </button>
+        <button
+          className="admin__btn"
+          onClick={() => handleWeightSearch(false)}
+          disabled={searchingWeights}
+        >
+          {searchingWeights ? '탐색 중...' : '가중치 탐색'}
+        </button>
+        <button
+          className="admin__btn"
+          onClick={() => handleWeightSearch(true)}
+          disabled={searchingWeights}
+        >
+          탐색 후 적용
+        </button>
       </div>
 
+      {weightSearch && (
+        <div className="admin__section">
+          <h3>
+            가중치 탐색 결과 ({weightSearch.eval_range[0]}~{weightSearch.eval_range[1]}회,
+            후보 {weightSearch.candidates}개, {weightSearch.elapsed_sec}초)
+          </h3>
+          {weightSearch.baseline && (
+            <p className="admin__info">
+              현재 가중치 Top15 적중률: {(weightSearch.baseline.hit_rate * 100).toFixed(2)}%
+              {weightSearch.applied && ' → 1위 가중치 적용됨'}
+            </p>
+          )}
+          <table className="admin__table">
+            <thead>
+              <tr>
+                <th>순위</th>
+                <th>Logic1</th>
+                <th>Logic2</th>
+                <th>Logic3</th>
+                <th>Logic4</th>
+                <th>Top15 적중률</th>
+                <th>회차당 적중</th>
+              </tr>
+            </thead>
+            <tbody>
+              {weightSearch.ranked.map((row) => (
+                <tr key={row.rank}>
+                  <td>{row.rank}</td>
+                  <td>{row.weights.logic1}</td>
+                  <td>{row.weights.logic2}</td>
+                  <td>{row.weights.logic3}</td>
+                  <td>{row.weights.logic4}</td>
+                  <td>{(row.hit_rate * 100).toFixed(2)}%</td>
+                  <td>{row.avg_hits}</td>
+                </tr>
+              ))}
+            </tbody>
+          </table>
+        </div>
+      )}
+
       {mlLatest && (
         <div className="admin__section">
           <h3>최신 ML 상태</h3>
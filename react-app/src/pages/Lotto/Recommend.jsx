@@ -4,11 +4,10 @@ import { useAuth } from '../../context/AuthContext.jsx'
 import { useNotification } from '../../context/NotificationContext.jsx'
 import {
   requestFreeRecommendation,
-  getFreeRecommendStatus,
   fetchMyPageLines,
   requestOneLine,
   requestAllLines,
-  getPoolStatus,
+  getRecommendSession,
   getFixedCandidates,
   requestOneLineAdvanced,
   requestAllLinesAdvanced,
@@ -128,7 +127,8 @@ function Recommend() {
 
   const loadFreeStatus = async () => {
     try {
-      const status = await getFreeRecommendStatus()
+      const session = await getRecommendSession()
+      const status = session.free
       setFreeStatus(status)
       if (status.lines && status.lines.length > 0) {
         setLines(status.lines)
@@ -144,7 +144,8 @@ function Recommend() {
 
   const loadPaidStatus = useCallback(async () => {
     try {
-      const poolData = await getPoolStatus()
+      const session = await getRecommendSession()
+      const poolData = session?.pool
       console.log('[동기화] DB 상태 로드:', poolData)
 
       if (poolData) {